@@ -2,7 +2,7 @@ import asyncio
 import aiohttp
 import logging
 from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 
 from query_classifier import QueryClassifier, QueryType
@@ -29,6 +29,7 @@ class RoutingResult:
     doc_response: Optional[AgentResponse] = None
     combined_response: Optional[str] = None
     total_processing_time_ms: float = 0.0
+    stages: List[Dict[str, Any]] = field(default_factory=list)
 
 class AgentRouter:
     """Routes queries to appropriate agents and combines responses."""
@@ -208,9 +209,12 @@ class AgentRouter:
             force_both: Force querying both agents regardless of classification
         """
         start_time = asyncio.get_event_loop().time()
+        stages = []
         
         # Classify the query
         routing_strategy = self.classifier.get_routing_strategy(question)
+        classified_time = asyncio.get_event_loop().time()
+        stages.append({"stage": "classify", "duration_ms": round((classified_time - start_time) * 1000, 3)})
         query_type = routing_strategy['query_type']
         confidence = routing_strategy['confidence']
         
@@ -235,6 +239,11 @@ class AgentRouter:
         
         if tasks:
             results = await asyncio.gather(*[task[1] for task in tasks], return_exceptions=True)
+            stages.append({
+                "stage": "agent_fanout",
+                "duration_ms": round((asyncio.get_event_loop().time() - classified_time) * 1000, 3),
+                "count": len(tasks)
+            })
             
             for i, (agent_type, _) in enumerate(tasks):
                 result = results[i]
@@ -259,9 +268,11 @@ class AgentRouter:
                         doc_response = result
         
         # Combine responses
+        combine_start = asyncio.get_event_loop().time()
         combined_response = self.combine_responses(question, schema_response, doc_response, query_type)
         
         end_time = asyncio.get_event_loop().time()
+        stages.append({"stage": "combine", "duration_ms": round((end_time - combine_start) * 1000, 3)})
         total_time = (end_time - start_time) * 1000
         
         return RoutingResult(
@@ -271,7 +282,8 @@ class AgentRouter:
             schema_response=schema_response,
             doc_response=doc_response,
             combined_response=combined_response,
-            total_processing_time_ms=total_time
+            total_processing_time_ms=total_time,
+            stages=stages
         )
     
     async def health_check(self) -> Dict[str, Any]:
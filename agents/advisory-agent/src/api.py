@@ -6,7 +6,7 @@ from fastapi import FastAPI, Request, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field, field_validator
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
@@ -15,6 +15,7 @@ from slowapi.errors import RateLimitExceeded
 import sys
 sys.path.append('.')
 from src.agent_router import AgentRouter
+from agent_common.tracing import Trace, observe_trace, observe_request, metrics_payload
 
 # Load environment variables
 try:
@@ -188,6 +189,12 @@ async def health_check():
             timestamp=time.strftime("%Y-%m-%d %H:%M:%S")
         )
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics (per-stage latency and candidate histograms)."""
+    body, content_type = metrics_payload()
+    return Response(content=body, media_type=content_type)
+
 @app.post("/chat", response_model=ChatResponse)
 @limiter.limit("30/minute")
 async def chat_endpoint(
@@ -223,6 +230,10 @@ async def chat_endpoint(
             agents_used.append("document-agent")
         
         processing_time = (time.time() - start_time) * 1000
+        trace = Trace("chat")
+        trace.spans.extend(result.stages)
+        observe_trace(trace, "advisory")
+        observe_request("advisory", "/chat", processing_time / 1000)
         
         return ChatResponse(
             response=result.combined_response,
@@ -236,7 +247,8 @@ async def chat_endpoint(
                 "question_length": len(chat_request.question),
                 "schema_agent_time": result.schema_response.processing_time_ms if result.schema_response else 0,
                 "doc_agent_time": result.doc_response.processing_time_ms if result.doc_response else 0,
-                "routing_time": result.total_processing_time_ms
+                "routing_time": result.total_processing_time_ms,
+                "stages": result.stages
             },
             processing_time_ms=processing_time
         )
@@ -0,0 +1,8 @@
+"""
+Code shared by the agents and the MCP servers.
+
+Index versioning and hot reloads, quantized FAISS storage, encoder and LLM
+backends, query micro-batching, pre-fork serving, stage tracing and the
+Postman operations catalog. Agent-specific code (chunking, retrieval,
+prompts) stays in each agent.
+"""
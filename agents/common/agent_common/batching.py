@@ -0,0 +1,131 @@
+"""
+Dynamic micro-batching of query encodes for the Schema and Document Agents.
+
+Concurrent requests each encode a single query, so under load the encoder
+runs many batch-of-one forward passes. A ``MicroBatcher`` collects items
+submitted within a short window (``ENCODE_BATCH_WINDOW_MS``) into one call
+of a batch function, e.g. one encode and one multi-row FAISS search, and
+hands each caller its own result.
+
+There is no background thread: the first caller of a batch waits for the
+window, runs the batch for everyone and wakes the others. It only waits
+while other callers are in flight (e.g. a batch is encoding), and stops
+waiting as soon as they have all joined, so a lone request runs at once
+and adds no latency. Batch sizes and queue waits are recorded in the
+Prometheus histograms in ``tracing``.
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, List, Optional, Sequence
+
+from .tracing import observe_batch
+
+logger = logging.getLogger(__name__)
+
+ENCODE_BATCH_WINDOW_MS = float(os.getenv("ENCODE_BATCH_WINDOW_MS", "3"))  # 0 disables batching
+ENCODE_BATCH_MAX = int(os.getenv("ENCODE_BATCH_MAX", "32"))
+
+
+class _Pending:
+    """One submitted item waiting for its batch."""
+
+    __slots__ = ("item", "enqueued", "done", "lead", "result", "error")
+
+    def __init__(self, item: Any):
+        self.item = item
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+        self.lead = False
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class MicroBatcher:
+    """Coalesces concurrent ``submit`` calls into batched calls of ``batch_fn``."""
+
+    def __init__(self, batch_fn: Callable[[List[Any]], Sequence[Any]], agent: str, name: str,
+                 window_ms: float = ENCODE_BATCH_WINDOW_MS, max_batch: int = ENCODE_BATCH_MAX):
+        """
+        Args:
+            batch_fn: Maps a list of items to a list of results in the same order
+            agent: Agent label for the metrics
+            name: Batcher label for the metrics
+            window_ms: How long the first item of a batch waits for others (0 disables batching)
+            max_batch: Largest batch; a full batch runs without waiting out the window
+        """
+        self.batch_fn = batch_fn
+        self.agent = agent
+        self.name = name
+        self.window = max(0.0, window_ms) / 1000.0
+        self.max_batch = max(1, max_batch)
+        self._pending: List[_Pending] = []
+        self._leading = False
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+    def submit(self, item: Any) -> Any:
+        """Run ``item`` as part of the next batch and return its result."""
+        if self.window == 0:
+            return self.batch_fn([item])[0]
+
+        request = _Pending(item)
+        with self._cond:
+            self._in_flight += 1
+            self._pending.append(request)
+            if self._leading:
+                # The batch may now be full, or hold every caller in flight
+                self._cond.notify_all()
+            else:
+                self._leading = request.lead = True
+
+        try:
+            if not request.lead:
+                # Woken when our batch has run, or when promoted to lead the next one
+                request.done.wait()
+            if request.lead:
+                self._run(self._collect(request))
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _collect(self, leader: _Pending) -> List[_Pending]:
+        # Wait for the window measured from the leader's arrival, a full batch,
+        # or until every caller in flight has joined (at once if there are none)
+        deadline = leader.enqueued + self.window
+        with self._cond:
+            while len(self._pending) < min(self.max_batch, self._in_flight):
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            if self._pending:
+                # Overflow: the oldest waiter leads the next batch
+                successor = self._pending[0]
+                successor.lead = True
+                successor.done.set()
+            else:
+                self._leading = False
+        return batch
+
+    def _run(self, batch: List[_Pending]):
+        started = time.perf_counter()
+        try:
+            results = self.batch_fn([request.item for request in batch])
+            for request, result in zip(batch, results):
+                request.result = result
+        except BaseException as e:
+            for request in batch:
+                request.error = e
+        finally:
+            observe_batch(self.agent, self.name, len(batch), [started - request.enqueued for request in batch])
+            for request in batch:
+                request.lead = False
+                request.done.set()
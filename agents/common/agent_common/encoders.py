@@ -0,0 +1,249 @@
+"""
+Sentence encoder backends for the Schema and Document Agents.
+
+``torch`` (the default) runs the SentenceTransformer model. ``onnx`` and
+``onnx-int8`` run an exported copy of the same model, full precision or
+with int8 dynamically quantized weights, on ONNX Runtime with the
+``tokenizers`` library. They apply the model's pooling and normalization in
+numpy, so serving processes never import torch.
+
+Export a model once (this step needs torch and sentence-transformers):
+
+    python -m agent_common.encoders --model sentence-transformers/all-MiniLM-L6-v2 --quantize
+
+then select it with ``ENCODER_BACKEND=onnx`` or ``ENCODER_BACKEND=onnx-int8``.
+"""
+
+import os
+import json
+import inspect
+import logging
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ENCODER_BACKENDS = ("torch", "onnx", "onnx-int8")
+ENCODER_BACKEND = os.getenv("ENCODER_BACKEND", "torch")
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "models/onnx")
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))  # 0: ONNX Runtime default
+
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+CONFIG_FILE = "encoder_config.json"
+POOLING_MODES = ("mean", "cls", "max")
+
+
+def onnx_model_dir(model_name: str, root: str = ONNX_MODEL_DIR) -> Path:
+    """Directory holding the exported copy of a model."""
+    return Path(root) / model_name.replace("/", "__")
+
+
+class OnnxEncoder:
+    """
+    ONNX Runtime replacement for ``SentenceTransformer.encode``.
+
+    Reads the files written by ``export_onnx``: the transformer graph, the
+    fast tokenizer and ``encoder_config.json`` (pooling, normalization,
+    maximum sequence length).
+    """
+
+    def __init__(self, model_dir: Union[str, Path], quantized: bool = False, threads: int = ONNX_THREADS):
+        """
+        Args:
+            model_dir: Export directory from ``export_onnx``
+            quantized: Use the int8 model instead of the full-precision one
+            threads: Intra-op threads (0 for the ONNX Runtime default)
+        """
+        from tokenizers import Tokenizer
+
+        self.model_dir = Path(model_dir)
+        config_path = self.model_dir / CONFIG_FILE
+        if not config_path.exists():
+            raise FileNotFoundError(f"No exported ONNX model in {self.model_dir}; run 'python -m agent_common.encoders --model ...' first")
+        self.config = json.loads(config_path.read_text())
+        self.model_name = self.config["model_name"]
+
+        self.model_path = self.model_dir / (QUANTIZED_MODEL_FILE if quantized else MODEL_FILE)
+        self.threads = threads
+        self._session = None
+        self._session_pid = None
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(str(self.model_dir / TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=self.config["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=self.config["pad_token_id"], pad_token=self.config["pad_token"])
+        logger.info(f"Loaded ONNX encoder {self.model_path} ({self.config['pooling']} pooling)")
+
+    @property
+    def session(self):
+        """The inference session, recreated in a forked worker (its thread pool does not survive fork)."""
+        if self._session_pid != os.getpid():
+            import onnxruntime as ort
+            options = ort.SessionOptions()
+            if self.threads:
+                options.intra_op_num_threads = self.threads
+            self._session = ort.InferenceSession(str(self.model_path), options, providers=["CPUExecutionProvider"])
+            self._session_pid = os.getpid()
+        return self._session
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.config["dimension"]
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32, show_progress_bar: bool = False,
+               convert_to_numpy: bool = True, normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        """
+        Encode texts like ``SentenceTransformer.encode``.
+
+        Accepts (and ignores) SentenceTransformer-only options such as
+        ``num_workers``. Always returns float32 numpy arrays.
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        embeddings = np.zeros((len(texts), self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        # Longest first, so each batch pads to similar lengths
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        for start in range(0, len(texts), batch_size):
+            batch = order[start:start + batch_size]
+            encodings = self.tokenizer.encode_batch([texts[i] for i in batch])
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feed = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": attention_mask
+            }
+            if "token_type_ids" in self.input_names:
+                feed["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+            hidden = self.session.run(None, feed)[0]
+            embeddings[batch] = self._pool(hidden, attention_mask)
+
+        if self.config["normalize"] or normalize_embeddings:
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return embeddings[0] if single else embeddings
+
+    def _pool(self, hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        pooling = self.config["pooling"]
+        if pooling == "cls":
+            return hidden[:, 0]
+        mask = attention_mask[..., None].astype(hidden.dtype)
+        if pooling == "max":
+            return np.where(mask > 0, hidden, -1e9).max(axis=1)
+        return (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+
+def load_encoder(model_name: str, backend: Optional[str] = None, model_dir: Optional[str] = None):
+    """
+    Load the encoder for a model with the configured backend.
+
+    Args:
+        model_name: SentenceTransformer model name
+        backend: One of ENCODER_BACKENDS (default: ENCODER_BACKEND)
+        model_dir: Export directory for the ONNX backends (default: under ONNX_MODEL_DIR)
+    """
+    backend = backend or ENCODER_BACKEND
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend: {backend} (expected one of {', '.join(ENCODER_BACKENDS)})")
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name, trust_remote_code=True)
+    return OnnxEncoder(model_dir or onnx_model_dir(model_name), quantized=backend == "onnx-int8")
+
+
+def _pooling_mode(pooling) -> str:
+    # sentence-transformers 6 stores one mode name, earlier versions one flag per mode
+    mode = getattr(pooling, "pooling_mode", None)
+    if isinstance(mode, str):
+        return mode
+    config = pooling.get_config_dict()
+    enabled = [key[len("pooling_mode_"):] for key, value in config.items() if key.startswith("pooling_mode_") and value]
+    names = {"cls_token": "cls", "mean_tokens": "mean", "max_tokens": "max"}
+    return "+".join(names.get(flag, flag) for flag in enabled)
+
+
+def export_onnx(model_name: str, output_dir: Optional[str] = None, quantize: bool = False, opset: int = 17) -> Path:
+    """
+    Export a SentenceTransformer model for the ONNX backends.
+
+    Args:
+        model_name: SentenceTransformer model name
+        output_dir: Export directory (default: under ONNX_MODEL_DIR)
+        quantize: Also write an int8 dynamically quantized model
+        opset: ONNX opset version
+
+    Returns:
+        The export directory
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer, models
+
+    model = SentenceTransformer(model_name, trust_remote_code=True, device="cpu")
+    modules = list(model)
+    transformer = modules[0]
+    pooling = next((m for m in modules if isinstance(m, models.Pooling)), None)
+    unsupported = [type(m).__name__ for m in modules[1:] if not isinstance(m, (models.Pooling, models.Normalize))]
+    if not isinstance(transformer, models.Transformer) or unsupported:
+        raise ValueError(f"Cannot export {model_name}: unsupported modules {unsupported or [type(transformer).__name__]}")
+    pooling_mode = _pooling_mode(pooling) if pooling else "mean"
+    if pooling_mode not in POOLING_MODES:
+        raise ValueError(f"Cannot export {model_name}: unsupported pooling '{pooling_mode}'")
+
+    out = Path(output_dir) if output_dir else onnx_model_dir(model_name)
+    out.mkdir(parents=True, exist_ok=True)
+    tokenizer = transformer.tokenizer
+    tokenizer.backend_tokenizer.save(str(out / TOKENIZER_FILE))
+
+    sample = tokenizer(["Export sample"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    auto_model = transformer.auto_model.eval()
+
+    class LastHiddenState(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.model = auto_model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs)))[0]
+
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in [*input_names, "last_hidden_state"]}
+    # torch >= 2.9 defaults to the dynamo exporter; the TorchScript one takes dynamic_axes on every version
+    export_options = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    with torch.no_grad():
+        torch.onnx.export(LastHiddenState(), tuple(sample[name] for name in input_names), str(out / MODEL_FILE),
+                          input_names=input_names, output_names=["last_hidden_state"],
+                          dynamic_axes=dynamic_axes, opset_version=opset, **export_options)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(str(out / MODEL_FILE), str(out / QUANTIZED_MODEL_FILE), weight_type=QuantType.QInt8)
+
+    config = {
+        "model_name": model_name,
+        "dimension": model.get_sentence_embedding_dimension(),
+        "pooling": pooling_mode,
+        "normalize": any(isinstance(m, models.Normalize) for m in modules),
+        "max_seq_length": model.max_seq_length,
+        "pad_token_id": tokenizer.pad_token_id,
+        "pad_token": tokenizer.pad_token,
+        "inputs": input_names,
+        "quantized": quantize
+    }
+    (out / CONFIG_FILE).write_text(json.dumps(config, indent=2))
+    logger.info(f"Exported {model_name} to {out}")
+    return out
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export a SentenceTransformer model for the ONNX encoder backends")
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2", help="Model to export")
+    parser.add_argument("--out", help=f"Export directory (default: {ONNX_MODEL_DIR}/<model>)")
+    parser.add_argument("--quantize", action="store_true", help="Also write an int8 quantized model for ENCODER_BACKEND=onnx-int8")
+    parser.add_argument("--opset", type=int, default=17, help="ONNX opset version")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    print(f"Exported to {export_onnx(args.model, args.out, args.quantize, args.opset)}")
@@ -0,0 +1,246 @@
+"""
+Versioned index directories and zero-downtime reloads for the Schema and Document Agents.
+
+An index root (e.g. ``embeddings/``) holds immutable builds under
+``versions/<id>/`` and a ``current`` symlink to the live one. ``index.faiss``
+and ``metadata.json`` in the root are symlinks through ``current``, so
+readers that open the fixed paths keep working and one ``os.replace`` of
+the ``current`` link switches both files together.
+
+``HotIndex`` holds the object that serves requests. A reload builds and
+warms a replacement in a background thread and then swaps the reference;
+requests that already hold the old object finish on it.
+"""
+
+import os
+import time
+import uuid
+import shutil
+import logging
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_DIR = "versions"
+CURRENT_LINK = "current"
+INDEX_FILES = ("index.faiss", "metadata.json", "vectors.npy")
+KEEP_VERSIONS = int(os.getenv("INDEX_KEEP_VERSIONS", "3"))
+WATCH_INTERVAL = float(os.getenv("INDEX_WATCH_INTERVAL", "30"))
+
+
+def new_version_dir(root: str) -> Path:
+    """Create an empty directory for the next build under ``root/versions``."""
+    version = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    version_dir = Path(root) / VERSIONS_DIR / version
+    version_dir.mkdir(parents=True)
+    return version_dir
+
+
+def _replace_symlink(link: Path, target: str):
+    tmp_link = link.with_name(f".{link.name}.{uuid.uuid4().hex[:6]}")
+    os.symlink(target, tmp_link)
+    os.replace(tmp_link, link)
+
+
+def publish_version(root: str, version_dir: Path, keep: int = KEEP_VERSIONS):
+    """
+    Make a finished build the current version.
+
+    Args:
+        root: Index root directory
+        version_dir: Directory created by ``new_version_dir`` holding the index files
+        keep: Versions to retain, including the new one
+    """
+    root = Path(root)
+    version_dir = Path(version_dir)
+    _replace_symlink(root / CURRENT_LINK, os.path.relpath(version_dir, root))
+
+    # Route the fixed file paths through ``current`` (replaces pre-versioning files)
+    for name in INDEX_FILES:
+        link = root / name
+        if not link.is_symlink():
+            _replace_symlink(link, f"{CURRENT_LINK}/{name}")
+    logger.info(f"Published index version {version_dir.name} in {root}")
+
+    versions = sorted(p for p in (root / VERSIONS_DIR).iterdir() if p.is_dir())
+    for old in versions[:-keep] if keep > 0 else []:
+        if old.resolve() != version_dir.resolve():
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def resolve_index_dir(root: str) -> Path:
+    """Directory of the current version, or ``root`` itself for an unversioned index."""
+    root = Path(root)
+    current = root / CURRENT_LINK
+    return current.resolve() if current.exists() else root
+
+
+def current_version(root: str) -> Optional[str]:
+    """Name of the current version, if the root is versioned."""
+    current = Path(root) / CURRENT_LINK
+    return current.resolve().name if current.exists() else None
+
+
+def file_signature(paths: Iterable[Path]) -> Tuple:
+    """Resolved path, size and mtime of each file; changes whenever a file is replaced."""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((os.path.realpath(path), stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            signature.append((str(path), None, None))
+    return tuple(signature)
+
+
+class HotIndex:
+    """
+    Serving object that can be rebuilt and swapped while requests run.
+
+    Request handlers read ``current`` once and use that reference for the
+    whole request. Reloads are single-flight: a reload requested while one is
+    running is coalesced into it.
+    """
+
+    def __init__(self, current: Any, build: Callable[[Any], Any], watch_paths: List[str],
+                 warmup: Optional[Callable[[Any], None]] = None, name: str = "index"):
+        """
+        Args:
+            current: Object serving requests now (None if the initial load failed)
+            build: Builds a replacement from the current object (may reuse its model)
+            watch_paths: Files whose replacement triggers a reload
+            warmup: Runs queries against a replacement before it is swapped in
+            name: Label for logs
+        """
+        self.current = current
+        self.build = build
+        self.warmup = warmup
+        self.watch_paths = [Path(p) for p in watch_paths]
+        self.name = name
+        self.signature = file_signature(self.watch_paths)
+        self.loaded_at = datetime.now(timezone.utc) if current is not None else None
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+        self.last_duration: Optional[float] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._pending: Optional[tuple] = None
+        self._stop = threading.Event()
+
+    @property
+    def reloading(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def reload(self, wait: bool = False) -> Dict[str, Any]:
+        """
+        Build, warm and swap in a new version in the background.
+
+        Args:
+            wait: Block until the reload finishes
+
+        Returns:
+            Status after starting (or finishing) the reload
+        """
+        with self._lock:
+            if not self.reloading:
+                self._thread = threading.Thread(target=self._reload, name=f"{self.name}-reload", daemon=True)
+                self._thread.start()
+            thread = self._thread
+        if wait:
+            thread.join()
+        return self.status()
+
+    def warm(self):
+        """Run the warmup against the current version, e.g. in a newly forked worker."""
+        if self.current is not None and self.warmup is not None:
+            self.warmup(self.current)
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Reload in the calling thread, without warming up, if the watched files
+        changed (or ``force``).
+
+        The pre-fork parent calls this instead of running a watcher: it must
+        not run inference, and the workers forked from the new version warm
+        up themselves.
+
+        Returns:
+            True if a new version was swapped in
+        """
+        if not (force or self.poll()):
+            return False
+        logger.info(f"Reloading {self.name}")
+        reloads = self.reloads
+        self._reload(warm=False)
+        return self.reloads > reloads
+
+    def _reload(self, warm: bool = True):
+        start = time.perf_counter()
+        signature = file_signature(self.watch_paths)
+        try:
+            replacement = self.build(self.current)
+            if warm and self.warmup is not None:
+                self.warmup(replacement)
+        except Exception as e:
+            logger.error(f"Reloading {self.name} failed, keeping the current version: {e}")
+            self.last_error = str(e)
+            # Do not retry the same files on every watcher tick
+            self.signature = signature
+            return
+
+        self.current = replacement
+        self.signature = signature
+        self.loaded_at = datetime.now(timezone.utc)
+        self.reloads += 1
+        self.last_error = None
+        self.last_duration = round(time.perf_counter() - start, 3)
+        logger.info(f"Swapped in new {self.name} in {self.last_duration}s")
+
+    def start_watching(self, interval: float = WATCH_INTERVAL):
+        """Poll the watched files and reload when they change (interval <= 0 disables)."""
+        if interval <= 0 or self._watcher is not None:
+            return
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name=f"{self.name}-watcher", daemon=True)
+        self._watcher.start()
+        logger.info(f"Watching {', '.join(str(p) for p in self.watch_paths)} every {interval}s")
+
+    def stop_watching(self):
+        self._stop.set()
+
+    def poll(self) -> bool:
+        """
+        Check the watched files once; True when they differ from the loaded
+        version and have not changed since the previous check.
+        """
+        signature = file_signature(self.watch_paths)
+        if signature == self.signature or self.reloading:
+            self._pending = None
+            return False
+        # Reload once the files have stopped changing for a full interval
+        if signature == self._pending:
+            self._pending = None
+            return True
+        self._pending = signature
+        return False
+
+    def _watch(self, interval: float):
+        while not self._stop.wait(interval):
+            if self.poll():
+                logger.info(f"{self.name} files changed, reloading")
+                self.reload()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.current is not None,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+            "files": [path for path, _, _ in self.signature],
+            "reloading": self.reloading,
+            "reloads": self.reloads,
+            "last_reload_seconds": self.last_duration,
+            "last_error": self.last_error,
+            "watching": self._watcher is not None and self._watcher.is_alive()
+        }
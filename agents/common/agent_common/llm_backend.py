@@ -0,0 +1,189 @@
+"""
+Pluggable LLM backends for the Schema and Document Agents.
+
+All backends expose the same ``chat(model, messages, stream=False)`` call and
+return Ollama-shaped payloads (``{"message": {"content": ...}}``), so callers
+can swap the real Ollama server for a deterministic stand-in when benchmarking
+retrieval and routing overhead without a model.
+
+Backend selection (``get_llm_backend``):
+    LLM_BACKEND=ollama (default)  - talk to Ollama at OLLAMA_HOST
+    LLM_BACKEND=fake              - in-process deterministic responses
+"""
+
+import os
+import time
+import random
+import hashlib
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+DEFAULT_FAKE_VOCABULARY = (
+    "the schema defines type field input mutation query returns object "
+    "payment card account holder transaction financial status id string "
+    "enum interface union list required optional argument value response"
+).split()
+
+
+class LLMBackend:
+    """Base interface for chat-completion backends."""
+
+    name = "base"
+
+    def chat(self, model: str, messages: List[Dict[str, str]], stream: bool = False,
+             **kwargs) -> Union[Dict[str, Any], Iterator[Dict[str, Any]]]:
+        """
+        Run a chat completion.
+
+        Args:
+            model: Model name to use
+            messages: List of ``{"role", "content"}`` dicts
+            stream: When True, return an iterator of partial message chunks
+
+        Returns:
+            A response dict, or an iterator of chunk dicts when streaming
+        """
+        raise NotImplementedError
+
+    def info(self) -> Dict[str, Any]:
+        """Describe the backend for health and stats endpoints."""
+        return {"backend": self.name}
+
+
+class OllamaBackend(LLMBackend):
+    """Backend that forwards requests to an Ollama (or Ollama-compatible) server."""
+
+    name = "ollama"
+
+    def __init__(self, host: Optional[str] = None):
+        import ollama  # imported lazily so the fake backend works without it
+
+        self.host = host or os.getenv("OLLAMA_HOST")
+        self._client = ollama.Client(host=self.host) if self.host else ollama
+
+    def chat(self, model, messages, stream=False, **kwargs):
+        return self._client.chat(model=model, messages=messages, stream=stream, **kwargs)
+
+    def info(self):
+        return {"backend": self.name, "host": self.host or "default"}
+
+
+class FakeLLMBackend(LLMBackend):
+    """
+    Deterministic in-process stand-in for Ollama.
+
+    The answer depends only on the model name and the last message, so repeated
+    runs produce identical output. Token rate, first-token latency and failure
+    injection can be tuned to model a real server.
+    """
+
+    name = "fake"
+
+    def __init__(self, tokens_per_second: float = 0.0, first_token_ms: float = 0.0,
+                 response_tokens: int = 64, failure_rate: float = 0.0,
+                 fail_every: int = 0, seed: int = 0):
+        """
+        Args:
+            tokens_per_second: Simulated generation rate (0 disables the delay)
+            first_token_ms: Simulated time to first token in milliseconds
+            response_tokens: Number of tokens in every answer
+            failure_rate: Probability (0-1) that a request raises
+            fail_every: Fail every Nth request deterministically (0 disables)
+            seed: Seed for the failure-injection random generator
+        """
+        self.tokens_per_second = tokens_per_second
+        self.first_token_ms = first_token_ms
+        self.response_tokens = response_tokens
+        self.failure_rate = failure_rate
+        self.fail_every = fail_every
+        self._rng = random.Random(seed)
+        self._request_count = 0
+        self._lock = threading.Lock()
+
+    def should_fail(self) -> bool:
+        """Advance the request counter and decide whether to inject a failure."""
+        with self._lock:
+            self._request_count += 1
+            if self.fail_every and self._request_count % self.fail_every == 0:
+                return True
+            return self.failure_rate > 0 and self._rng.random() < self.failure_rate
+
+    def generate_tokens(self, model: str, messages: List[Dict[str, str]]) -> List[str]:
+        """Build the deterministic token sequence for a request."""
+        prompt = messages[-1]["content"] if messages else ""
+        digest = hashlib.sha256(f"{model}\n{prompt}".encode("utf-8")).digest()
+        vocab = DEFAULT_FAKE_VOCABULARY
+        tokens = [f"[fake:{digest[:4].hex()}]"]
+        for i in range(max(self.response_tokens - 1, 0)):
+            tokens.append(" " + vocab[digest[i % len(digest)] % len(vocab)])
+        return tokens
+
+    def token_delay(self) -> float:
+        """Seconds to wait between tokens."""
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def chat(self, model, messages, stream=False, **kwargs):
+        if self.should_fail():
+            raise RuntimeError("Injected failure from fake LLM backend")
+        tokens = self.generate_tokens(model, messages)
+        if stream:
+            return self._stream(model, tokens)
+        if self.first_token_ms:
+            time.sleep(self.first_token_ms / 1000.0)
+        delay = self.token_delay()
+        if delay:
+            time.sleep(delay * len(tokens))
+        return {
+            "model": model,
+            "message": {"role": "assistant", "content": "".join(tokens)},
+            "done": True,
+            "eval_count": len(tokens),
+        }
+
+    def _stream(self, model: str, tokens: List[str]) -> Iterator[Dict[str, Any]]:
+        if self.first_token_ms:
+            time.sleep(self.first_token_ms / 1000.0)
+        delay = self.token_delay()
+        for i, token in enumerate(tokens):
+            if i and delay:
+                time.sleep(delay)
+            yield {"model": model, "message": {"role": "assistant", "content": token}, "done": False}
+        yield {"model": model, "message": {"role": "assistant", "content": ""}, "done": True,
+               "eval_count": len(tokens)}
+
+    def info(self):
+        return {
+            "backend": self.name,
+            "tokens_per_second": self.tokens_per_second,
+            "first_token_ms": self.first_token_ms,
+            "response_tokens": self.response_tokens,
+            "failure_rate": self.failure_rate,
+            "fail_every": self.fail_every,
+        }
+
+
+def get_llm_backend(name: Optional[str] = None) -> LLMBackend:
+    """
+    Create the LLM backend selected by name or the LLM_BACKEND env var.
+
+    The fake backend reads FAKE_LLM_TOKENS_PER_SEC, FAKE_LLM_FIRST_TOKEN_MS,
+    FAKE_LLM_RESPONSE_TOKENS, FAKE_LLM_FAILURE_RATE and FAKE_LLM_FAIL_EVERY.
+
+    Args:
+        name: Backend name ("ollama" or "fake"); defaults to LLM_BACKEND
+
+    Returns:
+        An LLMBackend instance
+    """
+    name = (name or os.getenv("LLM_BACKEND", "ollama")).lower()
+    if name == "ollama":
+        return OllamaBackend()
+    if name == "fake":
+        return FakeLLMBackend(
+            tokens_per_second=float(os.getenv("FAKE_LLM_TOKENS_PER_SEC", "0")),
+            first_token_ms=float(os.getenv("FAKE_LLM_FIRST_TOKEN_MS", "0")),
+            response_tokens=int(os.getenv("FAKE_LLM_RESPONSE_TOKENS", "64")),
+            failure_rate=float(os.getenv("FAKE_LLM_FAILURE_RATE", "0")),
+            fail_every=int(os.getenv("FAKE_LLM_FAIL_EVERY", "0")),
+        )
+    raise ValueError(f"Unknown LLM backend: {name}")
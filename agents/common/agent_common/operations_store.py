@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Operations Store
+
+Embedded SQLite catalog of programs, operations (with GraphQL bodies),
+categories and workflows, populated by the Postman sync step. Readers open
+the database read-only, so every process shares it through the OS page cache
+instead of parsing Postman collections and operations files itself.
+
+Operation search uses an FTS5 index ranked with bm25, weighting name over
+category, tags, description and the GraphQL body.
+
+The ship agent's Postman sync writes the catalog and the MCP servers read
+it; both use this module, so they always agree on the schema. Callers pass
+the database path (ship-agent/data/operations_catalog.db by default on
+both sides).
+"""
+
+import os
+import re
+import json
+import sqlite3
+import logging
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 2
+
+# Collection names whose program type is not the default normalization
+PROGRAM_TYPE_MAPPINGS = {
+    'Consumer Credit': 'consumer_credit',
+    'Trip.com': 'trip_com',
+    'Trip_com': 'trip_com',
+    'AP Automation': 'ap_automation',
+    'Fleet': 'fleet'
+}
+
+# bm25 column weights: name, category, tags, description, query
+FTS_WEIGHTS = (10.0, 5.0, 3.0, 2.0, 0.5)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS programs (
+    program_type TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT,
+    collection_file TEXT UNIQUE,
+    content_hash TEXT,
+    collection_size INTEGER,
+    collection_mtime_ns INTEGER,
+    operation_count INTEGER NOT NULL DEFAULT 0,
+    synced_at TEXT
+);
+CREATE TABLE IF NOT EXISTS operations (
+    id INTEGER PRIMARY KEY,
+    program_type TEXT NOT NULL REFERENCES programs(program_type) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    operation_type TEXT,
+    method TEXT,
+    category TEXT,
+    path TEXT,
+    description TEXT,
+    tags TEXT,
+    query TEXT,
+    variables TEXT,
+    document TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_operations_program_name ON operations(program_type, name);
+CREATE INDEX IF NOT EXISTS idx_operations_program_category ON operations(program_type, category);
+CREATE TABLE IF NOT EXISTS workflows (
+    program_type TEXT NOT NULL REFERENCES programs(program_type) ON DELETE CASCADE,
+    workflow_key TEXT NOT NULL,
+    name TEXT,
+    description TEXT,
+    required INTEGER,
+    steps TEXT,
+    PRIMARY KEY (program_type, workflow_key)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS operations_fts USING fts5(
+    name, category, tags, description, query,
+    tokenize = "unicode61 tokenchars '_'"
+);
+"""
+
+
+def normalize_program_type(collection_name: str) -> str:
+    """
+    Program type for a collection name.
+
+    Every writer of the store must use this, so the ship-agent and MCP syncers
+    key the same collection the same way.
+    """
+    if collection_name in PROGRAM_TYPE_MAPPINGS:
+        return PROGRAM_TYPE_MAPPINGS[collection_name]
+    return collection_name.lower().replace(' ', '_').replace('-', '_').replace('.', '_')
+
+
+def _name_words(name: str) -> str:
+    """Index camelCase and separator-joined names as words as well as whole."""
+    spaced = re.sub(r'([a-z0-9])([A-Z])', r'\1 \2', name)
+    spaced = re.sub(r'[^A-Za-z0-9]+', ' ', spaced)
+    return f"{name} {spaced}"
+
+
+def _fts_query(text: str) -> str:
+    """Turn free text into an FTS5 prefix query over its tokens (OR-combined)."""
+    tokens = re.findall(r'[A-Za-z0-9_]+', text)
+    return " OR ".join(f'"{t}"*' for t in tokens)
+
+
+class OperationsStore:
+    """SQLite/FTS5 operations catalog. Writers use WAL so readers never block."""
+
+    def __init__(self, db_path: Path, readonly: bool = False):
+        """
+        Args:
+            db_path: Database file
+            readonly: Open read-only; the database must already exist
+        """
+        self.db_path = Path(db_path)
+        self.readonly = readonly
+        if readonly:
+            if not self.db_path.exists():
+                raise FileNotFoundError(f"Operations store not found: {self.db_path}")
+            self.conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+            self.conn.execute("PRAGMA query_only = ON")
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                self.conn.close()
+                raise sqlite3.DatabaseError(f"Operations store schema {version}, expected {SCHEMA_VERSION}")
+        else:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                self._drop_tables()
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+
+    @classmethod
+    def open_readonly(cls, db_path: Path) -> Optional["OperationsStore"]:
+        """Open for reading, or return None if the store has not been built."""
+        try:
+            return cls(db_path, readonly=True)
+        except (FileNotFoundError, sqlite3.Error) as e:
+            logger.info(f"Operations store unavailable: {e}")
+            return None
+
+    def close(self):
+        self.conn.close()
+
+    def _drop_tables(self):
+        # Older schemas are rebuilt; the next sync repopulates them
+        self.conn.executescript(
+            "DROP TABLE IF EXISTS operations_fts; DROP TABLE IF EXISTS workflows; "
+            "DROP TABLE IF EXISTS operations; DROP TABLE IF EXISTS programs;"
+        )
+
+    # ------------------------------------------------------------------
+    # Writes (sync step)
+    # ------------------------------------------------------------------
+
+    def replace_program(self, program_type: str, name: str, operations: List[Dict[str, Any]],
+                        collection_file: Optional[Path] = None, content_hash: Optional[str] = None,
+                        description: Optional[str] = None,
+                        workflows: Optional[Dict[str, Any]] = None):
+        """
+        Replace a program's operations and workflows in one transaction.
+
+        Args:
+            program_type: Program identifier
+            name: Display name (collection name)
+            operations: Operations in the sync extractor's format
+            collection_file: Source Postman collection
+            content_hash: SHA-256 of the collection
+            description: Collection description
+            workflows: Program YAML ``workflows`` mapping
+        """
+        stat = collection_file.stat() if collection_file and collection_file.exists() else None
+        with self.conn:
+            old = self.conn.execute(
+                "SELECT program_type FROM programs WHERE program_type = ? OR collection_file = ?",
+                (program_type, collection_file.name if collection_file else None)
+            ).fetchall()
+            for row in old:
+                self._delete_program(row["program_type"])
+
+            self.conn.execute(
+                "INSERT INTO programs (program_type, name, description, collection_file, content_hash, "
+                "collection_size, collection_mtime_ns, operation_count, synced_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))",
+                (program_type, name, description, collection_file.name if collection_file else None,
+                 content_hash, stat.st_size if stat else None, stat.st_mtime_ns if stat else None,
+                 len(operations))
+            )
+            for position, op in enumerate(operations):
+                metadata = op.get('metadata', {})
+                graphql = op.get('graphql', {})
+                tags = metadata.get('tags') or []
+                description = metadata.get('description')
+                if isinstance(description, dict):
+                    description = description.get('content')
+                # Columns serve lookups and search; the document is returned as synced
+                cursor = self.conn.execute(
+                    "INSERT INTO operations (program_type, position, name, operation_type, method, category, "
+                    "path, description, tags, query, variables, document) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (program_type, position, op['name'], op.get('operation_type'), op.get('method'),
+                     metadata.get('category', 'uncategorized'), metadata.get('path', ''),
+                     description, json.dumps(tags),
+                     graphql.get('query', ''), json.dumps(graphql.get('variables', {})),
+                     json.dumps(op))
+                )
+                self.conn.execute(
+                    "INSERT INTO operations_fts (rowid, name, category, tags, description, query) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (cursor.lastrowid, _name_words(op['name']), metadata.get('category', ''),
+                     " ".join(tags), description or '', graphql.get('query', ''))
+                )
+            for key, workflow in (workflows or {}).items():
+                if not isinstance(workflow, dict):
+                    continue
+                self.conn.execute(
+                    "INSERT INTO workflows (program_type, workflow_key, name, description, required, steps) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (program_type, key, workflow.get('name', key), workflow.get('description', ''),
+                     int(bool(workflow.get('required', False))), json.dumps(workflow.get('steps', [])))
+                )
+        logger.info(f"Stored {len(operations)} operations for {program_type}")
+
+    def _delete_program(self, program_type: str):
+        self.conn.execute(
+            "DELETE FROM operations_fts WHERE rowid IN (SELECT id FROM operations WHERE program_type = ?)",
+            (program_type,)
+        )
+        self.conn.execute("DELETE FROM operations WHERE program_type = ?", (program_type,))
+        self.conn.execute("DELETE FROM workflows WHERE program_type = ?", (program_type,))
+        self.conn.execute("DELETE FROM programs WHERE program_type = ?", (program_type,))
+
+    def remove_collection(self, collection_file: str):
+        """Remove the program synced from a deleted collection."""
+        with self.conn:
+            for row in self.conn.execute("SELECT program_type FROM programs WHERE collection_file = ?",
+                                         (collection_file,)).fetchall():
+                self._delete_program(row["program_type"])
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def program_for_collection(self, collection_path: Path, content_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Program row synced from ``collection_path`` if it is still current.
+
+        Current means the file's size and mtime match the sync, or (if given)
+        its content hash does.
+        """
+        row = self.conn.execute("SELECT * FROM programs WHERE collection_file = ?",
+                                (collection_path.name,)).fetchone()
+        if row is None or not collection_path.exists():
+            return None
+        stat = collection_path.stat()
+        if row["collection_size"] == stat.st_size and row["collection_mtime_ns"] == stat.st_mtime_ns:
+            return dict(row)
+        if content_hash and row["content_hash"] == content_hash:
+            return dict(row)
+        return None
+
+    def list_programs(self) -> List[Dict[str, Any]]:
+        """All programs with operation counts."""
+        return [dict(row) for row in self.conn.execute("SELECT * FROM programs ORDER BY program_type")]
+
+    def get_program(self, program_type: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute("SELECT * FROM programs WHERE program_type = ?", (program_type,)).fetchone()
+        return dict(row) if row else None
+
+    @staticmethod
+    def _row_to_operation(row: sqlite3.Row) -> Dict[str, Any]:
+        """The operation exactly as the sync extractor produced it."""
+        return json.loads(row['document'])
+
+    def get_operations(self, program_type: str) -> List[Dict[str, Any]]:
+        """A program's operations in collection order."""
+        rows = self.conn.execute("SELECT * FROM operations WHERE program_type = ? ORDER BY position",
+                                 (program_type,))
+        return [self._row_to_operation(row) for row in rows]
+
+    def get_operation(self, program_type: str, name: str) -> Optional[Dict[str, Any]]:
+        """First operation with this name in a program."""
+        row = self.conn.execute(
+            "SELECT * FROM operations WHERE program_type = ? AND name = ? ORDER BY position LIMIT 1",
+            (program_type, name)
+        ).fetchone()
+        return self._row_to_operation(row) if row else None
+
+    def get_categories(self, program_type: str) -> Dict[str, List[str]]:
+        """category -> operation names, in collection order."""
+        categories: Dict[str, List[str]] = {}
+        for row in self.conn.execute(
+                "SELECT category, name FROM operations WHERE program_type = ? ORDER BY position",
+                (program_type,)):
+            categories.setdefault(row['category'], []).append(row['name'])
+        return categories
+
+    def get_workflows(self, program_type: str) -> Dict[str, Dict[str, Any]]:
+        """Workflows recorded from the program YAML."""
+        workflows = {}
+        for row in self.conn.execute("SELECT * FROM workflows WHERE program_type = ?", (program_type,)):
+            workflows[row['workflow_key']] = {
+                'name': row['name'],
+                'description': row['description'],
+                'required': bool(row['required']),
+                'steps': json.loads(row['steps'] or '[]')
+            }
+        return workflows
+
+    def search(self, query: str, program_type: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Full-text operation search ranked by weighted bm25.
+
+        Args:
+            query: Free text; each token is matched as a prefix
+            program_type: Restrict to one program
+            limit: Maximum results
+
+        Returns:
+            Operation summaries with a relevance score (higher is better)
+        """
+        match = _fts_query(query)
+        if not match:
+            return []
+        weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+        sql = (
+            f"SELECT o.name, o.program_type, o.operation_type, o.category, o.description, "
+            f"bm25(operations_fts, {weights}) AS rank "
+            f"FROM operations_fts JOIN operations o ON o.id = operations_fts.rowid "
+            f"WHERE operations_fts MATCH ?"
+        )
+        params: List[Any] = [match]
+        if program_type:
+            sql += " AND o.program_type = ?"
+            params.append(program_type)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+
+        results = []
+        for row in self.conn.execute(sql, params):
+            results.append({
+                "name": row["name"],
+                "program_type": row["program_type"],
+                "operation_type": row["operation_type"],
+                "category": row["category"],
+                "description": row["description"],
+                # bm25() is lower-is-better; flip it so callers sort descending
+                "score": round(-row["rank"], 4)
+            })
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Row counts and file size."""
+        programs = self.conn.execute("SELECT COUNT(*) FROM programs").fetchone()[0]
+        operations = self.conn.execute("SELECT COUNT(*) FROM operations").fetchone()[0]
+        workflows = self.conn.execute("SELECT COUNT(*) FROM workflows").fetchone()[0]
+        return {
+            "programs": programs,
+            "operations": operations,
+            "workflows": workflows,
+            "db_path": str(self.db_path),
+            "size_bytes": os.path.getsize(self.db_path) if self.db_path.exists() else 0
+        }
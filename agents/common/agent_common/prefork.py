@@ -0,0 +1,283 @@
+"""
+Pre-fork loading for multi-worker serving of the Schema and Document Agents.
+
+With ``WEB_WORKERS`` > 1 the API module loads the model, index, chunk texts
+and vocabulary once in the parent process, then forks the uvicorn workers,
+which share those pages copy-on-write instead of each loading its own copy:
+
+- FAISS indexes are opened with mmap IO flags, so their codes are file
+  pages in the OS page cache, shared by every process (and by reloads).
+- Chunk texts and paths live in a ``SharedTexts`` store: one UTF-8 buffer
+  and an offsets array rather than one Python object per chunk, so reading
+  a chunk does not write a reference count into shared pages.
+- Everything else loaded before the fork (vocabulary, metadata) is moved
+  out of the garbage collector's reach with ``gc.freeze()``, so collections
+  in the workers do not touch, and thereby copy, those pages.
+
+The parent must not run inference before forking: OpenMP and ONNX Runtime
+thread pools do not survive ``fork``. Models load in the parent and run in
+the workers.
+
+Workers do not watch the index themselves, which would load one copy per
+worker. The parent polls for new index versions (and reloads requested
+through a worker with SIGHUP), loads the new version once, forks a new set
+of workers from it and retires the old ones after the new ones are warm.
+Metrics use prometheus_client's multiprocess mode (set up in ``tracing``),
+so ``/metrics`` on any worker reports the samples of all of them.
+"""
+
+import gc
+import os
+import select
+import signal
+import socket
+import time
+import logging
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Union
+
+import faiss
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "1"))
+PREFORK = WEB_WORKERS > 1
+INDEX_MMAP = os.getenv("INDEX_MMAP", "true" if PREFORK else "false").lower() == "true"
+
+# How long the parent waits for a new set of workers to warm up before retiring the old set
+WORKER_READY_TIMEOUT = float(os.getenv("WORKER_READY_TIMEOUT", "120"))
+SUPERVISE_INTERVAL = 0.5
+
+# IO_FLAG_MMAP_IFC maps flat-code and inverted-list storage straight from the file (faiss >= 1.10)
+MMAP_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+
+def read_index(path: str, mmap: bool = INDEX_MMAP):
+    """
+    Read a FAISS index, memory-mapped when ``mmap`` is set.
+
+    Index files are immutable once published (see ``index_versions``), so
+    mapping them is safe. Falls back to a normal read for index types the
+    installed FAISS cannot map.
+    """
+    if mmap:
+        try:
+            return faiss.read_index(str(path), MMAP_FLAGS)
+        except RuntimeError as e:
+            logger.warning(f"Cannot memory-map {path}, reading it into memory: {e}")
+    return faiss.read_index(str(path))
+
+
+class SharedTexts(Sequence):
+    """Read-only list of strings stored as one UTF-8 buffer plus offsets."""
+
+    def __init__(self, texts: Iterable[str]):
+        encoded = [text.encode("utf-8") for text in texts]
+        self._offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(data) for data in encoded], out=self._offsets[1:])
+        self._buffer = b"".join(encoded)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("SharedTexts index out of range")
+        return self._buffer[self._offsets[i]:self._offsets[i + 1]].decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self._buffer[self._offsets[i]:self._offsets[i + 1]].decode("utf-8")
+
+    def nbytes(self) -> int:
+        return len(self._buffer) + self._offsets.nbytes
+
+
+def shared_texts(texts: Iterable[str]) -> Sequence[str]:
+    """``SharedTexts`` in pre-fork mode, otherwise a plain list."""
+    return SharedTexts(texts) if PREFORK else list(texts)
+
+
+def freeze():
+    """Exclude everything loaded so far from garbage collection before forking."""
+    # Release what an earlier freeze held, e.g. the index version a reload replaced
+    gc.unfreeze()
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Froze {gc.get_freeze_count()} objects before forking")
+
+
+_worker = False
+
+
+def is_worker() -> bool:
+    """True in a process forked by ``serve``."""
+    return _worker
+
+
+def request_reload():
+    """Ask the ``serve`` parent to load the current index version and replace the workers."""
+    os.kill(os.getppid(), signal.SIGHUP)
+
+
+def _clear_metrics(path: str):
+    """Remove metric files a previous run left in a configured directory."""
+    for db in Path(path).glob("*.db"):
+        db.unlink()
+
+
+def _mark_dead(pid: int):
+    """Drop the live-process samples of an exited worker."""
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        return
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(pid)
+
+
+def _wait_ready(fd: int, count: int, timeout: float) -> int:
+    """Read one byte per ready worker from a pipe; returns how many reported in time."""
+    ready = 0
+    deadline = time.monotonic() + timeout
+    while ready < count:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+            break
+        data = os.read(fd, count - ready)
+        if not data:
+            break  # Every worker of the set has reported or exited
+        ready += len(data)
+    return ready
+
+
+def serve(app, host: str, port: int, workers: int = WEB_WORKERS, log_level: str = "info",
+          reload: Optional[Callable[[bool], bool]] = None, watch_interval: float = 0,
+          warmup: Optional[Callable[[], None]] = None):
+    """
+    Serve ``app`` from ``workers`` forked uvicorn processes sharing one socket.
+
+    The app, and everything it loaded at import, must already be loaded in
+    this process. Workers that exit unexpectedly are replaced; SIGTERM or
+    SIGINT stops all of them.
+
+    Args:
+        reload: Called in the parent every ``watch_interval`` seconds with
+            False, and with True after a worker calls ``request_reload``. It
+            loads a new index version in this process without running
+            inference and returns True if it did; the workers are then
+            replaced by ones forked from the new version.
+        watch_interval: Seconds between ``reload`` polls (<= 0 polls only on request)
+        warmup: Runs in each new worker before it accepts requests
+    """
+    import uvicorn
+
+    if workers <= 1:
+        uvicorn.run(app, host=host, port=port, log_level=log_level)
+        return
+
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+    metrics_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        _clear_metrics(metrics_dir)
+    freeze()
+
+    children = set()
+    retiring = set()
+    stopping = False
+    reload_requested = False
+
+    def spawn(ready_fd: Optional[int] = None):
+        pid = os.fork()
+        if pid == 0:
+            global _worker
+            _worker = True
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGHUP, signal.SIG_DFL)
+            try:
+                if warmup is not None:
+                    warmup()
+                if ready_fd is not None:
+                    os.write(ready_fd, b"1")
+                    os.close(ready_fd)
+                uvicorn.Server(uvicorn.Config(app, log_level=log_level)).run(sockets=[sock])
+            finally:
+                os._exit(0)
+        children.add(pid)
+
+    def replace_workers():
+        # Old workers keep serving until the new ones are warm, then finish their in-flight requests
+        freeze()
+        old = children - retiring
+        read_fd, write_fd = os.pipe()
+        for _ in range(workers):
+            spawn(write_fd)
+        os.close(write_fd)
+        ready = _wait_ready(read_fd, workers, WORKER_READY_TIMEOUT)
+        os.close(read_fd)
+        logger.info(f"{ready}/{workers} new workers ready, retiring {len(old)} old workers")
+        for pid in old:
+            retiring.add(pid)
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def on_reload_request(signum, frame):
+        nonlocal reload_requested
+        if reload is None:
+            logger.warning("A worker requested a reload, but serve() was started without a reload callback")
+            return
+        reload_requested = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGHUP, on_reload_request)
+    for _ in range(workers):
+        spawn()
+    logger.info(f"Serving on {host}:{port} with {workers} pre-forked workers")
+
+    next_poll = time.monotonic() + watch_interval
+    while children:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            children.discard(pid)
+            _mark_dead(pid)
+            if pid in retiring:
+                retiring.discard(pid)
+            elif not stopping:
+                logger.warning(f"Worker {pid} exited with status {status}, starting a replacement")
+                time.sleep(1)  # Do not spin if workers die at startup
+                spawn()
+            continue
+
+        polling = watch_interval > 0 and time.monotonic() >= next_poll
+        if reload is not None and not stopping and (reload_requested or polling):
+            force, reload_requested = reload_requested, False
+            if reload(force):
+                replace_workers()
+            next_poll = time.monotonic() + watch_interval
+        time.sleep(SUPERVISE_INTERVAL)
+    sock.close()
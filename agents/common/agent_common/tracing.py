@@ -0,0 +1,163 @@
+"""
+Lightweight stage tracing and Prometheus export for the agent APIs.
+
+A ``Trace`` collects timed spans (with optional candidate counts) for one
+request. Spans are returned to clients in response metadata and recorded in
+Prometheus histograms exposed on ``/metrics``. prometheus_client is optional;
+without it tracing still works and ``/metrics`` reports that it is disabled.
+Pre-forked workers share their metrics through prometheus_client's
+multiprocess mode (see ``prefork``).
+"""
+
+import os
+import time
+import logging
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+def multiprocess_metrics_dir() -> Optional[str]:
+    """
+    Directory for prometheus_client's multiprocess mode, if it is in use.
+
+    Forked workers each hold their own metric values, so a scrape would only
+    see the worker that answered it. With ``WEB_WORKERS`` > 1 the workers
+    write their samples to files in ``PROMETHEUS_MULTIPROC_DIR`` (a new
+    temporary directory unless set) and ``/metrics`` aggregates them.
+    """
+    path = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if not path and int(os.getenv("WEB_WORKERS", "1")) > 1:
+        path = tempfile.mkdtemp(prefix="prometheus-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+    return path
+
+
+# Must be set before prometheus_client is imported, which is when it picks its value store
+MULTIPROCESS_DIR = multiprocess_metrics_dir()
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Histogram, generate_latest, multiprocess
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Buckets cover sub-millisecond lexical stages up to multi-second LLM calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+if PROMETHEUS_AVAILABLE:
+    STAGE_LATENCY = Histogram(
+        "agent_stage_duration_seconds", "Latency of a pipeline stage",
+        ["agent", "stage"], buckets=LATENCY_BUCKETS,
+    )
+    STAGE_CANDIDATES = Histogram(
+        "agent_stage_candidates", "Candidates produced by a pipeline stage",
+        ["agent", "stage"], buckets=COUNT_BUCKETS,
+    )
+    REQUEST_LATENCY = Histogram(
+        "agent_request_duration_seconds", "End-to-end request latency",
+        ["agent", "endpoint"], buckets=LATENCY_BUCKETS,
+    )
+    BATCH_SIZE = Histogram(
+        "agent_encode_batch_size", "Queries per micro-batched encode",
+        ["agent", "batcher"], buckets=BATCH_BUCKETS,
+    )
+    BATCH_QUEUE_WAIT = Histogram(
+        "agent_encode_queue_wait_seconds", "Time a query waited for its micro-batch to start",
+        ["agent", "batcher"], buckets=LATENCY_BUCKETS,
+    )
+
+
+class Trace:
+    """Collects per-stage spans for a single request."""
+
+    def __init__(self, name: str = "request"):
+        self.name = name
+        self.spans: List[Dict[str, Any]] = []
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[Dict[str, Any]]:
+        """
+        Time a stage. The yielded dict can be annotated, e.g. ``span["count"] = 12``.
+
+        Args:
+            stage: Stage name
+
+        Yields:
+            Mutable span record
+        """
+        record: Dict[str, Any] = {"stage": stage}
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            self.spans.append(record)
+
+    def total_ms(self) -> float:
+        """Elapsed time since the trace was created."""
+        return round((time.perf_counter() - self._start) * 1000, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize spans for response metadata."""
+        return {"total_ms": self.total_ms(), "stages": list(self.spans)}
+
+
+@contextmanager
+def maybe_span(trace: Optional[Trace], stage: str) -> Iterator[Dict[str, Any]]:
+    """``trace.span(stage)`` when tracing, otherwise a throwaway record."""
+    if trace is None:
+        yield {}
+    else:
+        with trace.span(stage) as record:
+            yield record
+
+
+def observe_trace(trace: Trace, agent: str):
+    """Record a finished trace in the Prometheus histograms."""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    try:
+        for record in trace.spans:
+            STAGE_LATENCY.labels(agent=agent, stage=record["stage"]).observe(record["duration_ms"] / 1000.0)
+            if "count" in record:
+                STAGE_CANDIDATES.labels(agent=agent, stage=record["stage"]).observe(record["count"])
+    except Exception as e:
+        logger.warning(f"Failed to record trace metrics: {e}")
+
+
+def observe_request(agent: str, endpoint: str, seconds: float):
+    """Record end-to-end request latency."""
+    if PROMETHEUS_AVAILABLE:
+        REQUEST_LATENCY.labels(agent=agent, endpoint=endpoint).observe(seconds)
+
+
+def observe_batch(agent: str, batcher: str, size: int, waits: List[float]):
+    """Record a micro-batch: its size and each item's queue wait in seconds."""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    try:
+        BATCH_SIZE.labels(agent=agent, batcher=batcher).observe(size)
+        queue_wait = BATCH_QUEUE_WAIT.labels(agent=agent, batcher=batcher)
+        for wait in waits:
+            queue_wait.observe(wait)
+    except Exception as e:
+        logger.warning(f"Failed to record batch metrics: {e}")
+
+
+def metrics_payload() -> Tuple[bytes, str]:
+    """Return (body, content type) for a /metrics response."""
+    if not PROMETHEUS_AVAILABLE:
+        return b"# prometheus_client not installed; metrics disabled\n", "text/plain; charset=utf-8"
+    if MULTIPROCESS_DIR:
+        # Aggregate the samples every worker process wrote
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=MULTIPROCESS_DIR)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -11,6 +11,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.doc_chunker import DocumentChunker
 from src.embedder import DocumentEmbedder
 from src.faiss_retriever import FAISSDocumentRetriever
+from agent_common.index_versions import new_version_dir, publish_version
+from agent_common.quantization import QUANTIZATION_TYPES
 import argparse
 import logging
 
@@ -26,6 +28,8 @@ def main():
     parser.add_argument("--max-chunk-size", type=int, default=800, help="Maximum chunk size")
     parser.add_argument("--skip-chunking", action="store_true", help="Skip chunking step (chunks already exist)")
     parser.add_argument("--skip-embedding", action="store_true", help="Skip embedding step (embeddings already exist)")
+    parser.add_argument("--quantization", choices=QUANTIZATION_TYPES, default="none",
+                        help="Vector storage: none (float32), sq8, fp16 or pq, re-scored with exact vectors")
     
     args = parser.parse_args()
     
@@ -63,14 +67,17 @@ def main():
         # Create embedder and FAISS retriever
         embedder = DocumentEmbedder(model_name=args.model)
         
+        # Build into a new version; running agents swap to it once it is published
+        version_dir = new_version_dir(args.embeddings_dir)
         retriever = FAISSDocumentRetriever(
             embedder=embedder,
-            index_path=args.embeddings_dir,
+            index_path=str(version_dir),
             auto_load=False
         )
         
-        num_chunks = retriever.build_index_from_directory(args.chunks_dir)
-        logger.info(f"Created FAISS index with {num_chunks} chunks")
+        num_chunks = retriever.build_index_from_directory(args.chunks_dir, quantization=args.quantization)
+        publish_version(args.embeddings_dir, version_dir)
+        logger.info(f"Created FAISS index with {num_chunks} chunks as version {version_dir.name}")
     else:
         logger.info("Skipping embedding step")
     
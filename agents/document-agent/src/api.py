@@ -1,4 +1,5 @@
 import os
+import copy
 import logging
 import time
 from typing import Optional, Dict, Any
@@ -6,7 +7,8 @@ from fastapi import FastAPI, Request, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field, field_validator
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import StreamingResponse, JSONResponse, Response
+from fastapi.concurrency import run_in_threadpool
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
@@ -15,6 +17,10 @@ from slowapi.errors import RateLimitExceeded
 import sys
 sys.path.append('.')
 from src.doc_llm_agent import DocumentLLMAgent
+from src.faiss_retriever import FAISSDocumentRetriever
+from agent_common.index_versions import HotIndex, WATCH_INTERVAL, current_version, resolve_index_dir
+from agent_common.prefork import WEB_WORKERS, is_worker, request_reload, serve
+from agent_common.tracing import Trace, observe_trace, observe_request, metrics_payload
 
 # Load environment variables
 try:
@@ -43,6 +49,11 @@ MAX_QUESTION_LENGTH = int(os.getenv("MAX_QUESTION_LENGTH", "1000"))
 ENABLE_AUTH = os.getenv("ENABLE_AUTH", "false").lower() == "true"
 CHUNKS_DIR = os.getenv("CHUNKS_DIR", "data/chunks")
 MODEL = os.getenv("MODEL", "llama3")
+# Index directory the agent serves; a new version published here is hot-swapped in
+EMBEDDINGS_DIR = "data/embeddings"
+WARMUP_QUERIES = [q for q in os.getenv(
+    "INDEX_WARMUP_QUERIES", "How do I issue a card?|What is a financial account?"
+).split("|") if q]
 
 app = FastAPI(
     title="Highnote Documentation QA API",
@@ -81,6 +92,29 @@ except Exception as e:
     logger.error(f"Failed to initialize document agent: {e}")
     agent = None
 
+def build_agent(previous: Optional[DocumentLLMAgent]) -> DocumentLLMAgent:
+    """Load the current index version into a new agent, reusing the previous agent's embedding model."""
+    if previous is None:
+        return DocumentLLMAgent(model=MODEL, chunks_dir=CHUNKS_DIR)
+    replacement = copy.copy(previous)
+    replacement.retriever = FAISSDocumentRetriever(
+        index_path=str(resolve_index_dir(EMBEDDINGS_DIR)),
+        embedder=previous.retriever.embedder
+    )
+    return replacement
+
+def warm_agent(candidate: DocumentLLMAgent):
+    """Touch the index and model before the agent takes traffic."""
+    for query in WARMUP_QUERIES:
+        candidate.retriever.retrieve_chunks(query, top_k=5)
+
+# Handlers read hot_index.current once per request, so in-flight requests finish on the version they started with
+hot_index = HotIndex(
+    agent, build_agent,
+    [os.path.join(EMBEDDINGS_DIR, "index.faiss"), os.path.join(EMBEDDINGS_DIR, "metadata.json")],
+    warmup=warm_agent, name="document index"
+)
+
 class ChatRequest(BaseModel):
     question: str = Field(..., min_length=1, max_length=MAX_QUESTION_LENGTH, description="Question about Highnote documentation")
     top_k: Optional[int] = Field(5, ge=1, le=20, description="Number of relevant chunks to retrieve")
@@ -128,12 +162,19 @@ async def verify_api_key(credentials: HTTPAuthorizationCredentials = Depends(sec
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint."""
+    agent = hot_index.current
     return HealthResponse(
         status="healthy" if agent is not None else "unhealthy",
         agent_ready=agent is not None,
         timestamp=time.strftime("%Y-%m-%d %H:%M:%S")
     )
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics (per-stage latency and candidate histograms)."""
+    body, content_type = metrics_payload()
+    return Response(content=body, media_type=content_type)
+
 @app.post("/chat", response_model=ChatResponse)
 @limiter.limit("30/minute")
 async def chat_endpoint(
@@ -143,6 +184,7 @@ async def chat_endpoint(
 ):
     """Main chat endpoint for Highnote documentation questions."""
     start_time = time.time()
+    agent = hot_index.current
     
     try:
         if agent is None:
@@ -153,21 +195,27 @@ async def chat_endpoint(
         
         logger.info(f"Processing question: {chat_request.question[:100]}...")
         
-        # Get answer
-        reply = agent.answer(
+        # Get answer; retrieval and generation run off the event loop
+        trace = Trace("chat")
+        reply = await run_in_threadpool(
+            agent.answer,
             question=chat_request.question,
             top_k=chat_request.top_k,
-            category_filter=chat_request.category
+            category_filter=chat_request.category,
+            trace=trace
         )
         
         processing_time = (time.time() - start_time) * 1000
+        observe_trace(trace, "document")
+        observe_request("document", "/chat", processing_time / 1000)
         
         return ChatResponse(
             response=reply,
             metadata={
                 "top_k": chat_request.top_k,
                 "category": chat_request.category,
-                "question_length": len(chat_request.question)
+                "question_length": len(chat_request.question),
+                "trace": trace.to_dict()
             },
             processing_time_ms=processing_time
         )
@@ -188,6 +236,7 @@ async def get_stats(
     _: bool = Depends(verify_api_key)
 ):
     """Get document agent statistics."""
+    agent = hot_index.current
     try:
         if agent is None or not hasattr(agent, 'retriever'):
             raise HTTPException(
@@ -212,6 +261,7 @@ async def get_categories(
     _: bool = Depends(verify_api_key)
 ):
     """Get available documentation categories."""
+    agent = hot_index.current
     try:
         if agent is None:
             raise HTTPException(
@@ -248,6 +298,8 @@ async def stream_chat(
     _: bool = Depends(verify_api_key)
 ):
     """Streaming chat endpoint."""
+    agent = hot_index.current
+
     def event_generator():
         try:
             if agent is None:
@@ -255,13 +307,17 @@ async def stream_chat(
                 return
             
             logger.info(f"Processing streaming question: {chat_request.question[:100]}...")
+            trace = Trace("chat_stream")
                 
             for chunk in agent.stream_answer(
                 question=chat_request.question,
                 top_k=chat_request.top_k,
-                category_filter=chat_request.category
+                category_filter=chat_request.category,
+                trace=trace
             ):
                 yield f"data: {chunk}\n\n"
+            observe_trace(trace, "document")
+            observe_request("document", "/chat/stream", trace.total_ms() / 1000)
             yield "data: [DONE]\n\n"
         except Exception as e:
             logger.error(f"Error in streaming: {e}")
@@ -273,6 +329,43 @@ async def stream_chat(
         headers={"Cache-Control": "no-cache"}
     )
 
+@app.post("/admin/reload")
+@limiter.limit("5/minute")
+async def reload_index(
+    request: Request,
+    wait: bool = False,
+    _: bool = Depends(verify_api_key)
+):
+    """Load the current index version in the background and swap it in."""
+    if is_worker():
+        # The pre-fork parent loads the version once and replaces every worker; wait does not apply
+        request_reload()
+        return {**hot_index.status(), "reloading": True, "current_version": current_version(EMBEDDINGS_DIR)}
+    if wait:
+        index_status = await run_in_threadpool(hot_index.reload, True)
+    else:
+        index_status = hot_index.reload()
+    return {**index_status, "current_version": current_version(EMBEDDINGS_DIR)}
+
+@app.get("/admin/index")
+async def index_status(
+    request: Request,
+    _: bool = Depends(verify_api_key)
+):
+    """Serving index and reload status."""
+    return {**hot_index.status(), "current_version": current_version(EMBEDDINGS_DIR)}
+
+@app.on_event("startup")
+async def start_index_watcher():
+    """Reload automatically when a new index version is published."""
+    # Pre-forked workers leave watching to the parent, which loads each version once
+    if not is_worker():
+        hot_index.start_watching(WATCH_INTERVAL)
+
+@app.on_event("shutdown")
+async def stop_index_watcher():
+    hot_index.stop_watching()
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -297,10 +390,16 @@ if __name__ == "__main__":
     logger.info(f"Authentication enabled: {ENABLE_AUTH}")
     logger.info(f"Allowed origins: {ALLOWED_ORIGINS}")
     
-    uvicorn.run(
-        "api:app",
-        host=host,
-        port=port,
-        reload=False,
-        log_level="info"
-    )
\ No newline at end of file
+    if WEB_WORKERS > 1:
+        # The agent is already loaded in this process; workers fork from it and share its memory.
+        # This process also watches for new index versions and replaces the workers when one loads.
+        serve(app, host, port, WEB_WORKERS, reload=hot_index.refresh, watch_interval=WATCH_INTERVAL,
+              warmup=hot_index.warm)
+    else:
+        uvicorn.run(
+            "api:app",
+            host=host,
+            port=port,
+            reload=False,
+            log_level="info"
+        )
\ No newline at end of file
@@ -1,6 +1,8 @@
 from src.faiss_retriever import FAISSDocumentRetriever
-import ollama
+from agent_common.llm_backend import get_llm_backend
+from agent_common.tracing import maybe_span
 import sys
+import time
 import datetime
 import json
 import os
@@ -50,8 +52,11 @@ class DocumentLLMAgent:
                  temperature=0.0, 
                  chunks_dir="data/chunks",
                  log_path=None, 
-                 history_path=None):
+                 history_path=None,
+                 llm_backend=None):
         self.retriever = FAISSDocumentRetriever(index_path="data/embeddings")
+        # Pluggable chat backend (Ollama by default, LLM_BACKEND=fake for benchmarks)
+        self.llm = llm_backend or get_llm_backend()
         self.model = model
         self.system_prompt = system_prompt or DEFAULT_SYSTEM_PROMPT
         self.use_examples = use_examples
@@ -135,16 +140,20 @@ class DocumentLLMAgent:
         messages.append({"role": "user", "content": prompt})
         return messages
 
-    def answer(self, question: str, top_k: int = 5, category_filter: str = None) -> str:
-        chunks = self.retriever.retrieve_chunks(question, top_k=top_k)
+    def answer(self, question: str, top_k: int = 5, category_filter: str = None, trace=None) -> str:
+        with maybe_span(trace, "retrieval") as span:
+            chunks = self.retriever.retrieve_chunks(question, top_k=top_k)
+            span["count"] = len(chunks)
         
         if not chunks:
             raise RuntimeError("No relevant documentation found for your question.")
         
-        context, used_k = self.fit_context_to_token_budget(question, chunks)
-        prompt = self.build_prompt(question, context)
-        chunk_ids = [chunk_id for chunk_id, _, _ in chunks]
-        messages = self.build_messages(prompt, self.history)
+        with maybe_span(trace, "prompt_build") as span:
+            context, used_k = self.fit_context_to_token_budget(question, chunks)
+            prompt = self.build_prompt(question, context)
+            chunk_ids = [chunk_id for chunk_id, _, _ in chunks]
+            messages = self.build_messages(prompt, self.history)
+            span["count"] = used_k
 
         ollama_args = {
             "model": self.model,
@@ -152,7 +161,8 @@ class DocumentLLMAgent:
         }
         
         try:
-            response = ollama.chat(**ollama_args)
+            with maybe_span(trace, "generation"):
+                response = self.llm.chat(**ollama_args)
         except Exception as e:
             raise RuntimeError(f"Ollama API call failed: {e}")
         
@@ -167,16 +177,20 @@ class DocumentLLMAgent:
         
         return answer
 
-    def stream_answer(self, question: str, top_k: int = 5, category_filter: str = None):
-        chunks = self.retriever.retrieve_chunks(question, top_k=top_k)
+    def stream_answer(self, question: str, top_k: int = 5, category_filter: str = None, trace=None):
+        with maybe_span(trace, "retrieval") as span:
+            chunks = self.retriever.retrieve_chunks(question, top_k=top_k)
+            span["count"] = len(chunks)
         
         if not chunks:
             raise RuntimeError("No relevant documentation found for your question.")
         
-        context, used_k = self.fit_context_to_token_budget(question, chunks)
-        prompt = self.build_prompt(question, context)
-        chunk_ids = [chunk_id for chunk_id, _, _ in chunks]
-        messages = self.build_messages(prompt, self.history)
+        with maybe_span(trace, "prompt_build") as span:
+            context, used_k = self.fit_context_to_token_budget(question, chunks)
+            prompt = self.build_prompt(question, context)
+            chunk_ids = [chunk_id for chunk_id, _, _ in chunks]
+            messages = self.build_messages(prompt, self.history)
+            span["count"] = used_k
 
         ollama_args = {
             "model": self.model,
@@ -186,10 +200,14 @@ class DocumentLLMAgent:
         
         try:
             response_accum = ""
-            for chunk in ollama.chat(**ollama_args):
-                if "message" in chunk and "content" in chunk["message"]:
-                    response_accum += chunk["message"]["content"]
-                    yield chunk["message"]["content"]
+            with maybe_span(trace, "generation") as span:
+                start = time.perf_counter()
+                for chunk in self.llm.chat(**ollama_args):
+                    if "message" in chunk and "content" in chunk["message"]:
+                        if "first_token_ms" not in span:
+                            span["first_token_ms"] = round((time.perf_counter() - start) * 1000, 3)
+                        response_accum += chunk["message"]["content"]
+                        yield chunk["message"]["content"]
             
             self.log(question, chunk_ids, prompt, response_accum)
             
@@ -2,26 +2,34 @@ import os
 import json
 import numpy as np
 from pathlib import Path
-from sentence_transformers import SentenceTransformer
 from typing import List, Dict, Any, Optional, Union
 import logging
 
+from agent_common.batching import MicroBatcher
+from agent_common.encoders import ENCODER_BACKEND, load_encoder
+
 logger = logging.getLogger(__name__)
 
 class DocumentEmbedder:
     """Handles document embedding using sentence transformers."""
     
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+                 encoder_backend: Optional[str] = None):
         """
         Initialize the document embedder.
         
         Args:
             model_name: Sentence transformer model to use for embeddings
+            encoder_backend: torch, onnx or onnx-int8 (default: ENCODER_BACKEND)
         """
         self.model_name = model_name
+        self.encoder_backend = encoder_backend or ENCODER_BACKEND
+        
+        logger.info(f"Loading embedding model: {model_name} ({self.encoder_backend} backend)")
+        self.model = load_encoder(model_name, self.encoder_backend)
         
-        logger.info(f"Loading embedding model: {model_name}")
-        self.model = SentenceTransformer(model_name, trust_remote_code=True)
+        # Concurrent single-text embeds share one batched encode
+        self.encode_batcher = MicroBatcher(self._encode_batch, "document", "encode")
         
     def embed_texts(self, texts: List[str], batch_size: int = 32, show_progress: bool = True) -> np.ndarray:
         """
@@ -50,18 +58,23 @@ class DocumentEmbedder:
         logger.info(f"Created embeddings with shape: {embeddings.shape}")
         return embeddings
     
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Encode a micro-batch of texts in one call."""
+        return self.model.encode(texts, batch_size=len(texts), convert_to_numpy=True)
+    
     def embed_single_text(self, text: str) -> np.ndarray:
         """
         Create embedding for a single text.
         
+        Concurrent calls are micro-batched into one encode (see ``batching``).
+        
         Args:
             text: Text string to embed
             
         Returns:
             1D numpy array embedding
         """
-        embedding = self.model.encode([text], convert_to_numpy=True)
-        return embedding[0]  # Return 1D array
+        return self.encode_batcher.submit(text)
     
     def embed_from_chunks_directory(self, chunks_dir: str) -> tuple[List[str], np.ndarray, List[Dict[str, Any]]]:
         """
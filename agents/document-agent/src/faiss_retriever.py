@@ -6,6 +6,9 @@ from pathlib import Path
 from typing import List, Tuple, Dict, Any, Optional
 import logging
 
+from agent_common.batching import MicroBatcher
+from agent_common.prefork import read_index, shared_texts
+from agent_common.quantization import QUANTIZATION_TYPES, RESCORE_FACTOR, build_index, describe, load_vectors, save_vectors, search_index
 from .embedder import DocumentEmbedder
 
 logger = logging.getLogger(__name__)
@@ -43,6 +46,14 @@ class FAISSDocumentRetriever:
         self.chunks = []
         self.metadata = []
         
+        # Float vectors for exact re-scoring of a quantized index
+        self.vectors = None
+        self.quantization_info = None
+        self.rescore_factor = RESCORE_FACTOR
+        
+        # Concurrent queries share one encode and one multi-row FAISS search
+        self.search_batcher = MicroBatcher(self._search_batch, "document", "search")
+        
         # Auto-load existing index
         if auto_load and self._index_exists():
             self.load_index()
@@ -54,12 +65,14 @@ class FAISSDocumentRetriever:
             (self.index_path / "metadata.json").exists()
         )
     
-    def build_index_from_directory(self, chunks_dir: str) -> int:
+    def build_index_from_directory(self, chunks_dir: str, quantization: str = "none") -> int:
         """
         Build FAISS index from chunks directory.
         
         Args:
             chunks_dir: Directory containing chunk files and metadata
+            quantization: Vector storage, one of QUANTIZATION_TYPES ("none" keeps float32);
+                quantized searches re-score candidates with the exact vectors
             
         Returns:
             Number of chunks indexed
@@ -73,14 +86,21 @@ class FAISSDocumentRetriever:
         logger.info("Building FAISS index...")
         dimension = embeddings.shape[1]
         
-        # Use IndexFlatIP for cosine similarity (normalized vectors)
-        self.index = faiss.IndexFlatIP(dimension)
-        
         # Normalize embeddings for cosine similarity
+        embeddings = embeddings.astype(np.float32)
         faiss.normalize_L2(embeddings)
         
-        # Add to index
-        self.index.add(embeddings.astype(np.float32))
+        if quantization == "none":
+            # Use IndexFlatIP for cosine similarity (normalized vectors)
+            self.index = faiss.IndexFlatIP(dimension)
+            self.index.add(embeddings)
+            self.vectors = None
+            self.quantization_info = None
+        else:
+            self.index = build_index(embeddings, quantization, faiss.METRIC_INNER_PRODUCT)
+            self.vectors = embeddings
+            self.quantization_info = describe(self.index, quantization, embeddings, faiss.METRIC_INNER_PRODUCT,
+                                              rescore_factor=self.rescore_factor)
         
         # Store data
         self.chunks = texts
@@ -103,12 +123,15 @@ class FAISSDocumentRetriever:
         
         # Save metadata with chunks
         combined_data = {
-            'chunks': self.chunks,
+            'chunks': list(self.chunks),
             'metadata': self.metadata,
             'model_name': self.embedder.model_name,
-            'index_type': 'IndexFlatIP',
+            'index_type': self.quantization_info['factory'] if self.quantization_info else 'IndexFlatIP',
             'total_chunks': len(self.chunks)
         }
+        if self.quantization_info:
+            save_vectors(self.index_path, self.vectors)
+            combined_data['quantization'] = self.quantization_info
         
         metadata_file = self.index_path / "metadata.json"
         with open(metadata_file, 'w', encoding='utf-8') as f:
@@ -126,18 +149,32 @@ class FAISSDocumentRetriever:
             raise FileNotFoundError(f"Index files not found in {self.index_path}")
         
         # Load FAISS index
-        self.index = faiss.read_index(str(index_file))
+        self.index = read_index(str(index_file))
         
         # Load metadata
         with open(metadata_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
-        self.chunks = data['chunks']
+        self.chunks = shared_texts(data['chunks'])  # Packed into one buffer in pre-fork mode
         self.metadata = data['metadata']
+        self.quantization_info = data.get('quantization')
+        self.vectors = load_vectors(str(index_file), self.quantization_info)
         
         logger.info(f"Loaded FAISS index with {len(self.chunks)} chunks")
         logger.info(f"Model: {data.get('model_name', 'unknown')}")
     
+    def _search_batch(self, requests: List[Tuple[str, int]]) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Encode and search a micro-batch of (query, top_k) requests; returns (scores, indices) per request."""
+        queries = [query for query, _ in requests]
+        query_embeddings = np.asarray(self.embedder.model.encode(queries, batch_size=len(queries), convert_to_numpy=True),
+                                      dtype=np.float32)
+        faiss.normalize_L2(query_embeddings)  # Normalize for cosine similarity
+        
+        k = max(top_k for _, top_k in requests)
+        scores, indices = search_index(self.index, query_embeddings, k, self.vectors,
+                                       faiss.METRIC_INNER_PRODUCT, self.rescore_factor)
+        return [(scores[row][:top_k], indices[row][:top_k]) for row, (_, top_k) in enumerate(requests)]
+    
     def retrieve_chunks(self, query: str, top_k: int = 5) -> List[Tuple[str, str, float]]:
         """
         Retrieve most similar chunks for a query.
@@ -152,20 +189,16 @@ class FAISSDocumentRetriever:
         if self.index is None:
             raise ValueError("No index loaded. Build or load index first.")
         
-        # Create query embedding
-        query_embedding = self.embedder.embed_single_text(query).reshape(1, -1)
-        faiss.normalize_L2(query_embedding)  # Normalize for cosine similarity
-        
-        # Search
-        scores, indices = self.index.search(query_embedding.astype(np.float32), top_k)
+        # Embed and search, micro-batched with concurrent queries
+        scores, indices = self.search_batcher.submit((query, top_k))
         
         # Format results
         results = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx < len(self.chunks):
+        for score, idx in zip(scores, indices):
+            if 0 <= idx < len(self.chunks):
                 # Generate chunk_id from metadata or index
                 chunk_id = f"chunk_{idx}"
-                if idx < len(self.metadata) and self.metadata[idx]:
+                if 0 <= idx < len(self.metadata) and self.metadata[idx]:
                     meta = self.metadata[idx]
                     if isinstance(meta, dict) and 'source' in meta:
                         chunk_id = f"{meta['source']}_{idx}"
@@ -184,21 +217,17 @@ class FAISSDocumentRetriever:
         if self.index is None:
             raise ValueError("No index loaded. Build or load index first.")
         
-        # Create query embedding
-        query_embedding = self.embedder.embed_single_text(query).reshape(1, -1)
-        faiss.normalize_L2(query_embedding)
-        
-        # Search
-        scores, indices = self.index.search(query_embedding.astype(np.float32), top_k)
+        # Embed and search, micro-batched with concurrent queries
+        scores, indices = self.search_batcher.submit((query, top_k))
         
         # Format results with metadata
         results = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx < len(self.chunks):
+        for score, idx in zip(scores, indices):
+            if 0 <= idx < len(self.chunks):
                 result = {
                     'chunk': self.chunks[idx],
                     'score': float(score),
-                    'metadata': self.metadata[idx] if idx < len(self.metadata) else {}
+                    'metadata': self.metadata[idx] if 0 <= idx < len(self.metadata) else {}
                 }
                 results.append(result)
         
@@ -261,6 +290,7 @@ class FAISSDocumentRetriever:
             "index_size": self.index.ntotal,
             "model_name": self.embedder.model_name,
             "index_path": str(self.index_path),
+            "quantization": self.quantization_info,
             "categories": categories
         }
 
@@ -273,6 +303,7 @@ if __name__ == "__main__":
     parser.add_argument("--index-path", default="data/embeddings", help="Index storage path")
     parser.add_argument("--query", help="Test query")
     parser.add_argument("--top-k", type=int, default=5, help="Number of results")
+    parser.add_argument("--quantization", choices=QUANTIZATION_TYPES, default="none", help="Vector storage for --build")
     
     args = parser.parse_args()
     
@@ -282,7 +313,7 @@ if __name__ == "__main__":
     retriever = FAISSDocumentRetriever(index_path=args.index_path, auto_load=not args.build)
     
     if args.build:
-        num_chunks = retriever.build_index_from_directory(args.chunks_dir)
+        num_chunks = retriever.build_index_from_directory(args.chunks_dir, quantization=args.quantization)
         print(f"Built index with {num_chunks} chunks")
     
     if args.query:
@@ -30,7 +30,12 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def download_source_code():
-    """Download the schema agent source code from Cloud Storage."""
+    """
+    Download the schema agent source code from Cloud Storage.
+
+    The zip (uploaded by deploy-cloud-scheduler.sh) holds update_schema.py,
+    the agent's src package and the shared agent_common package at its root.
+    """
     bucket_name = os.environ.get('SOURCE_BUCKET')
     if not bucket_name:
         raise ValueError("SOURCE_BUCKET environment variable not set")
@@ -59,7 +59,9 @@ gcloud services enable \
 
 # Build and push image
 echo -e "\033[0;35m[CONSTRUCTION]\033[0m Building Docker image..."
-docker build -t ${IMAGE_NAME}:latest .
+# Build from the repository root so the image includes the shared agents/common package
+REPO_ROOT="$(cd "$(dirname "$0")/../../.." && pwd)"
+docker build -f "${REPO_ROOT}/agents/schema-agent/config/Dockerfile" -t ${IMAGE_NAME}:latest "${REPO_ROOT}"
 
 echo -e "\033[0;35m[OUTBOX]\033[0m Pushing image to Container Registry..."
 docker push ${IMAGE_NAME}:latest
@@ -51,6 +51,15 @@ if ! gcloud pubsub topics describe ${TOPIC_NAME} &> /dev/null; then
     gcloud pubsub topics create ${TOPIC_NAME}
 fi
 
+# Upload the source the function runs: update_schema.py, the agent's src and the shared agent_common package
+SOURCE_DIR=$(mktemp -d)
+cp scripts/update_schema.py "${SOURCE_DIR}/"
+cp -r src ../common/agent_common "${SOURCE_DIR}/"
+(cd "${SOURCE_DIR}" && zip -qr schema-agent.zip update_schema.py src agent_common -x '*__pycache__*')
+echo -e "\033[0;35m[OUTBOX]\033[0m Uploading updater source..."
+gsutil cp "${SOURCE_DIR}/schema-agent.zip" gs://${STORAGE_BUCKET:-${PROJECT_ID}-schema-agent-data}/source/schema-agent.zip
+rm -rf "${SOURCE_DIR}"
+
 # Deploy Cloud Function
 echo -e "\033[0;94m[CLOUD]\033[0m Deploying Cloud Function..."
 gcloud functions deploy ${FUNCTION_NAME} \
@@ -20,7 +20,8 @@ os.environ['PORT'] = '8000'
 # Import and run the API
 if __name__ == "__main__":
     import uvicorn
-    from src.api import app
+    from src.api import app, serve_workers
+    from agent_common.prefork import WEB_WORKERS
     
     print("Starting GraphQL Schema QA API")
     print("No authentication required")
@@ -29,9 +30,14 @@ if __name__ == "__main__":
     print("Chat API: POST http://localhost:8000/chat")
     print("")
     
-    uvicorn.run(
-        app, 
-        host="0.0.0.0", 
-        port=8000,
-        log_level="info"
-    )
\ No newline at end of file
+    if WEB_WORKERS > 1:
+        print(f"Pre-forking {WEB_WORKERS} workers")
+        # Same path as src/api.py: the parent watches the index and warms each new worker
+        serve_workers("0.0.0.0", 8000)
+    else:
+        uvicorn.run(
+            app, 
+            host="0.0.0.0", 
+            port=8000,
+            log_level="info"
+        )
\ No newline at end of file
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Fake Ollama Server
+
+Deterministic, Ollama-compatible HTTP server for benchmarking the agents
+without a model:
+- /api/chat and /api/generate (streaming NDJSON or single JSON response)
+- /api/tags and /api/version for client health checks
+- Configurable token rate, first-token latency and failure injection
+
+Point any agent at it with OLLAMA_HOST=http://localhost:11435 so load tests
+measure our own retrieval/routing overhead rather than model time.
+"""
+
+import sys
+import json
+import time
+import argparse
+import logging
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Allow running from the schema-agent directory or from scripts/
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agent_common.llm_backend import FakeLLMBackend
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Request handler speaking the subset of the Ollama API the agents use."""
+
+    backend: FakeLLMBackend = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json(200, {"models": [{"name": "fake:latest", "model": "fake:latest",
+                                              "modified_at": _now(), "size": 0}]})
+        elif self.path == "/api/version":
+            self._send_json(200, {"version": "0.0.0-fake"})
+        elif self.path == "/":
+            self._send_json(200, {"status": "Fake Ollama is running", **self.backend.info()})
+        else:
+            self._send_json(404, {"error": f"unknown endpoint {self.path}"})
+
+    def do_POST(self):
+        if self.path not in ("/api/chat", "/api/generate"):
+            self._send_json(404, {"error": f"unknown endpoint {self.path}"})
+            return
+        try:
+            body = self._read_json()
+        except json.JSONDecodeError as e:
+            self._send_json(400, {"error": f"invalid JSON: {e}"})
+            return
+
+        model = body.get("model", "fake")
+        if self.path == "/api/chat":
+            messages = body.get("messages") or []
+        else:
+            messages = [{"role": "user", "content": body.get("prompt", "")}]
+
+        if self.backend.should_fail():
+            self._send_json(500, {"error": "injected failure"})
+            return
+
+        tokens = self.backend.generate_tokens(model, messages)
+        # Ollama streams by default
+        if body.get("stream", True):
+            self._stream(model, tokens)
+        else:
+            start = time.perf_counter()
+            if self.backend.first_token_ms:
+                time.sleep(self.backend.first_token_ms / 1000.0)
+            delay = self.backend.token_delay()
+            if delay:
+                time.sleep(delay * len(tokens))
+            payload = self._frame(model, "".join(tokens), done=True)
+            payload.update(self._stats(tokens, start))
+            self._send_json(200, payload)
+
+    def _frame(self, model: str, content: str, done: bool) -> dict:
+        if self.path == "/api/chat":
+            return {"model": model, "created_at": _now(),
+                    "message": {"role": "assistant", "content": content}, "done": done}
+        return {"model": model, "created_at": _now(), "response": content, "done": done}
+
+    def _stats(self, tokens, start) -> dict:
+        return {"done_reason": "stop", "eval_count": len(tokens),
+                "total_duration": int((time.perf_counter() - start) * 1e9)}
+
+    def _write_chunk(self, payload: dict):
+        data = (json.dumps(payload) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _stream(self, model: str, tokens):
+        start = time.perf_counter()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            if self.backend.first_token_ms:
+                time.sleep(self.backend.first_token_ms / 1000.0)
+            delay = self.backend.token_delay()
+            for i, token in enumerate(tokens):
+                if i and delay:
+                    time.sleep(delay)
+                self._write_chunk(self._frame(model, token, done=False))
+            final = self._frame(model, "", done=True)
+            final.update(self._stats(tokens, start))
+            self._write_chunk(final)
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug("Client disconnected mid-stream")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deterministic Ollama-compatible server for benchmarks.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=11435, help="Port to listen on (real Ollama uses 11434)")
+    parser.add_argument("--tokens-per-sec", type=float, default=0.0, help="Simulated token rate (0 = no delay)")
+    parser.add_argument("--first-token-ms", type=float, default=0.0, help="Simulated time to first token")
+    parser.add_argument("--response-tokens", type=int, default=64, help="Tokens per answer")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Probability of returning HTTP 500")
+    parser.add_argument("--fail-every", type=int, default=0, help="Fail every Nth request (0 = never)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for failure injection")
+    args = parser.parse_args()
+
+    FakeOllamaHandler.backend = FakeLLMBackend(
+        tokens_per_second=args.tokens_per_sec,
+        first_token_ms=args.first_token_ms,
+        response_tokens=args.response_tokens,
+        failure_rate=args.failure_rate,
+        fail_every=args.fail_every,
+        seed=args.seed,
+    )
+    server = ThreadingHTTPServer((args.host, args.port), FakeOllamaHandler)
+    logger.info(f"Fake Ollama listening on http://{args.host}:{args.port} ({FakeOllamaHandler.backend.info()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down fake Ollama server")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
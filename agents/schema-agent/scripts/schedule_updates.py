@@ -7,25 +7,31 @@ Provides scheduling capabilities for automated schema updates:
 - Webhook-triggered updates
 - Manual trigger endpoints
 - Status monitoring
+
+Updates run one at a time on a single worker thread. Triggers that arrive
+while a job is waiting are merged into it instead of queueing a second
+identical run.
 """
 
 import os
 import sys
 import json
 import time
+import uuid
 import threading
 import schedule
+from collections import deque
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable, Tuple
 import logging
 from flask import Flask, request, jsonify
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field, asdict
 
 # Add current directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from update_schema import SchemaUpdater, SchemaUpdateConfig
+from update_schema import SchemaUpdater, SchemaUpdateConfig, UpdateCancelled, PIPELINE_STAGES
 
 # Configure logging
 logging.basicConfig(
@@ -50,6 +56,171 @@ class ScheduleConfig:
     max_concurrent_updates: int = 1
 
 
+def _cpu_seconds() -> float:
+    """CPU time of this process and its reaped children (chunker workers)."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+@dataclass
+class UpdateJob:
+    """One queued or executed run of the update pipeline."""
+    id: str
+    sources: List[str]
+    force: bool = False
+    dry_run: bool = False
+    status: str = "queued"  # queued, running, succeeded, failed, cancelled
+    stage: Optional[str] = None
+    stages: List[Dict[str, Any]] = field(default_factory=list)
+    queued_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    duration_seconds: Optional[float] = None
+    cpu_seconds: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    cancel_requested: bool = False
+    _stage_start: Optional[float] = field(default=None, repr=False)
+    
+    def enter_stage(self, stage: str):
+        """Progress callback for SchemaUpdater.update_schema."""
+        # Cleanup runs after the new data is synced, so it is not a cancellation point
+        if self.cancel_requested and stage != PIPELINE_STAGES[-1]:
+            raise UpdateCancelled(f"Update cancelled before stage '{stage}'")
+        self.finish_stage()
+        self.stages.append({"stage": stage, "seconds": None})
+        self.stage = stage
+        self._stage_start = time.perf_counter()
+    
+    def finish_stage(self):
+        """Record the duration of the stage in progress."""
+        if self._stage_start is not None:
+            self.stages[-1]["seconds"] = round(time.perf_counter() - self._stage_start, 3)
+            self._stage_start = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        job = asdict(self)
+        job.pop("_stage_start")
+        job["progress"] = {
+            "completed_stages": sum(1 for stage in self.stages if stage["seconds"] is not None),
+            "total_stages": len(PIPELINE_STAGES)
+        }
+        return job
+
+
+class UpdateJobQueue:
+    """
+    Single-worker queue of update jobs.
+    
+    At most one job per dry_run mode waits at a time; later triggers for the
+    same mode are coalesced into it (sources are merged and force is OR-ed),
+    since one run picks up the latest schema for all of them.
+    """
+    
+    def __init__(self, run: Callable[[UpdateJob], Dict[str, Any]],
+                 on_finish: Optional[Callable[[UpdateJob], None]] = None, history_size: int = 100):
+        """
+        Args:
+            run: Executes a job on the worker thread, sets its status and returns its result
+            on_finish: Called with each job after it has run and been timed
+            history_size: Finished jobs to keep
+        """
+        self.run = run
+        self.on_finish = on_finish
+        self.history_size = history_size
+        self.pending: deque = deque()
+        self.running: Optional[UpdateJob] = None
+        self.finished: deque = deque(maxlen=history_size)
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self._condition = threading.Condition()
+        self._worker = threading.Thread(target=self._work, name="schema-update-worker", daemon=True)
+        self._worker.start()
+    
+    def submit(self, source: str, force: bool = False, dry_run: bool = False) -> Tuple[UpdateJob, bool]:
+        """
+        Queue an update, or merge it into a waiting job with the same dry_run mode.
+        
+        Returns:
+            The job that will run the update and whether the trigger was coalesced
+        """
+        with self._condition:
+            for job in self.pending:
+                if job.dry_run == dry_run:
+                    job.sources.append(source)
+                    job.force = job.force or force
+                    self.logger.info(f"Coalesced {source} trigger into queued job {job.id}")
+                    return job, True
+            
+            job = UpdateJob(id=uuid.uuid4().hex[:12], sources=[source], force=force, dry_run=dry_run)
+            self.pending.append(job)
+            self._condition.notify()
+            self.logger.info(f"Queued update job {job.id} (source: {source})")
+            return job, False
+    
+    def cancel(self, job_id: str) -> Optional[UpdateJob]:
+        """
+        Cancel a job. A queued job is dropped; a running job stops before its
+        next stage and its backup is restored.
+        """
+        with self._condition:
+            for job in self.pending:
+                if job.id == job_id:
+                    self.pending.remove(job)
+                    job.status = "cancelled"
+                    job.finished_at = datetime.now(timezone.utc).isoformat()
+                    self.finished.append(job)
+                    return job
+            if self.running is not None and self.running.id == job_id:
+                self.running.cancel_requested = True
+                return self.running
+        return None
+    
+    def snapshot(self) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """The running job and the queued jobs as dicts, read together under the lock."""
+        with self._condition:
+            running = self.running.to_dict() if self.running is not None else None
+            return running, [job.to_dict() for job in self.pending]
+    
+    def get(self, job_id: str) -> Optional[UpdateJob]:
+        with self._condition:
+            for job in [*self.pending, self.running, *self.finished]:
+                if job is not None and job.id == job_id:
+                    return job
+        return None
+    
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self.pending:
+                    self._condition.wait()
+                job = self.running = self.pending.popleft()
+            
+            job.status = "running"
+            job.started_at = datetime.now(timezone.utc).isoformat()
+            start = time.perf_counter()
+            cpu_start = _cpu_seconds()
+            try:
+                job.result = self.run(job)
+            except Exception as e:
+                self.logger.error(f"Update job {job.id} failed with exception: {e}")
+                job.status = "failed"
+                job.result = {"success": False, "error": str(e)}
+            finally:
+                job.finish_stage()
+                job.stage = None
+                job.duration_seconds = round(time.perf_counter() - start, 3)
+                job.cpu_seconds = round(_cpu_seconds() - cpu_start, 3)
+                job.finished_at = datetime.now(timezone.utc).isoformat()
+                with self._condition:
+                    self.running = None
+                    self.finished.append(job)
+            
+            if self.on_finish is not None:
+                try:
+                    self.on_finish(job)
+                except Exception as e:
+                    self.logger.error(f"Recording update job {job.id} failed: {e}")
+
+
 class SchemaUpdateScheduler:
     """Handles scheduled schema updates."""
     
@@ -64,8 +235,8 @@ class SchemaUpdateScheduler:
         
         # State tracking
         self.update_history: List[Dict[str, Any]] = []
-        self.currently_updating = False
         self.last_update_result: Optional[Dict[str, Any]] = None
+        self.jobs = UpdateJobQueue(self._run_job, on_finish=self._record_job)
         
         # Create updater
         self.updater = SchemaUpdater(self.update_config)
@@ -77,6 +248,10 @@ class SchemaUpdateScheduler:
         # Set up scheduler
         self._setup_scheduler()
     
+    @property
+    def currently_updating(self) -> bool:
+        return self.jobs.running is not None
+    
     def _load_update_config(self) -> SchemaUpdateConfig:
         """Load schema update configuration."""
         try:
@@ -176,12 +351,15 @@ class SchemaUpdateScheduler:
             if not self.schedule_config.status_endpoint:
                 return jsonify({"error": "Status endpoint disabled"}), 403
             
+            running_job, queued_jobs = self.jobs.snapshot()
             return jsonify({
                 "scheduler": {
                     "enabled": self.schedule_config.enabled,
                     "schedule": self.schedule_config.simple_schedule or self.schedule_config.cron_schedule,
-                    "currently_updating": self.currently_updating
+                    "currently_updating": running_job is not None
                 },
+                "running_job": running_job,
+                "queued_jobs": queued_jobs,
                 "last_update": self.last_update_result,
                 "update_history": self.update_history[-10:],  # Last 10 updates
                 "config": {
@@ -193,35 +371,24 @@ class SchemaUpdateScheduler:
         @self.app.route('/trigger', methods=['POST'])
         def trigger_update():
             """Manual trigger endpoint."""
-            if self.currently_updating:
-                return jsonify({"error": "Update already in progress"}), 409
-            
             # Optional: Check for authorization
-            auth_header = request.headers.get('Authorization')
-            if self.schedule_config.webhook_secret:
-                if not auth_header or not auth_header.startswith('Bearer '):
-                    return jsonify({"error": "Authorization required"}), 401
-                
-                token = auth_header.split(' ')[1]
-                if token != self.schedule_config.webhook_secret:
-                    return jsonify({"error": "Invalid token"}), 401
+            auth_error = self._check_authorization()
+            if auth_error:
+                return auth_error
             
             # Get optional parameters
             force = request.json.get('force', False) if request.is_json else False
             dry_run = request.json.get('dry_run', False) if request.is_json else False
             
-            # Trigger update in background
-            threading.Thread(
-                target=self.trigger_update,
-                args=("manual",),
-                kwargs={"force": force, "dry_run": dry_run}
-            ).start()
+            # Queue update for the background worker
+            job, coalesced = self.jobs.submit("manual", force=force, dry_run=dry_run)
             
             return jsonify({
-                "message": "Update triggered",
+                "message": "Update coalesced into queued job" if coalesced else "Update queued",
+                "job": job.to_dict(),
                 "force": force,
                 "dry_run": dry_run
-            })
+            }), 202
         
         @self.app.route('/webhook', methods=['POST'])
         def webhook():
@@ -235,16 +402,36 @@ class SchemaUpdateScheduler:
                 if not self._verify_webhook_signature(request.data, signature):
                     return jsonify({"error": "Invalid signature"}), 401
             
-            if self.currently_updating:
-                return jsonify({"error": "Update already in progress"}), 409
+            # Queue update for the background worker
+            job, coalesced = self.jobs.submit("webhook")
             
-            # Trigger update in background
-            threading.Thread(
-                target=self.trigger_update,
-                args=("webhook",)
-            ).start()
+            return jsonify({
+                "message": "Update coalesced into queued job" if coalesced else "Update queued via webhook",
+                "job": job.to_dict()
+            }), 202
+        
+        @self.app.route('/jobs/<job_id>', methods=['GET'])
+        def job_status(job_id):
+            """Get a queued, running or finished job."""
+            job = self.jobs.get(job_id)
+            if job is None:
+                return jsonify({"error": "Job not found"}), 404
+            return jsonify(job.to_dict())
+        
+        @self.app.route('/jobs/<job_id>/cancel', methods=['POST'])
+        def cancel_job(job_id):
+            """Cancel a queued job, or stop a running job before its next stage."""
+            auth_error = self._check_authorization()
+            if auth_error:
+                return auth_error
             
-            return jsonify({"message": "Update triggered via webhook"})
+            job = self.jobs.cancel(job_id)
+            if job is None:
+                return jsonify({"error": "Job not found or already finished"}), 404
+            return jsonify({
+                "message": "Job cancelled" if job.status == "cancelled" else "Cancellation requested",
+                "job": job.to_dict()
+            })
         
         @self.app.route('/history', methods=['GET'])
         def history():
@@ -255,6 +442,20 @@ class SchemaUpdateScheduler:
                 "total": len(self.update_history)
             })
     
+    def _check_authorization(self):
+        """Error response if a webhook secret is set and the bearer token does not match."""
+        if not self.schedule_config.webhook_secret:
+            return None
+        
+        auth_header = request.headers.get('Authorization')
+        if not auth_header or not auth_header.startswith('Bearer '):
+            return jsonify({"error": "Authorization required"}), 401
+        
+        token = auth_header.split(' ')[1]
+        if token != self.schedule_config.webhook_secret:
+            return jsonify({"error": "Invalid token"}), 401
+        return None
+    
     def _verify_webhook_signature(self, payload: bytes, signature: str) -> bool:
         """Verify webhook signature (GitHub-style)."""
         import hmac
@@ -272,58 +473,72 @@ class SchemaUpdateScheduler:
         received = signature.split('=')[1]
         return hmac.compare_digest(expected, received)
     
-    def trigger_update(self, source: str = "manual", force: bool = False, dry_run: bool = False):
-        """Trigger a schema update."""
-        if self.currently_updating:
-            self.logger.warning("Update already in progress, skipping")
-            return
-        
-        self.currently_updating = True
+    def trigger_update(self, source: str = "manual", force: bool = False, dry_run: bool = False) -> UpdateJob:
+        """Queue a schema update; returns the job that will run it."""
+        job, _ = self.jobs.submit(source, force=force, dry_run=dry_run)
+        return job
+    
+    def _run_job(self, job: UpdateJob) -> Dict[str, Any]:
+        """Run one update job on the queue's worker thread."""
+        source = ",".join(job.sources)
         start_time = datetime.now(timezone.utc)
         
-        self.logger.info(f"Starting schema update (source: {source})")
+        self.logger.info(f"Starting schema update job {job.id} (source: {source})")
         
         try:
             # Create temporary config with overrides
             temp_config = SchemaUpdateConfig(**asdict(self.update_config))
-            temp_config.force_update = force
-            temp_config.dry_run = dry_run
+            temp_config.force_update = job.force
+            temp_config.dry_run = job.dry_run
             
             # Create temporary updater
             temp_updater = SchemaUpdater(temp_config)
             
-            # Run update
-            result = temp_updater.update_schema()
-            result["source"] = source
-            
-            # Store result
-            self.last_update_result = result
-            self.update_history.append(result)
+            # Run update, reporting stages to the job
+            result = temp_updater.update_schema(progress=job.enter_stage)
             
-            # Keep only last 100 updates in memory
-            if len(self.update_history) > 100:
-                self.update_history = self.update_history[-100:]
-            
-            if result["success"]:
+            if job.cancel_requested and not result["success"]:
+                job.status = "cancelled"
+                self.logger.warning(f"Schema update job {job.id} cancelled (source: {source})")
+            elif result["success"]:
+                job.status = "succeeded"
                 self.logger.info(f"Schema update completed successfully (source: {source})")
             else:
+                job.status = "failed"
                 self.logger.error(f"Schema update failed (source: {source}): {result.get('error')}")
             
         except Exception as e:
             self.logger.error(f"Schema update failed with exception (source: {source}): {e}")
+            job.status = "failed"
             
             result = {
                 "success": False,
                 "start_time": start_time.isoformat(),
-                "error": str(e),
-                "source": source
+                "error": str(e)
             }
-            
-            self.last_update_result = result
-            self.update_history.append(result)
         
-        finally:
-            self.currently_updating = False
+        return result
+    
+    def _record_job(self, job: UpdateJob):
+        """Add a finished job to the update history."""
+        result = dict(job.result or {"success": False})
+        result.update({
+            "source": ",".join(job.sources),
+            "job_id": job.id,
+            "status": job.status,
+            "queued_at": job.queued_at,
+            "stages": job.to_dict()["stages"],
+            "duration_seconds": job.duration_seconds,
+            "cpu_seconds": job.cpu_seconds
+        })
+        
+        # Store result
+        self.last_update_result = result
+        self.update_history.append(result)
+        
+        # Keep only last 100 updates in memory
+        if len(self.update_history) > 100:
+            self.update_history = self.update_history[-100:]
     
     def run_scheduler(self):
         """Run the scheduler in the background."""
@@ -384,6 +599,7 @@ def main():
         print(f"  • Status: http://{args.host}:{args.port}/status")
         print(f"  • Trigger: http://{args.host}:{args.port}/trigger [POST]")
         print(f"  • History: http://{args.host}:{args.port}/history")
+        print(f"  • Jobs: http://{args.host}:{args.port}/jobs/<id> (cancel: /jobs/<id>/cancel [POST])")
         print("")
         
         scheduler.run(host=args.host, port=args.port, debug=args.debug)
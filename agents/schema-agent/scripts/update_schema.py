@@ -25,7 +25,7 @@ import requests
 import tempfile
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
 import logging
 from dataclasses import dataclass
 
@@ -35,6 +35,8 @@ sys.path.insert(0, str(Path(__file__).parent))
 from src.chunker import chunk_schema
 from src.embedder import Embedder
 from src.cloud_storage import cloud_storage
+from agent_common.index_versions import INDEX_FILES, new_version_dir, publish_version, resolve_index_dir
+from agent_common.quantization import QUANTIZATION_TYPES
 
 # Configure logging
 logging.basicConfig(
@@ -47,6 +49,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Stages reported to the update_schema progress callback, in order
+PIPELINE_STAGES = ("fetch", "check", "backup", "save", "chunk", "embed", "sync", "cleanup")
+
+
+class UpdateCancelled(Exception):
+    """Raised by a progress callback to stop the pipeline at the next stage."""
+
+
 @dataclass
 class SchemaUpdateConfig:
     """Configuration for schema update process."""
@@ -62,6 +72,7 @@ class SchemaUpdateConfig:
     sync_to_cloud: bool = True
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
     batch_size: int = 16
+    quantization: str = "none"  # Index vector storage: none, sq8, fp16 or pq
     
     def __post_init__(self):
         """Validate configuration."""
@@ -188,13 +199,11 @@ class SchemaUpdater:
             backup_embeddings = backup_path / "embeddings"
             backup_embeddings.mkdir(exist_ok=True)
             
-            index_file = embeddings_path / "index.faiss"
-            metadata_file = embeddings_path / "metadata.json"
-            
-            if index_file.exists():
-                shutil.copy2(index_file, backup_embeddings / "index.faiss")
-            if metadata_file.exists():
-                shutil.copy2(metadata_file, backup_embeddings / "metadata.json")
+            # Every file of the current version, including vectors.npy of a quantized index
+            index_dir = resolve_index_dir(embeddings_path)
+            for name in INDEX_FILES:
+                if (index_dir / name).exists():
+                    shutil.copy2(index_dir / name, backup_embeddings / name)
         
         self.logger.info(f"Backup completed: {backup_path}")
         return str(backup_path)
@@ -219,18 +228,16 @@ class SchemaUpdater:
             self.logger.info(f"[DRY RUN] Would chunk schema from {schema_path} to {self.config.chunks_dir}")
             return
         
-        # Clear existing chunks
+        # The chunker updates the chunk store in place and removes stale chunks
         chunks_path = Path(self.config.chunks_dir)
-        if chunks_path.exists():
-            for chunk_file in chunks_path.glob("*.graphql"):
-                chunk_file.unlink()
         
         try:
-            chunk_schema(schema_path, self.config.chunks_dir)
+            diff = chunk_schema(schema_path, self.config.chunks_dir)
             
             # Count generated chunks
             chunk_count = len(list(chunks_path.glob("*.graphql")))
-            self.logger.info(f"Generated {chunk_count} chunks")
+            self.logger.info(f"Generated {chunk_count} chunks: {len(diff['added'])} added, "
+                             f"{len(diff['changed'])} changed, {len(diff['removed'])} removed")
             
         except Exception as e:
             self.logger.error(f"Chunking failed: {e}")
@@ -247,19 +254,24 @@ class SchemaUpdater:
         try:
             embedder = Embedder(
                 model_name=self.config.embedding_model,
-                batch_size=self.config.batch_size
+                batch_size=self.config.batch_size,
+                quantization=self.config.quantization
             )
             
-            # Generate embeddings
-            embedder.embed_chunks(self.config.chunks_dir)
+            # Generate embeddings, reusing the current index's vectors for unchanged chunks
+            previous_index = resolve_index_dir(self.config.embeddings_dir) / "index.faiss"
+            embedder.embed_chunks(self.config.chunks_dir,
+                                  str(previous_index) if previous_index.exists() else None)
             
-            # Save embeddings
-            index_path = Path(self.config.embeddings_dir) / "index.faiss"
-            metadata_path = Path(self.config.embeddings_dir) / "metadata.json"
+            # Save into a new version and switch running agents over to it
+            version_dir = new_version_dir(self.config.embeddings_dir)
+            index_path = version_dir / "index.faiss"
+            metadata_path = version_dir / "metadata.json"
             
             embedder.save(str(index_path), str(metadata_path))
+            publish_version(self.config.embeddings_dir, version_dir)
             
-            self.logger.info(f"Embeddings generated and saved to {self.config.embeddings_dir}")
+            self.logger.info(f"Embeddings generated and published as {version_dir}")
             
         except Exception as e:
             self.logger.error(f"Embedding generation failed: {e}")
@@ -315,9 +327,16 @@ class SchemaUpdater:
                 shutil.rmtree(old_backup)
                 self.logger.info(f"Removed old backup: {old_backup}")
     
-    def update_schema(self) -> Dict[str, Any]:
-        """Run the complete schema update pipeline."""
+    def update_schema(self, progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Run the complete schema update pipeline.
+        
+        Args:
+            progress: Called with each stage name before the stage runs; raising
+                UpdateCancelled from it stops the pipeline and restores the backup
+        """
         start_time = datetime.now(timezone.utc)
+        stage = progress or (lambda name: None)
         self.logger.info("Starting schema update pipeline")
         
         results = {
@@ -330,12 +349,14 @@ class SchemaUpdater:
         
         try:
             # 1. Fetch or load schema
+            stage("fetch")
             if self.config.graphql_endpoint:
                 schema_content = self.fetch_schema_from_endpoint()
             else:
                 schema_content = self.load_schema_from_file()
             
             # 2. Check if schema changed
+            stage("check")
             if not self.config.force_update and not self.check_schema_changed(schema_content):
                 results["success"] = True
                 results["schema_changed"] = False
@@ -344,23 +365,29 @@ class SchemaUpdater:
             results["schema_changed"] = True
             
             # 3. Create backup
+            stage("backup")
             if not self.config.dry_run:
                 backup_path = self.backup_existing_data()
                 results["backup_path"] = backup_path
             
             # 4. Save new schema
+            stage("save")
             schema_path = self.save_schema(schema_content)
             
             # 5. Run chunker
+            stage("chunk")
             self.run_chunker(schema_path)
             
             # 6. Generate embeddings
+            stage("embed")
             self.generate_embeddings()
             
             # 7. Sync to cloud storage
+            stage("sync")
             self.sync_to_cloud_storage()
             
             # 8. Cleanup old backups
+            stage("cleanup")
             self.cleanup_old_backups()
             
             results["success"] = True
@@ -409,15 +436,13 @@ class SchemaUpdater:
         # Restore embeddings
         backup_embeddings = backup_dir / "embeddings"
         if backup_embeddings.exists():
-            embeddings_path = Path(self.config.embeddings_dir)
-            
-            backup_index = backup_embeddings / "index.faiss"
-            backup_metadata = backup_embeddings / "metadata.json"
+            # Restored files become a new version; published versions are never modified
+            version_dir = new_version_dir(self.config.embeddings_dir)
             
-            if backup_index.exists():
-                shutil.copy2(backup_index, embeddings_path / "index.faiss")
-            if backup_metadata.exists():
-                shutil.copy2(backup_metadata, embeddings_path / "metadata.json")
+            for name in INDEX_FILES:
+                if (backup_embeddings / name).exists():
+                    shutil.copy2(backup_embeddings / name, version_dir / name)
+            publish_version(self.config.embeddings_dir, version_dir)
 
 
 def load_config_from_file(config_path: str) -> SchemaUpdateConfig:
@@ -474,6 +499,8 @@ Examples:
     parser.add_argument("--no-cloud-sync", action="store_true", help="Skip cloud storage sync")
     parser.add_argument("--embedding-model", default="sentence-transformers/all-MiniLM-L6-v2", help="Embedding model to use")
     parser.add_argument("--batch-size", type=int, default=16, help="Batch size for embedding generation")
+    parser.add_argument("--quantization", choices=QUANTIZATION_TYPES, default="none",
+                        help="Index vector storage (sq8: 4x, fp16: 2x, pq: 16x smaller), re-scored with exact vectors")
     
     # Logging
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
@@ -504,7 +531,8 @@ Examples:
                 dry_run=args.dry_run,
                 sync_to_cloud=not args.no_cloud_sync,
                 embedding_model=args.embedding_model,
-                batch_size=args.batch_size
+                batch_size=args.batch_size,
+                quantization=args.quantization
             )
         
         # Override config with command line args if provided
@@ -514,6 +542,8 @@ Examples:
             config.dry_run = True
         if args.no_cloud_sync:
             config.sync_to_cloud = False
+        if args.quantization != "none":
+            config.quantization = args.quantization
         
         # Run update
         updater = SchemaUpdater(config)
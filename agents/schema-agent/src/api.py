@@ -1,16 +1,23 @@
 import os
+import copy
 import logging
 import time
+from pathlib import Path
 from typing import Optional, Dict, Any
 from fastapi import FastAPI, Request, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field, field_validator
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import StreamingResponse, JSONResponse, Response
+from fastapi.concurrency import run_in_threadpool
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from src.llm_agent import LLMQA as SchemaAgent
+from src.retriever import Retriever
+from agent_common.index_versions import HotIndex, WATCH_INTERVAL, current_version, resolve_index_dir
+from agent_common.prefork import WEB_WORKERS, is_worker, request_reload, serve
+from agent_common.tracing import Trace, observe_trace, observe_request, metrics_payload
 
 # Load environment variables
 try:
@@ -52,6 +59,13 @@ ENHANCED_INDEX_PATH = os.getenv("ENHANCED_INDEX_PATH", "embeddings_enhanced/inde
 ENHANCED_METADATA_PATH = os.getenv("ENHANCED_METADATA_PATH", "embeddings_enhanced/metadata.json")
 ENHANCED_MAX_TOKENS = int(os.getenv("ENHANCED_MAX_TOKENS", "12000"))
 
+# Index the agent serves; a new version published here is hot-swapped in
+INDEX_PATH = ENHANCED_INDEX_PATH if USE_ENHANCED_CHUNKS else "./data/embeddings/index.faiss"
+METADATA_PATH = ENHANCED_METADATA_PATH if USE_ENHANCED_CHUNKS else "./data/embeddings/metadata.json"
+WARMUP_QUERIES = [q for q in os.getenv(
+    "INDEX_WARMUP_QUERIES", "How do I create a payment card?|What fields are on a financial account?"
+).split("|") if q]
+
 app = FastAPI(
     title="GraphQL Schema QA API",
     description="AI-powered GraphQL schema question-answering service",
@@ -91,6 +105,26 @@ except Exception as e:
     logger.error(f"Failed to initialize schema agent: {e}")
     agent = None
 
+def build_agent(previous: Optional[SchemaAgent]) -> SchemaAgent:
+    """Load the current index version into a new agent, reusing the previous agent's LLM client."""
+    index_dir = resolve_index_dir(Path(INDEX_PATH).parent)
+    index_path = index_dir / Path(INDEX_PATH).name
+    metadata_path = index_dir / Path(METADATA_PATH).name
+    if previous is None:
+        kwargs = {"max_tokens": ENHANCED_MAX_TOKENS} if USE_ENHANCED_CHUNKS else {}
+        return SchemaAgent(index_path=str(index_path), metadata_path=str(metadata_path), **kwargs)
+    replacement = copy.copy(previous)
+    replacement.retriever = Retriever(index_path=str(index_path), metadata_path=str(metadata_path))
+    return replacement
+
+def warm_agent(candidate: SchemaAgent):
+    """Touch the index, vocabulary and model before the agent takes traffic."""
+    for query in WARMUP_QUERIES:
+        candidate.retriever.retrieve_chunks(query, top_k=5)
+
+# Handlers read hot_index.current once per request, so in-flight requests finish on the version they started with
+hot_index = HotIndex(agent, build_agent, [INDEX_PATH, METADATA_PATH], warmup=warm_agent, name="schema index")
+
 class ChatRequest(BaseModel):
     question: str = Field(..., min_length=1, max_length=MAX_QUESTION_LENGTH, description="Question about GraphQL schema")
     top_k: Optional[int] = Field(5, ge=1, le=20, description="Number of relevant chunks to retrieve")
@@ -138,12 +172,19 @@ async def verify_api_key(credentials: HTTPAuthorizationCredentials = Depends(sec
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint."""
+    agent = hot_index.current
     return HealthResponse(
         status="healthy" if agent is not None else "unhealthy",
         agent_ready=agent is not None,
         timestamp=time.strftime("%Y-%m-%d %H:%M:%S")
     )
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics (per-stage latency and candidate histograms)."""
+    body, content_type = metrics_payload()
+    return Response(content=body, media_type=content_type)
+
 @app.post("/chat", response_model=ChatResponse)
 @limiter.limit("30/minute")
 async def chat_endpoint(
@@ -153,6 +194,7 @@ async def chat_endpoint(
 ):
     """Main chat endpoint for GraphQL schema questions."""
     start_time = time.time()
+    agent = hot_index.current
     
     try:
         if agent is None:
@@ -162,9 +204,13 @@ async def chat_endpoint(
             )
         
         logger.info(f"Processing question: {chat_request.question[:100]}...")
+        trace = Trace("chat")
         
-        # Log retriever activity before getting answer
-        chunks = agent.retriever.retrieve_chunks(chat_request.question, top_k=chat_request.top_k)
+        # Log retriever activity before getting answer; retrieval runs off the event loop
+        with trace.span("log_retrieval") as span:
+            chunks = await run_in_threadpool(agent.retriever.retrieve_chunks, chat_request.question,
+                                             top_k=chat_request.top_k)
+            span["count"] = len(chunks)
         retriever_logger.info(f"CHAT - Question: '{chat_request.question}'")
         retriever_logger.info(f"CHAT - Retrieved {len(chunks)} chunks")
         
@@ -179,15 +225,18 @@ async def chat_endpoint(
             # Note: This would require updating LLMQA to accept model override
             pass
             
-        reply = agent.answer(chat_request.question, **kwargs)
+        reply = await run_in_threadpool(agent.answer, chat_request.question, trace=trace, **kwargs)
         
         processing_time = (time.time() - start_time) * 1000
+        observe_trace(trace, "schema")
+        observe_request("schema", "/chat", processing_time / 1000)
         
         return ChatResponse(
             response=reply,
             metadata={
                 "top_k": chat_request.top_k,
-                "question_length": len(chat_request.question)
+                "question_length": len(chat_request.question),
+                "trace": trace.to_dict()
             },
             processing_time_ms=processing_time
         )
@@ -208,6 +257,7 @@ async def get_stats(
     _: bool = Depends(verify_api_key)
 ):
     """Get retriever statistics."""
+    agent = hot_index.current
     try:
         if agent is None or not hasattr(agent, 'retriever'):
             raise HTTPException(
@@ -233,6 +283,8 @@ async def stream_chat(
     _: bool = Depends(verify_api_key)
 ):
     """Streaming chat endpoint."""
+    agent = hot_index.current
+
     def event_generator():
         try:
             if agent is None:
@@ -241,7 +293,10 @@ async def stream_chat(
             
             # Log retriever activity before streaming
             logger.info(f"Processing streaming question: {chat_request.question[:100]}...")
-            chunks = agent.retriever.retrieve_chunks(chat_request.question, top_k=chat_request.top_k)
+            trace = Trace("chat_stream")
+            with trace.span("log_retrieval") as span:
+                chunks = agent.retriever.retrieve_chunks(chat_request.question, top_k=chat_request.top_k)
+                span["count"] = len(chunks)
             retriever_logger.info(f"STREAM - Question: '{chat_request.question}'")
             retriever_logger.info(f"STREAM - Retrieved {len(chunks)} chunks")
             
@@ -250,8 +305,10 @@ async def stream_chat(
                 filename = os.path.basename(path)
                 retriever_logger.info(f"STREAM - Chunk #{i}: {filename} (score: {score:.3f}) - {content[:100].replace(chr(10), ' ')[:80]}...")
                 
-            for chunk in agent.stream_answer(chat_request.question):
+            for chunk in agent.stream_answer(chat_request.question, trace=trace):
                 yield f"data: {chunk}\n\n"
+            observe_trace(trace, "schema")
+            observe_request("schema", "/chat/stream", trace.total_ms() / 1000)
             yield "data: [DONE]\n\n"
         except Exception as e:
             logger.error(f"Error in streaming: {e}")
@@ -263,6 +320,43 @@ async def stream_chat(
         headers={"Cache-Control": "no-cache"}
     )
 
+@app.post("/admin/reload")
+@limiter.limit("5/minute")
+async def reload_index(
+    request: Request,
+    wait: bool = False,
+    _: bool = Depends(verify_api_key)
+):
+    """Load the current index version in the background and swap it in."""
+    if is_worker():
+        # The pre-fork parent loads the version once and replaces every worker; wait does not apply
+        request_reload()
+        return {**hot_index.status(), "reloading": True, "current_version": current_version(Path(INDEX_PATH).parent)}
+    if wait:
+        index_status = await run_in_threadpool(hot_index.reload, True)
+    else:
+        index_status = hot_index.reload()
+    return {**index_status, "current_version": current_version(Path(INDEX_PATH).parent)}
+
+@app.get("/admin/index")
+async def index_status(
+    request: Request,
+    _: bool = Depends(verify_api_key)
+):
+    """Serving index and reload status."""
+    return {**hot_index.status(), "current_version": current_version(Path(INDEX_PATH).parent)}
+
+@app.on_event("startup")
+async def start_index_watcher():
+    """Reload automatically when a new index version is published."""
+    # Pre-forked workers leave watching to the parent, which loads each version once
+    if not is_worker():
+        hot_index.start_watching(WATCH_INTERVAL)
+
+@app.on_event("shutdown")
+async def stop_index_watcher():
+    hot_index.stop_watching()
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -276,6 +370,16 @@ async def global_exception_handler(request: Request, exc: Exception):
         ).dict()
     )
 
+def serve_workers(host: str, port: int):
+    """
+    Serve from ``WEB_WORKERS`` pre-forked workers.
+
+    The agent is already loaded in this process; workers fork from it and share its memory.
+    This process also watches for new index versions and replaces the workers when one loads.
+    """
+    serve(app, host, port, WEB_WORKERS, reload=hot_index.refresh, watch_interval=WATCH_INTERVAL,
+          warmup=hot_index.warm)
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -287,10 +391,13 @@ if __name__ == "__main__":
     logger.info(f"Authentication enabled: {ENABLE_AUTH}")
     logger.info(f"Allowed origins: {ALLOWED_ORIGINS}")
     
-    uvicorn.run(
-        "api:app",
-        host=host,
-        port=port,
-        reload=False,
-        log_level="info"
-    )
\ No newline at end of file
+    if WEB_WORKERS > 1:
+        serve_workers(host, port)
+    else:
+        uvicorn.run(
+            "api:app",
+            host=host,
+            port=port,
+            reload=False,
+            log_level="info"
+        )
\ No newline at end of file
@@ -1,8 +1,30 @@
+import os
 import re
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
-from graphql import parse, print_ast, ObjectTypeDefinitionNode, InterfaceTypeDefinitionNode, EnumTypeDefinitionNode, ScalarTypeDefinitionNode, InputObjectTypeDefinitionNode, UnionTypeDefinitionNode, DocumentNode, FieldDefinitionNode, OperationType, SchemaDefinitionNode
+from typing import Any, Dict, List, Optional, Tuple
+from graphql import parse, print_ast, GraphQLSyntaxError, ObjectTypeDefinitionNode, InterfaceTypeDefinitionNode, EnumTypeDefinitionNode, ScalarTypeDefinitionNode, InputObjectTypeDefinitionNode, UnionTypeDefinitionNode, DocumentNode, FieldDefinitionNode, OperationType, SchemaDefinitionNode
 from graphql.language.printer import print_block_string
 
+CHUNK_WORKERS = int(os.getenv("CHUNK_WORKERS", str(os.cpu_count() or 1)))
+# Below this size the process pool costs more than it saves
+PARALLEL_THRESHOLD = 256 * 1024
+
+STORE_VERSION = 1
+PACK_NAME = "chunks.pack"
+MANIFEST_NAME = "chunks.manifest.json"
+DIFF_NAME = "chunks.diff.json"
+DIGEST_LENGTH = 12
+
+# Digest prefix of a chunk file name, or the running count of older chunkers
+FILE_PREFIX = re.compile(rf'^(?:[0-9a-f]{{{DIGEST_LENGTH}}}|\d+)_')
+
+# Printed SDL separates top-level definitions with a blank line
+DEFINITION_BOUNDARY = re.compile(r'\n\n(?="|(?:type|input|enum|scalar|interface|union|schema|directive|extend)\s)')
+
 CATEGORY_MAP = {
     'queries': ObjectTypeDefinitionNode,
     'mutations': ObjectTypeDefinitionNode,
@@ -25,6 +47,10 @@ CATEGORY_FILTERS = {
     'unions': lambda node: isinstance(node, UnionTypeDefinitionNode),
 }
 
+def chunk_file_key(file_name: str) -> str:
+    """``<category>_<name>.graphql`` part of a chunk file name, which does not depend on content"""
+    return FILE_PREFIX.sub('', file_name, count=1)
+
 def get_docstring(node):
     if hasattr(node, 'description') and node.description:
         return print_block_string(node.description.value)
@@ -65,45 +91,229 @@ def optimize_graphql_content(content: str) -> str:
     
     return '\n'.join(optimized_lines)
 
-def chunk_schema(schema_path: str, output_dir: str):
-    content = Path(schema_path).read_text()
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
-    doc = parse(content)
-    count = 0
-    for category, node_type in CATEGORY_MAP.items():
-        for defn in doc.definitions:
-            if CATEGORY_FILTERS[category](defn):
+
+def _render_segment(content: str) -> Optional[Dict[str, List[Tuple[str, str]]]]:
+    """
+    Classify the definitions of an SDL segment in one pass and render their chunks
+
+    Returns:
+        category -> [(name, chunk)] in source order, or None if the segment does not parse
+    """
+    try:
+        doc = parse(content)
+    except GraphQLSyntaxError:
+        return None
+
+    rendered: Dict[str, List[Tuple[str, str]]] = {category: [] for category in CATEGORY_MAP}
+    for defn in doc.definitions:
+        for category, matches in CATEGORY_FILTERS.items():
+            if not matches(defn):
+                continue
+            if category in ['queries', 'mutations']:
                 # For Query/Mutation, split by field
-                if category in ['queries', 'mutations']:
-                    for field in defn.fields or []:
-                        field_name = field.name.value
-                        # Build SDL for this field - print_ast already includes docstring
-                        lines = [f"type {defn.name.value} {{"]
-                        # Print field with its arguments and type
-                        field_sdl = print_ast(field).strip()
-                        lines.append(f"  {field_sdl}")
-                        lines.append("}")
-                        chunk = "\n".join(lines)
-                        # Optimize chunk for token efficiency
-                        optimized_chunk = optimize_graphql_content(chunk)
-                        filename = f"{count:03d}_{category}_{field_name}.graphql"
-                        Path(output_dir, filename).write_text(optimized_chunk + "\n")
-                        count += 1
-                else:
-                    # For all other types, one file per object
-                    chunk = print_ast(defn).strip()
-                    # Optimize chunk for token efficiency
-                    optimized_chunk = optimize_graphql_content(chunk)
-                    filename = f"{count:03d}_{category}_{defn.name.value}.graphql"
-                    Path(output_dir, filename).write_text(optimized_chunk + "\n")
-                    count += 1
-    print(f"SUCCESS: Chunked {count} total blocks into '{output_dir}'.")
+                for field in getattr(defn, 'fields', None) or []:
+                    # Build SDL for this field - print_ast already includes docstring
+                    chunk = f"type {defn.name.value} {{\n  {print_ast(field).strip()}\n}}"
+                    rendered[category].append((field.name.value, optimize_graphql_content(chunk)))
+            else:
+                # For all other types, one chunk per object
+                chunk = print_ast(defn).strip()
+                rendered[category].append((defn.name.value, optimize_graphql_content(chunk)))
+    return rendered
+
+def split_definitions(content: str, parts: int) -> List[str]:
+    """Split SDL into about ``parts`` segments at top-level definition boundaries"""
+    if parts <= 1:
+        return [content]
+    target = len(content) / parts
+    segments = []
+    start = 0
+    for match in DEFINITION_BOUNDARY.finditer(content):
+        if match.start() - start >= target:
+            segments.append(content[start:match.start()])
+            start = match.start()
+    segments.append(content[start:])
+    return segments
+
+def render_schema(content: str, workers: int = CHUNK_WORKERS) -> List[Tuple[str, str, str]]:
+    """
+    Render every chunk of a schema, in a process pool for large schemas
+
+    Returns:
+        (category, name, chunk) grouped in CATEGORY_MAP order, source order within a category
+    """
+    rendered = None
+    if workers > 1 and len(content) >= PARALLEL_THRESHOLD:
+        segments = split_definitions(content, workers * 4)
+        with ProcessPoolExecutor(max_workers=min(workers, len(segments))) as pool:
+            rendered = list(pool.map(_render_segment, segments))
+        if any(part is None for part in rendered):
+            # A boundary fell inside a definition (e.g. a block string); parse it whole
+            rendered = None
+    if rendered is None:
+        whole = _render_segment(content)
+        if whole is None:
+            parse(content)  # Raise the syntax error with its location
+        rendered = [whole]
+
+    return [(category, name, chunk)
+            for category in CATEGORY_MAP
+            for part in rendered
+            for name, chunk in part[category]]
+
+
+class ChunkStore:
+    """
+    Packed, content-addressed chunk store
+
+    Chunk contents are concatenated into ``chunks.pack`` and indexed by
+    ``chunks.manifest.json`` (key -> file, digest, byte offset and length).
+    Every chunk is also materialized as ``<digest>_<category>_<name>.graphql``
+    for the embedder and retriever. A name only changes with its content, so
+    unchanged chunks are never rewritten.
+    """
+
+    def __init__(self, output_dir: str):
+        self.output_dir = Path(output_dir)
+        self.pack_path = self.output_dir / PACK_NAME
+        self.manifest_path = self.output_dir / MANIFEST_NAME
+        self.diff_path = self.output_dir / DIFF_NAME
+        self.manifest = self._read_json(self.manifest_path)
+        if self.manifest.get('version') != STORE_VERSION:
+            self.manifest = {}
+
+    @property
+    def chunks(self) -> Dict[str, Dict[str, Any]]:
+        """key ('<category>/<name>') -> entry"""
+        return self.manifest.get('chunks', {})
+
+    @property
+    def last_diff(self) -> Dict[str, Any]:
+        """Diff written by the last chunking run"""
+        return self._read_json(self.diff_path)
+
+    def read(self, key: str) -> str:
+        """Read one chunk from the pack"""
+        entry = self.chunks[key]
+        with open(self.pack_path, 'rb') as f:
+            f.seek(entry['offset'])
+            return f.read(entry['length']).decode('utf-8')
+
+    def is_current(self, schema_digest: str) -> bool:
+        """Whether the store already holds every chunk of this schema"""
+        return (self.manifest.get('schema_digest') == schema_digest
+                and self.pack_path.exists()
+                and all((self.output_dir / entry['file']).exists() for entry in self.chunks.values()))
+
+    def update(self, schema_digest: str, rendered: List[Tuple[str, str, str]]) -> Dict[str, Any]:
+        """
+        Store a new set of chunks
+
+        Writes added and changed chunk files, removes stale ``.graphql`` files
+        (including count-prefixed files from older chunker versions) and
+        rewrites the pack and manifest.
+
+        Returns:
+            The diff against the previous run
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        previous = self.chunks
+        entries: Dict[str, Dict[str, Any]] = {}
+        pack = bytearray()
+        added, changed = [], []
+        seen: Dict[str, int] = {}
+
+        for category, name, chunk in rendered:
+            key = f"{category}/{name}"
+            seen[key] = seen.get(key, 0) + 1
+            if seen[key] > 1:
+                key = f"{key}#{seen[key]}"
+            data = (chunk + "\n").encode('utf-8')
+            digest = hashlib.sha256(data).hexdigest()[:DIGEST_LENGTH]
+            entry = {
+                'file': f"{digest}_{category}_{name}.graphql",
+                'digest': digest,
+                'category': category,
+                'name': name,
+                'offset': len(pack),
+                'length': len(data)
+            }
+            entries[key] = entry
+            pack += data
+
+            path = self.output_dir / entry['file']
+            if not path.exists():
+                path.write_bytes(data)
+            old = previous.get(key)
+            if old is None:
+                added.append({'key': key, 'file': entry['file']})
+            elif old['digest'] != digest:
+                changed.append({'key': key, 'file': entry['file'], 'previous_file': old['file']})
+
+        removed = [{'key': key, 'file': entry['file']} for key, entry in previous.items() if key not in entries]
+        current_files = {entry['file'] for entry in entries.values()}
+        for path in self.output_dir.glob("*.graphql"):
+            if path.name not in current_files:
+                path.unlink()
+
+        self._write_atomic(self.pack_path, bytes(pack))
+        previous_digest = self.manifest.get('schema_digest')
+        self.manifest = {'version': STORE_VERSION, 'schema_digest': schema_digest, 'chunks': entries}
+        self._write_atomic(self.manifest_path, json.dumps(self.manifest, indent=1).encode('utf-8'))
+        return self.write_diff(previous_digest, added, changed, removed, len(entries) - len(added) - len(changed))
+
+    def write_diff(self, previous_digest: Optional[str], added: List[Dict], changed: List[Dict],
+                   removed: List[Dict], unchanged: int) -> Dict[str, Any]:
+        """Write the diff for downstream embedding"""
+        diff = {
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'schema_digest': self.manifest.get('schema_digest'),
+            'previous_schema_digest': previous_digest,
+            'added': added,
+            'changed': changed,
+            'removed': removed,
+            'unchanged': unchanged
+        }
+        self._write_atomic(self.diff_path, json.dumps(diff, indent=2).encode('utf-8'))
+        return diff
+
+    @staticmethod
+    def _read_json(path: Path) -> Dict[str, Any]:
+        try:
+            return json.loads(path.read_text())
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        tmp_path = path.with_name(path.name + '.tmp')
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+def chunk_schema(schema_path: str, output_dir: str, workers: int = CHUNK_WORKERS) -> Dict[str, Any]:
+    """
+    Chunk a schema into the packed chunk store in ``output_dir``
+
+    Returns:
+        Diff against the previous run: added, changed and removed chunks
+    """
+    content = Path(schema_path).read_text()
+    schema_digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    store = ChunkStore(output_dir)
+    if store.is_current(schema_digest):
+        diff = store.write_diff(schema_digest, [], [], [], len(store.chunks))
+    else:
+        diff = store.update(schema_digest, render_schema(content, workers))
+    print(f"SUCCESS: Chunked {len(store.chunks)} total blocks into '{output_dir}' "
+          f"({len(diff['added'])} added, {len(diff['changed'])} changed, {len(diff['removed'])} removed).")
+    return diff
 
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="GraphQL chunker using graphql-core, with full docstring support.")
     parser.add_argument("--schema", required=True, help="Path to GraphQL SDL schema file")
     parser.add_argument("--out", default="./data/chunks", help="Output directory for chunks")
+    parser.add_argument("--workers", type=int, default=CHUNK_WORKERS, help="Worker processes for rendering")
     args = parser.parse_args()
 
-    chunk_schema(args.schema, args.out)
+    chunk_schema(args.schema, args.out, args.workers)
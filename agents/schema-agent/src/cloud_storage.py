@@ -1,106 +1,325 @@
 """
 Cloud Storage integration for Schema Agent
 Handles loading/saving embeddings and data from GCS
+
+Transfers are delta syncs: every object carries the SHA-256 of its
+uncompressed content in its metadata, and only files whose hash differs are
+transferred, gzip-compressed, over a bounded thread pool. Chunk files are
+bundled into sharded tar.gz archives tracked by a bundle index, so a schema
+update re-uploads only the shards whose chunks changed.
+
+The object store is pluggable: GCS in production, or a local directory
+(``STORAGE_BACKEND=local``) to exercise the sync path without GCS.
 """
 
+import io
 import os
+import gzip
+import json
+import hashlib
+import shutil
 import logging
-import tempfile
+import tarfile
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
-from google.cloud import storage
-from google.api_core import exceptions
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from agent_common.index_versions import new_version_dir, publish_version
+
+try:
+    from google.cloud import storage
+    from google.api_core import exceptions
+    GCS_AVAILABLE = True
+except ImportError:
+    GCS_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+SYNC_WORKERS = int(os.getenv("STORAGE_SYNC_WORKERS", "8"))
+CHUNK_SHARDS = int(os.getenv("STORAGE_CHUNK_SHARDS", "64"))
+
+EMBEDDINGS_PREFIX = "embeddings/"
+EMBEDDING_FILES = ("index.faiss", "metadata.json", "vectors.npy")
+CHUNKS_PREFIX = "data/chunks/"
+BUNDLE_PREFIX = CHUNKS_PREFIX + "bundles/"
+BUNDLE_INDEX = BUNDLE_PREFIX + "index.json"
+
+# Metadata keys stored on every object written by this module
+HASH_KEY = "sha256"
+ENCODING_KEY = "encoding"
+# Modification time of the local file(s) an object was uploaded from
+MTIME_KEY = "mtime"
+
+
+def content_sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def shard_of(name: str) -> str:
+    """Bundle shard for a chunk file name"""
+    return f"{int(hashlib.sha1(name.encode('utf-8')).hexdigest()[:8], 16) % CHUNK_SHARDS:03d}"
+
+
+def bundle_index(files: Dict[str, str]) -> Dict[str, Dict]:
+    """
+    Group chunk files into shards
+    
+    Args:
+        files: chunk file name -> content hash
+        
+    Returns:
+        shard -> {'sha256': digest of the shard's members, 'files': {name: hash}}
+    """
+    shards: Dict[str, Dict[str, str]] = {}
+    for name in sorted(files):
+        shards.setdefault(shard_of(name), {})[name] = files[name]
+    return {
+        shard: {HASH_KEY: content_sha256(json.dumps(members, sort_keys=True).encode('utf-8')), 'files': members}
+        for shard, members in shards.items()
+    }
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+class StorageBackend(ABC):
+    """Object store used by CloudStorageManager"""
+    
+    @abstractmethod
+    def describe(self) -> str:
+        """Location for log messages, e.g. ``gs://bucket``"""
+    
+    @abstractmethod
+    def exists(self) -> bool:
+        """Whether the bucket/root is reachable"""
+    
+    @abstractmethod
+    def list(self, prefix: str) -> Dict[str, Dict[str, str]]:
+        """Object name -> custom metadata for every object under ``prefix``"""
+    
+    @abstractmethod
+    def upload(self, name: str, data: bytes, metadata: Dict[str, str]):
+        """Store ``data`` as ``name`` with custom metadata"""
+    
+    @abstractmethod
+    def download(self, name: str) -> bytes:
+        """Content of object ``name``"""
+    
+    @abstractmethod
+    def delete(self, name: str):
+        """Remove object ``name``"""
+
+
+class GCSBackend(StorageBackend):
+    """Google Cloud Storage bucket"""
+    
+    def __init__(self, bucket_name: str, project_id: Optional[str] = None):
+        if not GCS_AVAILABLE:
+            raise RuntimeError("google-cloud-storage is not installed")
+        self.bucket_name = bucket_name
+        self.client = storage.Client(project=project_id)
+        self.bucket = self.client.bucket(bucket_name)
+    
+    def describe(self) -> str:
+        return f"gs://{self.bucket_name}"
+    
+    def exists(self) -> bool:
+        return self.bucket.exists()
+    
+    def list(self, prefix: str) -> Dict[str, Dict[str, str]]:
+        # Listing returns custom metadata, so one call covers every hash comparison
+        return {blob.name: dict(blob.metadata or {}) for blob in self.client.list_blobs(self.bucket_name, prefix=prefix)}
+    
+    def upload(self, name: str, data: bytes, metadata: Dict[str, str]):
+        blob = self.bucket.blob(name)
+        blob.metadata = metadata
+        blob.upload_from_string(data, content_type="application/octet-stream")
+    
+    def download(self, name: str) -> bytes:
+        return self.bucket.blob(name).download_as_bytes()
+    
+    def delete(self, name: str):
+        try:
+            self.bucket.blob(name).delete()
+        except exceptions.NotFound:
+            pass
+
+
+class LocalBackend(StorageBackend):
+    """
+    Directory standing in for a bucket
+    
+    Objects are files under ``root``; their metadata lives in
+    ``root/.metadata/<name>.json``.
+    """
+    
+    METADATA_DIR = ".metadata"
+    
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+    
+    def describe(self) -> str:
+        return f"file://{self.root.resolve()}"
+    
+    def exists(self) -> bool:
+        return self.root.is_dir()
+    
+    def list(self, prefix: str) -> Dict[str, Dict[str, str]]:
+        objects = {}
+        for path in self.root.rglob("*"):
+            name = path.relative_to(self.root).as_posix()
+            if (path.is_file() and name.startswith(prefix)
+                    and not name.startswith(self.METADATA_DIR + "/") and not name.endswith(".tmp")):
+                objects[name] = self._metadata(name)
+        return objects
+    
+    def upload(self, name: str, data: bytes, metadata: Dict[str, str]):
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_atomic(path, data)
+        metadata_path = self._metadata_path(name)
+        metadata_path.parent.mkdir(parents=True, exist_ok=True)
+        _write_atomic(metadata_path, json.dumps(metadata).encode('utf-8'))
+    
+    def download(self, name: str) -> bytes:
+        return (self.root / name).read_bytes()
+    
+    def delete(self, name: str):
+        for path in (self.root / name, self._metadata_path(name)):
+            if path.exists():
+                path.unlink()
+    
+    def _metadata_path(self, name: str) -> Path:
+        return self.root / self.METADATA_DIR / f"{name}.json"
+    
+    def _metadata(self, name: str) -> Dict[str, str]:
+        try:
+            return json.loads(self._metadata_path(name).read_text())
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+
 class CloudStorageManager:
     """Manages Cloud Storage operations for the Schema Agent."""
     
-    def __init__(self, bucket_name: Optional[str] = None, project_id: Optional[str] = None):
+    def __init__(self, bucket_name: Optional[str] = None, project_id: Optional[str] = None,
+                 backend: Optional[StorageBackend] = None, max_workers: int = SYNC_WORKERS):
         """
         Initialize Cloud Storage manager.
         
         Args:
             bucket_name: GCS bucket name (defaults to env var STORAGE_BUCKET)
             project_id: GCP project ID (defaults to env var GOOGLE_CLOUD_PROJECT)
+            backend: Object store to use instead of the one selected by STORAGE_BACKEND
+            max_workers: Parallel transfers
         """
         self.bucket_name = bucket_name or os.getenv('STORAGE_BUCKET')
         self.project_id = project_id or os.getenv('GOOGLE_CLOUD_PROJECT')
+        self.max_workers = max_workers
+        self.backend = backend or self._backend_from_env()
+    
+    def _backend_from_env(self) -> Optional[StorageBackend]:
+        if os.getenv('STORAGE_BACKEND', 'gcs') == 'local':
+            local_dir = os.getenv('STORAGE_LOCAL_DIR')
+            if not local_dir:
+                logger.warning("STORAGE_BACKEND=local needs STORAGE_LOCAL_DIR. Cloud storage disabled.")
+                return None
+            logger.info(f"Local storage backend initialized: {local_dir}")
+            return LocalBackend(local_dir)
         
         if not self.bucket_name:
             logger.warning("No storage bucket configured. Cloud storage disabled.")
-            self.client = None
-            self.bucket = None
-            return
+            return None
             
         try:
-            self.client = storage.Client(project=self.project_id)
-            self.bucket = self.client.bucket(self.bucket_name)
+            backend = GCSBackend(self.bucket_name, self.project_id)
             logger.info(f"Cloud Storage initialized: gs://{self.bucket_name}")
+            return backend
         except Exception as e:
             logger.warning(f"Failed to initialize Cloud Storage: {e}")
-            self.client = None
-            self.bucket = None
+            return None
     
     def is_enabled(self) -> bool:
         """Check if cloud storage is properly configured."""
-        return self.client is not None and self.bucket is not None
+        return self.backend is not None
     
-    def download_embeddings(self, local_dir: str = "embeddings") -> bool:
+    def download_embeddings(self, local_dir: str = "embeddings", force: bool = False) -> bool:
         """
         Download embeddings from Cloud Storage to local directory.
         
+        Only files whose content hash differs from the local copy are fetched,
+        into a new index version that is then published. Local embeddings
+        newer than the stored ones are kept.
+        
         Args:
             local_dir: Local directory to download embeddings to
+            force: Download even if the local files are current or newer
             
         Returns:
-            True if successful, False otherwise
+            True if the embeddings were checked against the remote ones, False otherwise
         """
+        return self._download_embeddings(local_dir, force) is not None
+    
+    def _download_embeddings(self, local_dir: str = "embeddings", force: bool = False) -> Optional[int]:
+        """download_embeddings, returning the number of files downloaded (None on failure)"""
         if not self.is_enabled():
             logger.debug("Cloud storage not enabled, skipping download")
-            return False
+            return None
             
         try:
             local_path = Path(local_dir)
             local_path.mkdir(parents=True, exist_ok=True)
+            remote = self.backend.list(EMBEDDINGS_PREFIX)
             
-            # Download index and metadata files
-            files_to_download = [
-                ("embeddings/index.faiss", "index.faiss"),
-                ("embeddings/metadata.json", "metadata.json")
+            available = [name for name in EMBEDDING_FILES if EMBEDDINGS_PREFIX + name in remote]
+            if not available:
+                logger.debug(f"No embeddings found in {self.backend.describe()}")
+                return None
+                
+            # The files form one index, so they are replaced together or not at all
+            if not force and not any(self._remote_is_newer(local_path / name, remote[EMBEDDINGS_PREFIX + name])
+                                     for name in available):
+                logger.info("Local embeddings are not older than the stored ones, keeping them")
+                return 0
+                
+            changed = [
+                name for name in available
+                if force or not self._is_current(local_path / name, remote[EMBEDDINGS_PREFIX + name])
             ]
-            
-            downloaded_any = False
-            for remote_path, local_filename in files_to_download:
-                try:
-                    blob = self.bucket.blob(remote_path)
-                    if blob.exists():
-                        local_file_path = local_path / local_filename
-                        blob.download_to_filename(str(local_file_path))
-                        logger.info(f"Downloaded {remote_path} -> {local_file_path}")
-                        downloaded_any = True
-                    else:
-                        logger.debug(f"Remote file not found: gs://{self.bucket_name}/{remote_path}")
-                except exceptions.NotFound:
-                    logger.debug(f"File not found in storage: {remote_path}")
-                except Exception as e:
-                    logger.error(f"Failed to download {remote_path}: {e}")
-            
-            return downloaded_any
+            if changed:
+                # Download into a new index version so running agents can swap to it atomically
+                version_dir = new_version_dir(local_path)
+                for name in available:
+                    if name not in changed:
+                        shutil.copy2(local_path / name, version_dir / name)
+                self._run(self._download_file, [
+                    (EMBEDDINGS_PREFIX + name, version_dir / name, remote[EMBEDDINGS_PREFIX + name]) for name in changed
+                ])
+                publish_version(local_path, version_dir)
+            logger.info(f"Embeddings synced: {len(changed)} downloaded, {len(available) - len(changed)} current")
+            return len(changed)
             
         except Exception as e:
             logger.error(f"Failed to download embeddings: {e}")
-            return False
+            return None
     
-    def upload_embeddings(self, local_dir: str = "embeddings") -> bool:
+    def upload_embeddings(self, local_dir: str = "embeddings", force: bool = False) -> bool:
         """
         Upload embeddings from local directory to Cloud Storage.
         
+        Only files whose content hash differs from the stored object are sent.
+        
         Args:
             local_dir: Local directory containing embeddings
+            force: Upload even if the remote files are current
             
         Returns:
-            True if successful, False otherwise
+            True if the remote embeddings match the local ones, False otherwise
         """
         if not self.is_enabled():
             logger.debug("Cloud storage not enabled, skipping upload")
@@ -112,85 +331,106 @@ class CloudStorageManager:
                 logger.warning(f"Local embeddings directory not found: {local_dir}")
                 return False
             
-            # Upload index and metadata files
-            files_to_upload = [
-                ("index.faiss", "embeddings/index.faiss"),
-                ("metadata.json", "embeddings/metadata.json")
+            available = [name for name in EMBEDDING_FILES if (local_path / name).exists()]
+            if not available:
+                logger.debug(f"No embedding files found in {local_dir}")
+                return False
+                
+            remote = self.backend.list(EMBEDDINGS_PREFIX)
+            transfers = [
+                (local_path / name, EMBEDDINGS_PREFIX + name)
+                for name in available
+                if force or not self._is_current(local_path / name, remote.get(EMBEDDINGS_PREFIX + name))
             ]
-            
-            uploaded_any = False
-            for local_filename, remote_path in files_to_upload:
-                local_file_path = local_path / local_filename
-                if local_file_path.exists():
-                    try:
-                        blob = self.bucket.blob(remote_path)
-                        blob.upload_from_filename(str(local_file_path))
-                        logger.info(f"Uploaded {local_file_path} -> gs://{self.bucket_name}/{remote_path}")
-                        uploaded_any = True
-                    except Exception as e:
-                        logger.error(f"Failed to upload {local_file_path}: {e}")
-                else:
-                    logger.debug(f"Local file not found: {local_file_path}")
-            
-            return uploaded_any
+            self._run(self._upload_file, transfers)
+            logger.info(f"Embeddings synced to {self.backend.describe()}: "
+                        f"{len(transfers)} uploaded, {len(available) - len(transfers)} current")
+            return True
             
         except Exception as e:
             logger.error(f"Failed to upload embeddings: {e}")
             return False
     
-    def download_chunks(self, local_dir: str = "chunks") -> bool:
+    def download_chunks(self, local_dir: str = "chunks", force: bool = False) -> bool:
         """
         Download chunks from Cloud Storage to local directory.
         
+        Fetches the bundles whose members changed, extracts them and removes
+        local chunk files that are no longer in the bundle index. Other files
+        (e.g. the chunk pack and manifest) are synced individually. Only
+        runs when the stored chunks were uploaded from files newer than the
+        local ones, so newer local chunks are never overwritten or removed.
+        
         Args:
             local_dir: Local directory to download chunks to
+            force: Download everything even if the local files are current or newer
             
         Returns:
-            True if successful, False otherwise
+            True if the chunks were checked against the remote ones, False otherwise
         """
+        return self._download_chunks(local_dir, force) is not None
+    
+    def _download_chunks(self, local_dir: str = "chunks", force: bool = False) -> Optional[int]:
+        """download_chunks, returning the number of bundles and files downloaded (None on failure)"""
         if not self.is_enabled():
             logger.debug("Cloud storage not enabled, skipping download")
-            return False
+            return None
             
         try:
             local_path = Path(local_dir)
             local_path.mkdir(parents=True, exist_ok=True)
+            remote = self.backend.list(CHUNKS_PREFIX)
+            if not remote:
+                logger.debug("No chunk files found in storage")
+                return None
             
-            # List all blobs in chunks folder
-            blobs = self.client.list_blobs(self.bucket_name, prefix="data/chunks/")
+            shards = []
+            if BUNDLE_INDEX in remote and (force or self._remote_is_newer(local_path, remote[BUNDLE_INDEX])):
+                remote_index = json.loads(self._get(BUNDLE_INDEX, remote[BUNDLE_INDEX]))
+                local_index = bundle_index(self._chunk_hashes(local_path))
+                shards = [
+                    shard for shard, entry in remote_index.items()
+                    if force or local_index.get(shard, {}).get(HASH_KEY) != entry[HASH_KEY]
+                ]
+                self._run(self._download_bundle, [(shard, local_path, remote) for shard in shards])
             
-            downloaded_count = 0
-            for blob in blobs:
-                if blob.name.endswith('.graphql'):
-                    local_filename = Path(blob.name).name
-                    local_file_path = local_path / local_filename
+                remote_files = {name for entry in remote_index.values() for name in entry['files']}
+                for path in local_path.glob("*.graphql"):
+                    if path.name not in remote_files:
+                        path.unlink()
                     
-                    try:
-                        blob.download_to_filename(str(local_file_path))
-                        downloaded_count += 1
-                    except Exception as e:
-                        logger.error(f"Failed to download {blob.name}: {e}")
+            # Loose objects: chunk store files, or per-file chunks from before bundling
+            files = [
+                (name, local_path / name[len(CHUNKS_PREFIX):], metadata)
+                for name, metadata in remote.items()
+                if not name.startswith(BUNDLE_PREFIX) and '/' not in name[len(CHUNKS_PREFIX):]
+                and (force or (self._remote_is_newer(local_path / name[len(CHUNKS_PREFIX):], metadata)
+                               and not self._is_current(local_path / name[len(CHUNKS_PREFIX):], metadata)))
+            ]
+            self._run(self._download_file, files)
             
-            if downloaded_count > 0:
-                logger.info(f"Downloaded {downloaded_count} chunk files")
-                return True
-            else:
-                logger.debug("No chunk files found in storage")
-                return False
+            logger.info(f"Chunks synced: {len(shards)} bundles and {len(files)} files downloaded")
+            return len(shards) + len(files)
             
         except Exception as e:
             logger.error(f"Failed to download chunks: {e}")
-            return False
+            return None
     
-    def upload_chunks(self, local_dir: str = "chunks") -> bool:
+    def upload_chunks(self, local_dir: str = "chunks", force: bool = False) -> bool:
         """
         Upload chunks from local directory to Cloud Storage.
         
+        Chunk files are uploaded as compressed shard bundles; only shards
+        whose members changed are re-uploaded. The bundle index is written
+        last, so readers never see an index pointing at missing bundles.
+        Remote objects that no longer exist locally are deleted.
+        
         Args:
             local_dir: Local directory containing chunks
+            force: Upload everything even if the remote files are current
             
         Returns:
-            True if successful, False otherwise
+            True if the remote chunks match the local ones, False otherwise
         """
         if not self.is_enabled():
             logger.debug("Cloud storage not enabled, skipping upload")
@@ -202,23 +442,46 @@ class CloudStorageManager:
                 logger.warning(f"Local chunks directory not found: {local_dir}")
                 return False
             
-            uploaded_count = 0
-            for graphql_file in local_path.glob("*.graphql"):
-                remote_path = f"data/chunks/{graphql_file.name}"
-                
-                try:
-                    blob = self.bucket.blob(remote_path)
-                    blob.upload_from_filename(str(graphql_file))
-                    uploaded_count += 1
-                except Exception as e:
-                    logger.error(f"Failed to upload {graphql_file}: {e}")
-            
-            if uploaded_count > 0:
-                logger.info(f"Uploaded {uploaded_count} chunk files")
-                return True
-            else:
+            chunk_hashes = self._chunk_hashes(local_path)
+            if not chunk_hashes:
                 logger.debug("No chunk files found to upload")
                 return False
+                
+            remote = self.backend.list(CHUNKS_PREFIX)
+            remote_index = {}
+            if BUNDLE_INDEX in remote:
+                remote_index = json.loads(self._get(BUNDLE_INDEX, remote[BUNDLE_INDEX]))
+                
+            index = bundle_index(chunk_hashes)
+            shards = [
+                shard for shard, entry in index.items()
+                if force or remote_index.get(shard, {}).get(HASH_KEY) != entry[HASH_KEY]
+                or self._bundle_name(shard) not in remote
+            ]
+            self._run(self._upload_bundle, [(shard, local_path, index[shard]) for shard in shards])
+            
+            loose = [
+                path for path in sorted(local_path.iterdir())
+                if path.is_file() and path.suffix != '.graphql' and not path.name.endswith('.tmp')
+            ]
+            files = [
+                (path, CHUNKS_PREFIX + path.name) for path in loose
+                if force or not self._is_current(path, remote.get(CHUNKS_PREFIX + path.name))
+            ]
+            self._run(self._upload_file, files)
+            
+            if shards or index != remote_index:
+                self._put(BUNDLE_INDEX, json.dumps(index, sort_keys=True).encode('utf-8'),
+                          self._newest_mtime(local_path))
+                          
+            # Objects left over from removed shards, removed files or per-file uploads
+            keep = {BUNDLE_INDEX} | {self._bundle_name(shard) for shard in index} | {CHUNKS_PREFIX + path.name for path in loose}
+            stale = [name for name in remote if name not in keep]
+            self._run(self.backend.delete, [(name,) for name in stale])
+            
+            logger.info(f"Chunks synced to {self.backend.describe()}: {len(shards)}/{len(index)} bundles "
+                        f"and {len(files)} files uploaded, {len(stale)} stale objects deleted")
+            return True
             
         except Exception as e:
             logger.error(f"Failed to upload chunks: {e}")
@@ -228,8 +491,12 @@ class CloudStorageManager:
         """
         Sync embeddings and chunks from cloud storage to local.
         
+        Local files whose content matches the stored hashes are kept, so a
+        cold start with a warm disk only compares listings. Local files newer
+        than the stored ones are kept as well.
+        
         Args:
-            force: Force download even if local files exist
+            force: Force download even if local files are current or newer
             
         Returns:
             True if any files were synced, False otherwise
@@ -237,33 +504,16 @@ class CloudStorageManager:
         if not self.is_enabled():
             return False
         
-        synced_any = False
-        
-        # Check if we need to download embeddings
-        embeddings_exist = (
-            Path("embeddings/index.faiss").exists() and 
-            Path("embeddings/metadata.json").exists()
-        )
-        
-        if force or not embeddings_exist:
-            logger.info("Syncing embeddings from cloud storage...")
-            if self.download_embeddings():
-                synced_any = True
-        
-        # Check if we need to download chunks
-        chunks_exist = Path("chunks").exists() and any(Path("chunks").glob("*.graphql"))
-        
-        if force or not chunks_exist:
-            logger.info("Syncing chunks from cloud storage...")
-            if self.download_chunks():
-                synced_any = True
-        
-        return synced_any
+        logger.info("Syncing embeddings and chunks from cloud storage...")
+        synced_embeddings = self._download_embeddings(force=force)
+        synced_chunks = self._download_chunks(force=force)
+        return bool(synced_embeddings) or bool(synced_chunks)
     
     def get_stats(self) -> dict:
         """Get cloud storage statistics."""
         stats = {
             "enabled": self.is_enabled(),
+            "backend": self.backend.describe() if self.backend else None,
             "bucket_name": self.bucket_name,
             "project_id": self.project_id
         }
@@ -271,18 +521,102 @@ class CloudStorageManager:
         if self.is_enabled():
             try:
                 # Count files in each folder
-                embeddings_count = sum(1 for _ in self.client.list_blobs(self.bucket_name, prefix="embeddings/"))
-                chunks_count = sum(1 for _ in self.client.list_blobs(self.bucket_name, prefix="data/chunks/"))
+                embeddings_count = len(self.backend.list(EMBEDDINGS_PREFIX))
+                chunks_count = len(self.backend.list(CHUNKS_PREFIX))
                 
                 stats.update({
                     "embeddings_files": embeddings_count,
                     "chunks_files": chunks_count,
-                    "bucket_exists": self.bucket.exists()
+                    "bucket_exists": self.backend.exists()
                 })
             except Exception as e:
                 stats["error"] = str(e)
         
         return stats
+    
+    def _run(self, transfer: Callable, tasks: Iterable[Tuple]):
+        """Run transfers on the bounded worker pool, raising the first failure"""
+        tasks = list(tasks)
+        if not tasks:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as pool:
+            for future in [pool.submit(transfer, *task) for task in tasks]:
+                future.result()
+    
+    def _put(self, name: str, data: bytes, mtime: Optional[float] = None):
+        """Store gzip-compressed content tagged with its uncompressed hash and source mtime"""
+        metadata = {HASH_KEY: content_sha256(data), ENCODING_KEY: 'gzip'}
+        if mtime is not None:
+            metadata[MTIME_KEY] = repr(mtime)
+        self.backend.upload(name, gzip.compress(data, mtime=0), metadata)
+    
+    def _get(self, name: str, metadata: Dict[str, str]) -> bytes:
+        data = self.backend.download(name)
+        # Objects uploaded before compression carry no encoding
+        if metadata.get(ENCODING_KEY) == 'gzip':
+            data = gzip.decompress(data)
+        return data
+    
+    def _is_current(self, path: Path, metadata: Optional[Dict[str, str]]) -> bool:
+        if metadata is None or HASH_KEY not in metadata or not path.exists():
+            return False
+        return content_sha256(path.read_bytes()) == metadata[HASH_KEY]
+    
+    def _remote_is_newer(self, path: Path, metadata: Dict[str, str]) -> bool:
+        """
+        Whether a stored object may replace ``path`` (a file, or a chunk directory)
+        
+        True if nothing exists locally, or the object was uploaded from files
+        newer than the local ones. Objects without a recorded mtime (uploaded
+        by older versions) only fill in missing files.
+        """
+        local_mtime = self._newest_mtime(path) if path.is_dir() else (path.stat().st_mtime if path.exists() else None)
+        if local_mtime is None:
+            return True
+        remote_mtime = metadata.get(MTIME_KEY)
+        return remote_mtime is not None and float(remote_mtime) > local_mtime
+    
+    @staticmethod
+    def _newest_mtime(local_path: Path) -> Optional[float]:
+        """Newest modification time of the files in a directory"""
+        mtimes = [path.stat().st_mtime for path in local_path.iterdir()
+                  if path.is_file() and not path.name.endswith('.tmp')]
+        return max(mtimes) if mtimes else None
+    
+    def _upload_file(self, path: Path, name: str):
+        self._put(name, path.read_bytes(), path.stat().st_mtime)
+        logger.debug(f"Uploaded {path} -> {self.backend.describe()}/{name}")
+    
+    def _download_file(self, name: str, path: Path, metadata: Dict[str, str]):
+        _write_atomic(path, self._get(name, metadata))
+        logger.debug(f"Downloaded {name} -> {path}")
+    
+    def _bundle_name(self, shard: str) -> str:
+        return f"{BUNDLE_PREFIX}{shard}.tar.gz"
+    
+    def _upload_bundle(self, shard: str, local_path: Path, entry: Dict):
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode='w:gz') as tar:
+            for name in entry['files']:
+                data = (local_path / name).read_bytes()
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        # Already compressed, so stored as is; the hash identifies the members
+        self.backend.upload(self._bundle_name(shard), buffer.getvalue(), {HASH_KEY: entry[HASH_KEY]})
+    
+    def _download_bundle(self, shard: str, local_path: Path, remote: Dict[str, Dict[str, str]]):
+        name = self._bundle_name(shard)
+        data = self._get(name, remote.get(name, {}))
+        with tarfile.open(fileobj=io.BytesIO(data), mode='r:gz') as tar:
+            for member in tar.getmembers():
+                # Bundles only hold flat chunk files
+                if not member.isfile() or Path(member.name).name != member.name:
+                    continue
+                _write_atomic(local_path / member.name, tar.extractfile(member).read())
+    
+    def _chunk_hashes(self, local_path: Path) -> Dict[str, str]:
+        return {path.name: content_sha256(path.read_bytes()) for path in local_path.glob("*.graphql")}
 
 
 # Global instance
@@ -3,26 +3,52 @@ import json
 import faiss
 import numpy as np
 from pathlib import Path
-from sentence_transformers import SentenceTransformer
 from tqdm import tqdm
 import re
+import threading
+from agent_common.batching import MicroBatcher
+from agent_common.encoders import ENCODER_BACKEND, load_encoder
+from agent_common.prefork import read_index, shared_texts
+from agent_common.quantization import QUANTIZATION_TYPES, RESCORE_FACTOR, build_index, describe, load_vectors, save_vectors, search_index
+from src.chunker import ChunkStore
+
+# Loaded models by name and encoder backend, shared by every Embedder so index reloads skip the model load
+_MODELS = {}
+_MODELS_LOCK = threading.Lock()
+
+def load_model(model_name, backend=None):
+    key = (model_name, backend or ENCODER_BACKEND)
+    with _MODELS_LOCK:
+        if key not in _MODELS:
+            _MODELS[key] = load_encoder(model_name, key[1])
+        return _MODELS[key]
 
 class Embedder:
-    def __init__(self, model_name="sentence-transformers/all-MiniLM-L6-v2", batch_size=16, index_type="flat", nlist=100, docstring_weight=0.7, num_workers=1):
+    def __init__(self, model_name="sentence-transformers/all-MiniLM-L6-v2", batch_size=16, index_type="flat", nlist=100, docstring_weight=0.7, num_workers=1,
+                 quantization="none", rescore_factor=RESCORE_FACTOR, encoder_backend=None):
         try:
-            self.model = SentenceTransformer(model_name, trust_remote_code=True)
+            self.model = load_model(model_name, encoder_backend)
         except Exception as e:
             print(f"[ERROR] Failed to load embedding model '{model_name}': {e}")
             print("[ERROR] Please check your internet connection or ensure the model is available locally.")
             raise SystemExit(1)
+        self.model_name = model_name
         self.index = None
         self.texts = []
         self.paths = []
+        self.schema_digest = None
         self.batch_size = batch_size
         self.index_type = index_type
         self.nlist = nlist
         self.docstring_weight = docstring_weight
         self.num_workers = num_workers
+        # Quantized storage: "none" keeps float32 vectors in the index
+        self.quantization = quantization
+        self.rescore_factor = rescore_factor
+        self.quantization_info = None
+        self.vectors = None
+        # Concurrent searches share one encode and one multi-row FAISS search
+        self.search_batcher = MicroBatcher(self._search_batch, "schema", "search")
 
     def extract_docstring(self, text):
         # Match triple-quoted docstring at the top or after type/field
@@ -31,8 +57,49 @@ class Embedder:
             return match.group(1).strip()
         return None
 
-    def embed_chunks(self, chunks_dir: str):
-        chunk_paths = list(Path(chunks_dir).glob("*.graphql"))
+    def previous_vectors(self, chunks_dir: str, previous_index: str):
+        """
+        Vectors of the previous index that the chunker's last diff leaves unchanged, by chunk file name.
+
+        Only used if the previous index was built by the same model and weights
+        from the schema the diff starts from; otherwise everything is re-embedded.
+        """
+        diff = ChunkStore(chunks_dir).last_diff
+        index_path = Path(os.path.realpath(previous_index))
+        try:
+            metadata = json.loads((index_path.parent / "metadata.json").read_text())
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if (not metadata.get("schema_digest") or metadata["schema_digest"] != diff.get("previous_schema_digest")
+                or metadata.get("model") != self.model_name
+                or metadata.get("docstring_weight") != self.docstring_weight):
+            print("[INFO] Previous index does not match the chunk diff, embedding all chunks.")
+            return {}
+        try:
+            vectors = load_vectors(str(index_path), metadata.get("quantization"))
+            if vectors is None:
+                index = faiss.read_index(str(index_path))
+                if index.ntotal and faiss.try_extract_index_ivf(index) is not None:
+                    faiss.extract_index_ivf(index).make_direct_map()
+                vectors = index.reconstruct_n(0, index.ntotal)
+        except RuntimeError as e:
+            print(f"[WARN] Cannot read vectors from {index_path}, embedding all chunks: {e}")
+            return {}
+        stale = {entry["file"] for entry in diff.get("added", []) + diff.get("changed", [])}
+        return {Path(path).name: vectors[i] for i, path in enumerate(metadata["paths"])
+                if i < len(vectors) and Path(path).name not in stale}
+
+    def embed_chunks(self, chunks_dir: str, previous_index: str = None):
+        """
+        Embed every chunk in ``chunks_dir`` and build the index.
+
+        With ``previous_index``, chunks the chunker reports unchanged keep
+        their vectors from that index and only added or changed chunks are
+        encoded.
+        """
+        self.schema_digest = ChunkStore(chunks_dir).manifest.get("schema_digest")
+        reused = self.previous_vectors(chunks_dir, previous_index) if previous_index else {}
+        chunk_paths = sorted(Path(chunks_dir).glob("*.graphql"))
         valid_paths = []
         valid_texts = []
         docstrings = []
@@ -56,15 +123,16 @@ class Embedder:
             except Exception as e:
                 print(f"[WARN] Failed to read {path}: {e}")
 
-        self.texts = valid_texts
-        self.paths = valid_paths
+        # Vectors by chunk position: reused from the previous index, or encoded below
+        vectors = {i: reused[Path(path).name] for i, path in enumerate(valid_paths) if Path(path).name in reused}
+        pending = [i for i in range(len(valid_paths)) if i not in vectors]
+        encoded = 0
 
         # Prepare batches for docstrings and SDLs
-        all_embeddings = []
-        for i in tqdm(range(0, len(valid_texts), self.batch_size), desc="Embedding chunks"):
-            batch_docs = docstrings[i:i+self.batch_size]
-            batch_sdl = sdl_bodies[i:i+self.batch_size]
-            batch_texts = valid_texts[i:i+self.batch_size]
+        for i in tqdm(range(0, len(pending), self.batch_size), desc="Embedding chunks"):
+            batch = pending[i:i+self.batch_size]
+            batch_docs = [docstrings[j] for j in batch]
+            batch_sdl = [sdl_bodies[j] for j in batch]
             emb_doc = None
             emb_sdl = None
             try:
@@ -75,12 +143,19 @@ class Embedder:
                 print(f"[WARN] Failed to embed batch {i//self.batch_size}: {e}")
                 continue
             # Combine embeddings
-            for j in range(len(batch_texts)):
+            for j in range(len(batch)):
                 if batch_docs[j]:
                     emb = self.docstring_weight * emb_doc[j] + (1 - self.docstring_weight) * emb_sdl[j]
                 else:
                     emb = emb_sdl[j]
-                all_embeddings.append(emb)
+                vectors[batch[j]] = emb
+            encoded += len(batch)
+
+        # Chunks whose batch failed are left out of the index
+        kept = sorted(vectors)
+        self.texts = [valid_texts[i] for i in kept]
+        self.paths = [valid_paths[i] for i in kept]
+        all_embeddings = [np.asarray(vectors[i], dtype=np.float32) for i in kept]
         if all_embeddings:
             embeddings = np.vstack(all_embeddings)
         else:
@@ -90,6 +165,15 @@ class Embedder:
         try:
             if embeddings.shape[0] == 0:
                 self.index = None
+            elif self.index_type not in ("flat", "ivfflat"):
+                raise ValueError(f"Unknown index_type: {self.index_type}")
+            elif self.quantization != "none":
+                # Compressed codes in the index, float vectors kept for exact re-scoring
+                nlist = self.nlist if self.index_type == "ivfflat" else None
+                self.vectors = embeddings.astype(np.float32)
+                self.index = build_index(self.vectors, self.quantization, faiss.METRIC_L2, nlist)
+                self.quantization_info = describe(self.index, self.quantization, self.vectors, faiss.METRIC_L2,
+                                                  nlist, self.rescore_factor)
             elif self.index_type == "flat":
                 self.index = faiss.IndexFlatL2(embeddings.shape[1])
                 self.index.add(embeddings) # type: ignore
@@ -103,9 +187,7 @@ class Embedder:
                     print(f"[ERROR] Failed to train IVFFlat index: {e}")
                     raise SystemExit(1)
                 self.index.add(embeddings)
-            else:
-                raise ValueError(f"Unknown index_type: {self.index_type}")
-            print(f"Embedded {len(self.texts)} chunks.")
+            print(f"Embedded {len(self.texts)} chunks ({encoded} encoded, {len(self.texts) - encoded} reused).")
         except Exception as e:
             raise RuntimeError(f"Failed to build FAISS index: {e}")
 
@@ -114,7 +196,11 @@ class Embedder:
             raise RuntimeError("No FAISS index to save.")
         try:
             faiss.write_index(self.index, index_path)
-            metadata = {"paths": self.paths}
+            metadata = {"paths": list(self.paths), "schema_digest": self.schema_digest,
+                        "model": self.model_name, "docstring_weight": self.docstring_weight}
+            if self.quantization_info:
+                save_vectors(Path(index_path).parent, self.vectors)
+                metadata["quantization"] = self.quantization_info
             Path(metadata_path).write_text(json.dumps(metadata, indent=2))
             print(f"Saved index to '{index_path}' and metadata to '{metadata_path}'.")
         except Exception as e:
@@ -122,20 +208,30 @@ class Embedder:
 
     def load(self, index_path="embeddings/index.faiss", metadata_path="embeddings/metadata.json"):
         try:
-            self.index = faiss.read_index(index_path)
+            self.index = read_index(index_path)
             metadata = json.loads(Path(metadata_path).read_text())
-            self.paths = metadata["paths"]
-            self.texts = [Path(p).read_text() for p in self.paths]
+            # Packed into shared buffers in pre-fork mode
+            self.paths = shared_texts(metadata["paths"])
+            self.texts = shared_texts(Path(p).read_text() for p in self.paths)
+            self.quantization_info = metadata.get("quantization")
+            self.vectors = load_vectors(index_path, self.quantization_info)
         except Exception as e:
             raise RuntimeError(f"Failed to load index or metadata: {e}")
 
+    def _search_batch(self, requests):
+        """Encode and search a micro-batch of (query, top_k) requests; returns (distances, ids) per request."""
+        query_emb = self.model.encode([query for query, _ in requests], batch_size=len(requests))
+        k = max(top_k for _, top_k in requests)
+        D, I = search_index(self.index, query_emb, k, self.vectors, faiss.METRIC_L2, self.rescore_factor)
+        return [(D[row][:top_k], I[row][:top_k]) for row, (_, top_k) in enumerate(requests)]
+
     def search(self, query: str, top_k=5):
         if self.index is None:
             raise RuntimeError("FAISS index not loaded.")
         try:
-            query_emb = self.model.encode([query])
-            D, I = self.index.search(query_emb, top_k) # type: ignore
-            return [(self.paths[i], self.texts[i]) for i in I[0]]
+            _, I = self.search_batcher.submit((query, top_k))
+            # Ids of -1 pad the results when an IVF search finds fewer than top_k candidates
+            return [(self.paths[i], self.texts[i]) for i in I if i >= 0]
         except Exception as e:
             print(f"[WARN] Search failed: {e}")
             return []
@@ -145,11 +241,10 @@ class Embedder:
         if self.index is None:
             raise RuntimeError("FAISS index not loaded.")
         try:
-            query_emb = self.model.encode([query])
-            D, I = self.index.search(query_emb, top_k) # type: ignore
+            D, I = self.search_batcher.submit((query, top_k))
             # Convert L2 distances to similarity scores (closer to 0 = more similar)
             # Use negative distance so higher = more similar
-            return [(self.paths[i], self.texts[i], -float(D[0][idx])) for idx, i in enumerate(I[0])]
+            return [(self.paths[i], self.texts[i], -float(D[idx])) for idx, i in enumerate(I) if i >= 0]
         except Exception as e:
             print(f"[WARN] Search with scores failed: {e}")
             return []
@@ -167,10 +262,13 @@ if __name__ == "__main__":
     parser.add_argument("--nlist", type=int, default=100, help="Number of clusters for IVFFlat index")
     parser.add_argument("--docstring_weight", type=float, default=0.7, help="Weight for docstring in embedding (0-1)")
     parser.add_argument("--num_workers", type=int, default=1, help="Number of parallel workers for embedding")
+    parser.add_argument("--quantization", choices=QUANTIZATION_TYPES, default="none", help="Vector storage: none (float32), sq8, fp16 or pq, re-scored with exact vectors")
+    parser.add_argument("--rescore_factor", type=int, default=RESCORE_FACTOR, help="Candidates re-scored per result for quantized indexes")
 
     args = parser.parse_args()
 
-    embedder = Embedder(batch_size=args.batch_size, index_type=args.index_type, nlist=args.nlist, docstring_weight=args.docstring_weight, num_workers=args.num_workers)
+    embedder = Embedder(batch_size=args.batch_size, index_type=args.index_type, nlist=args.nlist, docstring_weight=args.docstring_weight, num_workers=args.num_workers,
+                        quantization=args.quantization, rescore_factor=args.rescore_factor)
 
     # Create or load index
     if not Path(args.out_index).exists() or not Path(args.out_meta).exists() or args.force:
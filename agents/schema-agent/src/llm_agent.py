@@ -1,6 +1,8 @@
 from src.retriever import Retriever
-import ollama
+from agent_common.llm_backend import get_llm_backend
+from agent_common.tracing import maybe_span
 import sys
+import time
 import datetime
 import json
 import os
@@ -41,8 +43,10 @@ def estimate_tokens(text):
 class LLMQA:
     def __init__(self, model="llama3", system_prompt=None, use_examples=True, max_tokens=3500,
                  temperature=0.0, llm_max_tokens=None, index_path="./data/embeddings/index.faiss", metadata_path="./data/embeddings/metadata.json",
-                 log_path=None, history_path=None):
+                 log_path=None, history_path=None, llm_backend=None):
         self.retriever = Retriever(index_path=index_path, metadata_path=metadata_path)
+        # Pluggable chat backend (Ollama by default, LLM_BACKEND=fake for benchmarks)
+        self.llm = llm_backend or get_llm_backend()
         self.model = model
         self.system_prompt = system_prompt or DEFAULT_SYSTEM_PROMPT
         self.use_examples = use_examples
@@ -121,21 +125,24 @@ class LLMQA:
         messages.append({"role": "user", "content": prompt})
         return messages
 
-    def answer(self, question: str, top_k: int = 12) -> str:
-        chunks = self.retriever.retrieve_chunks(question, top_k=top_k)
+    def answer(self, question: str, top_k: int = 12, trace=None) -> str:
+        chunks = self.retriever.retrieve_chunks(question, top_k=top_k, trace=trace)
         if not chunks:
             raise RuntimeError("No relevant schema context found for your question.")
-        context, used_k = self.fit_context_to_token_budget(question, chunks)
-        prompt = self.build_prompt(question, context)
-        chunk_paths = [c[0] for c in chunks]
-        messages = self.build_messages(prompt, self.history)
+        with maybe_span(trace, "prompt_build") as span:
+            context, used_k = self.fit_context_to_token_budget(question, chunks)
+            prompt = self.build_prompt(question, context)
+            chunk_paths = [c[0] for c in chunks]
+            messages = self.build_messages(prompt, self.history)
+            span["count"] = used_k
 
         ollama_args = {
             "model": self.model,
             "messages": messages,
         }
         try:
-            response = ollama.chat(**ollama_args)
+            with maybe_span(trace, "generation"):
+                response = self.llm.chat(**ollama_args)
         except Exception as e:
             raise RuntimeError(f"Ollama API call failed: {e}")
         answer = response['message']['content'].strip()
@@ -147,14 +154,16 @@ class LLMQA:
             self.save_history()
         return answer
 
-    def stream_answer(self, question: str, top_k: int = 5):
-        chunks = self.retriever.retrieve_chunks(question, top_k=top_k)
+    def stream_answer(self, question: str, top_k: int = 5, trace=None):
+        chunks = self.retriever.retrieve_chunks(question, top_k=top_k, trace=trace)
         if not chunks:
             raise RuntimeError("No relevant schema context found for your question.")
-        context, used_k = self.fit_context_to_token_budget(question, chunks)
-        prompt = self.build_prompt(question, context)
-        chunk_paths = [c[0] for c in chunks]
-        messages = self.build_messages(prompt, self.history)
+        with maybe_span(trace, "prompt_build") as span:
+            context, used_k = self.fit_context_to_token_budget(question, chunks)
+            prompt = self.build_prompt(question, context)
+            chunk_paths = [c[0] for c in chunks]
+            messages = self.build_messages(prompt, self.history)
+            span["count"] = used_k
 
         ollama_args = {
             "model": self.model,
@@ -163,10 +172,14 @@ class LLMQA:
         }
         try:
             response_accum = ""
-            for chunk in ollama.chat(**ollama_args):
-                if "message" in chunk and "content" in chunk["message"]:
-                    response_accum += chunk["message"]["content"]
-                    yield chunk["message"]["content"]
+            with maybe_span(trace, "generation") as span:
+                start = time.perf_counter()
+                for chunk in self.llm.chat(**ollama_args):
+                    if "message" in chunk and "content" in chunk["message"]:
+                        if "first_token_ms" not in span:
+                            span["first_token_ms"] = round((time.perf_counter() - start) * 1000, 3)
+                        response_accum += chunk["message"]["content"]
+                        yield chunk["message"]["content"]
             self.log(question, chunk_paths, prompt, response_accum)
             # Update history
             if self.history_path is not None:
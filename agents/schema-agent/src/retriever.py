@@ -5,14 +5,18 @@ import numpy as np
 from pathlib import Path
 from typing import List, Tuple, Optional, Set, Dict
 from difflib import SequenceMatcher
+from src.chunker import chunk_file_key
 from src.embedder import Embedder
 from src.schema_analyzer import SchemaAnalyzer
 from src.pattern_generator import PatternGenerator
 from src.relevance_scorer import RelevanceScorer
+from agent_common.tracing import Trace, maybe_span
 
 class Retriever:
     def __init__(self, index_path="./data/embeddings/index.faiss", metadata_path="./data/embeddings/metadata.json", 
-                 model_name="sentence-transformers/all-MiniLM-L6-v2", min_similarity_score=-0.5):
+                 model_name="sentence-transformers/all-MiniLM-L6-v2", min_similarity_score=-0.5,
+                 semantic_multiplier=4, enable_fuzzy=True, max_related=3, enable_rerank=True,
+                 vocabulary_cache_path="./cache/schema_vocabulary_cache.pkl"):
         """
         Initialize the retriever.
         
@@ -21,18 +25,27 @@ class Retriever:
             metadata_path: Path to the metadata JSON file
             model_name: Name of the embedding model to use
             min_similarity_score: Minimum similarity score for filtering results
+            semantic_multiplier: Semantic search fetches top_k * semantic_multiplier candidates
+            enable_fuzzy: Include fuzzy keyword matching in the hybrid merge
+            max_related: Number of related chunks fetched by type reference (0 disables)
+            enable_rerank: Apply the relevance scorer for final ranking
+            vocabulary_cache_path: Where the schema analyzer caches its vocabulary
         """
         self.index_path = Path(index_path)
         self.metadata_path = Path(metadata_path)
         self.model_name = model_name
         self.min_similarity_score = min_similarity_score
+        self.semantic_multiplier = semantic_multiplier
+        self.enable_fuzzy = enable_fuzzy
+        self.max_related = max_related
+        self.enable_rerank = enable_rerank
         self.embedder = None
         
         # Set up logging
         self.logger = logging.getLogger(__name__)
         
         # Initialize schema analyzer for self-learning vocabulary
-        self.schema_analyzer = SchemaAnalyzer(metadata_path=metadata_path)
+        self.schema_analyzer = SchemaAnalyzer(metadata_path=metadata_path, cache_path=vocabulary_cache_path)
         
         # Load generated question patterns
         self.question_patterns = self._load_question_patterns()
@@ -360,13 +373,16 @@ class Retriever:
             self.logger.error(f"Failed to initialize embedder: {e}")
             raise RuntimeError(f"Failed to initialize retriever: {e}")
 
-    def retrieve_chunks(self, question: str, top_k: int = 12) -> List[Tuple[str, str, float]]:
+    def retrieve_chunks(self, question: str, top_k: int = 12,
+                        trace: Optional[Trace] = None) -> List[Tuple[str, str, float]]:
         """
         Retrieve top-k most relevant SDL chunks for the user's question.
         
         Args:
             question: The user's question
             top_k: Number of top chunks to retrieve
+            trace: Optional Trace that receives a timed span (with candidate
+                count) for each retrieval stage
             
         Returns:
             List of tuples (path, content, similarity_score)
@@ -381,62 +397,81 @@ class Retriever:
             
         try:
             # Preprocess the question
-            processed_question = self._preprocess_query(question)
-            
-            # Extract technical terms for keyword search
-            technical_terms = self._extract_technical_terms(question)
+            with maybe_span(trace, "preprocess") as span:
+                processed_question = self._preprocess_query(question)
+                
+                # Extract technical terms for keyword search
+                technical_terms = self._extract_technical_terms(question)
+                span["count"] = len(technical_terms)
             
             # Try to get results with similarity scores, fallback to regular search
             try:
                 # 1. Semantic search - cast wider net initially
-                semantic_results = self.embedder.search_with_scores(processed_question, top_k=top_k * 4)
-                
-                # Calculate adaptive threshold based on score distribution
-                scores = [score for _, _, score in semantic_results]
-                adaptive_threshold = self._calculate_adaptive_threshold(scores, top_k)
+                with maybe_span(trace, "semantic_search") as span:
+                    semantic_results = self.embedder.search_with_scores(processed_question, top_k=top_k * self.semantic_multiplier)
+                    span["count"] = len(semantic_results)
                 
-                # Use more permissive threshold to include more candidates
-                # Be extra permissive for validation queries since they often need specific files
-                validation_related = any(term in processed_question.lower() 
-                                       for term in ['validation', 'validate', 'pattern', 'regex', 'format'])
-                if validation_related:
-                    effective_threshold = min(adaptive_threshold, -1.5)  # Much more permissive for validation queries
-                else:
-                    effective_threshold = min(adaptive_threshold, -1.0)  # Allow scores down to -1.0
-                
-                # Filter semantic results by threshold
-                filtered_semantic = [
-                    (path, content, score) for path, content, score in semantic_results 
-                    if score >= effective_threshold
-                ]
+                with maybe_span(trace, "adaptive_threshold") as span:
+                    # Calculate adaptive threshold based on score distribution
+                    scores = [score for _, _, score in semantic_results]
+                    adaptive_threshold = self._calculate_adaptive_threshold(scores, top_k)
+                    
+                    # Use more permissive threshold to include more candidates
+                    # Be extra permissive for validation queries since they often need specific files
+                    validation_related = any(term in processed_question.lower() 
+                                           for term in ['validation', 'validate', 'pattern', 'regex', 'format'])
+                    if validation_related:
+                        effective_threshold = min(adaptive_threshold, -1.5)  # Much more permissive for validation queries
+                    else:
+                        effective_threshold = min(adaptive_threshold, -1.0)  # Allow scores down to -1.0
+                    
+                    # Filter semantic results by threshold
+                    filtered_semantic = [
+                        (path, content, score) for path, content, score in semantic_results 
+                        if score >= effective_threshold
+                    ]
+                    span["count"] = len(filtered_semantic)
                 
                 # 2. Keyword search
-                keyword_results = []
-                if technical_terms:
-                    keyword_results = self._fuzzy_match_chunks(technical_terms, min_similarity=0.5)
-                    # Limit keyword results to prevent overwhelming semantic results
-                    keyword_results = keyword_results[:top_k]
+                with maybe_span(trace, "fuzzy_match") as span:
+                    keyword_results = []
+                    if technical_terms and self.enable_fuzzy:
+                        keyword_results = self._fuzzy_match_chunks(technical_terms, min_similarity=0.5)
+                        # Limit keyword results to prevent overwhelming semantic results
+                        keyword_results = keyword_results[:top_k]
+                    span["count"] = len(keyword_results)
                 
                 # 3. Hybrid merge and ranking (keep more candidates than requested)
-                hybrid_results = self._merge_hybrid_results(filtered_semantic, keyword_results, top_k * 2)
+                with maybe_span(trace, "hybrid_merge") as span:
+                    hybrid_results = self._merge_hybrid_results(filtered_semantic, keyword_results, top_k * 2)
+                    span["count"] = len(hybrid_results)
                 
                 # 4. Fetch related chunks based on type references from top hybrid results
-                related_chunks = self._fetch_related_chunks(hybrid_results[:top_k], max_related=3)
-                
-                # 5. Final combination
-                all_results = hybrid_results + related_chunks
-                # Remove duplicates while preserving order
-                seen_paths = set()
-                deduplicated_results = []
-                for item in all_results:
-                    if item[0] not in seen_paths:
-                        deduplicated_results.append(item)
-                        seen_paths.add(item[0])
+                with maybe_span(trace, "related_fetch") as span:
+                    related_chunks = []
+                    if self.max_related > 0:
+                        related_chunks = self._fetch_related_chunks(hybrid_results[:top_k], max_related=self.max_related)
+                    
+                    # 5. Final combination
+                    all_results = hybrid_results + related_chunks
+                    # Remove duplicates while preserving order
+                    seen_paths = set()
+                    deduplicated_results = []
+                    for item in all_results:
+                        if item[0] not in seen_paths:
+                            deduplicated_results.append(item)
+                            seen_paths.add(item[0])
+                    span["count"] = len(deduplicated_results)
                 
                 # 6. Apply relevance scoring for final ranking (but keep more balanced)
-                relevance_enhanced_results = self.relevance_scorer.enhance_search_results(
-                    deduplicated_results, question, top_k + 2
-                )
+                with maybe_span(trace, "rerank") as span:
+                    if self.enable_rerank:
+                        relevance_enhanced_results = self.relevance_scorer.enhance_search_results(
+                            deduplicated_results, question, top_k + 2
+                        )
+                    else:
+                        relevance_enhanced_results = deduplicated_results[:top_k + 2]
+                    span["count"] = len(relevance_enhanced_results)
                 
                 # 7. Return relevance-enhanced results
                 final_results = relevance_enhanced_results
@@ -448,7 +483,9 @@ class Retriever:
             except (AttributeError, TypeError) as e:
                 # Fallback to regular search without scores
                 self.logger.warning(f"search_with_scores failed, using fallback: {e}")
-                regular_results = self.embedder.search(processed_question, top_k=top_k)
+                with maybe_span(trace, "fallback_search") as span:
+                    regular_results = self.embedder.search(processed_question, top_k=top_k)
+                    span["count"] = len(regular_results)
                 
                 # Convert to expected format with dummy scores
                 fallback_results = [
@@ -525,7 +562,8 @@ class Retriever:
             return keyword_matches
             
         for i, (path, content) in enumerate(zip(self.embedder.paths, self.embedder.texts)):
-            filename = Path(path).stem.lower()  # Get filename without extension
+            # Name without the content digest prefix and extension
+            filename = Path(chunk_file_key(Path(path).name)).stem.lower()
             content_lower = content.lower()
             
             max_match_score = 0.0
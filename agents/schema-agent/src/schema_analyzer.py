@@ -4,16 +4,52 @@ Self-learning GraphQL schema analyzer that automatically discovers
 vocabulary, patterns, and relationships for improved query processing.
 """
 
+import os
 import json
 import re
 import logging
 from pathlib import Path
-from typing import Dict, Set, List, Tuple, Optional
+from typing import Any, Dict, Iterable, Iterator, Set, List, Tuple, Optional
 from collections import defaultdict, Counter
-from dataclasses import dataclass, asdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
 import pickle
 import hashlib
 
+# Bump when extraction changes so cached per-chunk vocabularies are discarded
+CACHE_VERSION = 2
+VOCAB_WORKERS = int(os.getenv("VOCAB_WORKERS", "0")) or os.cpu_count() or 1
+# Below this many changed chunks the process pool costs more than it saves
+PARALLEL_THRESHOLD = 256
+
+# GraphQL parsing patterns
+PATTERNS = {
+    'type': re.compile(r'type\s+(\w+)(?:\s+implements\s+[\w\s&|]+)?\s*\{', re.IGNORECASE),
+    'input': re.compile(r'input\s+(\w+)\s*\{', re.IGNORECASE),
+    'enum': re.compile(r'enum\s+(\w+)\s*\{', re.IGNORECASE),
+    'interface': re.compile(r'interface\s+(\w+)\s*\{', re.IGNORECASE),
+    'union': re.compile(r'union\s+(\w+)\s*=\s*([^}]+)', re.IGNORECASE),
+    # \b only skips start positions inside a word, which can never begin the
+    # leftmost match; without it the scan is quadratic in word length
+    'mutation': re.compile(r'\b(\w+)\s*\([^)]*\)\s*:\s*(\w+)', re.MULTILINE),
+    'field': re.compile(r'^\s*(\w+)\s*:\s*([A-Z][\w\[\]!]*)', re.MULTILINE),
+    'validation': re.compile(r'validation.*?regex.*?pattern\s*[`"\']([^`"\']+)[`"\']', re.IGNORECASE | re.DOTALL),
+    'comment': re.compile(r'"""([^"]*?)"""', re.DOTALL)
+}
+
+WORD_RE = re.compile(r'\w+')
+NON_ALNUM_RE = re.compile(r'[^a-z0-9]')
+OPERATION_PATTERNS = [
+    (re.compile(r'create\s+(\w+)'), 'create{}'),
+    (re.compile(r'update\s+(\w+)'), 'update{}'),
+    (re.compile(r'issue\s+(\w+)'), 'issue{}'),
+    (re.compile(r'(\w+)\s+input'), '{}input'),
+]
+VALIDATION_KEYWORDS = ('validation', 'validate', 'validations', 'regex', 'pattern')
+
+SET_FIELDS = ('types', 'inputs', 'enums', 'interfaces', 'unions', 'mutations', 'queries', 'fields')
+RELATION_FIELDS = ('field_relationships', 'type_relationships', 'validation_patterns')
+
 @dataclass
 class SchemaVocabulary:
     """Container for discovered schema vocabulary."""
@@ -33,7 +69,8 @@ class SchemaVocabulary:
     def to_dict(self) -> Dict:
         """Convert to dictionary with sets as lists for JSON serialization."""
         result = {}
-        for key, value in asdict(self).items():
+        # asdict() cannot copy the defaultdict fields, so walk them directly
+        for key, value in ((f.name, getattr(self, f.name)) for f in fields(self)):
             if isinstance(value, set):
                 result[key] = list(value)
             elif isinstance(value, dict):
@@ -55,6 +92,265 @@ class SchemaVocabulary:
                 kwargs[key] = value
         return cls(**kwargs)
 
+def extract_partial_vocabulary(content: str) -> Dict[str, Any]:
+    """
+    Extract the vocabulary of one chunk.
+    
+    Returns:
+        Lists for each non-empty set field and {name: list} for each
+        relationship field, suitable for pickling and merging.
+    """
+    sets: Dict[str, Set[str]] = {name: set() for name in SET_FIELDS}
+    relations: Dict[str, Dict[str, Set[str]]] = {name: defaultdict(set) for name in RELATION_FIELDS}
+    
+    # Extract types, inputs, enums, etc.
+    for pattern_name, pattern in PATTERNS.items():
+        if pattern_name == 'mutation' and '(' not in content:
+            continue
+        matches = pattern.findall(content)
+        
+        if pattern_name == 'type':
+            sets['types'].update(matches)
+        elif pattern_name == 'input':
+            sets['inputs'].update(matches)
+        elif pattern_name == 'enum':
+            sets['enums'].update(matches)
+        elif pattern_name == 'interface':
+            sets['interfaces'].update(matches)
+        elif pattern_name == 'union':
+            for name, types_str in matches:
+                sets['unions'].add(name)
+                # Extract union member types
+                union_types = re.findall(r'\b([A-Z]\w+)\b', types_str)
+                relations['type_relationships'][name].update(union_types)
+        elif pattern_name == 'mutation':
+            for name, return_type in matches:
+                sets['mutations'].add(name)
+                relations['type_relationships'][name].add(return_type)
+        elif pattern_name == 'field':
+            for field_name, field_type in matches:
+                sets['fields'].add(field_name)
+                # Clean field type (remove [], !, etc.)
+                clean_type = re.sub(r'[\[\]!]', '', field_type)
+                relations['field_relationships'][field_name].add(clean_type)
+        elif pattern_name == 'validation':
+            # Extract validation patterns from comments
+            for field, pattern in _extract_field_context(content, matches):
+                relations['validation_patterns'][field].add(pattern)
+    
+    partial: Dict[str, Any] = {name: list(values) for name, values in sets.items() if values}
+    for name, relation in relations.items():
+        if relation:
+            partial[name] = {key: list(values) for key, values in relation.items()}
+    return partial
+
+
+def _extract_field_context(content: str, validation_matches: List[str]) -> List[Tuple[str, str]]:
+    """Extract field context for validation patterns."""
+    results = []
+    lines = content.split('\n')
+    for pattern in validation_matches:
+        # Look for field name near the validation pattern
+        for i, line in enumerate(lines):
+            if pattern in line:
+                # Look for field definition in nearby lines
+                for j in range(max(0, i-5), min(len(lines), i+5)):
+                    field_match = re.search(r'(\w+)\s*:\s*String', lines[j])
+                    if field_match:
+                        results.append((field_match.group(1), pattern))
+                        break
+    return results
+
+
+def _extract_chunk(path: str) -> Dict[str, Any]:
+    """Manifest entry for one chunk file (runs in worker processes)."""
+    try:
+        stat = os.stat(path)
+        with open(path, 'rb') as f:
+            raw = f.read()
+    except OSError:
+        return {'stat': None, 'hash': None, 'partial': None}
+    try:
+        # Universal newlines, as text-mode reads did
+        content = raw.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+        partial = extract_partial_vocabulary(content)
+    except UnicodeDecodeError:
+        partial = None
+    return {
+        'stat': [stat.st_size, stat.st_mtime_ns],
+        'hash': hashlib.sha1(raw).hexdigest(),
+        'partial': partial
+    }
+
+
+def _merge_partial(partial: Dict[str, Any], vocab: SchemaVocabulary):
+    """Add a chunk's partial vocabulary to vocab."""
+    for name in SET_FIELDS:
+        values = partial.get(name)
+        if values:
+            getattr(vocab, name).update(values)
+    for name in RELATION_FIELDS:
+        relation = partial.get(name)
+        if relation:
+            target = getattr(vocab, name)
+            for key, values in relation.items():
+                target[key].update(values)
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton: finds every pattern occurrence in one pass over the text."""
+    
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[str, ...]] = [()]
+        
+        for pattern in patterns:
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            if pattern not in self._out[state]:
+                self._out[state] += (pattern,)
+        
+        # Breadth-first failure links; outputs inherit along them
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] += self._out[self._fail[nxt]]
+    
+    def iter(self, text: str) -> Iterator[Tuple[int, str]]:
+        """Yield (end offset, pattern) for every match, end exclusive."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern in out[state]:
+                yield i + 1, pattern
+
+
+class QueryLexicon:
+    """
+    Query-time lookup structures precomputed from a SchemaVocabulary.
+    
+    - terms: lowercase term -> kinds, for identifiers that any case variant
+      of a query word (lower, upper, title, capitalized) would hit
+    - exact: identifier -> kinds, for mixed-case identifiers only an
+      exact-case query word hits (e.g. "streetAddress")
+    - cluster_of: term -> first semantic cluster containing it
+    - expansions: lowercase word -> related terms from types, inputs and fields
+    - automaton: compacted lowercase identifiers (no separators), matched
+      across word boundaries so "payment card" finds PaymentCard
+    """
+    
+    TECHNICAL_KINDS = (('types', 'type'), ('inputs', 'input'), ('enums', 'enum'), ('mutations', 'mutation'))
+    
+    def __init__(self, vocab: SchemaVocabulary):
+        self.terms: Dict[str, Set[str]] = defaultdict(set)
+        self.exact: Dict[str, Set[str]] = defaultdict(set)
+        compact_terms: Dict[str, Set[str]] = defaultdict(set)
+        for attr, kind in self.TECHNICAL_KINDS:
+            for identifier in getattr(vocab, attr):
+                lower = identifier.lower()
+                if identifier in _case_variants(lower):
+                    self.terms[lower].add(kind)
+                else:
+                    self.exact[identifier].add(kind)
+                compact = NON_ALNUM_RE.sub('', lower)
+                if compact:
+                    compact_terms[compact].add(lower)
+        self.compact_terms = dict(compact_terms)
+        self.automaton = AhoCorasick(self.compact_terms)
+        self.inputs_lower = {t.lower() for t in vocab.inputs}
+        
+        self.cluster_terms = vocab.semantic_clusters
+        self.cluster_of: Dict[str, str] = {}
+        for cluster_name, terms in vocab.semantic_clusters.items():
+            for term in terms:
+                self.cluster_of.setdefault(term, cluster_name)
+        
+        # Mirrors the per-variant type/input/field precedence of the original lookup
+        self.expansions: Dict[str, Set[str]] = defaultdict(set)
+        for identifier in vocab.types | vocab.inputs | vocab.fields:
+            lower = identifier.lower()
+            if identifier not in (lower, lower.title(), lower.capitalize()):
+                continue
+            if identifier in vocab.types:
+                self.expansions[lower].update(vocab.type_relationships.get(identifier, set()))
+            elif identifier in vocab.inputs:
+                self.expansions[lower].update(('input', lower))
+            else:
+                self.expansions[lower].update(t.lower() for t in vocab.field_relationships.get(identifier, set()))
+    
+    def technical_terms(self, query: str) -> Set[str]:
+        """Schema identifiers mentioned in the query, lowercased."""
+        terms = set()
+        compact_parts = []
+        starts, ends = set(), set()
+        offset = 0
+        for match in WORD_RE.finditer(query):
+            word = match.group()
+            lower = word.lower()
+            if lower in self.terms or word in self.exact:
+                terms.add(lower)
+            compact = NON_ALNUM_RE.sub('', lower)
+            if compact:
+                starts.add(offset)
+                compact_parts.append(compact)
+                offset += len(compact)
+                ends.add(offset)
+        
+        # Identifiers spelled across words or in a different case, aligned to word boundaries
+        for end, compact in self.automaton.iter(''.join(compact_parts)):
+            if end in ends and end - len(compact) in starts:
+                terms.update(self.compact_terms[compact])
+        
+        query_lower = query.lower()
+        for pattern, template in OPERATION_PATTERNS:
+            for match in pattern.findall(query_lower):
+                generated_term = template.format(match)
+                if generated_term in self.inputs_lower:
+                    terms.add(generated_term)
+        return terms
+    
+    def query_expansions(self, query: str) -> Set[str]:
+        """Query words plus related cluster terms, types and fields."""
+        query_lower = query.lower()
+        query_words = WORD_RE.findall(query_lower)
+        expanded_terms = set(query_words)
+        for word in query_words:
+            cluster_name = self.cluster_of.get(word)
+            if cluster_name is not None:
+                expanded_terms.update(self.cluster_terms[cluster_name])
+            expanded_terms.update(self.expansions.get(word, ()))
+        
+        # Add validation-specific expansions
+        if any(kw in query_lower for kw in VALIDATION_KEYWORDS):
+            expanded_terms.update({'input', 'addressinput', 'regex', 'pattern', 'validation'})
+        return expanded_terms
+
+
+def _case_variants(lower: str) -> Tuple[str, ...]:
+    """Case variants of a lowercase query word the lookup accepts."""
+    return (lower, lower.upper(), lower.title(), lower.capitalize())
+
+
 class SchemaAnalyzer:
     """Self-learning GraphQL schema analyzer."""
     
@@ -64,95 +360,117 @@ class SchemaAnalyzer:
         self.cache_path = Path(cache_path)
         self.logger = logging.getLogger(__name__)
         
-        # GraphQL parsing patterns
-        self.patterns = {
-            'type': re.compile(r'type\s+(\w+)(?:\s+implements\s+[\w\s&|]+)?\s*\{', re.IGNORECASE),
-            'input': re.compile(r'input\s+(\w+)\s*\{', re.IGNORECASE),
-            'enum': re.compile(r'enum\s+(\w+)\s*\{', re.IGNORECASE),
-            'interface': re.compile(r'interface\s+(\w+)\s*\{', re.IGNORECASE),
-            'union': re.compile(r'union\s+(\w+)\s*=\s*([^}]+)', re.IGNORECASE),
-            'mutation': re.compile(r'(\w+)\s*\([^)]*\)\s*:\s*(\w+)', re.MULTILINE),
-            'field': re.compile(r'^\s*(\w+)\s*:\s*([A-Z][\w\[\]!]*)', re.MULTILINE),
-            'validation': re.compile(r'validation.*?regex.*?pattern\s*[`"\']([^`"\']+)[`"\']', re.IGNORECASE | re.DOTALL),
-            'comment': re.compile(r'"""([^"]*?)"""', re.DOTALL)
-        }
+        self.patterns = PATTERNS
         
         self.vocabulary: Optional[SchemaVocabulary] = None
+        self._cached_vocabulary: Optional[Dict] = None
         self._load_or_build_vocabulary()
+        self.lexicon = QueryLexicon(self.vocabulary)
     
-    def _get_content_hash(self) -> str:
-        """Generate hash of schema content for cache invalidation."""
+    def _load_or_build_vocabulary(self):
+        """
+        Load the cached vocabulary, re-extracting only chunks that changed.
+        
+        The cache holds a per-chunk manifest (size, mtime, content hash and the
+        chunk's partial vocabulary). Chunks whose size and mtime are unchanged
+        are reused as-is; the rest are re-read and, if their content hash
+        differs, re-extracted in a process pool. Partials are then merged.
+        """
         if not self.metadata_path.exists():
-            return ""
-            
+            self.vocabulary = self._empty_vocabulary()
+            return
+        
         with open(self.metadata_path, 'r') as f:
-            metadata = json.load(f)
+            paths = json.load(f)['paths']
         
-        # Hash first 100 file paths and their modification times
-        hash_input = []
-        for path in metadata['paths'][:100]:
+        cached_chunks = self._load_cache()
+        chunks: Dict[str, Dict[str, Any]] = {}
+        stale: List[str] = []
+        for path in paths:
+            entry = cached_chunks.get(path)
             try:
-                stat = Path(path).stat()
-                hash_input.append(f"{path}:{stat.st_mtime}")
-            except:
-                hash_input.append(path)
-        
-        return hashlib.md5(''.join(hash_input).encode()).hexdigest()
-    
-    def _load_or_build_vocabulary(self):
-        """Load cached vocabulary or build new one if cache is stale."""
-        current_hash = self._get_content_hash()
+                stat = os.stat(path)
+                version = [stat.st_size, stat.st_mtime_ns]
+            except OSError:
+                version = None
+            if entry is not None and version is not None and entry['stat'] == version:
+                chunks[path] = entry
+            else:
+                stale.append(path)
         
-        # Try to load from cache
-        if self.cache_path.exists():
-            try:
-                with open(self.cache_path, 'rb') as f:
-                    cached_data = pickle.load(f)
-                
-                if cached_data.get('hash') == current_hash:
-                    self.vocabulary = SchemaVocabulary.from_dict(cached_data['vocabulary'])
-                    self.logger.info("Loaded schema vocabulary from cache")
-                    return
-            except Exception as e:
-                self.logger.warning(f"Failed to load vocabulary cache: {e}")
+        changed = 0
+        if stale:
+            self.logger.info(f"Extracting vocabulary from {len(stale)}/{len(paths)} chunks...")
+            for path, entry in zip(stale, self._extract_chunks(stale)):
+                previous = cached_chunks.get(path)
+                if previous is not None and entry['hash'] is not None and previous['hash'] == entry['hash']:
+                    # Touched but not modified
+                    entry['partial'] = previous['partial']
+                elif entry['partial'] is not None:
+                    changed += 1
+                chunks[path] = entry
         
-        # Build new vocabulary
-        self.logger.info("Building new schema vocabulary...")
-        self.vocabulary = self._build_vocabulary()
+        removed = len(set(cached_chunks) - set(chunks))
+        if not changed and not removed and self._cached_vocabulary is not None:
+            self.vocabulary = SchemaVocabulary.from_dict(self._cached_vocabulary)
+            self.logger.info("Loaded schema vocabulary from cache")
+            if stale:
+                # Record the new mtimes so touched chunks are not re-read next time
+                self._save_cache(chunks)
+            return
         
-        # Save to cache
+        self.logger.info(f"{changed} chunks changed, {removed} removed; merging vocabulary")
+        self.vocabulary = self._merge_chunks(chunks, paths)
+        self._save_cache(chunks)
+    
+    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Per-chunk manifest from the cache file (empty if missing or outdated)."""
+        self._cached_vocabulary = None
+        if not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path, 'rb') as f:
+                cached_data = pickle.load(f)
+        except Exception as e:
+            self.logger.warning(f"Failed to load vocabulary cache: {e}")
+            return {}
+        if not isinstance(cached_data, dict) or cached_data.get('version') != CACHE_VERSION:
+            return {}
+        self._cached_vocabulary = cached_data.get('vocabulary')
+        return cached_data.get('chunks', {})
+    
+    def _save_cache(self, chunks: Dict[str, Dict[str, Any]]):
+        """Write the manifest and merged vocabulary atomically."""
         try:
-            with open(self.cache_path, 'wb') as f:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(self.cache_path.suffix + '.tmp')
+            with open(tmp_path, 'wb') as f:
                 pickle.dump({
-                    'hash': current_hash,
+                    'version': CACHE_VERSION,
+                    'chunks': chunks,
                     'vocabulary': self.vocabulary.to_dict()
-                }, f)
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
             self.logger.info("Saved schema vocabulary to cache")
         except Exception as e:
             self.logger.warning(f"Failed to save vocabulary cache: {e}")
     
-    def _build_vocabulary(self) -> SchemaVocabulary:
-        """Build vocabulary by analyzing all schema chunks."""
-        if not self.metadata_path.exists():
-            return self._empty_vocabulary()
-        
-        with open(self.metadata_path, 'r') as f:
-            metadata = json.load(f)
+    def _extract_chunks(self, paths: List[str]) -> List[Dict[str, Any]]:
+        """Read, hash and extract chunks, in a process pool for large batches."""
+        if len(paths) < PARALLEL_THRESHOLD or VOCAB_WORKERS == 1:
+            return [_extract_chunk(path) for path in paths]
         
+        chunksize = max(16, len(paths) // (VOCAB_WORKERS * 8))
+        with ProcessPoolExecutor(max_workers=VOCAB_WORKERS) as pool:
+            return list(pool.map(_extract_chunk, paths, chunksize=chunksize))
+    
+    def _merge_chunks(self, chunks: Dict[str, Dict[str, Any]], paths: List[str]) -> SchemaVocabulary:
+        """Merge per-chunk partial vocabularies and build relationships."""
         vocab = self._empty_vocabulary()
-        
-        # Process all chunks
-        for i, path in enumerate(metadata['paths']):
-            if i % 500 == 0:
-                self.logger.info(f"Processed {i}/{len(metadata['paths'])} chunks")
-            
-            try:
-                content = self._read_chunk(path)
-                if content:
-                    self._extract_from_content(content, vocab)
-            except Exception as e:
-                self.logger.debug(f"Error processing {path}: {e}")
-                continue
+        for path in paths:
+            entry = chunks.get(path)
+            if entry is not None and entry['partial'] is not None:
+                _merge_partial(entry['partial'], vocab)
         
         # Post-process to build relationships and clusters
         self._build_relationships(vocab)
@@ -180,66 +498,9 @@ class SchemaAnalyzer:
             semantic_clusters=defaultdict(set)
         )
     
-    def _read_chunk(self, path: str) -> Optional[str]:
-        """Read content from chunk file."""
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except Exception:
-            return None
-    
     def _extract_from_content(self, content: str, vocab: SchemaVocabulary):
         """Extract vocabulary from GraphQL content."""
-        
-        # Extract types, inputs, enums, etc.
-        for pattern_name, pattern in self.patterns.items():
-            matches = pattern.findall(content)
-            
-            if pattern_name == 'type':
-                vocab.types.update(matches)
-            elif pattern_name == 'input':
-                vocab.inputs.update(matches)
-            elif pattern_name == 'enum':
-                vocab.enums.update(matches)
-            elif pattern_name == 'interface':
-                vocab.interfaces.update(matches)
-            elif pattern_name == 'union':
-                for name, types_str in matches:
-                    vocab.unions.add(name)
-                    # Extract union member types
-                    union_types = re.findall(r'\b([A-Z]\w+)\b', types_str)
-                    vocab.type_relationships[name].update(union_types)
-            elif pattern_name == 'mutation':
-                for name, return_type in matches:
-                    vocab.mutations.add(name)
-                    vocab.type_relationships[name].add(return_type)
-            elif pattern_name == 'field':
-                for field_name, field_type in matches:
-                    vocab.fields.add(field_name)
-                    # Clean field type (remove [], !, etc.)
-                    clean_type = re.sub(r'[\[\]!]', '', field_type)
-                    vocab.field_relationships[field_name].add(clean_type)
-            elif pattern_name == 'validation':
-                # Extract validation patterns from comments
-                field_context = self._extract_field_context(content, matches)
-                for field, pattern in field_context:
-                    vocab.validation_patterns[field].add(pattern)
-    
-    def _extract_field_context(self, content: str, validation_matches: List[str]) -> List[Tuple[str, str]]:
-        """Extract field context for validation patterns."""
-        results = []
-        for pattern in validation_matches:
-            # Look for field name near the validation pattern
-            lines = content.split('\n')
-            for i, line in enumerate(lines):
-                if pattern in line:
-                    # Look for field definition in nearby lines
-                    for j in range(max(0, i-5), min(len(lines), i+5)):
-                        field_match = re.search(r'(\w+)\s*:\s*String', lines[j])
-                        if field_match:
-                            results.append((field_match.group(1), pattern))
-                            break
-        return results
+        _merge_partial(extract_partial_vocabulary(content), vocab)
     
     def _build_relationships(self, vocab: SchemaVocabulary):
         """Build type relationships based on field usage."""
@@ -293,88 +554,13 @@ class SchemaAnalyzer:
         """Get expanded terms for a query using learned vocabulary."""
         if not self.vocabulary:
             return set()
-        
-        query_lower = query.lower()
-        query_words = re.findall(r'\w+', query_lower)
-        expanded_terms = set(query_words)
-        
-        # Expand using semantic clusters
-        for word in query_words:
-            for cluster_name, terms in self.vocabulary.semantic_clusters.items():
-                if word in terms:
-                    expanded_terms.update(terms)
-                    break
-        
-        # Add related types and fields
-        for word in query_words:
-            # Check if word matches any known type/input/field
-            word_variants = {word, word.title(), word.capitalize()}
-            
-            for variant in word_variants:
-                if variant in self.vocabulary.types:
-                    expanded_terms.update(self.vocabulary.type_relationships.get(variant, set()))
-                elif variant in self.vocabulary.inputs:
-                    expanded_terms.add('input')
-                    expanded_terms.add(variant.lower())
-                elif variant in self.vocabulary.fields:
-                    related_types = self.vocabulary.field_relationships.get(variant, set())
-                    expanded_terms.update(t.lower() for t in related_types)
-        
-        # Add validation-specific expansions
-        validation_keywords = {'validation', 'validate', 'validations', 'regex', 'pattern'}
-        if any(kw in query_lower for kw in validation_keywords):
-            expanded_terms.update({'input', 'addressinput', 'regex', 'pattern', 'validation'})
-        
-        return expanded_terms
+        return self.lexicon.query_expansions(query)
     
     def get_technical_terms(self, query: str) -> Set[str]:
         """Extract technical terms using learned schema vocabulary."""
         if not self.vocabulary:
             return set()
-        
-        # Extract words preserving original casing and create lowercase version for patterns
-        query_lower = query.lower()
-        query_words = re.findall(r'\w+', query)
-        technical_terms = set()
-        
-        # Direct matches with known schema elements
-        for word in query_words:
-            # Generate comprehensive variants including camelCase preservation
-            word_variants = {
-                word,                    # Original case (e.g., "streetAddress")
-                word.lower(),           # All lowercase (e.g., "streetaddress")
-                word.upper(),           # All uppercase (e.g., "STREETADDRESS")
-                word.title(),           # Title case (e.g., "Streetaddress")
-                word.capitalize(),      # Capitalize first (e.g., "Streetaddress")
-            }
-            
-            # Add camelCase variant if word contains mixed case
-            if any(c.isupper() for c in word) and any(c.islower() for c in word):
-                word_variants.add(word)  # Keep original camelCase
-            
-            for variant in word_variants:
-                if (variant in self.vocabulary.types or 
-                    variant in self.vocabulary.inputs or
-                    variant in self.vocabulary.enums or
-                    variant in self.vocabulary.mutations):
-                    technical_terms.add(variant.lower())
-        
-        # Pattern-based extraction using learned patterns
-        operation_patterns = [
-            (r'create\s+(\w+)', 'create{}'),
-            (r'update\s+(\w+)', 'update{}'),
-            (r'issue\s+(\w+)', 'issue{}'),
-            (r'(\w+)\s+input', '{}input'),
-        ]
-        
-        for pattern, template in operation_patterns:
-            matches = re.findall(pattern, query_lower)
-            for match in matches:
-                generated_term = template.format(match)
-                if generated_term in [t.lower() for t in self.vocabulary.inputs]:
-                    technical_terms.add(generated_term)
-        
-        return technical_terms
+        return self.lexicon.technical_terms(query)
     
     def get_validation_info(self, field_name: str) -> Set[str]:
         """Get validation patterns for a specific field."""
@@ -396,6 +582,7 @@ class SchemaAnalyzer:
             "fields": len(self.vocabulary.fields),
             "mutations": len(self.vocabulary.mutations),
             "semantic_clusters": len(self.vocabulary.semantic_clusters),
+            "lexicon_terms": len(self.lexicon.terms) + len(self.lexicon.exact),
             "cache_path": str(self.cache_path)
         }
 
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Equivalence check for the ONNX encoder backends.
+
+Encodes a sample of schema chunks and typical questions with the PyTorch
+SentenceTransformer and with the exported ONNX models (full precision and
+int8), and reports the cosine similarity between each pair of embeddings
+together with single-query encode latency. Exits non-zero if any backend
+falls below its minimum cosine.
+
+Usage (from agents/schema-agent, with torch and onnxruntime installed):
+    python -m agent_common.encoders --quantize
+    python -m tests.encoder_equivalence --chunks ./data/chunks --sample 200
+"""
+
+import sys
+import time
+import random
+import logging
+import argparse
+import statistics
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from agent_common.encoders import load_encoder, onnx_model_dir, QUANTIZED_MODEL_FILE, MODEL_FILE
+
+QUERIES = [
+    "How do I create a card product?",
+    "What fields does the PaymentCard type have?",
+    "mutation to issue a financial account",
+    "List all enum values for card status",
+    "How can I simulate an authorization in the test environment?",
+    "webhook notification events",
+]
+
+# Minimum per-text cosine against the PyTorch embeddings
+MIN_COSINE = {"onnx": 0.999, "onnx-int8": 0.97}
+
+
+def load_texts(chunks_dir: str, sample: int) -> List[str]:
+    """Sample chunk texts (seeded, so runs are comparable) plus the fixed queries."""
+    paths = sorted(Path(chunks_dir).glob("*.graphql"))
+    random.Random(0).shuffle(paths)
+    texts = [p.read_text().strip() for p in paths[:sample]]
+    return [t for t in texts if t] + QUERIES
+
+
+def cosine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return (a * b).sum(axis=1)
+
+
+def query_latency_ms(encoder, repeats: int = 20) -> float:
+    """Median latency of encoding one question."""
+    encoder.encode([QUERIES[0]])
+    timings = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        encoder.encode([QUERIES[i % len(QUERIES)]])
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def compare(model_name: str, texts: List[str], backends: List[str], batch_size: int) -> Dict[str, Dict[str, float]]:
+    reference_encoder = load_encoder(model_name, "torch")
+    reference = np.asarray(reference_encoder.encode(texts, batch_size=batch_size, convert_to_numpy=True))
+    results = {"torch": {"min_cosine": 1.0, "mean_cosine": 1.0, "query_ms": query_latency_ms(reference_encoder)}}
+
+    for backend in backends:
+        encoder = load_encoder(model_name, backend)
+        embeddings = encoder.encode(texts, batch_size=batch_size)
+        similarities = cosine(reference, embeddings)
+        results[backend] = {
+            "min_cosine": float(similarities.min()),
+            "mean_cosine": float(similarities.mean()),
+            "query_ms": query_latency_ms(encoder)
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check ONNX encoder embeddings against the PyTorch model.")
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2", help="Model to compare")
+    parser.add_argument("--chunks", default="./data/chunks", help="Directory of schema chunks to sample")
+    parser.add_argument("--sample", type=int, default=200, help="Number of chunks to encode")
+    parser.add_argument("--batch_size", type=int, default=32, help="Encode batch size")
+    parser.add_argument("--min_cosine", type=float, default=None, help="Override the minimum cosine for every backend")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    export_dir = onnx_model_dir(args.model)
+    backends = [backend for backend, model_file in (("onnx", MODEL_FILE), ("onnx-int8", QUANTIZED_MODEL_FILE))
+                if (export_dir / model_file).exists()]
+    if not backends:
+        print(f"No exported model in {export_dir}; run 'python -m agent_common.encoders --model {args.model} --quantize' first")
+        sys.exit(1)
+
+    texts = load_texts(args.chunks, args.sample)
+    print(f"Comparing {len(texts)} texts for {args.model}")
+    results = compare(args.model, texts, backends, args.batch_size)
+
+    failed = False
+    print(f"\n{'Backend':<12} {'Min cos':>9} {'Mean cos':>9} {'Query ms':>9}  Result")
+    print("-" * 52)
+    for backend, result in results.items():
+        threshold = args.min_cosine if args.min_cosine is not None else MIN_COSINE.get(backend, 1.0)
+        passed = result["min_cosine"] >= threshold
+        failed = failed or not passed
+        print(f"{backend:<12} {result['min_cosine']:>9.5f} {result['mean_cosine']:>9.5f} {result['query_ms']:>9.2f}  "
+              f"{'ok' if passed else f'FAIL (< {threshold})'}")
+    sys.exit(1 if failed else 0)
@@ -11,6 +11,7 @@ from typing import List, Dict, Tuple, Any
 from dataclasses import dataclass
 import re
 from src.retriever import Retriever
+from src.chunker import chunk_file_key
 
 
 @dataclass
@@ -64,7 +65,7 @@ class EvaluationFramework:
         return [
             EvaluationCase(
                 question="What are the validations for streetAddress?",
-                expected_files=["1579_inputs_AddressInput.graphql"],
+                expected_files=["inputs_AddressInput.graphql"],
                 expected_content_keywords=["regex", "pattern", "streetAddress", "validation"],
                 category="validation",
                 difficulty="medium",
@@ -72,7 +73,7 @@ class EvaluationFramework:
             ),
             EvaluationCase(
                 question="What regex pattern is used for postal code validation?",
-                expected_files=["1579_inputs_AddressInput.graphql"],
+                expected_files=["inputs_AddressInput.graphql"],
                 expected_content_keywords=["postalCode", "regex", "pattern", "5 numbers", "hyphen"],
                 category="validation",
                 difficulty="medium",
@@ -88,7 +89,7 @@ class EvaluationFramework:
             ),
             EvaluationCase(
                 question="What are the constraints for locality field?",
-                expected_files=["1579_inputs_AddressInput.graphql"],
+                expected_files=["inputs_AddressInput.graphql"],
                 expected_content_keywords=["locality", "validation", "pattern", "letter"],
                 category="validation",
                 difficulty="hard",
@@ -101,7 +102,7 @@ class EvaluationFramework:
         return [
             EvaluationCase(
                 question="What fields are available in AddressInput?",
-                expected_files=["1579_inputs_AddressInput.graphql"],
+                expected_files=["inputs_AddressInput.graphql"],
                 expected_content_keywords=["streetAddress", "postalCode", "locality", "region", "countryCodeAlpha3"],
                 category="field_inquiry",
                 difficulty="easy",
@@ -109,7 +110,7 @@ class EvaluationFramework:
             ),
             EvaluationCase(
                 question="What is the type of streetAddress field?",
-                expected_files=["1579_inputs_AddressInput.graphql", "334_objects_Address.graphql"],
+                expected_files=["inputs_AddressInput.graphql", "objects_Address.graphql"],
                 expected_content_keywords=["streetAddress", "String"],
                 category="field_inquiry",
                 difficulty="easy",
@@ -117,7 +118,7 @@ class EvaluationFramework:
             ),
             EvaluationCase(
                 question="Which fields are required in AddressInput?",
-                expected_files=["1579_inputs_AddressInput.graphql"],
+                expected_files=["inputs_AddressInput.graphql"],
                 expected_content_keywords=["streetAddress", "postalCode", "locality", "region", "countryCodeAlpha3", "required"],
                 category="field_inquiry",
                 difficulty="medium",
@@ -138,7 +139,7 @@ class EvaluationFramework:
         return [
             EvaluationCase(
                 question="What types are available for address information?",
-                expected_files=["334_objects_Address.graphql", "1579_inputs_AddressInput.graphql"],
+                expected_files=["objects_Address.graphql", "inputs_AddressInput.graphql"],
                 expected_content_keywords=["Address", "AddressInput", "type", "input"],
                 category="type_discovery",
                 difficulty="easy",
@@ -154,7 +155,7 @@ class EvaluationFramework:
             ),
             EvaluationCase(
                 question="What enum values are available for address validation?",
-                expected_files=["1557_enums_ValidatedAddressLabel.graphql"],
+                expected_files=["enums_ValidatedAddressLabel.graphql"],
                 expected_content_keywords=["enum", "ValidatedAddressLabel", "PO_BOX", "BUSINESS", "RESIDENTIAL"],
                 category="type_discovery",
                 difficulty="medium",
@@ -175,7 +176,7 @@ class EvaluationFramework:
             ),
             EvaluationCase(
                 question="What inputs are needed to validate an address?",
-                expected_files=["2101_inputs_ValidateAddressInput.graphql", "319_mutations_validateAddress.graphql"],
+                expected_files=["inputs_ValidateAddressInput.graphql", "mutations_validateAddress.graphql"],
                 expected_content_keywords=["validateAddress", "input", "address", "idempotencyKey"],
                 category="mutation",
                 difficulty="medium",
@@ -183,7 +184,7 @@ class EvaluationFramework:
             ),
             EvaluationCase(
                 question="How do I update a street address spend rule?",
-                expected_files=["114_mutations_updateStreetAddressSpendRule.graphql", "2009_inputs_UpdateStreetAddressSpendRuleInput.graphql"],
+                expected_files=["mutations_updateStreetAddressSpendRule.graphql", "inputs_UpdateStreetAddressSpendRuleInput.graphql"],
                 expected_content_keywords=["updateStreetAddressSpendRule", "input", "spend rule"],
                 category="mutation",
                 difficulty="hard",
@@ -196,7 +197,7 @@ class EvaluationFramework:
         return [
             EvaluationCase(
                 question="What types reference AddressInput?",
-                expected_files=["2101_inputs_ValidateAddressInput.graphql"],
+                expected_files=["inputs_ValidateAddressInput.graphql"],
                 expected_content_keywords=["AddressInput", "reference", "uses"],
                 category="relationship",
                 difficulty="hard",
@@ -204,7 +205,7 @@ class EvaluationFramework:
             ),
             EvaluationCase(
                 question="What mutations return address validation results?",
-                expected_files=["319_mutations_validateAddress.graphql", "2446_unions_ValidateAddressPayload.graphql"],
+                expected_files=["mutations_validateAddress.graphql", "unions_ValidateAddressPayload.graphql"],
                 expected_content_keywords=["validateAddress", "AddressValidationResult"],
                 category="relationship",
                 difficulty="hard",
@@ -217,7 +218,7 @@ class EvaluationFramework:
         return [
             EvaluationCase(
                 question="What's the difference between Address and AddressInput?",
-                expected_files=["334_objects_Address.graphql", "1579_inputs_AddressInput.graphql"],
+                expected_files=["objects_Address.graphql", "inputs_AddressInput.graphql"],
                 expected_content_keywords=["Address", "AddressInput", "type", "input", "validation"],
                 category="business_logic",
                 difficulty="medium",
@@ -225,7 +226,7 @@ class EvaluationFramework:
             ),
             EvaluationCase(
                 question="Can I use PO Box addresses for applications?",
-                expected_files=["1579_inputs_AddressInput.graphql"],
+                expected_files=["inputs_AddressInput.graphql"],
                 expected_content_keywords=["PO Box", "application", "validation", "excluded"],
                 category="business_logic",
                 difficulty="hard",
@@ -233,7 +234,7 @@ class EvaluationFramework:
             ),
             EvaluationCase(
                 question="What address formats are supported for card orders?",
-                expected_files=["1579_inputs_AddressInput.graphql"],
+                expected_files=["inputs_AddressInput.graphql"],
                 expected_content_keywords=["physical payment card", "card order", "PO Box", "mailing"],
                 category="business_logic",
                 difficulty="hard",
@@ -246,7 +247,7 @@ class EvaluationFramework:
         return [
             EvaluationCase(
                 question="What happens if I provide an invalid street address format?",
-                expected_files=["1579_inputs_AddressInput.graphql"],
+                expected_files=["inputs_AddressInput.graphql"],
                 expected_content_keywords=["validation", "regex", "pattern", "match"],
                 category="edge_case",
                 difficulty="hard",
@@ -254,7 +255,7 @@ class EvaluationFramework:
             ),
             EvaluationCase(
                 question="streetaddress field validation rules",  # Intentionally imperfect grammar
-                expected_files=["1579_inputs_AddressInput.graphql"],
+                expected_files=["inputs_AddressInput.graphql"],
                 expected_content_keywords=["streetAddress", "validation", "regex"],
                 category="edge_case",
                 difficulty="medium",
@@ -262,7 +263,7 @@ class EvaluationFramework:
             ),
             EvaluationCase(
                 question="address input type",  # Very short query
-                expected_files=["1579_inputs_AddressInput.graphql"],
+                expected_files=["inputs_AddressInput.graphql"],
                 expected_content_keywords=["AddressInput", "input", "address"],
                 category="edge_case",
                 difficulty="easy",
@@ -324,7 +325,7 @@ class EvaluationFramework:
             # Check file expectations
             file_matches = []
             for expected_file in case.expected_files:
-                found = any(expected_file in rf for rf in result_files)
+                found = any(chunk_file_key(rf) == chunk_file_key(expected_file) for rf in result_files)
                 file_matches.append(found)
             
             # Check content keyword expectations
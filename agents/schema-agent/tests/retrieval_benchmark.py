@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Retrieval quality-versus-latency benchmark for the schema retriever.
+
+Replays the evaluation cases against a matrix of retriever configurations
+(index type, semantic top_k multiplier, fuzzy matching, related-chunk depth,
+reranking) and reports recall@k and MRR alongside per-query latency
+percentiles and peak memory, marking the configurations on the Pareto
+frontier of recall versus p95 latency.
+
+Usage (from agents/schema-agent):
+    python -m tests.retrieval_benchmark --top_k 10
+    python -m tests.retrieval_benchmark --index_types flat ivfflat --multipliers 2 4 --related 0 3
+"""
+
+import gc
+import json
+import time
+import logging
+import argparse
+import itertools
+import resource
+import tempfile
+import statistics
+import tracemalloc
+from pathlib import Path
+from dataclasses import dataclass, asdict
+from typing import List, Dict, Optional
+
+from src.retriever import Retriever
+from src.chunker import chunk_file_key
+from tests.evaluation_framework import EvaluationFramework
+
+
+@dataclass
+class BenchmarkCase:
+    """A question with the chunk files that count as relevant."""
+    question: str
+    expected_files: List[str]
+    category: str = "general"
+
+
+@dataclass
+class ConfigResult:
+    """Aggregated metrics for one retriever configuration."""
+    index_type: str
+    multiplier: int
+    fuzzy: bool
+    related: int
+    rerank: bool
+    recall_at_k: float
+    mrr: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    peak_python_mb: float
+    max_rss_mb: float
+    queries: int
+    pareto: bool = False
+
+    @property
+    def label(self) -> str:
+        return (f"{self.index_type}/x{self.multiplier}/fuzzy={'on' if self.fuzzy else 'off'}"
+                f"/related={self.related}/rerank={'on' if self.rerank else 'off'}")
+
+
+def load_cases(cases_path: Optional[str] = None) -> List[BenchmarkCase]:
+    """Load benchmark cases from a JSON file or the evaluation framework."""
+    if cases_path:
+        data = json.loads(Path(cases_path).read_text())
+        cases = [BenchmarkCase(question=c["question"], expected_files=c["expected_files"],
+                               category=c.get("category", "general")) for c in data]
+    else:
+        cases = [BenchmarkCase(question=c.question, expected_files=c.expected_files, category=c.category)
+                 for c in EvaluationFramework().analyze_schema_for_test_cases()]
+    # Cases without expected files cannot contribute to recall or MRR
+    return [c for c in cases if c.expected_files]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def score_case(result_files: List[str], expected_files: List[str], k: int) -> Dict[str, float]:
+    """Compute recall@k and reciprocal rank for a single query."""
+    # Compare without the content digest (or legacy count) prefix of chunk file names
+    top = [chunk_file_key(rf) for rf in result_files[:k]]
+    expected = {chunk_file_key(exp) for exp in expected_files}
+    hits = [exp for exp in expected if exp in top]
+    recall = len(hits) / len(expected)
+    reciprocal_rank = 0.0
+    for rank, rf in enumerate(top, 1):
+        if rf in expected:
+            reciprocal_rank = 1.0 / rank
+            break
+    return {"recall": recall, "rr": reciprocal_rank}
+
+
+def build_index_variant(index_path: str, metadata_path: str, index_type: str, out_dir: Path,
+                        nlist: Optional[int] = None) -> str:
+    """
+    Build an index of another type from the vectors stored in an existing flat index.
+
+    Reconstructing the vectors avoids re-embedding every chunk for each variant.
+
+    Returns:
+        Path to the written index file
+    """
+    import faiss
+    import numpy as np
+
+    base = faiss.read_index(index_path)
+    vectors = base.reconstruct_n(0, base.ntotal).astype(np.float32)
+    dim = vectors.shape[1]
+    if index_type == "flat":
+        index = faiss.IndexFlatL2(dim)
+    elif index_type == "ivfflat":
+        nlist = nlist or max(1, min(100, int(len(vectors) ** 0.5)))
+        quantizer = faiss.IndexFlatL2(dim)
+        index = faiss.IndexIVFFlat(quantizer, dim, nlist)
+        index.train(vectors)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, 32)
+    else:
+        raise ValueError(f"Unknown index_type: {index_type}")
+    index.add(vectors)
+    out_path = out_dir / f"index_{index_type}.faiss"
+    faiss.write_index(index, str(out_path))
+    return str(out_path)
+
+
+class RetrievalBenchmark:
+    """Runs the configuration matrix and collects metrics."""
+
+    def __init__(self, index_path: str, metadata_path: str, top_k: int = 10,
+                 warmup: int = 2, repeats: int = 1):
+        self.index_path = index_path
+        self.metadata_path = metadata_path
+        self.top_k = top_k
+        self.warmup = warmup
+        self.repeats = repeats
+        self.logger = logging.getLogger(__name__)
+
+    def run_config(self, retriever: Retriever, cases: List[BenchmarkCase], index_type: str,
+                   multiplier: int, fuzzy: bool, related: int, rerank: bool) -> ConfigResult:
+        """Benchmark one configuration on an already-loaded retriever."""
+        retriever.semantic_multiplier = multiplier
+        retriever.enable_fuzzy = fuzzy
+        retriever.max_related = related
+        retriever.enable_rerank = rerank
+
+        for case in cases[:self.warmup]:
+            retriever.retrieve_chunks(case.question, top_k=self.top_k)
+
+        latencies, recalls, rrs = [], [], []
+        gc.collect()
+        tracemalloc.start()
+        for _ in range(self.repeats):
+            for case in cases:
+                start = time.perf_counter()
+                results = retriever.retrieve_chunks(case.question, top_k=self.top_k)
+                latencies.append((time.perf_counter() - start) * 1000)
+                scores = score_case([Path(r[0]).name for r in results], case.expected_files, self.top_k)
+                recalls.append(scores["recall"])
+                rrs.append(scores["rr"])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return ConfigResult(
+            index_type=index_type, multiplier=multiplier, fuzzy=fuzzy, related=related, rerank=rerank,
+            recall_at_k=statistics.mean(recalls) if recalls else 0.0,
+            mrr=statistics.mean(rrs) if rrs else 0.0,
+            p50_ms=percentile(latencies, 50), p95_ms=percentile(latencies, 95),
+            p99_ms=percentile(latencies, 99),
+            mean_ms=statistics.mean(latencies) if latencies else 0.0,
+            peak_python_mb=peak / (1024 * 1024),
+            # ru_maxrss is KiB on Linux
+            max_rss_mb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            queries=len(latencies),
+        )
+
+    def run(self, cases: List[BenchmarkCase], index_types: List[str], multipliers: List[int],
+            fuzzy_options: List[bool], related_options: List[int],
+            rerank_options: List[bool]) -> List[ConfigResult]:
+        """Run the full matrix, loading one retriever per index type."""
+        results = []
+        with tempfile.TemporaryDirectory(prefix="retrieval_bench_") as tmp:
+            for index_type in index_types:
+                index_file = self.index_path
+                if index_type != "flat":
+                    index_file = build_index_variant(self.index_path, self.metadata_path, index_type, Path(tmp))
+                retriever = Retriever(index_path=index_file, metadata_path=self.metadata_path)
+                for multiplier, fuzzy, related, rerank in itertools.product(
+                        multipliers, fuzzy_options, related_options, rerank_options):
+                    result = self.run_config(retriever, cases, index_type, multiplier, fuzzy, related, rerank)
+                    print(f"  {result.label}: recall@{self.top_k}={result.recall_at_k:.3f} "
+                          f"mrr={result.mrr:.3f} p95={result.p95_ms:.1f}ms")
+                    results.append(result)
+                del retriever
+                gc.collect()
+        mark_pareto(results)
+        return results
+
+
+def mark_pareto(results: List[ConfigResult]):
+    """Flag configurations not dominated on (higher recall, higher MRR, lower p95)."""
+    for r in results:
+        r.pareto = not any(
+            o is not r
+            and o.recall_at_k >= r.recall_at_k and o.mrr >= r.mrr and o.p95_ms <= r.p95_ms
+            and (o.recall_at_k > r.recall_at_k or o.mrr > r.mrr or o.p95_ms < r.p95_ms)
+            for o in results
+        )
+
+
+def print_report(results: List[ConfigResult], top_k: int):
+    """Print a table sorted by recall, then latency."""
+    print("\n" + "=" * 110)
+    print("RETRIEVAL BENCHMARK")
+    print("=" * 110)
+    print(f"{'configuration':<52} {'R@' + str(top_k):>6} {'MRR':>6} {'p50':>8} {'p95':>8} "
+          f"{'p99':>8} {'peakMB':>8} {'rssMB':>8}  pareto")
+    for r in sorted(results, key=lambda x: (-x.recall_at_k, x.p95_ms)):
+        print(f"{r.label:<52} {r.recall_at_k:>6.3f} {r.mrr:>6.3f} {r.p50_ms:>8.1f} {r.p95_ms:>8.1f} "
+              f"{r.p99_ms:>8.1f} {r.peak_python_mb:>8.1f} {r.max_rss_mb:>8.0f}  {'*' if r.pareto else ''}")
+
+
+def _on_off(values: List[str]) -> List[bool]:
+    return [v == "on" for v in values]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark retrieval quality vs latency across retriever configurations.")
+    parser.add_argument("--index_path", default="./data/embeddings/index.faiss", help="Path to the base (flat) FAISS index")
+    parser.add_argument("--metadata_path", default="./data/embeddings/metadata.json", help="Path to metadata JSON")
+    parser.add_argument("--cases", default=None, help="JSON file of {question, expected_files}; defaults to evaluation_framework cases")
+    parser.add_argument("--top_k", type=int, default=10, help="k for recall@k and retrieval")
+    parser.add_argument("--index_types", nargs="+", default=["flat", "ivfflat"], choices=["flat", "ivfflat", "hnsw"])
+    parser.add_argument("--multipliers", nargs="+", type=int, default=[2, 4])
+    parser.add_argument("--fuzzy", nargs="+", default=["on", "off"], choices=["on", "off"])
+    parser.add_argument("--related", nargs="+", type=int, default=[0, 3])
+    parser.add_argument("--rerank", nargs="+", default=["on", "off"], choices=["on", "off"])
+    parser.add_argument("--warmup", type=int, default=2, help="Warmup queries per configuration")
+    parser.add_argument("--repeats", type=int, default=1, help="Replays of the case set per configuration")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    cases = load_cases(args.cases)
+    print(f"Loaded {len(cases)} benchmark cases with expected files")
+
+    benchmark = RetrievalBenchmark(args.index_path, args.metadata_path, top_k=args.top_k,
+                                   warmup=args.warmup, repeats=args.repeats)
+    results = benchmark.run(cases, args.index_types, args.multipliers, _on_off(args.fuzzy),
+                            args.related, _on_off(args.rerank))
+    print_report(results, args.top_k)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps([asdict(r) for r in results], indent=2))
+        print(f"\nResults written to {args.output}")
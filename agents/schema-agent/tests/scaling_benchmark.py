@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the schema pipeline on synthetic schemas.
+
+For each requested size, generates a synthetic SDL and measures:
+- chunk:  chunk_schema() time and chunk count
+- embed:  Embedder.embed_chunks() time and index size on disk
+- vocab:  SchemaAnalyzer vocabulary build time
+- query:  Retriever.retrieve_chunks() latency percentiles
+
+Each stage also records process max RSS (and tracemalloc peak with
+--trace_memory). Stages that need the embedding model (embed, query) can be
+skipped with --stages.
+
+Usage (from agents/schema-agent):
+    python -m tests.scaling_benchmark --sizes 1000 5000 20000
+    python -m tests.scaling_benchmark --sizes 1000 50000 200000 --stages chunk vocab
+"""
+
+import gc
+import json
+import time
+import shutil
+import logging
+import argparse
+import resource
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from tests.synthetic_schema import generate_schema
+
+DEFAULT_QUERIES = [
+    "How do I create a payment card holder?",
+    "What fields are on FinancialAccountBalance?",
+    "Which enum values can a settlement status have?",
+    "How do I paginate spend rules?",
+    "What is the postal code format?",
+    "Which mutation creates a velocity limit?",
+]
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# tracemalloc slows allocation-heavy stages severalfold, so it is opt-in
+TRACE_MEMORY = False
+
+
+def measure(fn: Callable[[], Any]) -> Tuple[Any, Dict[str, float]]:
+    """Run fn and return (result, {seconds, max_rss_mb[, peak_python_mb]})."""
+    gc.collect()
+    if TRACE_MEMORY:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = fn()
+    finally:
+        elapsed = time.perf_counter() - start
+        if TRACE_MEMORY:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    metrics = {"seconds": round(elapsed, 3), "max_rss_mb": round(_max_rss_mb(), 1)}
+    if TRACE_MEMORY:
+        metrics["peak_python_mb"] = round(peak / (1024 * 1024), 1)
+    return result, metrics
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def run_size(num_types: int, work_dir: Path, stages: List[str], queries: List[str],
+             top_k: int, seed: int) -> Dict[str, Any]:
+    """Run every requested stage for one schema size."""
+    from src.chunker import chunk_schema
+
+    size_dir = work_dir / f"types_{num_types}"
+    schema_path = size_dir / "schema.graphql"
+    chunks_dir = size_dir / "chunks"
+    index_path = size_dir / "embeddings" / "index.faiss"
+    metadata_path = size_dir / "embeddings" / "metadata.json"
+    cache_path = size_dir / "cache" / "vocabulary.pkl"
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+    schema_stats, gen_metrics = measure(lambda: generate_schema(num_types, str(schema_path), seed=seed))
+    report: Dict[str, Any] = {
+        "types": num_types,
+        "schema": schema_stats,
+        "schema_mb": round(schema_path.stat().st_size / (1024 * 1024), 2),
+        "generate": gen_metrics,
+    }
+    print(f"\n[{num_types} types] {schema_stats['definitions']} definitions, "
+          f"{schema_stats['fields']} fields, {report['schema_mb']} MB SDL")
+
+    if "chunk" in stages or not chunks_dir.exists():
+        _, metrics = measure(lambda: chunk_schema(str(schema_path), str(chunks_dir)))
+        metrics["chunks"] = sum(1 for _ in chunks_dir.glob("*.graphql"))
+        report["chunk"] = metrics
+        print(f"  chunk: {metrics['seconds']}s for {metrics['chunks']} chunks")
+
+    if "embed" in stages:
+        from src.embedder import Embedder
+
+        def embed():
+            embedder = Embedder()
+            embedder.embed_chunks(str(chunks_dir))
+            embedder.save(str(index_path), str(metadata_path))
+            return embedder
+
+        _, metrics = measure(embed)
+        metrics["index_mb"] = round(index_path.stat().st_size / (1024 * 1024), 2)
+        report["embed"] = metrics
+        print(f"  embed: {metrics['seconds']}s, index {metrics['index_mb']} MB")
+    elif not metadata_path.exists():
+        # The analyzer only needs the chunk list the embedder would have written
+        metadata_path.write_text(json.dumps({"paths": sorted(str(p) for p in chunks_dir.glob("*.graphql"))}))
+
+    if "vocab" in stages:
+        from src.schema_analyzer import SchemaAnalyzer
+
+        if cache_path.exists():
+            cache_path.unlink()
+        analyzer, metrics = measure(lambda: SchemaAnalyzer(metadata_path=str(metadata_path), cache_path=str(cache_path)))
+        metrics.update({k: v for k, v in analyzer.get_stats().items() if isinstance(v, int)})
+        report["vocab"] = metrics
+        print(f"  vocab: {metrics['seconds']}s")
+
+    if "query" in stages:
+        if not index_path.exists():
+            print("  query: skipped (requires the embed stage)")
+        else:
+            from src.retriever import Retriever
+
+            retriever, load_metrics = measure(lambda: Retriever(
+                index_path=str(index_path), metadata_path=str(metadata_path),
+                vocabulary_cache_path=str(cache_path)))
+            retriever.retrieve_chunks(queries[0], top_k=top_k)  # warmup
+            latencies = []
+            for question in queries:
+                start = time.perf_counter()
+                retriever.retrieve_chunks(question, top_k=top_k)
+                latencies.append((time.perf_counter() - start) * 1000)
+            report["query"] = {
+                "load": load_metrics,
+                "p50_ms": round(percentile(latencies, 50), 1),
+                "p95_ms": round(percentile(latencies, 95), 1),
+                "max_ms": round(max(latencies), 1),
+                "max_rss_mb": round(_max_rss_mb(), 1),
+            }
+            print(f"  query: p50 {report['query']['p50_ms']}ms, p95 {report['query']['p95_ms']}ms")
+            del retriever
+    return report
+
+
+def print_summary(reports: List[Dict[str, Any]]):
+    """Print one row per size."""
+    print("\n" + "=" * 100)
+    print("SCALING BENCHMARK")
+    print("=" * 100)
+    print(f"{'types':>8} {'defs':>8} {'fields':>9} {'chunk_s':>8} {'embed_s':>8} {'idx_MB':>7} "
+          f"{'vocab_s':>8} {'q_p50':>7} {'q_p95':>7} {'rss_MB':>8}")
+    for r in reports:
+        rss = max(r.get(stage, {}).get("max_rss_mb", 0) for stage in ("generate", "chunk", "embed", "vocab", "query"))
+        print(f"{r['types']:>8} {r['schema']['definitions']:>8} {r['schema']['fields']:>9} "
+              f"{r.get('chunk', {}).get('seconds', '-'):>8} {r.get('embed', {}).get('seconds', '-'):>8} "
+              f"{r.get('embed', {}).get('index_mb', '-'):>7} {r.get('vocab', {}).get('seconds', '-'):>8} "
+              f"{r.get('query', {}).get('p50_ms', '-'):>7} {r.get('query', {}).get('p95_ms', '-'):>7} {rss:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure chunker, embedder, analyzer and retriever scaling on synthetic schemas.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 5000, 20000], help="Object type counts to test")
+    parser.add_argument("--stages", nargs="+", default=["chunk", "embed", "vocab", "query"],
+                        choices=["chunk", "embed", "vocab", "query"])
+    parser.add_argument("--top_k", type=int, default=10, help="top_k for query latency")
+    parser.add_argument("--seed", type=int, default=42, help="Generator seed")
+    parser.add_argument("--work_dir", default=None, help="Directory for generated artifacts (default: temp dir)")
+    parser.add_argument("--keep", action="store_true", help="Keep generated artifacts")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path")
+    parser.add_argument("--trace_memory", action="store_true", help="Record tracemalloc peaks (slows every stage)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    TRACE_MEMORY = args.trace_memory
+
+    work_dir = Path(args.work_dir or tempfile.mkdtemp(prefix="schema_scaling_"))
+    work_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        reports = [run_size(size, work_dir, args.stages, DEFAULT_QUERIES, args.top_k, args.seed)
+                   for size in sorted(args.sizes)]
+        print_summary(reports)
+        if args.output:
+            Path(args.output).write_text(json.dumps(reports, indent=2))
+            print(f"\nResults written to {args.output}")
+    finally:
+        if not args.keep and not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        elif args.keep:
+            print(f"\nArtifacts kept in {work_dir}")
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Synthetic GraphQL SDL generator for scale testing.
+
+Builds a valid, Highnote-flavoured schema of configurable size: object types
+with docstrings, input types, enums, interfaces, unions, Relay-style
+connections, and Query/Mutation root fields. Output is deterministic for a
+given seed so scaling runs are comparable.
+
+Usage (from agents/schema-agent):
+    python -m tests.synthetic_schema --types 5000 --out /tmp/synthetic_5k.graphql
+"""
+
+import random
+import argparse
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PREFIXES = [
+    "Payment", "Card", "Financial", "Account", "Business", "Person", "Ledger", "Transfer",
+    "Authorization", "Settlement", "Dispute", "Merchant", "Spend", "Velocity", "Credit",
+    "Debit", "Prepaid", "Interest", "Fee", "Reward", "Statement", "Billing", "Identity",
+    "Document", "Application", "Verification", "Collaborator", "Program", "Product", "Webhook",
+]
+NOUNS = [
+    "Holder", "Rule", "Event", "Instrument", "Limit", "Balance", "Entry", "Profile", "Policy",
+    "Config", "Record", "Summary", "Detail", "Schedule", "Plan", "Adjustment", "Review",
+    "Notification", "Template", "Address", "Contact", "Attribute", "Condition", "Result",
+]
+QUALIFIERS = ["", "External", "Internal", "Pending", "Scheduled", "Recurring", "Primary",
+              "Secondary", "Manual", "Automated", "Regional", "Network"]
+FIELD_WORDS = [
+    "amount", "status", "createdAt", "updatedAt", "currency", "name", "description", "type",
+    "externalId", "reason", "code", "limit", "threshold", "balance", "expirationDate",
+    "region", "network", "memo", "reference", "category", "priority", "count", "email",
+    "phoneNumber", "postalCode", "locality", "streetAddress", "countryCodeAlpha3",
+]
+SCALAR_FIELDS = {
+    "amount": "Int", "count": "Int", "limit": "Int", "threshold": "Int", "priority": "Int",
+    "createdAt": "DateTime", "updatedAt": "DateTime", "expirationDate": "Date",
+}
+ENUM_VALUE_WORDS = ["ACTIVE", "INACTIVE", "PENDING", "CLOSED", "SUSPENDED", "APPROVED",
+                    "DECLINED", "EXPIRED", "REVERSED", "SETTLED", "FAILED", "UNKNOWN"]
+DOC_PHRASES = [
+    "Used when issuing payment cards to account holders.",
+    "Controls spend and velocity for the associated financial account.",
+    "Captured at authorization time and reconciled during settlement.",
+    "Must be unique within the program.",
+    "Populated asynchronously after verification completes.",
+    "Returned in webhook notifications.",
+    "Validated against the program configuration.",
+]
+
+
+class SyntheticSchemaGenerator:
+    """Generates deterministic, valid GraphQL SDL at a requested size."""
+
+    def __init__(self, num_types: int = 1000, fields_per_type: Tuple[int, int] = (4, 12), seed: int = 42):
+        """
+        Args:
+            num_types: Number of object types to generate; inputs, enums,
+                interfaces, unions and connections scale with it
+            fields_per_type: Inclusive (min, max) fields per object type
+            seed: Random seed
+        """
+        self.num_types = num_types
+        self.fields_per_type = fields_per_type
+        self.rng = random.Random(seed)
+        self._used_names = set()
+        self.stats: Dict[str, int] = {}
+
+    def _unique_name(self, base: str) -> str:
+        name = base
+        suffix = 2
+        while name in self._used_names:
+            name = f"{base}{suffix}"
+            suffix += 1
+        self._used_names.add(name)
+        return name
+
+    def _type_name(self) -> str:
+        return self._unique_name(
+            self.rng.choice(QUALIFIERS) + self.rng.choice(PREFIXES) + self.rng.choice(NOUNS)
+        )
+
+    def _doc(self, subject: str, indent: str = "") -> str:
+        text = f"The {subject}. {self.rng.choice(DOC_PHRASES)}"
+        return f'{indent}"""{text}"""\n'
+
+    @staticmethod
+    def _lower_first(name: str) -> str:
+        return name[0].lower() + name[1:]
+
+    def generate(self) -> str:
+        """Build the full SDL document."""
+        n = max(self.num_types, 4)
+        type_names = [self._type_name() for _ in range(n)]
+        enum_names = [self._unique_name(self.rng.choice(PREFIXES) + "Status") for _ in range(max(1, n // 10))]
+        interface_names = [self._unique_name(self.rng.choice(PREFIXES) + "Node") for _ in range(max(1, n // 50))]
+        union_names = [self._unique_name(self.rng.choice(PREFIXES) + "Result") for _ in range(max(1, n // 100))]
+        input_targets = type_names[: max(1, n // 4)]
+        connection_targets = type_names[: max(1, n // 5)]
+
+        parts: List[str] = [
+            '"""An ISO-8601 encoded UTC date string."""\nscalar DateTime\n',
+            '"""A calendar date, such as 2007-12-03."""\nscalar Date\n',
+            '"""Information about pagination in a connection."""\ntype PageInfo {\n'
+            '  hasNextPage: Boolean!\n  hasPreviousPage: Boolean!\n  startCursor: String\n  endCursor: String\n}\n',
+        ]
+
+        for name in enum_names:
+            values = self.rng.sample(ENUM_VALUE_WORDS, self.rng.randint(3, len(ENUM_VALUE_WORDS)))
+            body = "".join(f"  {v}\n" for v in values)
+            parts.append(self._doc(f"{name} enumeration") + f"enum {name} {{\n{body}}}\n")
+
+        for name in interface_names:
+            parts.append(self._doc(f"{name} interface") +
+                         f"interface {name} {{\n  \"\"\"Global identifier.\"\"\"\n  id: ID!\n}}\n")
+
+        field_count = 0
+        for i, name in enumerate(type_names):
+            interface = self.rng.choice(interface_names) if self.rng.random() < 0.3 else None
+            lines = [self._doc(f"{name} object"),
+                     f"type {name}{' implements ' + interface if interface else ''} {{\n",
+                     '  """Global identifier."""\n  id: ID!\n']
+            fields = self.rng.sample(FIELD_WORDS, self.rng.randint(*self.fields_per_type))
+            for field in fields:
+                if field == "status":
+                    ftype = self.rng.choice(enum_names)
+                else:
+                    ftype = SCALAR_FIELDS.get(field, "String")
+                lines.append(self._doc(f"{field} of the {name}", "  ") + f"  {field}: {ftype}\n")
+            # Cross-references create realistic related-type fan-out
+            for ref in self.rng.sample(type_names, min(2, len(type_names))):
+                if ref != name:
+                    lines.append(f"  {self._lower_first(ref)}: {ref}\n")
+                    field_count += 1
+            if i < len(connection_targets):
+                child = type_names[(i + 1) % len(type_names)]
+                lines.append(f"  \"\"\"Paginated {child} records.\"\"\"\n"
+                             f"  {self._lower_first(child)}s(first: Int = 20, after: String): {child}Connection\n")
+                field_count += 1
+            lines.append("}\n")
+            field_count += len(fields) + 1
+            parts.append("".join(lines))
+
+        connection_children = {type_names[(i + 1) % len(type_names)] for i in range(len(connection_targets))}
+        for child in sorted(connection_children):
+            parts.append(
+                f'"""An edge in a {child} connection."""\ntype {child}Edge {{\n  cursor: String!\n  node: {child}\n}}\n'
+                f'"""A paginated list of {child}."""\ntype {child}Connection {{\n'
+                f'  edges: [{child}Edge!]\n  pageInfo: PageInfo!\n}}\n'
+            )
+
+        for name in union_names:
+            members = self.rng.sample(type_names, min(3, len(type_names)))
+            parts.append(self._doc(f"{name} union") + f"union {name} = {' | '.join(members)}\n")
+
+        for name in input_targets:
+            fields = self.rng.sample(FIELD_WORDS, self.rng.randint(2, 8))
+            body = "".join(
+                self._doc(f"{f} for the new {name}", "  ") +
+                f"  {f}: {SCALAR_FIELDS.get(f, 'String')}{'!' if j == 0 else ''}\n"
+                for j, f in enumerate(fields)
+            )
+            parts.append(self._doc(f"input for creating a {name}") + f"input Create{name}Input {{\n{body}}}\n")
+            field_count += len(fields)
+
+        query_lines = ['  """Simple query that returns a static value of `pong`."""\n  ping: String!\n']
+        for name in type_names[: max(1, n // 3)]:
+            query_lines.append(self._doc(f"lookup of a {name} by ID", "  ") +
+                               f"  {self._lower_first(name)}(id: ID!): {name}\n")
+        for name in union_names:
+            query_lines.append(f"  search{name}(query: String!): [{name}!]\n")
+        parts.append(f"type Query {{\n{''.join(query_lines)}}}\n")
+
+        mutation_lines = []
+        for name in input_targets:
+            mutation_lines.append(self._doc(f"creation of a {name}", "  ") +
+                                  f"  create{name}(input: Create{name}Input!): {name}\n")
+        parts.append(f"type Mutation {{\n{''.join(mutation_lines)}}}\n")
+
+        field_count += len(query_lines) + len(mutation_lines)
+        self.stats = {
+            "object_types": n + 2 * len(connection_children) + 1,
+            "inputs": len(input_targets),
+            "enums": len(enum_names),
+            "interfaces": len(interface_names),
+            "unions": len(union_names),
+            "queries": len(query_lines),
+            "mutations": len(mutation_lines),
+            "fields": field_count,
+        }
+        self.stats["definitions"] = (self.stats["object_types"] + self.stats["inputs"] + self.stats["enums"]
+                                     + self.stats["interfaces"] + self.stats["unions"] + 2 + 2)
+        return "\n".join(parts)
+
+
+def generate_schema(num_types: int, out_path: str, seed: int = 42, validate: bool = False) -> Dict[str, int]:
+    """
+    Generate a synthetic schema and write it to disk.
+
+    Args:
+        num_types: Number of object types
+        out_path: Destination .graphql path
+        seed: Random seed
+        validate: Build the schema with graphql-core to confirm it is valid
+
+    Returns:
+        Counts of generated definitions and fields
+    """
+    generator = SyntheticSchemaGenerator(num_types=num_types, seed=seed)
+    sdl = generator.generate()
+    if validate:
+        from graphql import build_schema
+        build_schema(sdl)
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    Path(out_path).write_text(sdl)
+    return generator.stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic GraphQL SDL for scale testing.")
+    parser.add_argument("--types", type=int, default=1000, help="Number of object types to generate")
+    parser.add_argument("--out", required=True, help="Output .graphql path")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--validate", action="store_true", help="Validate the SDL with graphql-core")
+    args = parser.parse_args()
+
+    stats = generate_schema(args.types, args.out, seed=args.seed, validate=args.validate)
+    print(f"SUCCESS: Wrote synthetic schema to '{args.out}'")
+    for key, value in stats.items():
+        print(f"  {key}: {value}")
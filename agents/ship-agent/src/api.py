@@ -4,12 +4,13 @@ Provides API endpoints for solution document generation using the modular patter
 """
 import os
 import sys
+import asyncio
 import logging
 from typing import Optional, Dict, Any, List
 from pathlib import Path
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from datetime import datetime
 import json
@@ -20,6 +21,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from modular_solution_generator import ModularSolutionGenerator
 from postman_sync import PostmanToOperationsSync
+from export_jobs import ExportJobQueue
 
 # Configure logging
 logging.basicConfig(
@@ -50,6 +52,15 @@ app.add_middleware(
 # Initialize components
 generator = ModularSolutionGenerator()
 syncer = PostmanToOperationsSync()
+export_jobs = ExportJobQueue(generator.output_dir)
+
+# Media types for downloads
+MEDIA_TYPES = {
+    'markdown': 'text/markdown',
+    'confluence': 'text/plain',
+    'html': 'text/html',
+    'pdf': 'application/pdf'
+}
 
 # Request/Response Models
 class GenerateSolutionRequest(BaseModel):
@@ -103,6 +114,12 @@ async def startup_event():
     logger.info("Ship Agent API ready")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the export worker pool"""
+    export_jobs.shutdown()
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -198,33 +215,25 @@ async def generate_solution(request: GenerateSolutionRequest):
     
     Combines program configuration with optional customer context
     to create a comprehensive solution document.
-    Supports multiple export formats: markdown, confluence, html, pdf
+    Supports multiple export formats: markdown, confluence, html, pdf.
+    Exports run in the background; poll /exports/{job_id} for the result.
     """
     try:
-        # Generate document with optional export formats
-        output_files = generator.generate(
+        # Generate the markdown document
+        content, markdown_path = generator.generate_document(
             program_type=request.program_type,
-            customer_name=request.customer_name,
-            export_formats=request.export_formats
+            customer_name=request.customer_name
         )
-        
-        # Read the markdown document for preview
-        markdown_path = output_files.get('markdown', list(output_files.values())[0] if output_files else None)
-        
-        if markdown_path:
-            with open(markdown_path, 'r') as f:
-                content = f.read()
-            content_preview = content[:1000] + "..." if len(content) > 1000 else content
-        else:
-            content_preview = "Document generated successfully"
+        output_files, export_job = _queue_exports(markdown_path, request.export_formats)
         
         return {
             "status": "success",
             "program_type": request.program_type,
             "customer_name": request.customer_name,
             "output_files": output_files,
-            "content_preview": content_preview,
-            "full_content_lines": len(content.split('\n')) if markdown_path else 0,
+            "export_job": export_job,
+            "content_preview": content[:1000] + "..." if len(content) > 1000 else content,
+            "full_content_lines": content.count('\n') + 1,
             "timestamp": datetime.now().isoformat()
         }
     
@@ -235,6 +244,74 @@ async def generate_solution(request: GenerateSolutionRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/generate/stream")
+async def generate_solution_stream(request: GenerateSolutionRequest):
+    """
+    Generate a solution document, streaming each section as it is rendered
+    
+    The response is newline-delimited JSON: one {"section", "content"} object
+    per section in document order, then a final {"status": "success", ...}
+    object with the saved files and export job.
+    """
+    try:
+        sections = generator.iter_sections(request.program_type, request.customer_name)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to generate solution: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    def stream():
+        rendered = []
+        try:
+            for name, text in sections:
+                rendered.append(text)
+                yield json.dumps({"section": name, "content": text}) + "\n"
+            
+            content = "\n\n".join(rendered)
+            markdown_path = generator.save_document(content, request.program_type, request.customer_name)
+            output_files, export_job = _queue_exports(markdown_path, request.export_formats)
+            yield json.dumps({
+                "status": "success",
+                "program_type": request.program_type,
+                "customer_name": request.customer_name,
+                "output_files": output_files,
+                "export_job": export_job,
+                "full_content_lines": content.count('\n') + 1,
+                "timestamp": datetime.now().isoformat()
+            }) + "\n"
+        except Exception as e:
+            # Headers are already sent; report the failure in-band
+            logger.error(f"Failed to generate solution: {e}")
+            yield json.dumps({"status": "error", "detail": str(e)}) + "\n"
+    
+    # Sections render in Starlette's threadpool, off the event loop
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.get("/generate/{program_type}/stream")
+async def generate_solution_stream_get(program_type: str, customer: Optional[str] = None, formats: Optional[str] = None):
+    """Streaming generation via GET request; formats can be comma-separated"""
+    request = GenerateSolutionRequest(
+        program_type=program_type,
+        customer_name=customer,
+        export_formats=formats.split(',') if formats else None
+    )
+    return await generate_solution_stream(request)
+
+
+def _queue_exports(markdown_path: str, export_formats: Optional[List[str]]):
+    """Queue exports of a saved document; returns (output_files, export job info)"""
+    output_files = {'markdown': markdown_path}
+    if not export_formats:
+        return output_files, None
+    
+    job = export_jobs.submit(markdown_path, export_formats)
+    if job.status == 'completed':
+        output_files = job.files
+    return output_files, job.to_dict()
+
+
 @app.get("/generate/{program_type}")
 async def generate_solution_get(program_type: str, customer: Optional[str] = None, formats: Optional[str] = None):
     """
@@ -261,45 +338,74 @@ async def download_solution(program_type: str, customer: Optional[str] = None, f
     Format options: markdown, confluence, html
     """
     try:
-        # Determine export formats
-        export_formats = [format] if format != "markdown" else None
-        
         # Generate document
         output_files = generator.generate(
             program_type=program_type,
-            customer_name=customer,
-            export_formats=export_formats
+            customer_name=customer
         )
         
-        # Get the requested file path
-        file_path = output_files.get(format)
-        if not file_path:
-            raise HTTPException(status_code=400, detail=f"Format '{format}' not available")
-        
-        # Get filename
+        file_path = output_files['markdown']
         filename = Path(file_path).name
         
-        # Determine media type
-        media_types = {
-            'markdown': 'text/markdown',
-            'confluence': 'text/plain',
-            'html': 'text/html',
-            'pdf': 'application/pdf'
-        }
-        media_type = media_types.get(format, 'application/octet-stream')
+        # Export in the worker pool without blocking the event loop
+        if format != "markdown":
+            job = export_jobs.submit(file_path, [format])
+            await asyncio.wrap_future(job.future)
+            if job.error:
+                raise HTTPException(status_code=500, detail=f"Export failed: {job.error}")
+            if format not in job.files:
+                raise HTTPException(status_code=400, detail=f"Format '{format}' not available")
+            file_path = job.files[format]
+            filename = job.download_name(format)
         
         # Return as file download
         return FileResponse(
             path=file_path,
-            media_type=media_type,
+            media_type=MEDIA_TYPES.get(format, 'application/octet-stream'),
             filename=filename
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to generate document for download: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/exports/{job_id}")
+async def get_export_job(job_id: str):
+    """Get the status and exported files of an export job"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Export job '{job_id}' not found")
+    return job.to_dict()
+
+
+@app.get("/exports/{job_id}/download")
+async def download_export(job_id: str, format: str = "pdf"):
+    """
+    Download a file produced by an export job
+    
+    Returns 409 while the job is still queued or running.
+    """
+    job = export_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Export job '{job_id}' not found")
+    if job.status in ('queued', 'running'):
+        raise HTTPException(status_code=409, detail=f"Export job '{job_id}' is {job.status}")
+    if job.error:
+        raise HTTPException(status_code=500, detail=f"Export failed: {job.error}")
+    
+    if format not in job.files:
+        raise HTTPException(status_code=400, detail=f"Format '{format}' not available")
+    
+    return FileResponse(
+        path=job.files[format],
+        media_type=MEDIA_TYPES.get(format, 'application/octet-stream'),
+        filename=job.download_name(format)
+    )
+
+
 @app.post("/sync/postman")
 async def sync_postman(request: SyncPostmanRequest):
     """
@@ -446,6 +552,8 @@ async def root():
             "programs": "/programs",
             "contexts": "/contexts",
             "generate": "/generate",
+            "generate_stream": "/generate/stream",
+            "exports": "/exports/{job_id}",
             "operations": "/operations/{program_type}",
             "workflows": "/workflows/{program_type}"
         },
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Bulk Solution Generator
+Generates solution documents for every program config × customer context
+pair in parallel, skipping pairs whose inputs have not changed since the
+last run, and writes a summary report with per-document timings.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.modular_solution_generator import ModularSolutionGenerator
+
+MANIFEST_NAME = "bulk_manifest.json"
+ALL_FORMATS = ['markdown', 'html', 'confluence', 'pdf']
+
+# Generator of the current worker process, created by _init_worker
+_worker_generator: Optional[ModularSolutionGenerator] = None
+
+
+def _init_worker(base_dir: str, cache_state: Dict[str, Dict]):
+    """Create the worker's generator, seeded with the parent's parsed inputs"""
+    global _worker_generator
+    _worker_generator = ModularSolutionGenerator(Path(base_dir))
+    _worker_generator.restore_cache_state(cache_state)
+
+
+def _generate_pair(program_type: str, customer_name: Optional[str],
+                   export_formats: List[str]) -> Dict[str, Any]:
+    """Generate one document in a worker process"""
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    files = _worker_generator.generate(program_type, customer_name, export_formats or None)
+    return {
+        'files': files,
+        # Taken after generation so diagrams instantiated by this run count as inputs
+        'input_digest': _worker_generator.input_digest(program_type, customer_name),
+        'seconds': round(time.perf_counter() - start, 3),
+        'cpu_seconds': round(time.process_time() - cpu_start, 3)
+    }
+
+
+class BulkGenerator:
+    """Fan the programs × contexts matrix out over a process pool"""
+
+    def __init__(self, base_dir: Path = None, workers: Optional[int] = None):
+        self.generator = ModularSolutionGenerator(base_dir)
+        self.base_dir = self.generator.base_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.manifest_path = self.generator.output_dir / MANIFEST_NAME
+
+    def list_programs(self) -> List[str]:
+        """Program types with a config (enhanced variants are picked up by the loader)"""
+        config_dir = self.generator.config_loader.config_dir
+        return sorted(p.stem for p in config_dir.glob("*.yaml") if not p.stem.endswith('_enhanced'))
+
+    def list_customers(self) -> List[str]:
+        """Customer names with a context file"""
+        context_dir = self.generator.context_loader.context_dir
+        customers = []
+        for context_file in sorted(context_dir.glob("*.json")):
+            customer = context_file.stem.replace('_context', '').replace('_v2', '')
+            if customer not in customers:
+                customers.append(customer)
+        return customers
+
+    def run(self, programs: Optional[List[str]] = None, customers: Optional[List[Optional[str]]] = None,
+            formats: Optional[List[str]] = None, force: bool = False) -> Dict[str, Any]:
+        """
+        Generate every program × customer pair
+
+        Args:
+            programs: Program types (default: all configs)
+            customers: Customer names, None for the generic document (default: generic + all contexts)
+            formats: Output formats from ALL_FORMATS (default: markdown)
+            force: Regenerate pairs even if their inputs are unchanged
+
+        Returns:
+            Summary report
+        """
+        programs = programs or self.list_programs()
+        customers = customers if customers is not None else [None] + self.list_customers()
+        formats = formats or ['markdown']
+        export_formats = [f for f in formats if f != 'markdown']
+        manifest = self._load_manifest()
+        started = time.perf_counter()
+
+        # Parse every config, context and Postman collection once, in the parent
+        results: List[Dict[str, Any]] = []
+        pending: List[Tuple[str, Optional[str], str]] = []
+        for program_type in programs:
+            for customer_name in customers:
+                key = f"{program_type}|{customer_name or ''}"
+                try:
+                    digest = self.generator.input_digest(program_type, customer_name)
+                except Exception as e:
+                    results.append(self._result(program_type, customer_name, 'failed', error=str(e)))
+                    continue
+
+                previous = manifest.get(key)
+                if not force and previous and self._is_current(previous, digest, formats):
+                    results.append(self._result(program_type, customer_name, 'skipped',
+                                                files=previous['files']))
+                    continue
+                pending.append((program_type, customer_name, key))
+
+        if pending:
+            with ProcessPoolExecutor(
+                max_workers=min(self.workers, len(pending)),
+                initializer=_init_worker,
+                initargs=(str(self.base_dir), self.generator.cache_state())
+            ) as pool:
+                futures = {
+                    pool.submit(_generate_pair, program_type, customer_name, export_formats): (program_type, customer_name, key)
+                    for program_type, customer_name, key in pending
+                }
+                for future in as_completed(futures):
+                    program_type, customer_name, key = futures[future]
+                    try:
+                        output = future.result()
+                    except Exception as e:
+                        results.append(self._result(program_type, customer_name, 'failed', error=str(e)))
+                        manifest.pop(key, None)
+                        continue
+
+                    results.append(self._result(program_type, customer_name, 'generated',
+                                                files=output['files'], seconds=output['seconds'],
+                                                cpu_seconds=output['cpu_seconds']))
+                    manifest[key] = {
+                        'input_digest': output['input_digest'],
+                        'requested': formats,
+                        'files': output['files'],
+                        'generated_at': datetime.now().isoformat()
+                    }
+            self._save_manifest(manifest)
+
+        results.sort(key=lambda r: (r['program_type'], r['customer_name'] or ''))
+        counts = {status: sum(1 for r in results if r['status'] == status)
+                  for status in ('generated', 'skipped', 'failed')}
+        report = {
+            'timestamp': datetime.now().isoformat(),
+            'workers': self.workers,
+            'formats': formats,
+            'total': len(results),
+            **counts,
+            'wall_seconds': round(time.perf_counter() - started, 3),
+            'documents': results
+        }
+        report['report_path'] = self._save_report(report)
+        return report
+
+    def _is_current(self, previous: Dict[str, Any], digest: str, formats: List[str]) -> bool:
+        """Whether the last run's output for a pair can be reused"""
+        if previous.get('input_digest') != digest:
+            return False
+        # Formats that could not be produced last time (e.g. PDF) are not retried
+        if not set(formats) <= set(previous.get('requested', [])):
+            return False
+        return all(Path(path).exists() for path in previous['files'].values())
+
+    def _result(self, program_type: str, customer_name: Optional[str], status: str,
+                files: Optional[Dict[str, str]] = None, seconds: Optional[float] = None,
+                cpu_seconds: Optional[float] = None, error: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            'program_type': program_type,
+            'customer_name': customer_name,
+            'status': status,
+            'seconds': seconds,
+            'cpu_seconds': cpu_seconds,
+            'files': files or {},
+            'error': error
+        }
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        if self.manifest_path.exists():
+            try:
+                with open(self.manifest_path, 'r') as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Ignoring unreadable bulk manifest: {e}")
+        return {}
+
+    def _save_manifest(self, manifest: Dict[str, Any]):
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _save_report(self, report: Dict[str, Any]) -> str:
+        report_dir = self.generator.output_dir / "reports"
+        report_dir.mkdir(parents=True, exist_ok=True)
+        report_path = report_dir / f"bulk_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        return str(report_path)
+
+
+def print_report(report: Dict[str, Any]):
+    """Print the summary table"""
+    print(f"\n{'Program':<40} {'Customer':<20} {'Status':<10} {'Seconds':>8}")
+    print("-" * 80)
+    for doc in report['documents']:
+        seconds = f"{doc['seconds']:.2f}" if doc['seconds'] is not None else "-"
+        print(f"{doc['program_type']:<40} {(doc['customer_name'] or 'generic'):<20} "
+              f"{doc['status']:<10} {seconds:>8}")
+        if doc['error']:
+            print(f"    {doc['error']}")
+    print("-" * 80)
+    print(f"{report['total']} documents: {report['generated']} generated, {report['skipped']} skipped, "
+          f"{report['failed']} failed in {report['wall_seconds']:.2f}s with {report['workers']} workers")
+    print(f"Report: {report['report_path']}")
+
+
+def main():
+    """CLI interface for bulk generation"""
+    parser = argparse.ArgumentParser(
+        description='Generate solution documents for all programs × customer contexts',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Generate markdown for every program, generic and per customer
+  python src/bulk_generator.py
+
+  # All formats, 8 workers, regenerate everything
+  python src/bulk_generator.py --formats markdown,html,confluence,pdf --workers 8 --force
+
+  # Selected programs for one customer
+  python src/bulk_generator.py --programs ap_automation,fleet --customers triplink
+        """
+    )
+
+    parser.add_argument('--programs', help='Comma-separated program types (default: all)')
+    parser.add_argument('--customers', help='Comma-separated customer names (default: all contexts)')
+    parser.add_argument('--no-generic', action='store_true',
+                       help='Skip generic (no customer) documents')
+    parser.add_argument('--formats', default='markdown',
+                       help=f"Comma-separated formats from {','.join(ALL_FORMATS)} (default: markdown)")
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true',
+                       help='Regenerate even if inputs are unchanged')
+
+    args = parser.parse_args()
+
+    formats = [f.strip() for f in args.formats.split(',') if f.strip()]
+    unknown = [f for f in formats if f not in ALL_FORMATS]
+    if unknown:
+        parser.error(f"Unknown formats: {', '.join(unknown)}")
+
+    bulk = BulkGenerator(workers=args.workers)
+    programs = args.programs.split(',') if args.programs else None
+    customers = args.customers.split(',') if args.customers else bulk.list_customers()
+    if not args.no_generic:
+        customers = [None] + customers
+
+    report = bulk.run(programs, customers, formats, force=args.force)
+    print_report(report)
+    return 1 if report['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
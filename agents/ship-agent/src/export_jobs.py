@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Export Job Queue
+Runs document exports (HTML, PDF, Confluence) in a bounded process pool so
+API requests return immediately, and caches artifacts by document content.
+"""
+import os
+import json
+import uuid
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.export_formatter import MultiFormatExporter
+
+logger = logging.getLogger(__name__)
+
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "2"))
+MAX_EXPORT_JOBS = int(os.getenv("MAX_EXPORT_JOBS", "1000"))
+
+ARTIFACT_NAME = "document"
+MANIFEST_NAME = "manifest.json"
+
+
+def _export_artifacts(markdown_content: str, artifact_dir: str, formats: List[str]) -> Dict[str, str]:
+    """
+    Render the requested formats into the artifact directory (runs in a worker process)
+
+    Returns:
+        Dictionary with paths to exported files
+    """
+    artifact_dir = Path(artifact_dir)
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+    markdown_path = artifact_dir / f"{ARTIFACT_NAME}.md"
+    if not markdown_path.exists():
+        with open(markdown_path, 'w') as f:
+            f.write(markdown_content)
+
+    exporter = MultiFormatExporter(artifact_dir)
+    exported = exporter.export_document(str(markdown_path), formats)
+
+    # Record what was attempted so formats that cannot be produced here
+    # (e.g. PDF without a PDF backend) are not retried on every request
+    manifest_path = artifact_dir / MANIFEST_NAME
+    manifest = {'attempted': [], 'files': {}}
+    if manifest_path.exists():
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+    manifest['attempted'] = sorted(set(manifest['attempted']) | set(formats))
+    manifest['files'].update({fmt: Path(path).name for fmt, path in exported.items() if fmt != 'markdown'})
+    tmp_path = manifest_path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+    return exported
+
+
+class ExportJob:
+    """A queued or finished export of one markdown document"""
+
+    def __init__(self, markdown_path: str, digest: str, formats: List[str]):
+        self.id = uuid.uuid4().hex
+        self.markdown_path = markdown_path
+        self.digest = digest
+        self.formats = formats
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self.files: Dict[str, str] = {}
+        self.error: Optional[str] = None
+        self.cached = False
+        # Resolved with the exported files once the job finishes
+        self.future: Future = Future()
+        self._export: Optional[Future] = None
+
+    @property
+    def status(self) -> str:
+        if self.future.done():
+            return 'failed' if self.error else 'completed'
+        return 'running' if self._export is not None and self._export.running() else 'queued'
+
+    def download_name(self, fmt: str) -> str:
+        """File name for a download, after the source markdown document"""
+        name = Path(self.files[fmt]).name
+        if fmt == 'markdown':
+            return name
+        return Path(self.markdown_path).stem + name[len(ARTIFACT_NAME):]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'formats': self.formats,
+            'cached': self.cached,
+            'files': self.files,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class ExportJobQueue:
+    """
+    Export jobs backed by a process pool and a content-addressed artifact cache
+
+    Artifacts live in ``<output_dir>/exports/<digest>/`` where the digest is the
+    SHA-256 of the markdown. Re-exporting an unchanged document completes
+    immediately from the cache, and concurrent requests for the same document
+    share one export.
+    """
+
+    def __init__(self, output_dir: Path, max_workers: int = EXPORT_WORKERS):
+        self.cache_dir = Path(output_dir) / "exports"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._jobs: "OrderedDict[str, ExportJob]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._in_flight_formats: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, markdown_path: str, formats: List[str]) -> ExportJob:
+        """
+        Queue an export of a markdown document
+
+        Args:
+            markdown_path: Path to the markdown file
+            formats: Formats to export ['confluence', 'pdf', 'html']
+
+        Returns:
+            The job; already completed if every format was cached
+        """
+        with open(markdown_path, 'r') as f:
+            markdown_content = f.read()
+        digest = hashlib.sha256(markdown_content.encode('utf-8')).hexdigest()
+        formats = sorted(set(formats))
+        job = ExportJob(markdown_path, digest, formats)
+        artifact_dir = self.cache_dir / digest
+
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > MAX_EXPORT_JOBS:
+                self._jobs.popitem(last=False)
+
+            cached = self._cached_files(artifact_dir, formats)
+            if cached is not None:
+                job.cached = True
+                self._finish(job, markdown_path, cached)
+                return job
+
+            submitted = False
+            future = self._in_flight.get(digest)
+            if future is None or not set(formats) <= set(self._in_flight_formats[digest]):
+                # Cover everything already in flight so the new export supersedes it
+                export_formats = sorted(set(formats) | set(self._in_flight_formats.get(digest, [])))
+                future = self._executor().submit(_export_artifacts, markdown_content, str(artifact_dir), export_formats)
+                self._in_flight[digest] = future
+                self._in_flight_formats[digest] = export_formats
+                submitted = True
+            job._export = future
+
+        # Outside the lock: a callback runs immediately if the future is already done
+        if submitted:
+            future.add_done_callback(lambda f, digest=digest: self._release(digest, f))
+        future.add_done_callback(lambda f: self._complete(job, f))
+        return job
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        """Look up a job by id"""
+        return self._jobs.get(job_id)
+
+    def shutdown(self):
+        """Stop the worker pool, waiting for running exports"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def _cached_files(self, artifact_dir: Path, formats: List[str]) -> Optional[Dict[str, str]]:
+        """Exported files for the document if every format was already attempted"""
+        manifest_path = artifact_dir / MANIFEST_NAME
+        if not manifest_path.exists():
+            return None
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not set(formats) <= set(manifest.get('attempted', [])):
+            return None
+
+        files = {}
+        for fmt in formats + (['html'] if 'pdf' in formats else []):
+            name = manifest['files'].get(fmt)
+            if name:
+                if not (artifact_dir / name).exists():
+                    return None
+                files[fmt] = str(artifact_dir / name)
+        return files
+
+    def _release(self, digest: str, future: Future):
+        with self._lock:
+            if self._in_flight.get(digest) is future:
+                del self._in_flight[digest]
+                del self._in_flight_formats[digest]
+
+    def _complete(self, job: ExportJob, future: Future):
+        try:
+            exported = future.result()
+        except Exception as e:
+            logger.error(f"Export job {job.id} failed: {e}")
+            job.error = str(e)
+            job.finished_at = datetime.now()
+            job.future.set_result(None)
+            return
+
+        wanted = set(job.formats) | ({'html'} if 'pdf' in job.formats else set())
+        files = {fmt: path for fmt, path in exported.items() if fmt in wanted}
+        self._finish(job, job.markdown_path, files)
+
+    def _finish(self, job: ExportJob, markdown_path: str, files: Dict[str, str]):
+        job.files = {'markdown': markdown_path, **files}
+        job.finished_at = datetime.now()
+        job.future.set_result(job.files)
@@ -4,26 +4,94 @@ Modular Solution Generator
 A data-driven solution document generator that combines program configs, 
 customer contexts, and Postman collections without any hardcoded logic.
 """
+import os
+import copy
 import json
 import yaml
+import hashlib
+import threading
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, Iterator, List, Any, Optional, Tuple
 from datetime import datetime
 import argparse
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 from src.export_formatter import MultiFormatExporter
 from src.workflow_diagram_generator import WorkflowDiagramGenerator
 
 
+SECTION_CACHE_SIZE = int(os.getenv("SECTION_CACHE_SIZE", "256"))
+
+# Document sections in order, with the inputs each one reads from the
+# combined data. A section is re-rendered only when one of its inputs changes.
+SECTIONS = [
+    ('header', ('config', 'context', 'generation_date')),
+    ('executive_summary', ('config', 'context', 'postman')),
+    ('technical_overview', ('config',)),
+    ('use_cases', ('config', 'context')),
+    ('workflows', ('config', 'context', 'customer_name', 'diagrams')),
+    ('api_reference', ('config', 'postman')),
+    ('integration_guide', ('config',)),
+    ('security_compliance', ('config',)),
+    ('appendices', ('context', 'generation_date')),
+]
+
+
+class FileCache:
+    """
+    Parsed files memoized by path, invalidated when size or mtime changes
+    
+    Each caller gets its own copy of the parsed value, so callers may modify it.
+    """
+    
+    def __init__(self, parse: Callable[[Path, bytes], Any]):
+        self.parse = parse
+        self._entries: Dict[Path, Tuple[Tuple[int, int], Any, str]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, path: Path) -> Tuple[Any, str]:
+        """
+        Return the parsed file and the SHA-256 digest of its contents
+        
+        The file is only read and parsed again after it changes on disk.
+        """
+        stat = path.stat()
+        version = (stat.st_size, stat.st_mtime_ns)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == version:
+            return copy.deepcopy(entry[1]), entry[2]
+        
+        raw = path.read_bytes()
+        value = self.parse(path, raw)
+        digest = hashlib.sha256(raw).hexdigest()
+        with self._lock:
+            self._entries[path] = (version, value, digest)
+        return copy.deepcopy(value), digest
+    
+    def snapshot(self) -> Dict[Path, Tuple[Tuple[int, int], Any, str]]:
+        """Copy of the cached entries, e.g. to seed a worker process"""
+        with self._lock:
+            return dict(self._entries)
+    
+    def restore(self, entries: Dict[Path, Tuple[Tuple[int, int], Any, str]]):
+        """Add entries from a snapshot; stale ones are re-read on next access"""
+        with self._lock:
+            self._entries.update(entries)
+
+
 class ConfigLoader:
     """Load and validate program configurations"""
     
     def __init__(self, config_dir: Path):
         self.config_dir = config_dir
+        self._cache = FileCache(self._parse)
     
     def load(self, program_type: str) -> Dict[str, Any]:
         """Load program configuration from YAML"""
+        return self.load_with_digest(program_type)[0]
+    
+    def load_with_digest(self, program_type: str) -> Tuple[Dict[str, Any], str]:
+        """Load program configuration and the content digest of its file"""
         # Try enhanced version first, fall back to standard
         enhanced_path = self.config_dir / f"{program_type}_enhanced.yaml"
         standard_path = self.config_dir / f"{program_type}.yaml"
@@ -33,8 +101,10 @@ class ConfigLoader:
         if not config_path.exists():
             raise FileNotFoundError(f"No configuration found for program: {program_type}")
         
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        return self._cache.get(config_path)
+    
+    def _parse(self, config_path: Path, raw: bytes) -> Dict[str, Any]:
+        config = yaml.safe_load(raw)
         
         # Validate required fields
         self._validate_config(config)
@@ -54,11 +124,16 @@ class ContextLoader:
     
     def __init__(self, context_dir: Path):
         self.context_dir = context_dir
+        self._cache = FileCache(lambda path, raw: json.loads(raw))
     
     def load(self, customer_name: str) -> Optional[Dict[str, Any]]:
         """Load customer context from JSON"""
+        return self.load_with_digest(customer_name)[0]
+    
+    def load_with_digest(self, customer_name: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Load customer context and the content digest of its file"""
         if not customer_name:
-            return None
+            return None, None
         
         # Try v2 version first, fall back to v1
         v2_path = self.context_dir / f"{customer_name.lower().replace(' ', '_')}_context_v2.json"
@@ -67,22 +142,26 @@ class ContextLoader:
         context_path = v2_path if v2_path.exists() else v1_path
         
         if not context_path.exists():
-            return None  # Context is optional
+            return None, None  # Context is optional
         
-        with open(context_path, 'r') as f:
-            context = json.load(f)
-        
-        return context
+        return self._cache.get(context_path)
 
 
 class PostmanAnalyzer:
     """Analyze Postman collections for operations data"""
     
-    def __init__(self, postman_dir: Path):
+    def __init__(self, postman_dir: Path, store_path: Optional[Path] = None):
         self.postman_dir = postman_dir
+        self.store_path = store_path or postman_dir.parent / "operations_catalog.db"
+        self._store = None
+        self._cache = FileCache(self._analyze)
     
     def analyze(self, collection_name: str) -> Dict[str, Any]:
         """Analyze Postman collection and extract operations"""
+        return self.analyze_with_digest(collection_name)[0]
+    
+    def analyze_with_digest(self, collection_name: str) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Analyze Postman collection, returning the analysis and the collection digest"""
         collection_path = self.postman_dir / f"{collection_name}.json"
         
         if not collection_path.exists():
@@ -91,10 +170,16 @@ class PostmanAnalyzer:
                 'total_operations': 0,
                 'categories': {},
                 'operations': []
-            }
+            }, None
         
-        with open(collection_path, 'r') as f:
-            collection = json.load(f)
+        return self._cache.get(collection_path)
+    
+    def _analyze(self, collection_path: Path, raw: bytes) -> Dict[str, Any]:
+        stored = self._analyze_from_store(collection_path)
+        if stored is not None:
+            return stored
+        
+        collection = json.loads(raw)
         
         analysis = {
             'info': collection.get('info', {}),
@@ -113,6 +198,36 @@ class PostmanAnalyzer:
         
         return analysis
     
+    def _analyze_from_store(self, collection_path: Path) -> Optional[Dict[str, Any]]:
+        """Build the analysis from the operations store if it holds a current sync"""
+        if self._store is None:
+            from agent_common.operations_store import OperationsStore
+            self._store = OperationsStore.open_readonly(self.store_path) or False
+        if not self._store:
+            return None
+        
+        program = self._store.program_for_collection(collection_path)
+        if program is None:
+            return None
+        
+        analysis = {
+            'info': {'name': program['name'], 'description': program['description']},
+            'categories': defaultdict(list),
+            'operations': [],
+            'total_operations': 0
+        }
+        for op in self._store.get_operations(program['program_type']):
+            # Top-level requests have no folder, matching _process_item
+            category = op['metadata']['category'] if op['metadata']['path'] else None
+            operation = {'name': op['name'], 'category': category, 'method': op.get('method', 'POST')}
+            if category:
+                analysis['categories'][category].append(operation)
+            analysis['operations'].append(operation)
+        
+        analysis['total_operations'] = len(analysis['operations'])
+        analysis['categories'] = dict(analysis['categories'])
+        return analysis
+    
     def _process_item(self, item: Dict[str, Any], analysis: Dict[str, Any], 
                      category: Optional[str] = None):
         """Process Postman collection item"""
@@ -185,6 +300,19 @@ class ModularSolutionGenerator:
         
         self.output_dir = base_dir / "data" / "generated"
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Shared so compiled sequence templates are reused across requests
+        self._diagram_generator = None
+        
+        # Rendered sections keyed by a digest of their inputs (LRU)
+        self._section_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._section_lock = threading.Lock()
+    
+    @property
+    def diagram_generator(self) -> WorkflowDiagramGenerator:
+        if self._diagram_generator is None:
+            self._diagram_generator = WorkflowDiagramGenerator(self.base_dir)
+        return self._diagram_generator
     
     def generate(self, program_type: str, customer_name: Optional[str] = None, 
                  export_formats: Optional[List[str]] = None) -> Dict[str, str]:
@@ -199,10 +327,79 @@ class ModularSolutionGenerator:
         Returns:
             Dictionary with paths to all generated files
         """
-        # Load all data sources
-        config = self.config_loader.load(program_type)
-        context = self.context_loader.load(customer_name)
-        postman = self.postman_analyzer.analyze(program_type)
+        _, markdown_path = self.generate_document(program_type, customer_name)
+        
+        # Export to additional formats if requested
+        if export_formats:
+            exporter = MultiFormatExporter(self.output_dir)
+            exported_files = exporter.export_document(markdown_path, export_formats)
+            return exported_files
+        else:
+            return {'markdown': markdown_path}
+    
+    def generate_document(self, program_type: str,
+                          customer_name: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Generate and save the markdown document
+        
+        Returns:
+            The document content and the path it was saved to
+        """
+        document = "\n\n".join(text for _, text in self.iter_sections(program_type, customer_name))
+        return document, self.save_document(document, program_type, customer_name)
+    
+    def iter_sections(self, program_type: str,
+                      customer_name: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+        """
+        Render the document section by section
+        
+        Inputs are loaded before this returns, so a missing program config
+        raises immediately; each section is rendered as it is consumed.
+        
+        Returns:
+            Iterator of (section name, markdown) in document order
+        """
+        data, inputs = self._load_inputs(program_type, customer_name)
+        return ((name, self._render_section(name, keys, data, inputs)) for name, keys in SECTIONS)
+    
+    def input_digest(self, program_type: str, customer_name: Optional[str] = None) -> str:
+        """
+        Digest of everything a document is generated from
+        
+        Changes whenever the program config, customer context, Postman
+        collection or sequence diagrams change; the generation date is excluded.
+        """
+        _, inputs = self._load_inputs(program_type, customer_name)
+        return hashlib.sha256(json.dumps(
+            {k: v for k, v in inputs.items() if k != 'generation_date'}, sort_keys=True
+        ).encode()).hexdigest()
+    
+    def cache_state(self) -> Dict[str, Dict]:
+        """Parsed configs, contexts and Postman analyses held by the loaders"""
+        return {
+            'config': self.config_loader._cache.snapshot(),
+            'context': self.context_loader._cache.snapshot(),
+            'postman': self.postman_analyzer._cache.snapshot()
+        }
+    
+    def restore_cache_state(self, state: Dict[str, Dict]):
+        """Seed the loaders from another generator's cache_state()"""
+        self.config_loader._cache.restore(state.get('config', {}))
+        self.context_loader._cache.restore(state.get('context', {}))
+        self.postman_analyzer._cache.restore(state.get('postman', {}))
+    
+    def _load_inputs(self, program_type: str,
+                     customer_name: Optional[str]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Load all data sources (memoized until the files change)
+        
+        The customer's sequence diagrams are instantiated here if they do not
+        exist yet, outside the section cache, so they are always written and
+        fingerprinted as they will be read.
+        """
+        config, config_digest = self.config_loader.load_with_digest(program_type)
+        context, context_digest = self.context_loader.load_with_digest(customer_name)
+        postman, postman_digest = self.postman_analyzer.analyze_with_digest(program_type)
         
         # Combine data
         data = {
@@ -212,50 +409,49 @@ class ModularSolutionGenerator:
             'customer_name': customer_name,
             'generation_date': datetime.now().strftime('%Y-%m-%d')
         }
+        data['diagrams'] = self._resolve_diagrams(data)
         
-        # Generate sections
-        sections = []
-        
-        # Header
-        sections.append(self._generate_header(data))
-        
-        # Executive Summary
-        sections.append(self._generate_executive_summary(data))
-        
-        # Technical Overview
-        sections.append(self._generate_technical_overview(data))
-        
-        # Use Cases
-        sections.append(self._generate_use_cases(data))
-        
-        # Implementation Workflows
-        sections.append(self._generate_workflows(data))
-        
-        # API Operations Reference
-        sections.append(self._generate_api_reference(data))
-        
-        # Integration Guide
-        sections.append(self._generate_integration_guide(data))
-        
-        # Security & Compliance
-        sections.append(self._generate_security_compliance(data))
-        
-        # Appendices
-        sections.append(self._generate_appendices(data))
-        
-        # Combine sections
-        document = "\n\n".join(sections)
-        
-        # Save markdown document
-        markdown_path = self._save_document(document, program_type, customer_name)
-        
-        # Export to additional formats if requested
-        if export_formats:
-            exporter = MultiFormatExporter(self.output_dir)
-            exported_files = exporter.export_document(markdown_path, export_formats)
-            return exported_files
-        else:
-            return {'markdown': markdown_path}
+        # Identity of each input, used to key the rendered sections
+        inputs = {
+            'config': config_digest,
+            'context': context_digest,
+            'postman': postman_digest,
+            'customer_name': customer_name,
+            'generation_date': data['generation_date'],
+            'diagrams': self._diagram_fingerprint(data['diagrams'])
+        }
+        return data, inputs
+    
+    def _render_section(self, name: str, keys: Tuple[str, ...],
+                        data: Dict[str, Any], inputs: Dict[str, Any]) -> str:
+        """Render a section, reusing the cached text if its inputs are unchanged"""
+        key = hashlib.sha256(
+            "\0".join([name] + [f"{k}={inputs[k]}" for k in keys]).encode()
+        ).hexdigest()
+        with self._section_lock:
+            text = self._section_cache.get(key)
+            if text is not None:
+                self._section_cache.move_to_end(key)
+                return text
+        
+        text = getattr(self, f"_generate_{name}")(data)
+        with self._section_lock:
+            self._section_cache[key] = text
+            while len(self._section_cache) > SECTION_CACHE_SIZE:
+                self._section_cache.popitem(last=False)
+        return text
+    
+    @staticmethod
+    def _diagram_fingerprint(diagrams: Dict[str, str]) -> str:
+        """Size/mtime of the sequence diagrams the workflows section reads"""
+        entries = []
+        for workflow_id, path in sorted(diagrams.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append(f"{workflow_id}:{path}:{stat.st_size}:{stat.st_mtime_ns}")
+        return hashlib.sha256("\n".join(entries).encode()).hexdigest()
     
     def _generate_header(self, data: Dict[str, Any]) -> str:
         """Generate document header"""
@@ -453,51 +649,62 @@ The solution is built on a modern GraphQL API architecture providing:
         
         return use_cases
     
+    def _resolve_diagrams(self, data: Dict[str, Any]) -> Dict[str, str]:
+        """Workflow id -> customer sequence diagram, instantiating them from templates if needed"""
+        config = data['config']
+        if 'workflows' not in config:
+            return {}
+        program_type = config.get('program_type', 'unknown')
+        
+        # Generate or use existing sequence diagrams for workflows
+        diagrams = {}
+        try:
+            diagram_gen = self.diagram_generator
+            
+            # Get customer and vendor names from data
+            customer_name = data.get('customer_name')
+            if not customer_name and data.get('context'):
+                customer_name = data['context'].get('customer', {}).get('name')
+            
+            vendor_name = "Highnote"  # Default vendor
+            if data.get('context') and data['context'].get('vendor'):
+                vendor_name = data['context']['vendor'].get('name', vendor_name)
+            
+            # Check if instantiated diagrams exist for this customer
+            customer_dir = customer_name.lower().replace(' ', '_').replace('.', '') if customer_name else None
+            instantiated_dir = self.base_dir / "data" / "sequences" / program_type / customer_dir if customer_dir else None
+            
+            if instantiated_dir and instantiated_dir.exists():
+                # Use existing instantiated diagrams
+                for workflow_id in config['workflows'].keys():
+                    diagram_file = instantiated_dir / f"{workflow_id}.md"
+                    if diagram_file.exists():
+                        diagrams[workflow_id] = str(diagram_file)
+            else:
+                # Generate new instantiated diagrams from templates
+                if customer_name and vendor_name:
+                    additional_replacements = {}
+                    if data.get('context') and data['context'].get('webhook_service'):
+                        additional_replacements['WEBHOOK_SERVICE'] = data['context']['webhook_service']
+                    
+                    diagrams = diagram_gen.batch_instantiate(
+                        program_type, customer_name, vendor_name, additional_replacements
+                    )
+        except Exception as e:
+            diagrams = {}
+            print(f"Note: Could not generate/load diagrams: {e}")
+        
+        return diagrams
+    
     def _generate_workflows(self, data: Dict[str, Any]) -> str:
         """Generate implementation workflows from config with diagrams"""
         config = data['config']
-        program_type = config.get('program_type', 'unknown')
         
         workflows_text = "## Implementation Workflows\n\n"
         
         if 'workflows' in config:
-            # Generate or use existing sequence diagrams for workflows
-            diagrams = {}
-            try:
-                diagram_gen = WorkflowDiagramGenerator(self.base_dir)
-                
-                # Get customer and vendor names from data
-                customer_name = data.get('customer_name')
-                if not customer_name and data.get('context'):
-                    customer_name = data['context'].get('customer', {}).get('name')
-                
-                vendor_name = "Highnote"  # Default vendor
-                if data.get('context') and data['context'].get('vendor'):
-                    vendor_name = data['context']['vendor'].get('name', vendor_name)
-                
-                # Check if instantiated diagrams exist for this customer
-                customer_dir = customer_name.lower().replace(' ', '_').replace('.', '') if customer_name else None
-                instantiated_dir = self.base_dir / "data" / "sequences" / program_type / customer_dir if customer_dir else None
-                
-                if instantiated_dir and instantiated_dir.exists():
-                    # Use existing instantiated diagrams
-                    for workflow_id in config['workflows'].keys():
-                        diagram_file = instantiated_dir / f"{workflow_id}.md"
-                        if diagram_file.exists():
-                            diagrams[workflow_id] = str(diagram_file)
-                else:
-                    # Generate new instantiated diagrams from templates
-                    if customer_name and vendor_name:
-                        additional_replacements = {}
-                        if data.get('context') and data['context'].get('webhook_service'):
-                            additional_replacements['WEBHOOK_SERVICE'] = data['context']['webhook_service']
-                        
-                        diagrams = diagram_gen.batch_instantiate(
-                            program_type, customer_name, vendor_name, additional_replacements
-                        )
-            except Exception as e:
-                diagrams = {}
-                print(f"Note: Could not generate/load diagrams: {e}")
+            # Sequence diagrams resolved by _load_inputs
+            diagrams = data.get('diagrams', {})
             
             for workflow_id, workflow in config['workflows'].items():
                 workflows_text += f"### {workflow['name']}\n\n"
@@ -739,7 +946,7 @@ The solution is built on a modern GraphQL API architecture providing:
         
         return appendices
     
-    def _save_document(self, document: str, program_type: str, 
+    def save_document(self, document: str, program_type: str, 
                       customer_name: Optional[str]) -> str:
         """Save generated document"""
         # Create output directory structure
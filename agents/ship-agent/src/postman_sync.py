@@ -4,14 +4,18 @@ Postman Sync Utility
 
 Synchronizes operations from Postman collections (source of truth) to operations JSON files.
 This ensures consistency between what's in Postman and what the solution generator uses.
+Each synced collection is also written to the shared SQLite operations store.
 """
 
 import json
+import hashlib
 import logging
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+from agent_common.operations_store import normalize_program_type
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -96,6 +100,7 @@ class PostmanOperationExtractor:
                 'name': item.get('name', 'Unknown'),
                 'program_type': program_type,
                 'operation_type': graphql_info['operation_type'],
+                'method': request.get('method', 'POST'),
                 'graphql': {
                     'query': graphql_info['query'],
                     'variables': graphql_info['variables']
@@ -141,11 +146,23 @@ class PostmanOperationExtractor:
 class PostmanToOperationsSync:
     """Syncs Postman collections to operations JSON files"""
     
-    def __init__(self, postman_dir: Path = None, operations_dir: Path = None):
+    def __init__(self, postman_dir: Path = None, operations_dir: Path = None,
+                 store_path: Optional[Path] = None, use_store: bool = True):
         base_dir = Path(__file__).parent.parent
         self.postman_dir = postman_dir or base_dir / "data" / "postman"
         self.operations_dir = operations_dir or base_dir / "data" / "operations"
         self.operations_dir.mkdir(parents=True, exist_ok=True)
+        self.store_path = store_path or self.operations_dir.parent / "operations_catalog.db"
+        self.use_store = use_store
+        self._store = None
+    
+    @property
+    def store(self):
+        """Writable operations store, opened on first sync"""
+        if self._store is None and self.use_store:
+            from agent_common.operations_store import OperationsStore
+            self._store = OperationsStore(self.store_path)
+        return self._store
     
     def sync_all(self) -> Dict[str, int]:
         """Sync all Postman collections to operations files"""
@@ -160,14 +177,22 @@ class PostmanToOperationsSync:
                 logger.error(f"Failed to sync {postman_file}: {e}")
                 results[postman_file.stem] = -1
         
+        # Drop stored programs whose collection was deleted
+        if self.use_store:
+            present = {p.name for p in self.postman_dir.glob('*.json')}
+            for program in self.store.list_programs():
+                if program['collection_file'] and program['collection_file'] not in present:
+                    self.store.remove_collection(program['collection_file'])
+        
         return results
     
     def sync_collection(self, postman_file: Path) -> int:
         """Sync a single Postman collection to operations file"""
         
         # Load Postman collection
-        with open(postman_file, 'r') as f:
-            collection = json.load(f)
+        with open(postman_file, 'rb') as f:
+            raw = f.read()
+        collection = json.loads(raw)
         
         # Determine program type from filename
         program_type = self._get_program_type(postman_file.stem)
@@ -187,35 +212,45 @@ class PostmanToOperationsSync:
         logger.info(f"Saved {len(operations)} operations to {output_file}")
         
         # Also update the YAML config if it exists
-        self._update_yaml_config(program_type, operations)
+        config = self._update_yaml_config(program_type, operations)
+        
+        self._store_collection(postman_file, hashlib.sha256(raw).hexdigest(), collection,
+                               program_type, operations, config)
         
         return len(operations)
     
+    def _store_collection(self, postman_file: Path, content_hash: str, collection: Dict[str, Any],
+                          program_type: str, operations: List[Dict[str, Any]],
+                          config: Optional[Dict[str, Any]]):
+        """Record the synced collection in the shared operations store"""
+        if not self.use_store:
+            return
+        info = collection.get('info', {})
+        description = info.get('description', '')
+        if isinstance(description, dict):
+            description = description.get('content', '')
+        try:
+            self.store.replace_program(
+                program_type, info.get('name', postman_file.stem), operations,
+                collection_file=postman_file, content_hash=content_hash,
+                description=description,
+                workflows=(config or {}).get('workflows')
+            )
+        except Exception as e:
+            logger.warning(f"Could not update operations store for {program_type}: {e}")
+    
     def _get_program_type(self, collection_name: str) -> str:
         """Convert collection name to program type"""
-        # Handle special cases
-        mappings = {
-            'Consumer Credit': 'consumer_credit',
-            'Trip.com': 'trip_com',
-            'Trip_com': 'trip_com',
-            'AP Automation': 'ap_automation',
-            'Fleet': 'fleet'
-        }
-        
-        if collection_name in mappings:
-            return mappings[collection_name]
-        
-        # Default: lowercase with underscores
-        return collection_name.lower().replace(' ', '_').replace('-', '_').replace('.', '_')
+        return normalize_program_type(collection_name)
     
-    def _update_yaml_config(self, program_type: str, operations: List[Dict[str, Any]]):
-        """Update YAML config with operation categories from Postman"""
+    def _update_yaml_config(self, program_type: str, operations: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Update YAML config with operation categories from Postman; returns the updated config"""
         yaml_dir = self.operations_dir.parent / 'programs'
         yaml_file = yaml_dir / f"{program_type}.yaml"
         
         if not yaml_file.exists():
             logger.info(f"No YAML config found for {program_type}, skipping update")
-            return
+            return None
         
         try:
             import yaml
@@ -247,9 +282,11 @@ class PostmanToOperationsSync:
                 yaml.dump(config, f, default_flow_style=False, sort_keys=False)
             
             logger.info(f"Updated YAML config for {program_type}")
+            return config
             
         except Exception as e:
             logger.warning(f"Could not update YAML for {program_type}: {e}")
+            return None
 
 
 def main():
@@ -22,11 +22,13 @@ logger = logging.getLogger(__name__)
 class PostmanToYamlGenerator:
     """Generate program YAML configurations from Postman collections"""
     
-    def __init__(self, postman_dir: Path = None, programs_dir: Path = None):
+    def __init__(self, postman_dir: Path = None, programs_dir: Path = None, store_path: Path = None):
         """Initialize generator with directories"""
         base_dir = Path(__file__).parent.parent
         self.postman_dir = postman_dir or base_dir / "data" / "postman"
         self.programs_dir = programs_dir or base_dir / "data" / "programs"
+        self.store_path = store_path or self.postman_dir.parent / "operations_catalog.db"
+        self._store = None
         
         # Common operation patterns for workflow detection
         self.workflow_patterns = {
@@ -295,18 +297,17 @@ class PostmanToYamlGenerator:
     
     def generate_yaml_config(self, collection_path: Path) -> Dict[str, Any]:
         """Generate YAML configuration from a Postman collection"""
-        # Load Postman collection
-        with open(collection_path, 'r') as f:
-            collection = json.load(f)
+        # Prefer the operations store when it holds a current sync of this collection
+        info, operations = self._load_from_store(collection_path)
+        if info is None:
+            with open(collection_path, 'r') as f:
+                collection = json.load(f)
+            info = collection.get('info', {})
+            operations = []
+            self._extract_operations_recursive(collection.get('item', []), operations)
         
-        # Extract collection info
-        info = collection.get('info', {})
         collection_name = info.get('name', 'Unknown')
         
-        # Extract all operations
-        operations = []
-        self._extract_operations_recursive(collection.get('item', []), operations)
-        
         # Categorize operations
         categories = self.categorize_operations(operations)
         
@@ -381,6 +382,35 @@ class PostmanToYamlGenerator:
         
         return config
     
+    def _load_from_store(self, collection_path: Path):
+        """Return (info, operations) from the operations store, or (None, None) if not current"""
+        if self._store is None:
+            from agent_common.operations_store import OperationsStore
+            self._store = OperationsStore.open_readonly(self.store_path) or False
+        if not self._store:
+            return None, None
+        
+        program = self._store.program_for_collection(collection_path)
+        if program is None:
+            return None, None
+        
+        operations = []
+        for op in self._store.get_operations(program['program_type']):
+            # Rebuild the request item so extraction matches the collection path exactly
+            item = {
+                'name': op['name'],
+                'description': op['metadata']['description'],
+                'request': {'body': {'graphql': {'query': op['graphql']['query']}}}
+            }
+            op_info = self.extract_operation_info(item)
+            if op_info:
+                operations.append(op_info)
+        
+        info = {'name': program['name']}
+        if program['description']:
+            info['description'] = program['description']
+        return info, operations
+    
     def _extract_operations_recursive(self, items: List[Dict[str, Any]], 
                                      operations: List[Dict[str, Any]]):
         """Recursively extract operations from Postman collection items"""
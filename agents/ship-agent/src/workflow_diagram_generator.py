@@ -6,8 +6,12 @@ Generates Mermaid sequence diagram templates with alias support.
 Creates reusable templates that can be customized for different customers and vendors.
 """
 
+import os
 import yaml
 import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
@@ -17,6 +21,77 @@ import re
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+PLACEHOLDER_RE = re.compile(r"\{\{([^{}]+)\}\}")
+INSTANTIATE_WORKERS = int(os.getenv("INSTANTIATE_WORKERS", "8"))
+
+
+class CompiledTemplate:
+    """A template split once into literal text and placeholder segments"""
+    
+    def __init__(self, content: str):
+        # Even indices are literal text, odd indices are placeholder names
+        self.segments = PLACEHOLDER_RE.split(content)
+        self.placeholders = set(self.segments[1::2])
+    
+    def render(self, replacements: Dict[str, str]) -> str:
+        """Substitute all placeholders in a single pass; unknown ones are kept as-is"""
+        parts = list(self.segments)
+        for i in range(1, len(parts), 2):
+            name = parts[i]
+            parts[i] = replacements[name] if name in replacements else f"{{{{{name}}}}}"
+        return "".join(parts)
+
+
+@lru_cache(maxsize=4096)
+def _actor_aliases(operation: str) -> Tuple[str, str]:
+    """Source and target actor aliases for an operation (pure, memoized)"""
+    op_lower = operation.lower()
+    
+    # Default: Customer interacts with Vendor
+    source = "CUSTOMER"
+    target = "VENDOR"
+
+    # Special cases for other participants
+    if any(keyword in op_lower for keyword in ['webhook', 'event', 'notification']):
+        if 'callback' in op_lower or 'notify' in op_lower:
+            source = "VENDOR"
+            target = "CUSTOMER"
+        else:
+            source = "CUSTOMER"
+            target = "WEBHOOK"
+    elif any(keyword in op_lower for keyword in ['external', 'third']):
+        target = "EXTERNAL"
+    elif any(keyword in op_lower for keyword in ['auth', 'authenticate']):
+        target = "AUTH"
+    elif any(keyword in op_lower for keyword in ['payment', 'charge', 'transaction']):
+        if 'process' in op_lower or 'charge' in op_lower:
+            target = "PAYMENT"
+
+    return source, target
+
+
+@lru_cache(maxsize=4096)
+def _response_type(operation: str) -> str:
+    """Response type label for an operation (pure, memoized)"""
+    op_lower = operation.lower()
+
+    if 'create' in op_lower:
+        return "Created (201)"
+    elif 'update' in op_lower or 'modify' in op_lower:
+        return "Updated (200)"
+    elif 'delete' in op_lower or 'remove' in op_lower:
+        return "Deleted (204)"
+    elif 'get' in op_lower or 'list' in op_lower or 'query' in op_lower:
+        return "Data Response (200)"
+    elif 'activate' in op_lower or 'enable' in op_lower:
+        return "Activated (200)"
+    elif 'suspend' in op_lower or 'disable' in op_lower:
+        return "Suspended (200)"
+    elif 'simulate' in op_lower:
+        return "Simulation Complete"
+    else:
+        return "Success (200)"
+
 
 class WorkflowDiagramGenerator:
     """Generate Mermaid sequence diagram templates with alias support"""
@@ -44,10 +119,37 @@ class WorkflowDiagramGenerator:
             'AUTH': 'Auth Service',
             'PAYMENT': 'Payment Processor'
         }
+        
+        # Compiled templates by path, with the (size, mtime) they were read at
+        self._compiled: Dict[Path, Tuple[Tuple[int, int], CompiledTemplate]] = {}
+        # Generated workflow diagrams keyed by a digest of the workflow definition
+        self._workflow_templates: Dict[str, str] = {}
+    
+    def compile_template(self, template_path: Path) -> CompiledTemplate:
+        """Compile a template file, reusing the cached one until the file changes"""
+        stat = template_path.stat()
+        version = (stat.st_size, stat.st_mtime_ns)
+        cached = self._compiled.get(template_path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        with open(template_path, 'r') as f:
+            compiled = CompiledTemplate(f.read())
+        self._compiled[template_path] = (version, compiled)
+        return compiled
     
     def generate_workflow_template(self, workflow_name: str, workflow_data: Dict[str, Any], 
                                   program_type: str) -> str:
         """Generate a Mermaid sequence diagram template with aliases"""
+        key = hashlib.sha256(json.dumps(
+            [workflow_name, program_type, workflow_data], sort_keys=True, default=str
+        ).encode()).hexdigest()
+        template = self._workflow_templates.get(key)
+        if template is None:
+            template = self._workflow_templates[key] = self._build_workflow_template(workflow_name, workflow_data)
+        return template
+    
+    def _build_workflow_template(self, workflow_name: str, workflow_data: Dict[str, Any]) -> str:
         diagram_lines = []
         
         # Start Mermaid diagram with alias definitions
@@ -164,50 +266,11 @@ class WorkflowDiagramGenerator:
     
     def _determine_actor_aliases(self, operation: str) -> Tuple[str, str]:
         """Determine source and target actor aliases for an operation"""
-        op_lower = operation.lower()
-        
-        # Default: Customer interacts with Vendor
-        source = "CUSTOMER"
-        target = "VENDOR"
-        
-        # Special cases for other participants
-        if any(keyword in op_lower for keyword in ['webhook', 'event', 'notification']):
-            if 'callback' in op_lower or 'notify' in op_lower:
-                source = "VENDOR"
-                target = "CUSTOMER"
-            else:
-                source = "CUSTOMER"
-                target = "WEBHOOK"
-        elif any(keyword in op_lower for keyword in ['external', 'third']):
-            target = "EXTERNAL"
-        elif any(keyword in op_lower for keyword in ['auth', 'authenticate']):
-            target = "AUTH"
-        elif any(keyword in op_lower for keyword in ['payment', 'charge', 'transaction']):
-            if 'process' in op_lower or 'charge' in op_lower:
-                target = "PAYMENT"
-        
-        return source, target
+        return _actor_aliases(operation)
     
     def _determine_response_type(self, operation: str) -> str:
         """Determine the response type based on operation"""
-        op_lower = operation.lower()
-        
-        if 'create' in op_lower:
-            return "Created (201)"
-        elif 'update' in op_lower or 'modify' in op_lower:
-            return "Updated (200)"
-        elif 'delete' in op_lower or 'remove' in op_lower:
-            return "Deleted (204)"
-        elif 'get' in op_lower or 'list' in op_lower or 'query' in op_lower:
-            return "Data Response (200)"
-        elif 'activate' in op_lower or 'enable' in op_lower:
-            return "Activated (200)"
-        elif 'suspend' in op_lower or 'disable' in op_lower:
-            return "Suspended (200)"
-        elif 'simulate' in op_lower:
-            return "Simulation Complete"
-        else:
-            return "Success (200)"
+        return _response_type(operation)
     
     def generate_program_templates(self, program_type: str) -> Dict[str, str]:
         """Generate template diagrams for all workflows in a program"""
@@ -272,6 +335,7 @@ class WorkflowDiagramGenerator:
             
             for workflow_name, workflow_data in workflows.items():
                 f.write(f"## {workflow_data.get('name', workflow_name.title())}\n\n")
+                # Memoized by generate_workflow_template above
                 template = self.generate_workflow_template(workflow_name, workflow_data, program_type)
                 f.write(template)
                 f.write("\n\n---\n\n")
@@ -283,22 +347,9 @@ class WorkflowDiagramGenerator:
     def instantiate_template(self, template_path: Path, replacements: Dict[str, str], 
                             output_path: Path = None) -> str:
         """Instantiate a template with specific values"""
-        # Read template
-        with open(template_path, 'r') as f:
-            content = f.read()
-        
-        # Replace placeholders
-        for placeholder, value in replacements.items():
-            # Replace in participant declarations
-            content = content.replace(f"{{{{{placeholder}}}}}", value)
-            # Also replace alias references if needed
-            if placeholder.endswith('_NAME'):
-                alias = placeholder.replace('_NAME', '')
-                if alias in self.default_aliases:
-                    # Update participant declaration
-                    old_pattern = f"participant {alias} as {{{{{placeholder}}}}}"
-                    new_pattern = f"participant {alias} as {value}"
-                    content = content.replace(old_pattern, new_pattern)
+        # Compiled once per template file; participant declarations and all
+        # other {{PLACEHOLDER}} occurrences are substituted in one pass
+        content = self.compile_template(template_path).render(replacements)
         
         # Save if output path provided
         if output_path:
@@ -347,6 +398,28 @@ class WorkflowDiagramGenerator:
         logger.info(f"Instantiated {len(instantiated)} templates for {customer_name}")
         
         return instantiated
+    
+    def batch_instantiate_many(self, requests: List[Tuple[str, str, str, Optional[Dict[str, str]]]],
+                               max_workers: int = INSTANTIATE_WORKERS) -> Dict[Tuple[str, str], Any]:
+        """
+        Instantiate templates for many (program, customer) pairs in parallel
+        
+        Args:
+            requests: (program_type, customer_name, vendor_name, additional_replacements) tuples
+            max_workers: Worker threads; compiled templates are shared between them
+        
+        Returns:
+            (program_type, customer_name) -> instantiated files, or the exception raised
+        """
+        def instantiate(request):
+            try:
+                return self.batch_instantiate(*request)
+            except Exception as e:
+                return e
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(instantiate, requests))
+        return {(request[0], request[1]): result for request, result in zip(requests, results)}
 
 
 def main():
@@ -367,6 +440,10 @@ Examples:
   
   # Generate templates for all programs
   python workflow_diagram_generator.py --all-templates
+  
+  # Instantiate several programs for several customers in parallel
+  python workflow_diagram_generator.py --program ap_automation,consumer_credit --instantiate \\
+      --customer "TripLink.com,Acme Corp" --vendor "Highnote"
         """
     )
     
@@ -382,6 +459,8 @@ Examples:
     parser.add_argument('--webhook-service', help='Webhook service name')
     parser.add_argument('--external-service', help='External service name')
     parser.add_argument('--output-dir', help='Custom output directory')
+    parser.add_argument('--workers', type=int, default=INSTANTIATE_WORKERS,
+                       help='Parallel instantiation workers')
     
     args = parser.parse_args()
     
@@ -428,15 +507,22 @@ Examples:
         if args.external_service:
             additional['EXTERNAL_SERVICE'] = args.external_service
         
-        try:
-            instantiated = generator.batch_instantiate(
-                args.program, args.customer, args.vendor, additional
-            )
-            print(f"Successfully instantiated {len(instantiated)} diagrams for {args.customer}:")
+        requests = [
+            (program, customer.strip(), args.vendor, additional)
+            for program in args.program.split(',')
+            for customer in args.customer.split(',')
+        ]
+        results = generator.batch_instantiate_many(requests, args.workers)
+        failed = False
+        for (program, customer), instantiated in results.items():
+            if isinstance(instantiated, Exception):
+                print(f"Error ({program}, {customer}): {instantiated}")
+                failed = True
+                continue
+            print(f"Successfully instantiated {len(instantiated)} {program} diagrams for {customer}:")
             for workflow, path in instantiated.items():
                 print(f"  - {workflow}: {path}")
-        except Exception as e:
-            print(f"Error: {e}")
+        if failed:
             return 1
     
     else:
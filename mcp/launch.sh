@@ -71,4 +71,6 @@ echo "Starting server..."
 echo ""
 
 cd "$SCRIPT_DIR"
+# Shared operations store (agents/common), unless agent-common is installed
+export PYTHONPATH="$SCRIPT_DIR/../agents/common${PYTHONPATH:+:$PYTHONPATH}"
 python -m src.data_server
\ No newline at end of file
@@ -88,4 +88,6 @@ echo "Starting server..."
 echo ""
 
 cd "$SCRIPT_DIR"
+# Shared operations store (agents/common), unless agent-common is installed
+export PYTHONPATH="$SCRIPT_DIR/../agents/common${PYTHONPATH:+:$PYTHONPATH}"
 python -m src.solutions_mcp_server_v2
\ No newline at end of file
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+"""
+Prebuild the indexed GraphQL schema catalog for the Data MCP server
+
+Parses highnote.graphql once with graphql-core and writes the catalog
+(records plus name/field/type/enum-value indexes) to cache/schema_catalog.pkl,
+so the server starts without re-parsing the SDL.
+"""
+
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.schema_catalog import SchemaCatalog
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MCP_DIR = Path(__file__).parent.parent
+DEFAULT_SCHEMA = MCP_DIR.parent / "agents" / "schema-agent" / "schema" / "highnote.graphql"
+DEFAULT_CATALOG = MCP_DIR / "cache" / "schema_catalog.pkl"
+
+
+def main():
+    """Build and persist the schema catalog"""
+    parser = argparse.ArgumentParser(description="Prebuild the MCP schema catalog")
+    parser.add_argument("--schema", default=str(DEFAULT_SCHEMA), help="Path to GraphQL SDL")
+    parser.add_argument("--out", default=str(DEFAULT_CATALOG), help="Catalog output path")
+    args = parser.parse_args()
+
+    schema_file = Path(args.schema)
+    start = time.perf_counter()
+    catalog = SchemaCatalog.from_sdl(schema_file.read_text())
+    catalog.save(Path(args.out), SchemaCatalog.fingerprint(schema_file))
+
+    logger.info(f"Catalog built in {time.perf_counter() - start:.2f}s -> {args.out}")
+    logger.info(f"  Types: {len(catalog.types)}")
+    logger.info(f"  Operations: {len(catalog.operations)}")
+    logger.info(f"  Distinct field names: {len(catalog.field_names.terms)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,6 @@ Design principles:
 
 import json
 import logging
-import re
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, asdict
@@ -26,6 +25,8 @@ from mcp.server.models import InitializationOptions
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 
+from src.schema_catalog import SchemaCatalog
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -35,36 +36,10 @@ BASE_DIR = Path(__file__).parent.parent.parent
 SCHEMA_DIR = BASE_DIR / "agents" / "schema-agent"
 DOC_DIR = BASE_DIR / "agents" / "document-agent"
 SHIP_DIR = BASE_DIR / "agents" / "ship-agent"
-
-
-@dataclass
-class GraphQLType:
-    """Represents a GraphQL type definition"""
-    name: str
-    kind: str  # type, interface, enum, input, scalar
-    description: Optional[str] = None
-    fields: Optional[List[Dict[str, Any]]] = None
-    values: Optional[List[str]] = None  # For enums
-
-
-@dataclass
-class GraphQLOperation:
-    """Represents a GraphQL operation"""
-    name: str
-    type: str  # query, mutation, subscription
-    description: Optional[str] = None
-    arguments: Optional[List[Dict[str, str]]] = None
-    return_type: Optional[str] = None
-
-
-@dataclass
-class DocumentChunk:
-    """Represents a documentation chunk"""
-    id: str
-    content: str
-    category: Optional[str] = None
-    source: Optional[str] = None
-    metadata: Optional[Dict[str, Any]] = None
+# Written by the ship agent's Postman sync
+OPERATIONS_DB_PATH = SHIP_DIR / "data" / "operations_catalog.db"
+CACHE_DIR = Path(__file__).parent.parent / "cache"
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "server_config.json"
 
 
 @dataclass
@@ -89,8 +64,10 @@ class DataMCPServer:
         # Load data sources
         logger.info("Loading data sources...")
         self.schema_data = self._load_schema_data()
-        self.doc_chunks = self._load_documentation()
         self.programs = self._load_programs()
+        self._doc_index = None
+        self._knowledge_base = None
+        self._operations_store = None
         
         # Register MCP handlers
         self._register_handlers()
@@ -98,87 +75,46 @@ class DataMCPServer:
         logger.info(f"Server initialized with:")
         logger.info(f"  - {len(self.schema_data.get('types', {}))} GraphQL types")
         logger.info(f"  - {len(self.schema_data.get('operations', {}))} GraphQL operations")
-        logger.info(f"  - {len(self.doc_chunks)} documentation chunks")
+        logger.info("  - documentation index loads on first search")
         logger.info(f"  - {len(self.programs)} programs")
     
     def _load_schema_data(self) -> Dict[str, Any]:
-        """Load and parse GraphQL schema"""
+        """Load the indexed schema catalog (prebuilt if the SDL is unchanged)"""
         schema_file = SCHEMA_DIR / "schema" / "highnote.graphql"
         
         if not schema_file.exists():
             logger.warning(f"Schema file not found: {schema_file}")
+            self.schema_catalog = SchemaCatalog({}, {})
             return {"types": {}, "operations": {}}
         
-        with open(schema_file, 'r') as f:
-            schema_content = f.read()
-        
-        types = {}
-        operations = {}
-        
-        # Parse types
-        type_pattern = r'(type|interface|enum|input|scalar)\s+(\w+)(?:\s+implements\s+[^{]+)?\s*\{([^}]*)\}'
-        for match in re.finditer(type_pattern, schema_content, re.MULTILINE | re.DOTALL):
-            kind = match.group(1)
-            name = match.group(2)
-            body = match.group(3)
-            
-            if kind == "enum":
-                # Parse enum values
-                values = re.findall(r'^\s*(\w+)', body, re.MULTILINE)
-                types[name] = GraphQLType(name=name, kind=kind, values=values)
-            else:
-                # Parse fields
-                fields = []
-                field_pattern = r'^\s*(\w+)(?:\([^)]*\))?\s*:\s*([^\n#]+)'
-                for field_match in re.finditer(field_pattern, body, re.MULTILINE):
-                    fields.append({
-                        "name": field_match.group(1),
-                        "type": field_match.group(2).strip()
-                    })
-                types[name] = GraphQLType(name=name, kind=kind, fields=fields)
-        
-        # Parse operations (simplified - in real implementation would parse Query and Mutation types)
-        mutation_pattern = r'^\s*(\w+)\s*\([^)]*\)\s*:\s*([^\n]+)'
-        query_section = re.search(r'type Query\s*\{([^}]*)\}', schema_content, re.DOTALL)
-        if query_section:
-            for match in re.finditer(mutation_pattern, query_section.group(1), re.MULTILINE):
-                operations[match.group(1)] = GraphQLOperation(
-                    name=match.group(1),
-                    type="query",
-                    return_type=match.group(2).strip()
-                )
-        
-        mutation_section = re.search(r'type Mutation\s*\{([^}]*)\}', schema_content, re.DOTALL)
-        if mutation_section:
-            for match in re.finditer(mutation_pattern, mutation_section.group(1), re.MULTILINE):
-                operations[match.group(1)] = GraphQLOperation(
-                    name=match.group(1),
-                    type="mutation",
-                    return_type=match.group(2).strip()
-                )
-        
-        return {"types": types, "operations": operations}
+        self.schema_catalog = SchemaCatalog.load_or_build(schema_file, CACHE_DIR / "schema_catalog.pkl")
+        return {"types": self.schema_catalog.types, "operations": self.schema_catalog.operations}
     
-    def _load_documentation(self) -> List[DocumentChunk]:
-        """Load documentation chunks"""
-        chunks = []
-        chunks_dir = DOC_DIR / "data" / "chunks"
-        
-        if not chunks_dir.exists():
-            logger.warning(f"Documentation chunks directory not found: {chunks_dir}")
-            return chunks
-        
-        # Load first 100 chunks for efficiency
-        for i, chunk_file in enumerate(sorted(chunks_dir.glob("chunk_*.txt"))[:100]):
-            with open(chunk_file, 'r') as f:
-                content = f.read()
-                chunks.append(DocumentChunk(
-                    id=chunk_file.stem,
-                    content=content[:1000],  # Limit content size
-                    source=chunk_file.name
-                ))
-        
-        return chunks
+    @property
+    def operations_store(self):
+        """Shared SQLite operations catalog (read-only), populated by the Postman sync"""
+        if self._operations_store is None:
+            from agent_common.operations_store import OperationsStore
+            self._operations_store = OperationsStore.open_readonly(OPERATIONS_DB_PATH)
+        return self._operations_store
+    
+    @property
+    def knowledge_base(self):
+        """Unified vector index (memory-mapped), loaded on first semantic search"""
+        if self._knowledge_base is None:
+            from src.knowledge_base import UnifiedKnowledgeBase
+            with open(CONFIG_PATH) as f:
+                config = json.load(f)
+            self._knowledge_base = UnifiedKnowledgeBase(config, build=False, mmap=True)
+        return self._knowledge_base
+    
+    @property
+    def doc_index(self):
+        """BM25 index over the full documentation corpus, built or loaded on first use"""
+        if self._doc_index is None:
+            from src.doc_search import BM25DocIndex
+            self._doc_index = BM25DocIndex.load_or_build(CACHE_DIR / "doc_bm25")
+        return self._doc_index
     
     def _load_programs(self) -> Dict[str, Program]:
         """Load program configurations"""
@@ -310,6 +246,40 @@ class DataMCPServer:
                                 "type": "string",
                                 "description": "Search query"
                             },
+                            "limit": {
+                                "type": "integer",
+                                "description": "Maximum results to return",
+                                "default": 5
+                            },
+                            "semantic": {
+                                "type": "boolean",
+                                "description": "Fuse keyword results with vector search over the docs (requires the unified index)",
+                                "default": False
+                            }
+                        },
+                        "required": ["query"]
+                    }
+                ),
+                
+                # Cross-source semantic search
+                Tool(
+                    name="search_knowledge_base",
+                    description="Semantic search across schema, documentation, programs and operations in one query",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "query": {
+                                "type": "string",
+                                "description": "Natural-language query"
+                            },
+                            "namespaces": {
+                                "type": "array",
+                                "items": {
+                                    "type": "string",
+                                    "enum": ["schema", "docs", "programs", "operations"]
+                                },
+                                "description": "Restrict results to these sources (optional)"
+                            },
                             "limit": {
                                 "type": "integer",
                                 "description": "Maximum results to return",
@@ -329,6 +299,29 @@ class DataMCPServer:
                         "properties": {}
                     }
                 ),
+                Tool(
+                    name="search_program_operations",
+                    description="Full-text search of Postman-synced program operations (names, categories, tags, descriptions, GraphQL)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "query": {
+                                "type": "string",
+                                "description": "Search query (e.g., 'activate card', 'velocity rule')"
+                            },
+                            "program_type": {
+                                "type": "string",
+                                "description": "Restrict to one program (optional)"
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "Maximum results to return",
+                                "default": 10
+                            }
+                        },
+                        "required": ["query"]
+                    }
+                ),
                 Tool(
                     name="get_program_details",
                     description="Get detailed information about a specific program",
@@ -383,7 +376,16 @@ class DataMCPServer:
                 elif name == "search_documentation":
                     results = self._search_documentation(
                         arguments["query"],
-                        arguments.get("limit", 5)
+                        arguments.get("limit", 5),
+                        arguments.get("semantic", False)
+                    )
+                    return [TextContent(type="text", text=json.dumps(results, indent=2))]
+                
+                elif name == "search_knowledge_base":
+                    results = self.knowledge_base.search(
+                        arguments["query"],
+                        arguments.get("limit", 5),
+                        arguments.get("namespaces")
                     )
                     return [TextContent(type="text", text=json.dumps(results, indent=2))]
                 
@@ -391,18 +393,36 @@ class DataMCPServer:
                     results = [asdict(p) for p in self.programs.values()]
                     return [TextContent(type="text", text=json.dumps(results, indent=2))]
                 
+                elif name == "search_program_operations":
+                    if self.operations_store is None:
+                        results = {"error": "Operations store not built; run the Postman sync first"}
+                    else:
+                        results = self.operations_store.search(
+                            arguments["query"],
+                            arguments.get("program_type"),
+                            arguments.get("limit", 10)
+                        )
+                    return [TextContent(type="text", text=json.dumps(results, indent=2))]
+                
                 elif name == "get_program_details":
                     result = self._get_program_details(arguments["program_id"])
                     return [TextContent(type="text", text=json.dumps(result, indent=2))]
                 
                 elif name == "get_statistics":
+                    if self._doc_index is not None:
+                        doc_chunks = self._doc_index.num_docs
+                    else:
+                        # Do not build the BM25 index just to count it
+                        from src.doc_search import BM25DocIndex
+                        stored = BM25DocIndex.stored_count(CACHE_DIR / "doc_bm25")
+                        doc_chunks = stored if stored is not None else "not built"
                     stats = {
                         "schema": {
                             "types": len(self.schema_data.get("types", {})),
                             "operations": len(self.schema_data.get("operations", {}))
                         },
                         "documentation": {
-                            "chunks": len(self.doc_chunks)
+                            "chunks": doc_chunks
                         },
                         "programs": {
                             "count": len(self.programs)
@@ -425,112 +445,62 @@ class DataMCPServer:
     
     def _search_schema_types(self, query: str, kind: Optional[str], limit: int) -> List[Dict[str, Any]]:
         """Search GraphQL types"""
-        results = []
-        query_lower = query.lower()
-        
-        for type_name, type_obj in self.schema_data.get("types", {}).items():
-            # Filter by kind if specified
-            if kind and type_obj.kind != kind:
-                continue
-            
-            # Calculate relevance score
-            score = 0
-            
-            # Check type name
-            if query_lower in type_name.lower():
-                score += 10
-            
-            # Check fields
-            if type_obj.fields:
-                for field in type_obj.fields:
-                    if query_lower in field["name"].lower():
-                        score += 5
-                    if query_lower in field.get("type", "").lower():
-                        score += 2
-            
-            # Check enum values
-            if type_obj.values:
-                for value in type_obj.values:
-                    if query_lower in value.lower():
-                        score += 3
-            
-            if score > 0:
-                results.append({
-                    "name": type_obj.name,
-                    "kind": type_obj.kind,
-                    "score": score,
-                    "field_count": len(type_obj.fields) if type_obj.fields else 0,
-                    "sample_fields": type_obj.fields[:3] if type_obj.fields else None,
-                    "sample_values": type_obj.values[:5] if type_obj.values else None
-                })
-        
-        # Sort by score and return top results
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return results[:limit]
+        return self.schema_catalog.search_types(query, kind, limit)
     
     def _get_type_details(self, type_name: str) -> Dict[str, Any]:
         """Get complete type details"""
         type_obj = self.schema_data.get("types", {}).get(type_name)
         
         if not type_obj:
-            return {"error": f"Type '{type_name}' not found"}
+            return {
+                "error": f"Type '{type_name}' not found",
+                "suggestions": self.schema_catalog.suggest_types(type_name)
+            }
         
         return asdict(type_obj)
     
     def _search_operations(self, query: str, op_type: str, limit: int) -> List[Dict[str, Any]]:
         """Search GraphQL operations"""
-        results = []
-        query_lower = query.lower()
-        
-        for op_name, op_obj in self.schema_data.get("operations", {}).items():
-            # Filter by type if specified
-            if op_type != "all" and op_obj.type != op_type:
-                continue
-            
-            # Calculate relevance score
-            score = 0
-            
-            if query_lower in op_name.lower():
-                score += 10
-            
-            if op_obj.return_type and query_lower in op_obj.return_type.lower():
-                score += 5
-            
-            if score > 0:
-                results.append({
-                    "name": op_obj.name,
-                    "type": op_obj.type,
-                    "return_type": op_obj.return_type,
-                    "score": score
-                })
-        
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return results[:limit]
+        return self.schema_catalog.search_operations(query, op_type, limit)
     
-    def _search_documentation(self, query: str, limit: int) -> List[Dict[str, Any]]:
-        """Search documentation chunks"""
-        results = []
-        query_lower = query.lower()
-        query_words = query_lower.split()
+    def _search_documentation(self, query: str, limit: int, semantic: bool = False) -> List[Dict[str, Any]]:
+        """
+        Search the full documentation corpus with BM25.
+
+        With ``semantic``, BM25 and the unified index's ``docs`` namespace are
+        fused by reciprocal rank (k=60); chunk ids are shared between the two.
+        """
+        index = self.doc_index
+        candidates = limit * 4 if semantic else limit
+        ranked = index.rank(query, candidates)
+        scores = {doc: score for doc, score in ranked}
         
-        for chunk in self.doc_chunks:
-            content_lower = chunk.content.lower()
-            
-            # Calculate relevance score
-            score = 0
-            for word in query_words:
-                score += content_lower.count(word)
-            
-            if score > 0:
-                results.append({
-                    "chunk_id": chunk.id,
-                    "score": score,
-                    "excerpt": chunk.content[:200],
-                    "source": chunk.source
-                })
+        if semantic:
+            try:
+                vector_hits = self.knowledge_base.search(query, candidates, ["docs"])
+            except Exception as e:
+                logger.warning(f"Semantic doc search unavailable, using BM25 only: {e}")
+                vector_hits = []
+            fused: Dict[int, float] = {}
+            for rank, (doc, _) in enumerate(ranked):
+                fused[doc] = fused.get(doc, 0.0) + 1.0 / (60 + rank + 1)
+            for rank, hit in enumerate(vector_hits):
+                doc = index.position(hit["chunk_id"][len("docs:"):])
+                if doc is not None:
+                    fused[doc] = fused.get(doc, 0.0) + 1.0 / (60 + rank + 1)
+            if vector_hits:
+                scores = fused
+                ranked = sorted(fused.items(), key=lambda x: x[1], reverse=True)
         
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return results[:limit]
+        results = []
+        for doc, _ in ranked[:limit]:
+            results.append({
+                "chunk_id": index.doc_ids[doc],
+                "score": round(scores[doc], 4),
+                "excerpt": index.excerpt(doc, query),
+                "source": index.sources[doc]
+            })
+        return results
     
     def _get_program_details(self, program_id: str) -> Dict[str, Any]:
         """Get program details"""
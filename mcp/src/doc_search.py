@@ -0,0 +1,233 @@
+"""
+Full-corpus BM25 search over the document-agent chunks
+
+The index is built once into ``cache/doc_bm25/`` as flat numpy arrays
+(CSR-style postings, document lengths, text offsets) plus a UTF-8 text blob,
+and served memory-mapped. Only the vocabulary dict lives on the Python heap;
+postings and chunk text are paged in on demand. The index is rebuilt when any
+source file's size or mtime changes.
+"""
+
+import os
+import re
+import json
+import shutil
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.knowledge_base import doc_source_files, iter_doc_chunks
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how i in is it of on or that the this to was what when "
+    "where which with you your do does can".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens without stopwords."""
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _fingerprint(files: List[Path]) -> List[List[Any]]:
+    fingerprint = []
+    for path in files:
+        stat = path.stat()
+        fingerprint.append([str(path), stat.st_size, stat.st_mtime_ns])
+    return fingerprint
+
+
+class BM25DocIndex:
+    """
+    Memory-mapped BM25 index over every documentation chunk.
+
+    Attributes:
+        doc_ids: Chunk id per document (matches the knowledge base ``docs`` namespace)
+        sources: Source file per document
+    """
+
+    FILES = ("term_offsets.npy", "postings_docs.npy", "postings_tf.npy",
+             "doc_lengths.npy", "text_offsets.npy", "texts.bin", "docs.json")
+
+    def __init__(self, index_dir: Path, k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            index_dir: Directory holding the built index
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalization
+        """
+        self.index_dir = Path(index_dir)
+        self.k1 = k1
+        self.b = b
+        self._load()
+
+    @classmethod
+    def load_or_build(cls, index_dir: Path, chunk_size: int = 1000, overlap: int = 100) -> "BM25DocIndex":
+        """Load the index, rebuilding it first if the documentation changed."""
+        index_dir = Path(index_dir)
+        fingerprint = _fingerprint(doc_source_files())
+        manifest_path = index_dir / "manifest.json"
+        if manifest_path.exists():
+            try:
+                with open(manifest_path, "r") as f:
+                    manifest = json.load(f)
+                if (manifest.get("version") == INDEX_VERSION
+                        and manifest.get("fingerprint") == fingerprint
+                        and all((index_dir / name).exists() for name in cls.FILES)):
+                    return cls(index_dir)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Ignoring unreadable BM25 manifest: {e}")
+
+        cls.build(index_dir, fingerprint, chunk_size, overlap)
+        return cls(index_dir)
+
+    @staticmethod
+    def stored_count(index_dir: Path) -> Optional[int]:
+        """Documents recorded in a built index's manifest, without loading or rebuilding it."""
+        try:
+            with open(Path(index_dir) / "manifest.json", "r") as f:
+                return json.load(f).get("documents")
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    @staticmethod
+    def build(index_dir: Path, fingerprint: List[List[Any]], chunk_size: int = 1000, overlap: int = 100):
+        """
+        Tokenize every chunk and write the index files.
+
+        Built into a sibling temp directory and swapped in, so a concurrent
+        reader never sees a half-written index.
+        """
+        index_dir = Path(index_dir)
+        tmp_dir = index_dir.with_name(index_dir.name + ".tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+
+        vocabulary: Dict[str, int] = {}
+        term_postings: List[List[Tuple[int, int]]] = []
+        doc_ids, sources, doc_lengths, text_offsets = [], [], [], [0]
+
+        with open(tmp_dir / "texts.bin", "wb") as blob:
+            for doc, (chunk_id, text, source) in enumerate(iter_doc_chunks(chunk_size, overlap)):
+                tokens = tokenize(text)
+                counts: Dict[str, int] = {}
+                for token in tokens:
+                    counts[token] = counts.get(token, 0) + 1
+                for token, tf in counts.items():
+                    term = vocabulary.get(token)
+                    if term is None:
+                        term = vocabulary[token] = len(term_postings)
+                        term_postings.append([])
+                    term_postings[term].append((doc, tf))
+                encoded = text.encode("utf-8")
+                blob.write(encoded)
+                text_offsets.append(text_offsets[-1] + len(encoded))
+                doc_ids.append(chunk_id)
+                sources.append(source)
+                doc_lengths.append(len(tokens))
+
+        term_offsets = np.zeros(len(term_postings) + 1, dtype=np.int64)
+        term_offsets[1:] = np.cumsum([len(p) for p in term_postings])
+        postings_docs = np.fromiter((d for p in term_postings for d, _ in p), dtype=np.int32,
+                                    count=int(term_offsets[-1]))
+        postings_tf = np.fromiter((min(tf, 65535) for p in term_postings for _, tf in p), dtype=np.uint16,
+                                  count=int(term_offsets[-1]))
+
+        np.save(tmp_dir / "term_offsets.npy", term_offsets)
+        np.save(tmp_dir / "postings_docs.npy", postings_docs)
+        np.save(tmp_dir / "postings_tf.npy", postings_tf)
+        np.save(tmp_dir / "doc_lengths.npy", np.asarray(doc_lengths, dtype=np.int32))
+        np.save(tmp_dir / "text_offsets.npy", np.asarray(text_offsets, dtype=np.int64))
+        with open(tmp_dir / "docs.json", "w") as f:
+            json.dump({"vocabulary": vocabulary, "doc_ids": doc_ids, "sources": sources}, f)
+        with open(tmp_dir / "manifest.json", "w") as f:
+            json.dump({"version": INDEX_VERSION, "fingerprint": fingerprint,
+                       "documents": len(doc_ids), "terms": len(vocabulary)}, f)
+
+        old_dir = index_dir.with_name(index_dir.name + ".old")
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if index_dir.exists():
+            os.replace(index_dir, old_dir)
+        os.replace(tmp_dir, index_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+        logger.info(f"Built BM25 index: {len(doc_ids)} chunks, {len(vocabulary)} terms")
+
+    def _load(self):
+        with open(self.index_dir / "docs.json", "r") as f:
+            docs = json.load(f)
+        self.vocabulary: Dict[str, int] = docs["vocabulary"]
+        self.doc_ids: List[str] = docs["doc_ids"]
+        self.sources: List[str] = docs["sources"]
+
+        self.term_offsets = np.load(self.index_dir / "term_offsets.npy", mmap_mode="r")
+        self.postings_docs = np.load(self.index_dir / "postings_docs.npy", mmap_mode="r")
+        self.postings_tf = np.load(self.index_dir / "postings_tf.npy", mmap_mode="r")
+        self.doc_lengths = np.load(self.index_dir / "doc_lengths.npy", mmap_mode="r")
+        self.text_offsets = np.load(self.index_dir / "text_offsets.npy", mmap_mode="r")
+        texts_path = self.index_dir / "texts.bin"
+        # np.memmap cannot map an empty file
+        self._texts = np.memmap(texts_path, dtype=np.uint8, mode="r") if texts_path.stat().st_size else None
+
+        self.num_docs = len(self.doc_ids)
+        self.avg_length = float(self.doc_lengths.mean()) if self.num_docs else 0.0
+        self._positions = {doc_id: i for i, doc_id in enumerate(self.doc_ids)}
+        self._norm = None
+
+    def text(self, doc: int) -> str:
+        """Full text of a document, read from the memory-mapped blob."""
+        if self._texts is None:
+            return ""
+        start, end = int(self.text_offsets[doc]), int(self.text_offsets[doc + 1])
+        return bytes(self._texts[start:end]).decode("utf-8")
+
+    def position(self, chunk_id: str) -> Optional[int]:
+        """Document number for a chunk id."""
+        return self._positions.get(chunk_id)
+
+    def rank(self, query: str, limit: int) -> List[Tuple[int, float]]:
+        """
+        Score every document containing a query term.
+
+        Returns:
+            (document number, BM25 score), best first
+        """
+        terms = [self.vocabulary[t] for t in dict.fromkeys(tokenize(query)) if t in self.vocabulary]
+        if not terms or not self.num_docs:
+            return []
+
+        if self._norm is None:
+            lengths = np.asarray(self.doc_lengths, dtype=np.float32)
+            self._norm = self.k1 * (1 - self.b + self.b * lengths / max(self.avg_length, 1.0))
+        norm = self._norm
+        scores = np.zeros(self.num_docs, dtype=np.float32)
+        for term in terms:
+            start, end = int(self.term_offsets[term]), int(self.term_offsets[term + 1])
+            docs = np.asarray(self.postings_docs[start:end])
+            tf = np.asarray(self.postings_tf[start:end], dtype=np.float32)
+            df = end - start
+            idf = np.log(1 + (self.num_docs - df + 0.5) / (df + 0.5))
+            scores[docs] += idf * tf * (self.k1 + 1) / (tf + norm[docs])
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > limit:
+            matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        ordered = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(int(doc), float(scores[doc])) for doc in ordered]
+
+    def excerpt(self, doc: int, query: str, width: int = 200) -> str:
+        """Window of the document around the first query-term hit."""
+        text = self.text(doc)
+        lower = text.lower()
+        hits = [lower.find(t) for t in tokenize(query)]
+        hits = [h for h in hits if h >= 0]
+        start = max(0, min(hits) - width // 4) if hits else 0
+        if start:
+            # Begin at a word boundary
+            start = text.rfind(" ", 0, start) + 1
+        return text[start:start + width]
@@ -0,0 +1,501 @@
+"""
+Unified knowledge base for the Lamplight MCP servers
+
+One FAISS index holds schema, documentation, program and operation chunks.
+Each namespace owns a disjoint range of vector ids (``namespace_id << 40``),
+so a search can be restricted to any subset of namespaces with an id-range
+selector instead of keeping one index (and one model copy) per source.
+
+Builds are incremental: chunks are keyed by a stable id and a content hash,
+so rebuilding only embeds new or changed chunks and removes deleted ones.
+Serving processes load the index memory-mapped and read-only.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Base paths
+MCP_DIR = Path(__file__).parent.parent
+BASE_DIR = MCP_DIR.parent
+SCHEMA_DIR = BASE_DIR / "agents" / "schema-agent"
+DOC_DIR = BASE_DIR / "agents" / "document-agent"
+SHIP_DIR = BASE_DIR / "agents" / "ship-agent"
+
+# Namespace -> id prefix. Ids are (prefix << NAMESPACE_SHIFT) + offset.
+NAMESPACES = {"schema": 1, "docs": 2, "programs": 3, "operations": 4}
+NAMESPACE_SHIFT = 40
+
+METADATA_VERSION = 1
+
+
+def content_hash(text: str) -> str:
+    """Stable hash used to detect changed chunks between builds."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def split_text(text: str, chunk_size: int, overlap: int) -> List[str]:
+    """
+    Split text into overlapping windows, preferring whitespace boundaries.
+
+    Args:
+        text: Text to split
+        chunk_size: Maximum characters per chunk
+        overlap: Characters shared by consecutive chunks
+
+    Returns:
+        List of non-empty chunks
+    """
+    text = text.strip()
+    if len(text) <= chunk_size:
+        return [text] if text else []
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            boundary = text.rfind(" ", start + chunk_size // 2, end)
+            if boundary != -1:
+                end = boundary
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+
+def iter_doc_chunks(chunk_size: int = 1000, overlap: int = 100) -> Iterator[Tuple[str, str, str]]:
+    """
+    Yield every document-agent chunk as (chunk_id, text, source).
+
+    Uses the chunker output (``data/chunks``) when present, otherwise splits
+    the raw docs. Shared by the vector index and the data server's BM25 index
+    so both agree on chunk ids.
+    """
+    chunks_dir = DOC_DIR / "data" / "chunks"
+    metadata_file = chunks_dir / "chunks_metadata.json"
+    if metadata_file.exists():
+        with open(metadata_file, "r") as f:
+            chunk_metadata = json.load(f)
+        for meta in chunk_metadata:
+            path = Path(meta["file_path"])
+            if not path.is_absolute():
+                path = DOC_DIR / path
+            if not path.exists():
+                continue
+            content = path.read_text(encoding="utf-8")
+            # Skip the chunk file's metadata header
+            if "=" * 50 in content:
+                content = content.split("=" * 50, 1)[1].strip()
+            if content:
+                yield meta["chunk_id"], content, meta.get("source_file", path.name)
+        return
+
+    docs_dir = DOC_DIR / "data" / "docs"
+    if not docs_dir.exists():
+        logger.warning(f"Documentation not found: {docs_dir}")
+        return
+    for path in sorted(docs_dir.glob("*.txt")):
+        text = path.read_text(encoding="utf-8")
+        for i, part in enumerate(split_text(text, chunk_size, overlap)):
+            yield f"{path.stem}:{i}", part, path.name
+
+
+def doc_source_files() -> List[Path]:
+    """Files whose changes invalidate documentation chunks."""
+    chunks_dir = DOC_DIR / "data" / "chunks"
+    if (chunks_dir / "chunks_metadata.json").exists():
+        return sorted(chunks_dir.glob("*.txt")) + [chunks_dir / "chunks_metadata.json"]
+    return sorted((DOC_DIR / "data" / "docs").glob("*.txt"))
+
+
+class UnifiedKnowledgeBase:
+    """
+    Namespaced FAISS index over every agent's data.
+
+    Attributes:
+        index: ``faiss.IndexIDMap2`` over normalized embeddings (inner product)
+        metadata: chunk_id -> {namespace, source, content_hash, faiss_id, text}
+    """
+
+    def __init__(self, config: Dict[str, Any], build: bool = True, mmap: bool = True):
+        """
+        Args:
+            config: Server config; the ``knowledge_base`` section is used
+            build: Incrementally (re)build the index from agent data. When
+                False, only load the saved index for serving.
+            mmap: Memory-map the saved index when loading for serving
+        """
+        if not FAISS_AVAILABLE:
+            raise ImportError("faiss is required for the unified knowledge base (pip install faiss-cpu)")
+
+        kb_config = config.get("knowledge_base", {})
+        self.index_path = MCP_DIR / kb_config.get("faiss_index_path", "embeddings/unified.index")
+        self.metadata_path = MCP_DIR / kb_config.get("metadata_path", "embeddings/metadata.json")
+        self.chunk_size = kb_config.get("chunk_size", 1000)
+        self.overlap = kb_config.get("overlap", 100)
+        self.embedding_model = kb_config.get("embedding_model", "all-MiniLM-L6-v2")
+        self.dimension = kb_config.get("embedding_dimension", 384)
+
+        self.index = None
+        self.metadata: Dict[str, Dict[str, Any]] = {}
+        self._id_to_chunk: Dict[int, str] = {}
+        self._model = None
+        self.read_only = False
+
+        if build:
+            self.build()
+        else:
+            self.load_index(mmap=mmap)
+
+    # ------------------------------------------------------------------
+    # Embedding
+    # ------------------------------------------------------------------
+
+    @property
+    def model(self):
+        """Sentence-transformer model, loaded on first use."""
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            logger.info(f"Loading embedding model: {self.embedding_model}")
+            self._model = SentenceTransformer(self.embedding_model)
+        return self._model
+
+    def _encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        vectors = self.model.encode(texts, batch_size=batch_size, normalize_embeddings=True,
+                                    show_progress_bar=len(texts) > 500)
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _new_index(self):
+        return faiss.IndexIDMap2(faiss.IndexFlatIP(self.dimension))
+
+    def load_index(self, mmap: bool = True) -> bool:
+        """
+        Load the saved index and metadata.
+
+        Args:
+            mmap: Memory-map the index read-only (serving). Builds need a
+                mutable copy and pass False.
+
+        Returns:
+            True if a compatible saved index was loaded
+        """
+        if not self.index_path.exists() or not self.metadata_path.exists():
+            logger.info(f"No saved knowledge base at {self.index_path}")
+            self.index = self._new_index()
+            self.metadata = {}
+            self._id_to_chunk = {}
+            return False
+
+        with open(self.metadata_path, "r") as f:
+            saved = json.load(f)
+        if (saved.get("version") != METADATA_VERSION
+                or saved.get("embedding_model") != self.embedding_model
+                or saved.get("dimension") != self.dimension):
+            logger.warning("Saved knowledge base was built with a different model or format; ignoring it")
+            self.index = self._new_index()
+            self.metadata = {}
+            self._id_to_chunk = {}
+            return False
+
+        index = None
+        if mmap:
+            try:
+                index = faiss.read_index(str(self.index_path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+                self.read_only = True
+            except RuntimeError as e:
+                logger.warning(f"Memory-mapped load failed, reading index into memory: {e}")
+        if index is None:
+            index = faiss.read_index(str(self.index_path))
+            self.read_only = False
+
+        self.index = index
+        self.metadata = saved.get("chunks", {})
+        self._id_to_chunk = {meta["faiss_id"]: chunk_id for chunk_id, meta in self.metadata.items()}
+        logger.info(f"Loaded knowledge base: {self.index.ntotal} vectors{' (mmap)' if self.read_only else ''}")
+        return True
+
+    def save_index(self):
+        """Atomically write the index and metadata."""
+        if self.read_only:
+            raise RuntimeError("Knowledge base was loaded read-only; rebuild it to save")
+
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self.metadata_path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_index = self.index_path.with_suffix(self.index_path.suffix + ".tmp")
+        faiss.write_index(self.index, str(tmp_index))
+        os.replace(tmp_index, self.index_path)
+
+        payload = {
+            "version": METADATA_VERSION,
+            "embedding_model": self.embedding_model,
+            "dimension": self.dimension,
+            "chunks": self.metadata,
+        }
+        tmp_meta = self.metadata_path.with_suffix(self.metadata_path.suffix + ".tmp")
+        with open(tmp_meta, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp_meta, self.metadata_path)
+        logger.info(f"Saved knowledge base to {self.index_path} ({self.index.ntotal} vectors)")
+
+    # ------------------------------------------------------------------
+    # Source collectors: yield (chunk_id, text, source)
+    # ------------------------------------------------------------------
+
+    def _collect_schema(self) -> Iterator[Tuple[str, str, str]]:
+        chunks_dir = SCHEMA_DIR / "data" / "chunks"
+        if chunks_dir.exists():
+            for path in sorted(chunks_dir.glob("*.graphql")):
+                text = path.read_text(encoding="utf-8")
+                if text.strip():
+                    yield f"schema:{path.stem}", text, path.name
+            return
+
+        # No chunker output; split the SDL into one chunk per definition
+        schema_file = SCHEMA_DIR / "schema" / "highnote.graphql"
+        if not schema_file.exists():
+            logger.warning(f"Schema not found: {schema_file}")
+            return
+        from graphql import parse
+
+        sdl = schema_file.read_text(encoding="utf-8")
+        for definition in parse(sdl).definitions:
+            name = getattr(getattr(definition, "name", None), "value", None) or definition.kind
+            text = sdl[definition.loc.start:definition.loc.end]
+            for i, part in enumerate(split_text(text, self.chunk_size * 4, self.overlap)):
+                yield f"schema:{name}:{i}", part, schema_file.name
+
+    def _collect_docs(self) -> Iterator[Tuple[str, str, str]]:
+        for chunk_id, text, source in iter_doc_chunks(self.chunk_size, self.overlap):
+            yield f"docs:{chunk_id}", text, source
+
+    def _collect_programs(self) -> Iterator[Tuple[str, str, str]]:
+        programs_dir = SHIP_DIR / "data" / "programs"
+        if not programs_dir.exists():
+            logger.warning(f"Programs not found: {programs_dir}")
+            return
+        for path in sorted(programs_dir.glob("*.yaml")):
+            text = path.read_text(encoding="utf-8")
+            for i, part in enumerate(split_text(text, self.chunk_size, self.overlap)):
+                yield f"programs:{path.stem}:{i}", part, path.name
+
+    def _collect_operations(self) -> Iterator[Tuple[str, str, str]]:
+        operations_dir = SHIP_DIR / "data" / "operations"
+        if not operations_dir.exists():
+            logger.warning(f"Operations not found: {operations_dir}")
+            return
+        for path in sorted(operations_dir.glob("*_operations.json")):
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Skipping {path.name}: {e}")
+                continue
+            # Extracted collections are {program_type, operations: [...]}; older
+            # exports are a bare list of operations carrying their own program_type
+            if isinstance(data, dict):
+                default_program = data.get("program_type")
+                operations = data.get("operations", [])
+            else:
+                default_program = None
+                operations = data
+            default_program = default_program or path.stem.replace("_operations", "")
+            for op in operations:
+                name = op.get("name") if isinstance(op, dict) else None
+                if not name:
+                    continue
+                program = op.get("program_type") or default_program
+                op_type = op.get("type") or op.get("operation_type", "operation")
+                graphql = op.get("graphql", "")
+                if isinstance(graphql, dict):
+                    graphql = graphql.get("query", "")
+                text = (f"{op_type} {name} "
+                        f"(program: {program}, category: {op.get('category', 'general')}, "
+                        f"required: {op.get('required', False)})\n{graphql}")
+                yield f"operations:{program}:{name}", text, path.name
+
+    # ------------------------------------------------------------------
+    # Build
+    # ------------------------------------------------------------------
+
+    def _collectors(self):
+        return {
+            "schema": self._collect_schema,
+            "docs": self._collect_docs,
+            "programs": self._collect_programs,
+            "operations": self._collect_operations,
+        }
+
+    def build(self, namespaces: Optional[List[str]] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Incrementally rebuild the given namespaces (default: all).
+
+        Unchanged chunks keep their vectors; changed chunks are re-embedded
+        under their existing id; deleted chunks are removed.
+
+        Returns:
+            Per-namespace counts of added, updated, removed and unchanged chunks
+        """
+        self.load_index(mmap=False)
+        collectors = self._collectors()
+        stats = {}
+        for namespace in namespaces or list(NAMESPACES):
+            if namespace not in collectors:
+                raise ValueError(f"Unknown namespace: {namespace}")
+            stats[namespace] = self._build_namespace(namespace, collectors[namespace]())
+            logger.info(f"Namespace {namespace}: {stats[namespace]}")
+        return stats
+
+    def _build_namespace(self, namespace: str, chunks: Iterator[Tuple[str, str, str]]) -> Dict[str, int]:
+        existing = {cid: meta for cid, meta in self.metadata.items() if meta["namespace"] == namespace}
+        base = NAMESPACES[namespace] << NAMESPACE_SHIFT
+        next_offset = max((meta["faiss_id"] - base for meta in existing.values()), default=-1) + 1
+
+        seen = set()
+        pending: List[Tuple[str, str, str, str]] = []
+        stale_ids: List[int] = []
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+
+        for chunk_id, text, source in chunks:
+            if chunk_id in seen:
+                continue
+            seen.add(chunk_id)
+            digest = content_hash(text)
+            old = existing.get(chunk_id)
+            if old and old["content_hash"] == digest:
+                counts["unchanged"] += 1
+                continue
+            if old:
+                stale_ids.append(old["faiss_id"])
+                counts["updated"] += 1
+            else:
+                counts["added"] += 1
+            pending.append((chunk_id, text, source, digest))
+
+        for chunk_id in set(existing) - seen:
+            stale_ids.append(existing[chunk_id]["faiss_id"])
+            self._id_to_chunk.pop(existing[chunk_id]["faiss_id"], None)
+            del self.metadata[chunk_id]
+            counts["removed"] += 1
+
+        if stale_ids:
+            self.index.remove_ids(np.array(stale_ids, dtype=np.int64))
+
+        if pending:
+            vectors = self._encode([text for _, text, _, _ in pending])
+            ids = []
+            for chunk_id, text, source, digest in pending:
+                old = existing.get(chunk_id)
+                if old:
+                    faiss_id = old["faiss_id"]
+                else:
+                    faiss_id = base + next_offset
+                    next_offset += 1
+                ids.append(faiss_id)
+                self.metadata[chunk_id] = {
+                    "namespace": namespace,
+                    "source": source,
+                    "content_hash": digest,
+                    "faiss_id": faiss_id,
+                    "text": text,
+                }
+                self._id_to_chunk[faiss_id] = chunk_id
+            self.index.add_with_ids(vectors, np.array(ids, dtype=np.int64))
+
+        return counts
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _namespace_selector(namespaces: List[str]):
+        """Build an id-range selector; sub-selectors are returned to keep them alive."""
+        ranges = []
+        for namespace in namespaces:
+            if namespace not in NAMESPACES:
+                raise ValueError(f"Unknown namespace: {namespace}")
+            start = NAMESPACES[namespace] << NAMESPACE_SHIFT
+            ranges.append(faiss.IDSelectorRange(start, start + (1 << NAMESPACE_SHIFT)))
+        selector = ranges[0]
+        keep_alive = list(ranges)
+        for other in ranges[1:]:
+            selector = faiss.IDSelectorOr(selector, other)
+            keep_alive.append(selector)
+        return selector, keep_alive
+
+    def search(self, query: str, top_k: int = 5,
+               namespaces: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Semantic search across the knowledge base.
+
+        Args:
+            query: Natural-language query
+            top_k: Number of results
+            namespaces: Restrict results to these namespaces (default: all)
+
+        Returns:
+            Results with chunk_id, namespace, source, score and text
+        """
+        if self.index is None or self.index.ntotal == 0:
+            return []
+
+        vector = self._encode([query])
+        params = None
+        keep_alive = None
+        if namespaces and set(namespaces) != set(NAMESPACES):
+            selector, keep_alive = self._namespace_selector(namespaces)
+            params = faiss.SearchParameters(sel=selector)
+
+        scores, ids = self.index.search(vector, top_k, params=params)
+        del keep_alive
+
+        results = []
+        for score, faiss_id in zip(scores[0], ids[0]):
+            if faiss_id < 0:
+                continue
+            chunk_id = self._id_to_chunk.get(int(faiss_id))
+            if chunk_id is None:
+                continue
+            meta = self.metadata[chunk_id]
+            results.append({
+                "chunk_id": chunk_id,
+                "namespace": meta["namespace"],
+                "source": meta["source"],
+                "score": float(score),
+                "text": meta["text"],
+            })
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Vector and per-namespace chunk counts."""
+        per_namespace: Dict[str, int] = {}
+        for meta in self.metadata.values():
+            per_namespace[meta["namespace"]] = per_namespace.get(meta["namespace"], 0) + 1
+        return {
+            "vectors": self.index.ntotal if self.index is not None else 0,
+            "namespaces": per_namespace,
+            "embedding_model": self.embedding_model,
+            "memory_mapped": self.read_only,
+        }
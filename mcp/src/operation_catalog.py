@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Indexed operation catalog for the Solutions MCP Server.
+
+Operations are indexed once when loaded:
+- exact (program, name) lookup via a hash map
+- substring lookup over names, categories, tags and descriptions via the
+  trigram ``SubstringIndex`` shared with the schema catalog
+- precomputed per-program query/mutation counts
+"""
+
+import heapq
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.schema_catalog import SubstringIndex
+
+logger = logging.getLogger(__name__)
+
+# Field weights, matching the original linear scan
+NAME_SCORE = 10
+CATEGORY_SCORE = 5
+TAG_SCORE = 3
+DESCRIPTION_SCORE = 2
+
+
+class OperationCatalog:
+    """
+    Operation indexes across all programs.
+
+    Operations are numbered in program order, so each program occupies a
+    contiguous id range and ties sort exactly as the linear scan did.
+    Catalogs are immutable once built; reloads build a new one and swap the
+    reference so in-flight searches see a consistent index.
+    """
+
+    def __init__(self, operations: Dict[str, List[Any]]):
+        """
+        Args:
+            operations: program_type -> operations (PostmanOperation records)
+        """
+        self.operations: List[Any] = []
+        self.ranges: Dict[str, range] = {}
+        self.by_name: Dict[Tuple[str, str], Any] = {}
+        self.program_counts: Dict[str, Dict[str, int]] = {}
+
+        for program_type, ops in list(operations.items()):
+            start = len(self.operations)
+            self.operations.extend(ops)
+            self.ranges[program_type] = range(start, len(self.operations))
+            for op in ops:
+                # First definition wins, as the linear scan did
+                self.by_name.setdefault((program_type, op.name), op)
+            self.program_counts[program_type] = {
+                "queries": sum(1 for op in ops if op.operation_type == "query"),
+                "mutations": sum(1 for op in ops if op.operation_type == "mutation"),
+            }
+
+        ops = self.operations
+        self.names = SubstringIndex.build((op.name, i) for i, op in enumerate(ops))
+        self.categories = SubstringIndex.build((op.category, i) for i, op in enumerate(ops))
+        self.tags = SubstringIndex.build((tag, i) for i, op in enumerate(ops) for tag in (op.tags or []))
+        self.descriptions = SubstringIndex.build((op.description, i) for i, op in enumerate(ops) if op.description)
+
+    def score(self, query: str) -> Dict[int, int]:
+        """Score operations whose name, category, tags or description contain ``query``."""
+        scores: Dict[int, int] = {}
+        for owner in self.names.owners(self.names.find(query)):
+            scores[owner] = scores.get(owner, 0) + NAME_SCORE
+        for owner in self.categories.owners(self.categories.find(query)):
+            scores[owner] = scores.get(owner, 0) + CATEGORY_SCORE
+        for owner, count in self.tags.owners(self.tags.find(query)).items():
+            scores[owner] = scores.get(owner, 0) + TAG_SCORE * count
+        for owner in self.descriptions.owners(self.descriptions.find(query)):
+            scores[owner] = scores.get(owner, 0) + DESCRIPTION_SCORE
+        return scores
+
+    def find(self, query: str, program_type: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Find operations matching ``query``.
+
+        Args:
+            query: Case-insensitive substring
+            program_type: Restrict to one program; ignored if unknown
+            limit: Maximum results
+
+        Returns:
+            Result dicts sorted by score, ties in program/operation order
+        """
+        scores = self.score(query)
+        id_range = self.ranges.get(program_type) if program_type else None
+        if id_range is not None:
+            scores = {i: score for i, score in scores.items() if i in id_range}
+
+        results = []
+        for i in heapq.nsmallest(limit, scores, key=lambda i: (-scores[i], i)):
+            op = self.operations[i]
+            results.append({
+                "name": op.name,
+                "program_type": op.program_type,
+                "operation_type": op.operation_type,
+                "category": op.category,
+                "score": scores[i]
+            })
+        return results
+
+    def get(self, program_type: str, name: str) -> Optional[Any]:
+        """Exact operation lookup."""
+        return self.by_name.get((program_type, name))
+
+    def counts(self, program_type: str) -> Dict[str, int]:
+        """Precomputed query and mutation counts for a program."""
+        return self.program_counts.get(program_type, {"queries": 0, "mutations": 0})
@@ -4,14 +4,24 @@ Postman Sync Utility
 
 Synchronizes operations from Postman collections (source of truth) to operations JSON files.
 This ensures consistency between what's in Postman and what the MCP server uses.
+
+A manifest of collection content hashes lets unchanged collections be skipped,
+and parsed collections are cached by hash so each is parsed once per process.
+Synced collections are also written to the shared SQLite operations store.
 """
 
+import os
 import json
+import hashlib
 import logging
+import tempfile
+import threading
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
+from agent_common.operations_store import normalize_program_type
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -96,6 +106,7 @@ class PostmanOperationExtractor:
                 'name': item.get('name', 'Unknown'),
                 'program_type': program_type,
                 'operation_type': graphql_info['operation_type'],
+                'method': request.get('method', 'POST'),
                 'graphql': {
                     'query': graphql_info['query'],
                     'variables': graphql_info['variables']
@@ -141,32 +152,146 @@ class PostmanOperationExtractor:
 class PostmanToOperationsSync:
     """Syncs Postman collections to operations JSON files"""
     
-    def __init__(self, postman_dir: Path, operations_dir: Path):
+    MANIFEST_NAME = ".postman_sync_manifest.json"
+    # sync_all results that are not operation counts
+    SKIPPED = -2
+    FAILED = -1
+    
+    def __init__(self, postman_dir: Path, operations_dir: Path,
+                 store_path: Optional[Path] = None, use_store: bool = True):
         self.postman_dir = Path(postman_dir)
         self.operations_dir = Path(operations_dir)
         self.operations_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.operations_dir / self.MANIFEST_NAME
+        self.manifest = self._load_manifest()
+        # collection path -> (content hash, parsed collection)
+        self._parsed: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self.store_path = store_path or self.operations_dir.parent / "operations_catalog.db"
+        self.use_store = use_store
+        self._store = None
+    
+    @property
+    def store(self):
+        """Writable operations store, opened on first use"""
+        if self._store is None and self.use_store:
+            from agent_common.operations_store import OperationsStore
+            self._store = OperationsStore(self.store_path)
+        return self._store
+    
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Load the collection-hash manifest written by previous syncs"""
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable sync manifest: {e}")
+            return {}
+    
+    def _save_manifest(self):
+        # Unique temp file, so concurrent writers never share one
+        with tempfile.NamedTemporaryFile('w', dir=self.operations_dir, prefix=self.MANIFEST_NAME + '.',
+                                         suffix='.tmp', delete=False) as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(f.name, self.manifest_path)
+    
+    @staticmethod
+    def content_hash(postman_file: Path) -> str:
+        """SHA-256 of a collection file's bytes"""
+        digest = hashlib.sha256()
+        with open(postman_file, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def load_collection(self, postman_file: Path, file_hash: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Parse a collection, reusing the cached parse if its content is unchanged.
+        
+        Args:
+            postman_file: Collection path
+            file_hash: Precomputed content hash (computed if omitted)
+        
+        Returns:
+            Parsed collection JSON
+        """
+        file_hash = file_hash or self.content_hash(postman_file)
+        cached = self._parsed.get(str(postman_file))
+        if cached and cached[0] == file_hash:
+            return cached[1]
+        
+        with open(postman_file, 'r') as f:
+            collection = json.load(f)
+        self._parsed[str(postman_file)] = (file_hash, collection)
+        return collection
     
-    def sync_all(self) -> Dict[str, int]:
-        """Sync all Postman collections to operations files"""
+    def release(self, postman_file: Path):
+        """Drop the cached parse of a collection once it has been loaded"""
+        self._parsed.pop(str(postman_file), None)
+    
+    def is_unchanged(self, postman_file: Path, file_hash: Optional[str] = None) -> bool:
+        """True if the collection matches the manifest and its operations file exists"""
+        entry = self.manifest.get(postman_file.name)
+        if not entry:
+            return False
+        file_hash = file_hash or self.content_hash(postman_file)
+        output_file = self.operations_dir / f"{entry['program_type']}_operations.json"
+        if entry.get('sha256') != file_hash or not output_file.exists():
+            return False
+        # The store must hold this version too (it may be new or rebuilt)
+        if self.use_store and self.store.program_for_collection(postman_file, file_hash) is None:
+            return False
+        return True
+    
+    def sync_all(self, force: bool = False) -> Dict[str, int]:
+        """
+        Sync all Postman collections to operations files.
+        
+        Args:
+            force: Re-sync collections even if their content hash is unchanged
+        
+        Returns:
+            collection stem -> operations written (SKIPPED when unchanged, FAILED on error)
+        """
         results = {}
+        present = set()
         
-        for postman_file in self.postman_dir.glob('*.json'):
+        for postman_file in sorted(self.postman_dir.glob('*.json')):
+            present.add(postman_file.name)
             try:
-                count = self.sync_collection(postman_file)
+                file_hash = self.content_hash(postman_file)
+                if not force and self.is_unchanged(postman_file, file_hash):
+                    results[postman_file.stem] = self.SKIPPED
+                    logger.info(f"Skipped unchanged collection {postman_file.name}")
+                    continue
+                count = self.sync_collection(postman_file, file_hash=file_hash, save_manifest=False)
                 results[postman_file.stem] = count
                 logger.info(f"Synced {count} operations from {postman_file.name}")
             except Exception as e:
                 logger.error(f"Failed to sync {postman_file}: {e}")
-                results[postman_file.stem] = -1
+                results[postman_file.stem] = self.FAILED
+        
+        # Forget collections that were removed; their operations files are left in place
+        for name in set(self.manifest) - present:
+            del self.manifest[name]
+        for path in [p for p in self._parsed if Path(p).name not in present]:
+            del self._parsed[path]
+        self._save_manifest()
+        if self.use_store:
+            for program in self.store.list_programs():
+                if program['collection_file'] and program['collection_file'] not in present:
+                    self.store.remove_collection(program['collection_file'])
         
         return results
     
-    def sync_collection(self, postman_file: Path) -> int:
+    def sync_collection(self, postman_file: Path, file_hash: Optional[str] = None,
+                        save_manifest: bool = True) -> int:
         """Sync a single Postman collection to operations file"""
         
         # Load Postman collection
-        with open(postman_file, 'r') as f:
-            collection = json.load(f)
+        file_hash = file_hash or self.content_hash(postman_file)
+        collection = self.load_collection(postman_file, file_hash)
         
         # Determine program type from filename
         program_type = self._get_program_type(postman_file.stem)
@@ -186,35 +311,56 @@ class PostmanToOperationsSync:
         logger.info(f"Saved {len(operations)} operations to {output_file}")
         
         # Also update the YAML config if it exists
-        self._update_yaml_config(program_type, operations)
+        config = self._update_yaml_config(program_type, operations)
+        if self._store_collection(postman_file, file_hash, collection, program_type, operations, config):
+            # Readers load this version from the store, so the parse is no longer needed
+            self.release(postman_file)
+        
+        self.manifest[postman_file.name] = {
+            'sha256': file_hash,
+            'program_type': program_type,
+            'operations': len(operations),
+            'synced_at': datetime.now().isoformat()
+        }
+        if save_manifest:
+            self._save_manifest()
         
         return len(operations)
     
+    def _store_collection(self, postman_file: Path, file_hash: str, collection: Dict[str, Any],
+                          program_type: str, operations: List[Dict[str, Any]],
+                          config: Optional[Dict[str, Any]]) -> bool:
+        """Record the synced collection in the shared operations store; True if stored"""
+        if not self.use_store:
+            return False
+        info = collection.get('info', {})
+        description = info.get('description', '')
+        if isinstance(description, dict):
+            description = description.get('content', '')
+        try:
+            self.store.replace_program(
+                program_type, info.get('name', postman_file.stem), operations,
+                collection_file=postman_file, content_hash=file_hash,
+                description=description,
+                workflows=(config or {}).get('workflows')
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"Could not update operations store for {program_type}: {e}")
+            return False
+    
     def _get_program_type(self, collection_name: str) -> str:
         """Convert collection name to program type"""
-        # Handle special cases
-        mappings = {
-            'Consumer Credit': 'consumer_credit',
-            'Trip.com': 'trip_com',
-            'Trip_com': 'trip_com',
-            'AP Automation': 'ap_automation',
-            'Fleet': 'fleet'
-        }
-        
-        if collection_name in mappings:
-            return mappings[collection_name]
-        
-        # Default: lowercase with underscores
-        return collection_name.lower().replace(' ', '_').replace('-', '_')
+        return normalize_program_type(collection_name)
     
-    def _update_yaml_config(self, program_type: str, operations: List[Dict[str, Any]]):
-        """Update YAML config with operation categories from Postman"""
+    def _update_yaml_config(self, program_type: str, operations: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Update YAML config with operation categories from Postman; returns the updated config"""
         yaml_dir = self.operations_dir.parent / 'programs'
         yaml_file = yaml_dir / f"{program_type}.yaml"
         
         if not yaml_file.exists():
             logger.info(f"No YAML config found for {program_type}, skipping update")
-            return
+            return None
         
         try:
             import yaml
@@ -245,9 +391,79 @@ class PostmanToOperationsSync:
                 yaml.dump(config, f, default_flow_style=False, sort_keys=False)
             
             logger.info(f"Updated YAML config for {program_type}")
+            return config
             
         except Exception as e:
             logger.warning(f"Could not update YAML for {program_type}: {e}")
+            return None
+
+
+class PostmanCollectionWatcher:
+    """
+    Polls a Postman directory and reports changed collections.
+    
+    Uses size/mtime polling in a daemon thread so no extra dependency is
+    needed. The callback receives (path, event) where event is 'created',
+    'modified' or 'deleted'.
+    """
+    
+    def __init__(self, postman_dir: Path, callback: Callable[[Path, str], None], interval: float = 2.0):
+        self.postman_dir = Path(postman_dir)
+        self.callback = callback
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._state = self._snapshot()
+    
+    def _snapshot(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        for path in self.postman_dir.glob('*.json'):
+            try:
+                stat = path.stat()
+                snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                continue  # Removed between glob and stat
+        return snapshot
+    
+    def poll(self) -> List[Tuple[Path, str]]:
+        """Compare against the last snapshot and dispatch changes"""
+        current = self._snapshot()
+        events = []
+        for path, signature in current.items():
+            previous = self._state.get(path)
+            if previous is None:
+                events.append((path, 'created'))
+            elif previous != signature:
+                events.append((path, 'modified'))
+        for path in set(self._state) - set(current):
+            events.append((path, 'deleted'))
+        self._state = current
+        
+        for path, event in events:
+            try:
+                self.callback(path, event)
+            except Exception as e:
+                logger.error(f"Watcher callback failed for {path.name} ({event}): {e}")
+        return events
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+    
+    def start(self):
+        """Start polling in a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='postman-watcher', daemon=True)
+        self._thread.start()
+        logger.info(f"Watching {self.postman_dir} for collection changes")
+    
+    def stop(self):
+        """Stop polling"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
 
 
 def main():
@@ -263,6 +479,8 @@ def main():
                        help='Directory to save operations files')
     parser.add_argument('--collection',
                        help='Specific collection to sync (optional)')
+    parser.add_argument('--force', action='store_true',
+                       help='Re-sync collections even if unchanged since the last sync')
     
     args = parser.parse_args()
     
@@ -281,12 +499,14 @@ def main():
             print(f"Collection not found: {postman_file}")
     else:
         # Sync all collections
-        results = syncer.sync_all()
+        results = syncer.sync_all(force=args.force)
         
         print("\nSync Results:")
         print("-" * 40)
         for collection, count in results.items():
-            if count >= 0:
+            if count == syncer.SKIPPED:
+                print(f"  {collection}: unchanged")
+            elif count >= 0:
                 print(f"  {collection}: {count} operations")
             else:
                 print(f"  {collection}: FAILED")
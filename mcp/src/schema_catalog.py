@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Indexed GraphQL schema catalog for the Data MCP Server.
+
+The SDL is parsed once with graphql-core into compact typed records, then
+indexed for fast lookups:
+- exact name lookup
+- substring lookup over type names, field names, field types and enum values
+  via trigram postings (verified against the candidate terms)
+- prefix lookup over sorted lowercase names
+
+The built catalog is pickled next to a fingerprint of the SDL so the server
+can start without re-parsing the schema.
+"""
+
+import bisect
+import hashlib
+import logging
+import pickle
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION = 1
+
+
+@dataclass
+class GraphQLType:
+    """Represents a GraphQL type definition"""
+    name: str
+    kind: str  # type, interface, enum, input, scalar, union
+    description: Optional[str] = None
+    fields: Optional[List[Dict[str, Any]]] = None
+    values: Optional[List[str]] = None  # For enums and union members
+
+
+@dataclass
+class GraphQLOperation:
+    """Represents a GraphQL operation"""
+    name: str
+    type: str  # query, mutation, subscription
+    description: Optional[str] = None
+    arguments: Optional[List[Dict[str, str]]] = None
+    return_type: Optional[str] = None
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SubstringIndex:
+    """
+    Substring and prefix lookup over a vocabulary of distinct terms.
+
+    Each term maps to postings of (owner, count) so a caller can score owners
+    (e.g. types) by how many of their fields matched.
+    """
+
+    def __init__(self):
+        self.terms: List[str] = []                      # lowercase distinct terms
+        self.postings: List[List[Tuple[str, int]]] = []  # term id -> [(owner, count)]
+        self.grams: Dict[str, List[int]] = {}           # trigram -> sorted term ids
+        self.sorted_terms: List[Tuple[str, int]] = []   # (term, id) for prefix lookup
+
+    @classmethod
+    def build(cls, pairs: Iterable[Tuple[str, str]]) -> "SubstringIndex":
+        """
+        Build from (term, owner) pairs; repeated pairs increase the count.
+
+        Args:
+            pairs: Iterable of (term, owner)
+        """
+        index = cls()
+        counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for term, owner in pairs:
+            counts[term.lower()][owner] += 1
+
+        grams: Dict[str, List[int]] = defaultdict(list)
+        for term_id, term in enumerate(sorted(counts)):
+            index.terms.append(term)
+            index.postings.append(sorted(counts[term].items()))
+            for gram in _trigrams(term):
+                grams[gram].append(term_id)
+        index.grams = dict(grams)
+        index.sorted_terms = [(term, i) for i, term in enumerate(index.terms)]
+        return index
+
+    def find(self, query: str) -> List[int]:
+        """Return ids of terms containing ``query`` (case-insensitive)."""
+        query = query.lower()
+        if not query:
+            return []
+        if len(query) < 3:
+            # Too short for trigrams; the distinct vocabulary is small enough to scan
+            return [i for i, term in enumerate(self.terms) if query in term]
+
+        posting_lists = []
+        for gram in _trigrams(query):
+            ids = self.grams.get(gram)
+            if not ids:
+                return []
+            posting_lists.append(ids)
+        posting_lists.sort(key=len)
+        candidates = set(posting_lists[0])
+        for ids in posting_lists[1:]:
+            candidates.intersection_update(ids)
+            if not candidates:
+                return []
+        return sorted(i for i in candidates if query in self.terms[i])
+
+    def prefix(self, query: str, limit: int = 20) -> List[int]:
+        """Return ids of terms starting with ``query`` (case-insensitive)."""
+        query = query.lower()
+        start = bisect.bisect_left(self.sorted_terms, (query, -1))
+        matches = []
+        for term, term_id in self.sorted_terms[start:]:
+            if not term.startswith(query) or len(matches) >= limit:
+                break
+            matches.append(term_id)
+        return matches
+
+    def owners(self, term_ids: Iterable[int]) -> Dict[str, int]:
+        """Sum posting counts per owner for the given term ids."""
+        totals: Dict[str, int] = defaultdict(int)
+        for term_id in term_ids:
+            for owner, count in self.postings[term_id]:
+                totals[owner] += count
+        return totals
+
+
+class SchemaCatalog:
+    """Parsed schema records plus name, field-name, field-type and enum-value indexes."""
+
+    def __init__(self, types: Dict[str, GraphQLType], operations: Dict[str, GraphQLOperation]):
+        self.types = types
+        self.operations = operations
+        self._build_indexes()
+
+    def _build_indexes(self):
+        self.type_names = SubstringIndex.build((name, name) for name in self.types)
+        self.field_names = SubstringIndex.build(
+            (field["name"], t.name) for t in self.types.values() for field in (t.fields or [])
+        )
+        self.field_types = SubstringIndex.build(
+            (field["type"], t.name) for t in self.types.values() for field in (t.fields or [])
+        )
+        self.enum_values = SubstringIndex.build(
+            (value, t.name) for t in self.types.values() if t.kind == "enum" for value in (t.values or [])
+        )
+        self.operation_names = SubstringIndex.build((name, name) for name in self.operations)
+        self.return_types = SubstringIndex.build(
+            (op.return_type, op.name) for op in self.operations.values() if op.return_type
+        )
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_sdl(cls, sdl: str) -> "SchemaCatalog":
+        """Parse SDL with graphql-core and build the catalog."""
+        from graphql import parse, print_ast
+        from graphql.language import ast
+
+        kinds = {
+            ast.ObjectTypeDefinitionNode: "type",
+            ast.ObjectTypeExtensionNode: "type",
+            ast.InterfaceTypeDefinitionNode: "interface",
+            ast.InterfaceTypeExtensionNode: "interface",
+            ast.EnumTypeDefinitionNode: "enum",
+            ast.EnumTypeExtensionNode: "enum",
+            ast.InputObjectTypeDefinitionNode: "input",
+            ast.InputObjectTypeExtensionNode: "input",
+            ast.ScalarTypeDefinitionNode: "scalar",
+            ast.ScalarTypeExtensionNode: "scalar",
+            ast.UnionTypeDefinitionNode: "union",
+            ast.UnionTypeExtensionNode: "union",
+        }
+        root_names = {"query": "Query", "mutation": "Mutation", "subscription": "Subscription"}
+
+        document = parse(sdl, no_location=True)
+        types: Dict[str, GraphQLType] = {}
+        for node in document.definitions:
+            if isinstance(node, ast.SchemaDefinitionNode):
+                for op in node.operation_types:
+                    root_names[op.operation.value] = op.type.name.value
+                continue
+            kind = kinds.get(type(node))
+            if kind is None:
+                continue
+            name = node.name.value
+            record = types.get(name)
+            if record is None:
+                description = getattr(node, "description", None)
+                record = GraphQLType(name=name, kind=kind,
+                                     description=description.value if description else None)
+                types[name] = record
+
+            if kind == "enum":
+                record.values = (record.values or []) + [v.name.value for v in node.values or []]
+            elif kind == "union":
+                record.values = (record.values or []) + [t.name.value for t in node.types or []]
+            elif kind != "scalar":
+                fields = []
+                for field in node.fields or []:
+                    entry = {"name": field.name.value, "type": print_ast(field.type)}
+                    if field.description:
+                        entry["description"] = field.description.value
+                    arguments = getattr(field, "arguments", None)
+                    if arguments:
+                        entry["arguments"] = [{"name": a.name.value, "type": print_ast(a.type)} for a in arguments]
+                    fields.append(entry)
+                record.fields = (record.fields or []) + fields
+
+        operations: Dict[str, GraphQLOperation] = {}
+        for op_type, root_name in root_names.items():
+            root = types.get(root_name)
+            if not root:
+                continue
+            for field in root.fields or []:
+                operations[field["name"]] = GraphQLOperation(
+                    name=field["name"],
+                    type=op_type,
+                    description=field.get("description"),
+                    arguments=field.get("arguments"),
+                    return_type=field["type"],
+                )
+        return cls(types, operations)
+
+    @staticmethod
+    def fingerprint(schema_file: Path) -> Dict[str, Any]:
+        """Size, mtime and content hash of the SDL file."""
+        stat = schema_file.stat()
+        return {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": hashlib.sha256(schema_file.read_bytes()).hexdigest(),
+        }
+
+    def save(self, catalog_path: Path, fingerprint: Dict[str, Any]):
+        """Persist the catalog (records and indexes) with the SDL fingerprint."""
+        catalog_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = catalog_path.with_suffix(catalog_path.suffix + ".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"version": CATALOG_VERSION, "fingerprint": fingerprint, "catalog": self},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(catalog_path)
+
+    @classmethod
+    def load_or_build(cls, schema_file: Path, catalog_path: Optional[Path] = None) -> "SchemaCatalog":
+        """
+        Load a persisted catalog if it matches the SDL, otherwise parse and persist.
+
+        Args:
+            schema_file: Path to the GraphQL SDL
+            catalog_path: Where the prebuilt catalog is stored (None disables persistence)
+
+        Returns:
+            SchemaCatalog instance
+        """
+        if catalog_path and catalog_path.exists():
+            try:
+                with open(catalog_path, "rb") as f:
+                    cached = pickle.load(f)
+                stored = cached.get("fingerprint", {})
+                stat = schema_file.stat()
+                if cached.get("version") == CATALOG_VERSION and (
+                    (stored.get("size") == stat.st_size and stored.get("mtime_ns") == stat.st_mtime_ns)
+                    or stored.get("sha256") == cls.fingerprint(schema_file)["sha256"]
+                ):
+                    logger.info(f"Loaded prebuilt schema catalog from {catalog_path}")
+                    return cached["catalog"]
+            except Exception as e:
+                logger.warning(f"Failed to load schema catalog: {e}")
+
+        catalog = cls.from_sdl(schema_file.read_text())
+        if catalog_path:
+            try:
+                catalog.save(catalog_path, cls.fingerprint(schema_file))
+                logger.info(f"Saved schema catalog to {catalog_path}")
+            except Exception as e:
+                logger.warning(f"Failed to save schema catalog: {e}")
+        return catalog
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def search_types(self, query: str, kind: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Score types by substring matches on name (10), field names (5 each),
+        field types (2 each) and enum values (3 each).
+        """
+        scores: Dict[str, int] = defaultdict(int)
+        for term_id in self.type_names.find(query):
+            for owner, _ in self.type_names.postings[term_id]:
+                scores[owner] += 10
+        for owner, count in self.field_names.owners(self.field_names.find(query)).items():
+            scores[owner] += 5 * count
+        for owner, count in self.field_types.owners(self.field_types.find(query)).items():
+            scores[owner] += 2 * count
+        for owner, count in self.enum_values.owners(self.enum_values.find(query)).items():
+            scores[owner] += 3 * count
+
+        results = []
+        for name, score in scores.items():
+            type_obj = self.types[name]
+            if kind and type_obj.kind != kind:
+                continue
+            results.append({
+                "name": type_obj.name,
+                "kind": type_obj.kind,
+                "score": score,
+                "field_count": len(type_obj.fields) if type_obj.fields else 0,
+                "sample_fields": [{"name": f["name"], "type": f["type"]} for f in type_obj.fields[:3]]
+                if type_obj.fields else None,
+                "sample_values": type_obj.values[:5] if type_obj.values else None,
+            })
+        results.sort(key=lambda x: (-x["score"], x["name"]))
+        return results[:limit]
+
+    def search_operations(self, query: str, op_type: str = "all", limit: int = 10) -> List[Dict[str, Any]]:
+        """Score operations by substring matches on name (10) and return type (5)."""
+        scores: Dict[str, int] = defaultdict(int)
+        for term_id in self.operation_names.find(query):
+            for owner, _ in self.operation_names.postings[term_id]:
+                scores[owner] += 10
+        for owner in self.return_types.owners(self.return_types.find(query)):
+            scores[owner] += 5
+
+        results = []
+        for name, score in scores.items():
+            op = self.operations[name]
+            if op_type != "all" and op.type != op_type:
+                continue
+            results.append({"name": op.name, "type": op.type, "return_type": op.return_type, "score": score})
+        results.sort(key=lambda x: (-x["score"], x["name"]))
+        return results[:limit]
+
+    def suggest_types(self, prefix: str, limit: int = 10) -> List[str]:
+        """Type names starting with ``prefix``, then names containing it."""
+        term_ids = self.type_names.prefix(prefix, limit)
+        if len(term_ids) < limit:
+            seen = set(term_ids)
+            term_ids += [i for i in self.type_names.find(prefix) if i not in seen]
+        names = [owner for i in term_ids for owner, _ in self.type_names.postings[i]]
+        return names[:limit]
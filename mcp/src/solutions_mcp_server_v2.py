@@ -3,11 +3,14 @@
 Solutions MCP Server V2
 
 Enhanced version that uses Postman collections as the source of truth for operations.
-Automatically syncs from Postman collections on startup.
+Automatically syncs changed Postman collections on startup and can watch the
+collection directory to hot-reload a single changed collection.
 """
 
+import os
 import json
 import logging
+import threading
 import yaml
 from pathlib import Path
 from typing import List, Dict, Any, Optional
@@ -20,7 +23,9 @@ from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 
 # Import sync utility
-from src.postman_sync import PostmanToOperationsSync, PostmanOperationExtractor
+from src.postman_sync import PostmanToOperationsSync, PostmanOperationExtractor, PostmanCollectionWatcher
+from src.operation_catalog import OperationCatalog
+from agent_common.operations_store import OperationsStore, normalize_program_type
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -63,12 +68,25 @@ class SolutionsMCPServerV2:
     Enhanced MCP Server that uses Postman collections as source of truth
     """
     
-    def __init__(self, auto_sync: bool = True):
-        """Initialize the Solutions MCP Server V2"""
+    def __init__(self, auto_sync: bool = True, watch: bool = False):
+        """
+        Initialize the Solutions MCP Server V2
+        
+        Args:
+            auto_sync: Sync changed collections to operations files on startup
+            watch: Poll the Postman directory and hot-reload changed collections
+        """
         self.server = Server("lamplight-solutions-v2")
         self.postman_dir = POSTMAN_DIR
         self.operations_dir = OPERATIONS_DIR
         self.programs_dir = PROGRAMS_DIR
+        # Shared so sync and load parse each collection once
+        self.syncer = PostmanToOperationsSync(self.postman_dir, self.operations_dir)
+        self._collection_programs: Dict[str, str] = {}  # collection file name -> program_type
+        # Serializes sync and reloads; readers never take it, they see whole dicts swapped in
+        self._reload_lock = threading.RLock()
+        self.watcher: Optional[PostmanCollectionWatcher] = None
+        self._store: Optional[OperationsStore] = None
         
         # Auto-sync from Postman on startup
         if auto_sync:
@@ -79,77 +97,145 @@ class SolutionsMCPServerV2:
         logger.info("Loading Solutions MCP Server V2 data...")
         self.programs = self._load_programs_from_postman()
         self.operations = self._load_operations_from_postman()
+        self.catalog = OperationCatalog(self.operations)
         
         # Register MCP handlers
         self._register_handlers()
         
+        if watch:
+            self.watcher = PostmanCollectionWatcher(self.postman_dir, self._on_collection_changed)
+            self.watcher.start()
+        
         logger.info(f"Solutions MCP Server V2 initialized:")
         logger.info(f"  - {len(self.programs)} programs from Postman")
         logger.info(f"  - {sum(len(ops) for ops in self.operations.values())} total operations")
         logger.info(f"  - Source: Postman collections (source of truth)")
     
-    def _sync_from_postman(self):
-        """Sync all Postman collections to operations files"""
-        syncer = PostmanToOperationsSync(self.postman_dir, self.operations_dir)
-        results = syncer.sync_all()
-        logger.info(f"Synced {sum(c for c in results.values() if c >= 0)} operations from Postman")
+    def _sync_from_postman(self, force: bool = False) -> Dict[str, int]:
+        """Sync changed Postman collections to operations files"""
+        with self._reload_lock:
+            results = self.syncer.sync_all(force=force)
+        skipped = sum(1 for c in results.values() if c == self.syncer.SKIPPED)
+        logger.info(f"Synced {sum(c for c in results.values() if c >= 0)} operations from Postman "
+                    f"({skipped} unchanged collections skipped)")
+        return results
     
     def _load_programs_from_postman(self) -> Dict[str, PostmanProgram]:
         """Load programs directly from Postman collections"""
         programs = {}
+        collection_programs = {}
         
         for postman_file in self.postman_dir.glob("*.json"):
             try:
-                with open(postman_file, 'r') as f:
-                    collection = json.load(f)
-                
-                # Extract program info
-                collection_name = collection.get('info', {}).get('name', postman_file.stem)
-                program_type = self._normalize_program_name(collection_name)
-                
-                # Extract all operations
-                operations = []
-                categories = {}
-                
-                for item in collection.get('item', []):
-                    ops = PostmanOperationExtractor.process_item(item, '', program_type)
-                    for op in ops:
-                        # Create PostmanOperation
-                        operation = PostmanOperation(
-                            name=op['name'],
-                            program_type=program_type,
-                            operation_type=op['operation_type'],
-                            graphql=op['graphql'],
-                            category=op['metadata'].get('category', 'uncategorized'),
-                            path=op['metadata'].get('path', ''),
-                            description=op['metadata'].get('description'),
-                            tags=op['metadata'].get('tags', [])
-                        )
-                        operations.append(operation)
-                        
-                        # Track categories
-                        cat = operation.category
-                        if cat not in categories:
-                            categories[cat] = []
-                        categories[cat].append(operation.name)
-                
-                # Create program
-                program = PostmanProgram(
-                    name=collection_name,
-                    program_type=program_type,
-                    operations=operations,
-                    categories=categories,
-                    total_operations=len(operations),
-                    last_synced=datetime.now()
-                )
-                
-                programs[program_type] = program
-                
+                program = self._load_program(postman_file)
+                programs[program.program_type] = program
+                collection_programs[postman_file.name] = program.program_type
             except Exception as e:
                 logger.error(f"Failed to load program from {postman_file}: {e}")
         
+        self._collection_programs = collection_programs
         return programs
     
+    @property
+    def store(self) -> Optional[OperationsStore]:
+        """Read-only operations store, once the sync step has created it"""
+        if self._store is None:
+            self._store = OperationsStore.open_readonly(self.syncer.store_path)
+        return self._store
+    
+    def _extract_operations(self, postman_file: Path):
+        """
+        Return (collection name, extracted operations) for a collection.
+        
+        Reads the operations store when it holds a current sync of the file;
+        otherwise parses the collection (once, via the syncer's cache).
+        """
+        stored = self.store.program_for_collection(postman_file) if self.store else None
+        if stored:
+            return stored['name'], self.store.get_operations(stored['program_type'])
+        
+        collection = self.syncer.load_collection(postman_file)
+        self.syncer.release(postman_file)
+        collection_name = collection.get('info', {}).get('name', postman_file.stem)
+        program_type = self._normalize_program_name(collection_name)
+        ops = []
+        for item in collection.get('item', []):
+            ops.extend(PostmanOperationExtractor.process_item(item, '', program_type))
+        return collection_name, ops
+    
+    def _load_program(self, postman_file: Path) -> PostmanProgram:
+        """Build a program from one collection"""
+        collection_name, ops = self._extract_operations(postman_file)
+        
+        # Extract program info
+        program_type = self._normalize_program_name(collection_name)
+        
+        # Extract all operations
+        operations = []
+        categories = {}
+        
+        for op in ops:
+            # Create PostmanOperation
+            operation = PostmanOperation(
+                name=op['name'],
+                program_type=program_type,
+                operation_type=op['operation_type'],
+                graphql=op['graphql'],
+                category=op['metadata'].get('category', 'uncategorized'),
+                path=op['metadata'].get('path', ''),
+                description=op['metadata'].get('description'),
+                tags=op['metadata'].get('tags', [])
+            )
+            operations.append(operation)
+            
+            # Track categories
+            cat = operation.category
+            if cat not in categories:
+                categories[cat] = []
+            categories[cat].append(operation.name)
+        
+        # Create program
+        return PostmanProgram(
+            name=collection_name,
+            program_type=program_type,
+            operations=operations,
+            categories=categories,
+            total_operations=len(operations),
+            last_synced=datetime.now()
+        )
+    
+    def _on_collection_changed(self, postman_file: Path, event: str):
+        """Hot-reload a single collection reported by the watcher"""
+        with self._reload_lock:
+            # Build new dicts and swap them in; request handlers iterate the old ones unlocked
+            collection_programs = dict(self._collection_programs)
+            programs = dict(self.programs)
+            operations = dict(self.operations)
+            old_program = collection_programs.pop(postman_file.name, None)
+            if old_program:
+                programs.pop(old_program, None)
+                operations.pop(old_program, None)
+            
+            if event == 'deleted':
+                if self.syncer.use_store:
+                    self.syncer.store.remove_collection(postman_file.name)
+                self.syncer.release(postman_file)
+                program = None
+            else:
+                self.syncer.sync_collection(postman_file)
+                program = self._load_program(postman_file)
+                programs[program.program_type] = program
+                operations[program.program_type] = program.operations
+                collection_programs[postman_file.name] = program.program_type
+            
+            catalog = OperationCatalog(operations)
+            self.programs, self.operations, self.catalog = programs, operations, catalog
+            self._collection_programs = collection_programs
+            if program is None:
+                logger.info(f"Collection removed: {postman_file.name} ({old_program})")
+            else:
+                logger.info(f"Reloaded {postman_file.name}: {program.total_operations} operations ({event})")
+    
     def _load_operations_from_postman(self) -> Dict[str, List[PostmanOperation]]:
         """Load operations grouped by program from Postman"""
         operations = {}
@@ -161,17 +247,7 @@ class SolutionsMCPServerV2:
     
     def _normalize_program_name(self, name: str) -> str:
         """Normalize program name for consistency"""
-        mappings = {
-            'Consumer Credit': 'consumer_credit',
-            'Trip.com': 'trip_com',
-            'AP Automation': 'ap_automation',
-            'Fleet': 'fleet'
-        }
-        
-        if name in mappings:
-            return mappings[name]
-        
-        return name.lower().replace(' ', '_').replace('.', '_').replace('-', '_')
+        return normalize_program_type(name)
     
     def _register_handlers(self):
         """Register MCP protocol handlers"""
@@ -248,7 +324,13 @@ class SolutionsMCPServerV2:
                     description="Re-sync operations from Postman collections",
                     inputSchema={
                         "type": "object",
-                        "properties": {}
+                        "properties": {
+                            "force": {
+                                "type": "boolean",
+                                "description": "Re-sync collections even if unchanged",
+                                "default": False
+                            }
+                        }
                     }
                 ),
                 Tool(
@@ -290,11 +372,16 @@ class SolutionsMCPServerV2:
                     return [TextContent(type="text", text=json.dumps(result, indent=2, default=str))]
                 
                 elif name == "sync_from_postman":
-                    self._sync_from_postman()
-                    self.programs = self._load_programs_from_postman()
-                    self.operations = self._load_operations_from_postman()
+                    with self._reload_lock:
+                        sync_results = self._sync_from_postman(arguments.get("force", False))
+                        programs = self._load_programs_from_postman()
+                        operations = {program_type: program.operations for program_type, program in programs.items()}
+                        self.programs, self.operations = programs, operations
+                        self.catalog = OperationCatalog(operations)
                     result = {
                         "status": "success",
+                        "collections_synced": sum(1 for c in sync_results.values() if c >= 0),
+                        "collections_unchanged": sum(1 for c in sync_results.values() if c == self.syncer.SKIPPED),
                         "programs_loaded": len(self.programs),
                         "total_operations": sum(len(ops) for ops in self.operations.values())
                     }
@@ -361,46 +448,7 @@ class SolutionsMCPServerV2:
     
     def _find_operations(self, query: str, program_type: Optional[str], limit: int) -> List[Dict[str, Any]]:
         """Find operations matching query"""
-        results = []
-        query_lower = query.lower()
-        
-        # Search in specified program or all
-        search_programs = [program_type] if program_type and program_type in self.operations else self.operations.keys()
-        
-        for prog_type in search_programs:
-            for op in self.operations[prog_type]:
-                score = 0
-                
-                # Search in name
-                if query_lower in op.name.lower():
-                    score += 10
-                
-                # Search in category
-                if query_lower in op.category.lower():
-                    score += 5
-                
-                # Search in tags
-                if op.tags:
-                    for tag in op.tags:
-                        if query_lower in tag.lower():
-                            score += 3
-                
-                # Search in description
-                if op.description and query_lower in op.description.lower():
-                    score += 2
-                
-                if score > 0:
-                    results.append({
-                        "name": op.name,
-                        "program_type": op.program_type,
-                        "operation_type": op.operation_type,
-                        "category": op.category,
-                        "score": score
-                    })
-        
-        # Sort by score
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return results[:limit]
+        return self.catalog.find(query, program_type, limit)
     
     def _get_operation_details(self, operation_name: str, program_type: str) -> Dict[str, Any]:
         """Get complete operation details"""
@@ -408,18 +456,18 @@ class SolutionsMCPServerV2:
         if program_type not in self.operations:
             return {"error": f"Program '{program_type}' not found"}
         
-        for op in self.operations[program_type]:
-            if op.name == operation_name:
-                return {
-                    "name": op.name,
-                    "program_type": op.program_type,
-                    "operation_type": op.operation_type,
-                    "category": op.category,
-                    "path": op.path,
-                    "description": op.description,
-                    "tags": op.tags,
-                    "graphql": op.graphql
-                }
+        op = self.catalog.get(program_type, operation_name)
+        if op:
+            return {
+                "name": op.name,
+                "program_type": op.program_type,
+                "operation_type": op.operation_type,
+                "category": op.category,
+                "path": op.path,
+                "description": op.description,
+                "tags": op.tags,
+                "graphql": op.graphql
+            }
         
         return {"error": f"Operation '{operation_name}' not found in {program_type}"}
     
@@ -436,8 +484,7 @@ class SolutionsMCPServerV2:
                 "name": program.name,
                 "operations": program.total_operations,
                 "categories": len(program.categories),
-                "queries": sum(1 for op in program.operations if op.operation_type == "query"),
-                "mutations": sum(1 for op in program.operations if op.operation_type == "mutation")
+                **self.catalog.counts(prog_type)
             }
         
         return stats
@@ -472,7 +519,7 @@ class SolutionsMCPServerV2:
 
 async def main():
     """Main entry point"""
-    server = SolutionsMCPServerV2(auto_sync=True)
+    server = SolutionsMCPServerV2(auto_sync=True, watch=os.getenv("POSTMAN_WATCH", "true").lower() == "true")
     await server.run()
 
 